@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Export pipeline stages (parse, map, DXF, IFC, passport, hashing) on synthetic projects, tracked over time.
+
+--save appends the run to .cache/benchmarks/export_pipeline.ndjson; --check compares each
+stage's median with the median of the last --window saved runs from the same host and Python
+and exits 1 when one is slower than benchmarks/thresholds.json allows (see benchlib).
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import io
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from benchlib import add_history_options, finish, run_record  # also puts scripts/ on sys.path
+
+import json_io
+from active_set_lib import sha256_file
+from export_dxf import generate_dxf_stub
+from export_ifc import generate_ifc_stub
+from export_mapping import map_snapshot_to_export_config
+from export_passport import generate_passport
+from snapshot_model import parse_snapshot_bytes
+from synth_project import generate_snapshot
+
+def _time(repeat: int, fn: Callable[[], Any]) -> dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return {"median_s": statistics.median(samples), "min_s": min(samples)}
+
+
+def bench_size(nodes: int, repeat: int, tmp: Path) -> dict[str, dict[str, float]]:
+    raw = json_io.dumps(generate_snapshot(nodes))
+    snapshot = parse_snapshot_bytes(raw)
+    config = map_snapshot_to_export_config(snapshot, "bench")
+    dxf, ifc, passport = tmp / "bench.dxf", tmp / "bench.ifc", tmp / "bench.passport.md"
+
+    def write_ifc() -> None:
+        with contextlib.redirect_stdout(io.StringIO()):  # generate_ifc_stub reports the path it wrote
+            generate_ifc_stub(config, str(ifc))
+
+    timings = {
+        "parse": _time(repeat, lambda: parse_snapshot_bytes(raw)),
+        "map": _time(repeat, lambda: map_snapshot_to_export_config(snapshot, "bench")),
+        "dxf": _time(repeat, lambda: generate_dxf_stub(config, dxf)),
+        "ifc": _time(repeat, write_ifc),
+        "passport": _time(repeat, lambda: generate_passport(config, passport)),
+    }
+    artifacts = sorted(p for p in tmp.iterdir() if p.name.startswith("bench."))
+    timings["hash"] = _time(
+        repeat, lambda: (hashlib.sha256(raw).hexdigest(), [sha256_file(p) for p in artifacts])
+    )
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="Project sizes.")
+    parser.add_argument("--repeat", type=int, default=5)
+    add_history_options(parser, "export_pipeline")
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for nodes in args.nodes:
+            for stage, timing in bench_size(nodes, args.repeat, Path(tmp)).items():
+                results[f"{stage}@{nodes}"] = timing
+
+    return finish(args, run_record("export_pipeline", results, repeat=args.repeat))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
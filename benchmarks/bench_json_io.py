@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Compare json_io backends on the sample .rivo.json scaled up to a large project."""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+import json_io  # noqa: E402
+
+SAMPLE = REPO_ROOT / "research/RIVO_Deliverables_Passport_DXF_IFC_JSON/05_sample_project.rivo.json"
+
+
+def scaled_config(copies: int) -> dict:
+    config = json.loads(SAMPLE.read_text(encoding="utf-8"))
+    template = config["elements"]
+    elements = []
+    for i in range(copies):
+        for elem in template:
+            clone = copy.deepcopy(elem)
+            clone["id"] = f"{elem['id']}-{i}"
+            elements.append(clone)
+    config["elements"] = elements
+    return config
+
+
+def _best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--copies", type=int, default=50_000, help="Copies of the sample element set.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    config = scaled_config(args.copies)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "large.rivo.json"
+        json_io.dump_path(config, source, pretty=True, backend="stdlib")
+        target = Path(tmp) / "out.json"
+
+        results: dict[str, object] = {
+            "elements": len(config["elements"]),
+            "bytes": source.stat().st_size,
+            "baseline_read_text_json_loads_s": _best_of(
+                args.repeat, lambda: json.loads(source.read_text(encoding="utf-8"))
+            ),
+            "baseline_json_dumps_write_text_s": _best_of(
+                args.repeat,
+                lambda: target.write_text(json.dumps(config, ensure_ascii=False, indent=2), encoding="utf-8"),
+            ),
+        }
+        for backend in json_io.available_backends():
+            results[backend] = {
+                "load_path_s": _best_of(args.repeat, lambda: json_io.load_path(source, backend=backend)),
+                "dump_path_pretty_s": _best_of(
+                    args.repeat, lambda: json_io.dump_path(config, target, pretty=True, backend=backend)
+                ),
+                "dump_path_compact_s": _best_of(args.repeat, lambda: json_io.dump_path(config, target, backend=backend)),
+            }
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
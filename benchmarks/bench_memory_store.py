@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Runs per second writing run records to WalMemoryStore: fsync per write vs group commit."""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from uuid import uuid4
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+from memory_wal import WalMemoryStore  # noqa: E402
+
+
+def run_payload(i: int) -> dict:
+    # Shaped like the record swarmctl run writes.
+    return {
+        "objective": f"Implement catalog export endpoint #{i}",
+        "route": {"task_type": "T3", "complexity": "C2", "primary_model": "light-model", "fallbacks": ["mid-model"]},
+        "status": "completed",
+    }
+
+
+def bench(runs: int, workers: int, sync: bool) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = WalMemoryStore(Path(tmp), sync=sync)
+
+        def one_run(i: int) -> None:
+            key = f"run:{uuid4()}"
+            future = store.write(key, run_payload(i))
+            assert store.read(key)["payload"]["objective"].endswith(f"#{i}")  # read-your-writes
+            future.result()  # a run reports only after its record is durable
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(one_run, range(runs)))
+        elapsed = time.perf_counter() - started
+
+        compact_started = time.perf_counter()
+        store.compact()
+        compact_s = time.perf_counter() - compact_started
+        stats = dict(store.stats)
+        store.close()
+    return {
+        "mode": "sync" if sync else "batched",
+        "runs_per_s": round(runs / elapsed, 1),
+        "commits": stats["commits"],
+        "compact_s": round(compact_s, 4),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5_000)
+    parser.add_argument("--workers", type=int, default=32, help="Concurrent runs")
+    args = parser.parse_args()
+
+    results = {
+        "runs": args.runs,
+        "workers": args.workers,
+        "results": [bench(args.runs, args.workers, sync) for sync in (True, False)],
+    }
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
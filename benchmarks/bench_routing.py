@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Throughput and latency of the swarmctl triage/routing path, in-process and through the CLI.
+
+Replays a corpus of task texts through triage_rules.guess_task_type/guess_complexity
+("triage", with text_norm's per-text cache cleared before each request), the model_routing/mcp_profiles
+lookups ("lookup"), ModelRouter.route ("route") and swarmctl's memoized _route
+("route_cached"); --cli-requests also times `swarmctl triage` and
+`swarmctl route` subprocesses. Every op runs across --workers threads or processes and
+reports ops/s with p50/p95/p99 latency. Needs agent-os like swarmctl (AGENT_OS_SRC).
+--save/--check track runs in .cache/benchmarks/routing.ndjson (see benchlib).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from benchlib import REPO_ROOT, add_history_options, finish, run_record  # also puts scripts/ on sys.path
+
+# Spans and events would measure the trace writer, not routing.
+os.environ.setdefault("SWARM_TRACE", "off")
+
+import swarmctl  # noqa: E402
+import text_norm  # noqa: E402
+import triage_rules  # noqa: E402
+from json_io import load_path  # noqa: E402
+from tracing import percentile  # noqa: E402
+
+CORPUS_PATH = Path(__file__).resolve().parent / "routing_corpus.txt"
+SWARMCTL = REPO_ROOT / "scripts/swarmctl.py"
+IN_PROCESS_OPS = ("triage", "lookup", "route", "route_cached")
+POOLS = ("thread", "process")
+
+
+def load_corpus(path: Path) -> list[str]:
+    """Task texts from a text file (one per line, # comments) or a regression_tasks.json-style list."""
+    if path.suffix == ".json":
+        texts = [str(task["text"]) for task in load_path(path)]
+    else:
+        lines = path.read_text(encoding="utf-8").splitlines()
+        texts = [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+    if not texts:
+        raise ValueError(f"Empty corpus: {path}")
+    return texts
+
+
+def _make_op(op: str, texts: list[str]) -> Callable[[int], object]:
+    """A callable taking a request index; triage results and configs are prepared outside the timed call."""
+    root = swarmctl._repo_root()
+    model_routing = load_path(root / "configs/tooling/model_routing.json")
+    mcp_profiles = load_path(root / "configs/tooling/mcp_profiles.json")
+    triaged = [(triage_rules.guess_task_type(t), triage_rules.guess_complexity(t)) for t in texts]
+    n = len(texts)
+
+    if op == "triage":
+
+        def triage(i: int) -> object:
+            # The corpus is far smaller than analyze()'s cache; without this every
+            # request after the first pass would time a cache hit, not tokenizing
+            # and stemming. (The per-token stem cache stays warm, as in a long-lived process.)
+            text_norm.analyze.cache_clear()
+            return triage_rules.guess_task_type(texts[i % n]), triage_rules.guess_complexity(texts[i % n])
+
+        return triage
+    if op == "lookup":
+
+        def lookup(i: int) -> object:
+            task_type, complexity = triaged[i % n]
+            return (
+                swarmctl._routing_lookup_model_tier(model_routing, task_type, complexity),
+                swarmctl._routing_lookup_mcp_profile(mcp_profiles, task_type, complexity),
+            )
+
+        return lookup
+
+    inputs = []
+    for task_type, complexity in triaged:
+        token_budget, cost_budget = swarmctl._default_budgets(root, complexity)
+        inputs.append(swarmctl.ModelRouteInput(task_type, complexity, token_budget, cost_budget, []))
+    if op == "route":
+        return lambda i: swarmctl.ModelRouter(repo_root=root).route(inputs[i % n], mode=None, unavailable_models=set())
+    if op == "route_cached":
+        args = argparse.Namespace(mode=None, route_cache="memory")
+        return lambda i: swarmctl._route(root, args, inputs[i % n], set())
+    raise ValueError(f"Unknown op: {op}")
+
+
+def _run_slice(op: str, texts: list[str], start: int, count: int) -> list[int]:
+    fn = _make_op(op, texts)
+    latencies = []
+    for i in range(start, start + count):
+        started = time.perf_counter_ns()
+        fn(i)
+        latencies.append(time.perf_counter_ns() - started)
+    return latencies
+
+
+def _cli_slice(op: str, texts: list[str], start: int, count: int) -> list[int]:
+    latencies = []
+    for i in range(start, start + count):
+        cmd = [sys.executable, str(SWARMCTL), op.removeprefix("cli_"), texts[i % len(texts)]]
+        if op == "cli_route":
+            cmd += ["--route-cache", "off"]
+        started = time.perf_counter_ns()
+        subprocess.run(cmd, capture_output=True, check=True, cwd=REPO_ROOT)
+        latencies.append(time.perf_counter_ns() - started)
+    return latencies
+
+
+def _stats(latencies_ns: list[int], wall_s: float) -> dict[str, float]:
+    ordered = sorted(ns / 1000 for ns in latencies_ns)
+    return {
+        "requests": len(ordered),
+        "ops_per_s": round(len(ordered) / wall_s, 1) if wall_s > 0 else 0.0,
+        "p50_us": round(percentile(ordered, 0.50), 1),
+        "p95_us": round(percentile(ordered, 0.95), 1),
+        "p99_us": round(percentile(ordered, 0.99), 1),
+        "max_us": round(ordered[-1], 1) if ordered else 0.0,
+    }
+
+
+def run_load(
+    executor: Executor, workers: int, slice_fn: Callable[..., list[int]], op: str, texts: list[str], requests: int
+) -> dict[str, float]:
+    """Split `requests` across `workers` and time them together; ops/s is over the wall time of the batch."""
+    shares = [requests // workers + (1 if w < requests % workers else 0) for w in range(workers)]
+    starts = [sum(shares[:w]) for w in range(workers)]
+    started = time.perf_counter()
+    futures = [executor.submit(slice_fn, op, texts, s, c) for s, c in zip(starts, shares) if c]
+    latencies = [ns for f in futures for ns in f.result()]
+    return _stats(latencies, time.perf_counter() - started)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=str(CORPUS_PATH), help="Task texts (.txt lines or .json task list).")
+    parser.add_argument("--ops", nargs="+", choices=IN_PROCESS_OPS, default=list(IN_PROCESS_OPS))
+    parser.add_argument("--requests", type=int, default=20_000, help="In-process requests per op.")
+    parser.add_argument("--cli-requests", type=int, default=0, help="swarmctl subprocesses per CLI op (0: skip).")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--pool", choices=POOLS, default="thread", help="In-process workers: threads (shared GIL) or processes."
+    )
+    add_history_options(parser, "routing")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+
+    try:
+        texts = load_corpus(Path(args.corpus))
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+
+    results: dict[str, dict[str, float]] = {}
+    suffix = f"{args.workers}{args.pool[0]}"
+    pool_cls = ProcessPoolExecutor if args.pool == "process" else ThreadPoolExecutor
+    with pool_cls(max_workers=args.workers) as executor:
+        # Start every worker (and, for processes, import swarmctl there) before timing.
+        n = args.workers
+        list(executor.map(_run_slice, ["triage"] * n, [texts] * n, range(n), [1] * n))
+        for op in args.ops:
+            _run_slice(op, texts, 0, min(len(texts), args.requests))  # warm caches and imports
+            results[f"{op}@{suffix}"] = run_load(executor, args.workers, _run_slice, op, texts, args.requests)
+
+    if args.cli_requests:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            for op in ("cli_triage", "cli_route"):
+                results[f"{op}@{args.workers}w"] = run_load(
+                    executor, args.workers, _cli_slice, op, texts, args.cli_requests
+                )
+
+    run = run_record(
+        "routing",
+        results,
+        corpus=Path(args.corpus).name,
+        corpus_size=len(texts),
+        workers=args.workers,
+        pool=args.pool,
+        cpus=os.cpu_count(),
+    )
+    return finish(args, run)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
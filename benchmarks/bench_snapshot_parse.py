@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Parse + map timing for large ConfigurationSnapshots (typed model vs. raw dicts)."""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from export_mapping import map_snapshot_to_export_config  # noqa: E402
+from snapshot_model import parse_snapshot_bytes  # noqa: E402
+
+
+def make_snapshot(nodes: int) -> dict:
+    graph_nodes = [
+        {
+            "id": f"n{i:07d}",
+            "kind": "profile" if i % 3 else "connector",
+            "article": "100001.1" if i % 3 else "100002",
+            "geom": {"type": "segment", "start": {"x": i, "y": 0, "z": 0}, "end": {"x": i, "y": 2500, "z": 0}},
+        }
+        for i in range(nodes)
+    ]
+    edges = [{"from": f"n{i:07d}", "to": f"n{i + 1:07d}", "type": "corner"} for i in range(nodes - 1)]
+    return {
+        "stateId": "3b1f7c77-3b0c-4d6f-9e2a-2c4dbf516f2f",
+        "dimensions": {"width": 1200, "height": 2500, "depth": 200},
+        "graph": {"rootNode": "n0000000", "nodes": graph_nodes, "edges": edges},
+        "bom": [{"article": "100001.1", "qty": nodes * 2500, "uom": "mm"}],
+    }
+
+
+def _best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    raw = json.dumps(make_snapshot(args.nodes)).encode("utf-8")
+    results = {
+        "nodes": args.nodes,
+        "bytes": len(raw),
+        "stdlib_parse_map_s": _best_of(args.repeat, lambda: map_snapshot_to_export_config(json.loads(raw), "bench")),
+        "typed_parse_map_s": _best_of(args.repeat, lambda: map_snapshot_to_export_config(parse_snapshot_bytes(raw), "bench")),
+        "typed_parse_s": _best_of(args.repeat, lambda: parse_snapshot_bytes(raw)),
+    }
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
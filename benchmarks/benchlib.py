@@ -0,0 +1,114 @@
+"""Run history and regression checks shared by the tracked benchmarks (bench_export_pipeline, bench_routing)."""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+import json_io  # noqa: E402
+
+HISTORY_DIR = REPO_ROOT / ".cache/benchmarks"
+THRESHOLDS_PATH = Path(__file__).resolve().parent / "thresholds.json"
+
+
+def add_history_options(parser: argparse.ArgumentParser, suite: str) -> None:
+    parser.add_argument("--save", action="store_true", help="Append this run to the history file.")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a metric regressed against history.")
+    parser.add_argument("--window", type=int, default=5, help="Saved runs the baseline is taken from.")
+    parser.add_argument("--history", default=str(HISTORY_DIR / f"{suite}.ndjson"))
+    parser.add_argument("--thresholds", default=str(THRESHOLDS_PATH))
+
+
+def _commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run_record(suite: str, results: dict[str, dict[str, float]], **extra: Any) -> dict[str, Any]:
+    return {
+        "suite": suite,
+        "timestamp": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        "commit": _commit(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "json_backend": json_io.BACKEND,
+        **extra,
+        "results": results,
+    }
+
+
+def load_history(path: Path) -> list[dict[str, Any]]:
+    if not path.exists():
+        return []
+    return [json_io.loads(line) for line in path.read_bytes().splitlines() if line.strip()]
+
+
+def compare(
+    run: dict[str, Any], history: list[dict[str, Any]], thresholds: dict[str, Any], window: int
+) -> list[dict[str, Any]]:
+    """
+    One row per metric present in both `run` and the baseline. The baseline is
+    the median of the metric's value over the last `window` comparable runs
+    (same host and Python); a metric regresses when it exceeds baseline * ratio
+    by more than min_delta. `thresholds` is the suite's section of thresholds.json.
+    """
+    comparable = [r for r in history if r.get("host") == run["host"] and r.get("python") == run["python"]]
+    recent = comparable[-window:]
+    key = thresholds.get("key", "median_s")
+    default_ratio = float(thresholds.get("default_ratio", 1.25))
+    ratios = thresholds.get("ratios", {})
+    min_delta = float(thresholds.get("min_delta", 0.0))
+
+    rows = []
+    for metric, current in sorted(run["results"].items()):
+        past = [r["results"][metric][key] for r in recent if key in r.get("results", {}).get(metric, {})]
+        if not past or key not in current:
+            continue
+        baseline = statistics.median(past)
+        allowed = float(ratios.get(metric.split("@")[0], default_ratio))
+        ratio = current[key] / baseline if baseline > 0 else 1.0
+        rows.append(
+            {
+                "metric": metric,
+                "baseline": baseline,
+                key: current[key],
+                "ratio": round(ratio, 3),
+                "allowed": allowed,
+                "regressed": ratio > allowed and current[key] - baseline > min_delta,
+            }
+        )
+    return rows
+
+
+def finish(args: argparse.Namespace, run: dict[str, Any]) -> int:
+    """Check against and/or append to the history as requested, print the report, return the exit code."""
+    history_path = Path(args.history)
+    report: dict[str, Any] = {"run": run}
+    if args.check:
+        thresholds = json_io.load_path(Path(args.thresholds)).get(run["suite"], {})
+        report["comparison"] = compare(run, load_history(history_path), thresholds, args.window)
+    if args.save:
+        history_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(history_path, "ab") as fh:
+            fh.write(json_io.dumps(run) + b"\n")
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    regressed = [row["metric"] for row in report.get("comparison", []) if row["regressed"]]
+    if regressed:
+        print(f"error: regression in {', '.join(regressed)}", file=sys.stderr)
+        return 1
+    return 0
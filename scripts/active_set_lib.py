@@ -10,6 +10,9 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Iterable
 
+from json_io import dump_path, load_path
+from skill_store import BlobStore
+
 
 @dataclass(frozen=True)
 class SkillSpec:
@@ -31,27 +34,52 @@ def sha256_file(path: Path) -> str:
     return h.hexdigest()
 
 
-def sha256_tree(root: Path) -> str:
-    """
-    Deterministic tree hash for a directory.
-
-    Includes: relative path + file content hash for all regular files.
-    Excludes: __pycache__/ and *.pyc
-    """
-    root = root.resolve()
-    entries: list[tuple[str, str]] = []
+def _iter_tree_files(root: Path) -> list[tuple[str, Path]]:
+    """Regular files under root as sorted (relative posix path, path); skips __pycache__/ and *.pyc."""
+    entries: list[tuple[str, Path]] = []
     for p in sorted(root.rglob("*")):
         if p.is_dir():
             continue
         rel = p.relative_to(root).as_posix()
         if rel.startswith("__pycache__/") or rel.endswith(".pyc"):
             continue
-        entries.append((rel, sha256_file(p)))
+        entries.append((rel, p))
+    return entries
 
+
+def _tree_hash(entries: list[tuple[str, str]]) -> str:
     payload = json.dumps(entries, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
     return _sha256_bytes(payload)
 
 
+def sha256_tree(root: Path) -> str:
+    """
+    Deterministic tree hash for a directory.
+
+    Includes: relative path + file content hash for all regular files.
+    Excludes: __pycache__/ and *.pyc
+    """
+    root = root.resolve()
+    return _tree_hash([(rel, sha256_file(p)) for rel, p in _iter_tree_files(root)])
+
+
+def published_tree_hash(skill_dir: Path, files: dict[str, str] | None = None, store: BlobStore | None = None) -> str:
+    """
+    sha256_tree of a published skill, trusting the manifest's per-file hash
+    for files that are still hardlinks of their blob and whose blob was not
+    written since it was stored (see BlobStore.is_linked). Copied, reflinked,
+    replaced or edited files are hashed as usual.
+    """
+    store = store or BlobStore()
+    entries: list[tuple[str, str]] = []
+    for rel, p in _iter_tree_files(skill_dir.resolve()):
+        digest = (files or {}).get(rel)
+        if digest is None or not store.is_linked(p, digest):
+            digest = sha256_file(p)
+        entries.append((rel, digest))
+    return _tree_hash(entries)
+
+
 def parse_active_skills_md(md_path: Path) -> list[SkillSpec]:
     """
     Parse `configs/skills/ACTIVE_SKILLS.md`.
@@ -109,16 +137,59 @@ def safe_rmtree_children(dir_path: Path, keep: Iterable[str] = (".gitkeep",)) ->
             child.unlink()
 
 
+MANIFEST_NAME = ".active_set_manifest.json"
+
+
+def materialize_skill(source_dir: Path, dest_skill_dir: Path, store: BlobStore) -> dict[str, str]:
+    """
+    Ingest every file of source_dir into the blob store and link it into
+    dest_skill_dir. Returns {relative path: sha256} for the manifest.
+    """
+    files: dict[str, str] = {}
+    dest_skill_dir.mkdir(parents=True)
+    for rel, path in _iter_tree_files(source_dir):
+        digest, executable = store.put(path)
+        dest = dest_skill_dir / rel
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        store.materialize(digest, executable, dest)
+        files[rel] = digest
+    return files
+
+
+def _manifest_row(repo_root: Path, spec: SkillSpec, dest_skill_dir: Path, files: dict[str, str]) -> dict:
+    return {
+        "name": spec.name,
+        "source": os.path.relpath(spec.source_dir, repo_root),
+        "dest": os.path.relpath(dest_skill_dir, repo_root),
+        # `files` keeps _iter_tree_files order, which is what sha256_tree hashes.
+        "sha256_tree": _tree_hash(list(files.items())),
+        "files": files,
+    }
+
+
+def _write_manifest(repo_root: Path, active_md: Path, dest_dir: Path, published: list[dict]) -> dict:
+    manifest = {
+        "version": "agent-os-v2",
+        "generated_at": datetime.now(tz=timezone.utc).isoformat(),
+        "active_skills_md": os.path.relpath(active_md, repo_root),
+        "skills": published,
+    }
+    dump_path(manifest, dest_dir / MANIFEST_NAME, pretty=True, trailing_newline=True)
+    return manifest
+
+
 def publish_active_set(
     *,
     repo_root: Path,
     active_md: Path,
     dest_dir: Path,
+    store: BlobStore | None = None,
 ) -> dict:
     specs = parse_active_skills_md(active_md)
     if not specs:
         raise ValueError(f"No skills found in: {active_md}")
 
+    store = store or BlobStore()
     dest_dir.mkdir(parents=True, exist_ok=True)
     safe_rmtree_children(dest_dir)
 
@@ -126,24 +197,94 @@ def publish_active_set(
     for spec in specs:
         ensure_skill_dir_valid(spec.source_dir)
         dest_skill_dir = (dest_dir / spec.name).resolve()
-        shutil.copytree(spec.source_dir, dest_skill_dir)
-        published.append(
-            {
-                "name": spec.name,
-                "source": os.path.relpath(spec.source_dir, repo_root),
-                "dest": os.path.relpath(dest_skill_dir, repo_root),
-                "sha256_tree": sha256_tree(dest_skill_dir),
-            }
-        )
+        files = materialize_skill(spec.source_dir, dest_skill_dir, store)
+        published.append(_manifest_row(repo_root, spec, dest_skill_dir, files))
 
-    manifest = {
-        "version": "agent-os-v2",
-        "generated_at": datetime.now(tz=timezone.utc).isoformat(),
-        "active_skills_md": os.path.relpath(active_md, repo_root),
-        "skills": published,
-    }
-    (dest_dir / ".active_set_manifest.json").write_text(
-        json.dumps(manifest, indent=2, ensure_ascii=False) + "\n",
-        encoding="utf-8",
-    )
-    return manifest
+    return _write_manifest(repo_root, active_md, dest_dir, published)
+
+
+def _replace_skill_dir(source_dir: Path, dest_skill_dir: Path, store: BlobStore) -> dict[str, str]:
+    """Materialize next to the destination, then swap, so readers never see a half-published skill."""
+    tmp = dest_skill_dir.with_name(f".{dest_skill_dir.name}.tmp-{os.getpid()}")
+    old = dest_skill_dir.with_name(f".{dest_skill_dir.name}.old-{os.getpid()}")
+    for leftover in (tmp, old):
+        if leftover.exists():
+            shutil.rmtree(leftover)
+    files = materialize_skill(source_dir, tmp, store)
+    if dest_skill_dir.exists():
+        os.rename(dest_skill_dir, old)
+    os.rename(tmp, dest_skill_dir)
+    if old.exists():
+        shutil.rmtree(old)
+    return files
+
+
+def sync_active_set(
+    *,
+    repo_root: Path,
+    active_md: Path,
+    dest_dir: Path,
+    names: Iterable[str] | None = None,
+    store: BlobStore | None = None,
+) -> dict:
+    """
+    Incremental counterpart of publish_active_set.
+
+    Only skills in `names` (all when None), new skills and skills whose source
+    moved are considered; each is re-copied only if its source tree hash differs
+    from the manifest. Skills no longer listed are removed. The manifest is
+    rewritten only when something changed.
+    """
+    specs = parse_active_skills_md(active_md)
+    if not specs:
+        raise ValueError(f"No skills found in: {active_md}")
+
+    store = store or BlobStore()
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = dest_dir / MANIFEST_NAME
+    try:
+        rows = {row.get("name"): row for row in load_path(manifest_path).get("skills", [])}
+    except (OSError, ValueError, AttributeError):
+        rows = {}
+
+    wanted = None if names is None else set(names)
+    republished: list[str] = []
+    published: list[dict] = []
+    for spec in specs:
+        dest_skill_dir = (dest_dir / spec.name).resolve()
+        row = rows.get(spec.name)
+        source = os.path.relpath(spec.source_dir, repo_root)
+        stale = row is None or row.get("source") != source or not dest_skill_dir.exists()
+        if stale or wanted is None or spec.name in wanted:
+            ensure_skill_dir_valid(spec.source_dir)
+            if stale or sha256_tree(spec.source_dir) != row.get("sha256_tree"):
+                files = _replace_skill_dir(spec.source_dir, dest_skill_dir, store)
+                row = _manifest_row(repo_root, spec, dest_skill_dir, files)
+                republished.append(spec.name)
+        published.append(row)
+
+    listed = {spec.name for spec in specs}
+    removed = sorted(set(rows) - listed)
+    for child in dest_dir.iterdir():
+        if child.is_dir() and not child.name.startswith(".") and child.name not in listed:
+            shutil.rmtree(child)
+            if child.name not in removed:
+                removed.append(child.name)
+
+    changed = bool(republished or removed) or [r.get("name") for r in rows.values()] != [s.name for s in specs]
+    manifest = _write_manifest(repo_root, active_md, dest_dir, published) if changed else None
+    return {"republished": republished, "removed": sorted(removed), "manifest": manifest}
+
+
+def gc_blob_store(dest_dirs: Iterable[Path], store: BlobStore | None = None) -> list[Path]:
+    """
+    Remove blobs not referenced by the manifest of any of `dest_dirs`. A
+    missing or unreadable manifest raises instead of counting as empty, so it
+    cannot take the blobs of a live publish with it.
+    """
+    store = store or BlobStore()
+    referenced: set[str] = set()
+    for dest_dir in dest_dirs:
+        for row in load_path(dest_dir / MANIFEST_NAME).get("skills", []):
+            referenced.update((row.get("files") or {}).values())
+    return store.gc(referenced)
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping
+
+from json_io import dump_path, load_path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_LEDGER_DIR = REPO_ROOT / ".cache/budget-ledger"
+
+# ledger.bin: a 64-byte header, then fixed-width records. The header's record
+# count is written after the record itself, so a torn append is invisible and
+# gets overwritten by the next one.
+MAGIC = b"RVLEDGR1"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIQ")
+HEADER_SIZE = 64
+# ts, run id, task type, complexity, tier, model, tokens, cost
+RECORD = struct.Struct("<d16s4s4s12s52sQd")
+GROW_RECORDS = 4096
+
+# Counters kept per value of each dimension (plus "total": {"all": ...}).
+DIMENSIONS = ("task_type", "complexity", "tier", "model", "day")
+COUNTERS_VERSION = 1
+
+
+@dataclass(frozen=True)
+class LedgerRecord:
+    ts: float
+    run_id: str
+    task_type: str
+    complexity: str
+    tier: str
+    model: str
+    tokens: int
+    cost_usd: float
+
+    @property
+    def day(self) -> str:
+        return utc_day(self.ts)
+
+    def key(self, dimension: str) -> str:
+        return self.day if dimension == "day" else getattr(self, dimension)
+
+
+@dataclass
+class Spend:
+    runs: int = 0
+    tokens: int = 0
+    cost_usd: float = 0.0
+
+    def add(self, tokens: int, cost_usd: float) -> None:
+        self.runs += 1
+        self.tokens += tokens
+        self.cost_usd += cost_usd
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"runs": self.runs, "tokens": self.tokens, "cost_usd": round(self.cost_usd, 6)}
+
+
+def utc_day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _run_id_bytes(run_id: str) -> bytes:
+    try:
+        return uuid.UUID(run_id).bytes
+    except ValueError:
+        return hashlib.blake2b(run_id.encode("utf-8"), digest_size=16).digest()
+
+
+def _field(value: str, size: int) -> bytes:
+    data = value.encode("utf-8")[:size]
+    return data.decode("utf-8", errors="ignore").encode("utf-8")  # never split a character
+
+
+def _text(raw: bytes) -> str:
+    return raw.rstrip(b"\0").decode("utf-8")
+
+
+class BudgetLedger:
+    """
+    Append-only record of what each run spent, in memory-mapped fixed-width
+    records (`ledger.bin`), with per-dimension counters (`counters.json`)
+    updated on every append. Queries read the counters and fold in only the
+    records appended since they were written, never the whole ledger.
+    Appends from several processes are serialised by a `LOCK` flock.
+    """
+
+    def __init__(self, root: Path = DEFAULT_LEDGER_DIR) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.path = self.root / "ledger.bin"
+        self.counters_path = self.root / "counters.json"
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._lock_fd = os.open(self.root / "LOCK", os.O_RDWR | os.O_CREAT, 0o644)
+        self._map: mmap.mmap | None = None
+        with self._locked():
+            if os.fstat(self._fd).st_size < HEADER_SIZE:
+                os.ftruncate(self._fd, HEADER_SIZE + GROW_RECORDS * RECORD.size)
+                os.pwrite(self._fd, HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size, 0), 0)
+        self._remap()
+        magic, version, record_size, _ = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"Not a budget ledger (or an incompatible version): {self.path}")
+        self._applied = 0
+        self._counters: dict[str, dict[str, Spend]] = {}
+        self._load_counters()
+
+    # -- storage -----------------------------------------------------------
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _remap(self) -> None:
+        size = os.fstat(self._fd).st_size
+        if self._map is not None and len(self._map) == size:
+            return
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._fd, size)
+
+    def __len__(self) -> int:
+        self._remap()
+        return HEADER.unpack_from(self._map, 0)[3]
+
+    def _read(self, index: int) -> LedgerRecord:
+        ts, run_id, task_type, complexity, tier, model, tokens, cost = RECORD.unpack_from(
+            self._map, HEADER_SIZE + index * RECORD.size
+        )
+        return LedgerRecord(
+            ts, str(uuid.UUID(bytes=run_id)), _text(task_type), _text(complexity), _text(tier), _text(model), tokens, cost
+        )
+
+    def records(self, start: int = 0) -> Iterator[LedgerRecord]:
+        count = len(self)
+        for index in range(start, count):
+            yield self._read(index)
+
+    def append(
+        self,
+        *,
+        run_id: str,
+        task_type: str,
+        complexity: str,
+        tier: str,
+        model: str | None,
+        tokens: int,
+        cost_usd: float,
+        ts: float | None = None,
+    ) -> LedgerRecord:
+        """Record one run's spend; returns the record as it will read back."""
+        record = RECORD.pack(
+            time.time() if ts is None else ts,
+            _run_id_bytes(run_id),
+            _field(task_type, 4),
+            _field(complexity, 4),
+            _field(tier, 12),
+            _field(model or "", 52),
+            max(0, int(tokens)),
+            max(0.0, float(cost_usd)),
+        )
+        with self._locked():
+            self._remap()
+            count = HEADER.unpack_from(self._map, 0)[3]
+            offset = HEADER_SIZE + count * RECORD.size
+            if offset + RECORD.size > len(self._map):
+                os.ftruncate(self._fd, offset + GROW_RECORDS * RECORD.size)
+                self._remap()
+            self._map[offset : offset + RECORD.size] = record
+            self._map.flush()
+            HEADER.pack_into(self._map, 0, MAGIC, FORMAT_VERSION, RECORD.size, count + 1)
+            self._map.flush()
+            self._catch_up()
+            self._save_counters()
+            return self._read(count)
+
+    # -- counters ----------------------------------------------------------
+
+    def _load_counters(self) -> None:
+        data: Any = None
+        if self.counters_path.exists():
+            try:
+                data = load_path(self.counters_path)
+            except (OSError, ValueError):
+                data = None
+        if isinstance(data, dict) and data.get("version") == COUNTERS_VERSION and data.get("applied", 0) <= len(self):
+            self._applied = int(data.get("applied", 0))
+            self._counters = {
+                dimension: {key: Spend(*values) for key, values in rows.items()}
+                for dimension, rows in (data.get("counters") or {}).items()
+            }
+        else:
+            self._applied, self._counters = 0, {}  # missing or from another ledger: rebuild
+
+    def _catch_up(self) -> None:
+        for record in self.records(self._applied):
+            self._counters.setdefault("total", {}).setdefault("all", Spend()).add(record.tokens, record.cost_usd)
+            for dimension in DIMENSIONS:
+                self._counters.setdefault(dimension, {}).setdefault(record.key(dimension), Spend()).add(
+                    record.tokens, record.cost_usd
+                )
+            self._applied += 1
+
+    def _save_counters(self) -> None:
+        tmp = self.counters_path.with_name(f".{self.counters_path.name}.{os.getpid()}.tmp")
+        dump_path(
+            {
+                "version": COUNTERS_VERSION,
+                "applied": self._applied,
+                "counters": {
+                    dimension: {key: [s.runs, s.tokens, s.cost_usd] for key, s in sorted(rows.items())}
+                    for dimension, rows in sorted(self._counters.items())
+                },
+            },
+            tmp,
+        )
+        os.replace(tmp, self.counters_path)
+
+    def _refresh(self) -> None:
+        if self._applied < len(self):
+            self._load_counters()  # another process may have appended and saved
+            self._catch_up()
+
+    def spend(self, dimension: str = "total", key: str = "all") -> Spend:
+        """Spend for one value of a dimension, e.g. spend("day", "2026-10-19")."""
+        self._refresh()
+        found = self._counters.get(dimension, {}).get(key)
+        return Spend(found.runs, found.tokens, found.cost_usd) if found else Spend()
+
+    def spend_by(self, dimension: str) -> dict[str, Spend]:
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown ledger dimension: {dimension} (expected one of: {', '.join(DIMENSIONS)})")
+        self._refresh()
+        return {key: Spend(s.runs, s.tokens, s.cost_usd) for key, s in sorted(self._counters.get(dimension, {}).items())}
+
+    def remaining_today(self, limits: Mapping[str, Any], now: float | None = None) -> tuple[int, float] | None:
+        """(tokens, usd) left under budgets.daily in model_providers.json, or None without a daily budget."""
+        if not limits:
+            return None
+        spent = self.spend("day", utc_day(time.time() if now is None else now))
+        tokens = int(limits.get("max_total_tokens", 0)) - spent.tokens
+        cost = float(limits.get("max_cost_usd", 0.0)) - spent.cost_usd
+        return max(0, tokens), max(0.0, cost)
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        for fd in (self._fd, self._lock_fd):
+            if fd >= 0:
+                os.close(fd)
+        self._fd = self._lock_fd = -1
+
+    def __enter__(self) -> BudgetLedger:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def downgrade_complexity(
+    per_complexity: Mapping[str, Mapping[str, Any]],
+    complexity: str,
+    remaining: tuple[int, float] | None,
+    routable: Iterable[str] | None = None,
+) -> str:
+    """
+    The complexity to route as so that one run's worst case (its
+    per-complexity max_total_tokens / max_cost_usd) fits in `remaining`:
+    the requested one if it fits, else the highest lower complexity that
+    does, which moves routing to a cheaper tier. When nothing fits, the
+    lowest one is used. `routable` limits candidates to complexities with
+    a routing entry for the task type.
+    """
+    if remaining is None:
+        return complexity
+    tokens_left, cost_left = remaining
+    allowed = set(per_complexity if routable is None else routable)
+    ordered = sorted(c for c in per_complexity if c in allowed and c <= complexity)
+    if not ordered:
+        return complexity
+    for candidate in reversed(ordered):
+        row = per_complexity[candidate]
+        if int(row.get("max_total_tokens", 0)) <= tokens_left and float(row.get("max_cost_usd", 0.0)) <= cost_left:
+            return candidate
+    return ordered[0]
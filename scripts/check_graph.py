@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import contextvars
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator
+
+from tracing import span
+
+OK = "ok"
+WARN = "warn"
+FAIL = "fail"
+SKIP = "skip"
+
+
+@dataclass(frozen=True)
+class Check:
+    name: str
+    fn: Callable[[CheckContext], Any]
+    deps: tuple[str, ...] = ()
+
+
+@dataclass
+class CheckResult:
+    name: str
+    status: str
+    failures: list[str] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+    value: Any = field(default=None, repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "status": self.status,
+            "elapsed_ms": round(self.elapsed_ms, 3),
+            "failures": self.failures,
+            "warnings": self.warnings,
+        }
+
+
+class CheckContext:
+    """
+    Passed to each check: `inputs` maps dependency names to their return
+    values. `fail`/`warn` record messages without aborting the check; raising
+    any exception fails it with the exception text. `spawn` adds checks to the
+    running graph (e.g. one per item discovered by this check).
+    """
+
+    def __init__(self, name: str, inputs: dict[str, Any]) -> None:
+        self.name = name
+        self.inputs = inputs
+        self.failures: list[str] = []
+        self.warnings: list[str] = []
+        self.spawned: list[Check] = []
+
+    def fail(self, message: str) -> None:
+        self.failures.append(message)
+
+    def warn(self, message: str) -> None:
+        self.warnings.append(message)
+
+    def spawn(self, check: Check) -> None:
+        self.spawned.append(check)
+
+
+def _execute(check: Check, ctx: CheckContext) -> CheckResult:
+    started = time.perf_counter()
+    value = None
+    with span(f"check.{check.name}") as current:
+        try:
+            value = check.fn(ctx)
+        except Exception as e:  # noqa: BLE001
+            ctx.fail(str(e) or type(e).__name__)
+        status = FAIL if ctx.failures else WARN if ctx.warnings else OK
+        current.set(status=status)
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    return CheckResult(check.name, status, ctx.failures, ctx.warnings, elapsed_ms, value)
+
+
+def run_checks(
+    checks: Iterable[Check],
+    *,
+    workers: int | None = None,
+    fail_fast: bool = False,
+) -> Iterator[CheckResult]:
+    """
+    Run a dependency graph of checks on a thread pool and yield results as
+    they complete. A check starts once all of its dependencies have passed
+    (ok or warn); dependents of failed or skipped checks are skipped. With
+    `fail_fast`, nothing new is started after the first failure.
+    """
+    pending: dict[str, Check] = {}
+    known: set[str] = set()
+
+    def add(check: Check) -> None:
+        if check.name in known:
+            raise ValueError(f"Duplicate check name: {check.name}")
+        known.add(check.name)
+        pending[check.name] = check
+
+    for check in checks:
+        add(check)
+
+    done: dict[str, CheckResult] = {}
+    running: dict[Future[CheckResult], CheckContext] = {}
+    stopped = False
+    # Submit no more than the pool can run, so fail-fast has nothing queued to drain.
+    limit = workers or min(32, (os.cpu_count() or 1) + 4)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="check") as pool:
+        while pending or running:
+            progressed = True
+            while progressed and not stopped:
+                progressed = False
+                for name, check in list(pending.items()):
+                    unknown = [d for d in check.deps if d not in known]
+                    if unknown:
+                        del pending[name]
+                        done[name] = CheckResult(name, FAIL, failures=[f"Unknown dependency: {', '.join(unknown)}"])
+                        progressed = True
+                        yield done[name]
+                        continue
+                    if any(d not in done for d in check.deps):
+                        continue
+                    blocked = [d for d in check.deps if done[d].status in (FAIL, SKIP)]
+                    if not blocked and len(running) >= limit:
+                        continue
+                    del pending[name]
+                    progressed = True
+                    if blocked:
+                        done[name] = CheckResult(name, SKIP, warnings=[f"Skipped: {', '.join(blocked)} did not pass"])
+                        yield done[name]
+                        continue
+                    ctx = CheckContext(name, {d: done[d].value for d in check.deps})
+                    # A copy of the caller's context, so check spans nest under its span.
+                    running[pool.submit(contextvars.copy_context().run, _execute, check, ctx)] = ctx
+
+            if not running:
+                # Whatever is left was cut off by fail-fast or waits on itself.
+                for name in list(pending):
+                    del pending[name]
+                    if stopped:
+                        done[name] = CheckResult(name, SKIP, warnings=["Not run (fail-fast)"])
+                    else:
+                        done[name] = CheckResult(name, FAIL, failures=["Dependency cycle"])
+                    yield done[name]
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                ctx = running.pop(future)
+                result = future.result()
+                done[result.name] = result
+                for spawned in ctx.spawned:
+                    add(spawned)
+                if fail_fast and result.status == FAIL:
+                    stopped = True
+                yield result
@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from json_io import dump_path, load_path
+from profiling import add_profile_option, profiled
+from tracing import span
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CATALOG_PATH = REPO_ROOT / "models/catalog/v1-catalog.json"
+DEFAULT_STOCK_LENGTH = 6000
+METHODS = ("ffd", "colgen")
+DEFAULT_COLGEN_SECONDS = 5.0  # per article
+
+_EPS = 1e-9
+
+
+def _as_float(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _point_xyz(value: Any) -> tuple[float, float, float]:
+    point = value if isinstance(value, dict) else {}
+    return (
+        _as_float(point.get("x", 0.0)),
+        _as_float(point.get("y", 0.0)),
+        _as_float(point.get("z", 0.0)),
+    )
+
+
+def _derive_output_path(config_path: Path) -> Path:
+    source = str(config_path)
+    if source.endswith(".rivo.json"):
+        return Path(source.removesuffix(".rivo.json") + ".cutlist.json")
+    return config_path.with_suffix(".cutlist.json")
+
+
+def catalog_stock_length(catalog_path: Path = DEFAULT_CATALOG_PATH) -> int:
+    """
+    Return the stock bar length from the profile catalog (largest `maxLength`),
+    falling back to DEFAULT_STOCK_LENGTH when the catalog is missing or empty.
+    """
+    try:
+        catalog = load_path(catalog_path)
+    except (OSError, ValueError):
+        return DEFAULT_STOCK_LENGTH
+    profiles = catalog.get("profiles", []) if isinstance(catalog, dict) else []
+    lengths = [int(_as_float(p.get("maxLength"))) for p in profiles if isinstance(p, dict)]
+    lengths = [length for length in lengths if length > 0]
+    return max(lengths) if lengths else DEFAULT_STOCK_LENGTH
+
+
+def extract_profile_segments(rivo_config: dict[str, Any]) -> dict[str, list[tuple[str, int]]]:
+    """
+    Collect `(element_id, length_mm)` per article for every profile element with
+    segment geometry. Lengths are rounded to whole millimetres.
+    """
+    if not isinstance(rivo_config, dict):
+        raise ValueError("rivo_config must be a dictionary")
+
+    elements = rivo_config.get("elements")
+    segments: dict[str, list[tuple[str, int]]] = {}
+    if not isinstance(elements, list):
+        return segments
+
+    for index, elem in enumerate(elements):
+        if not isinstance(elem, dict) or str(elem.get("kind", "")) != "profile":
+            continue
+        geom = elem.get("geom") if isinstance(elem.get("geom"), dict) else {}
+        if str(geom.get("type", "")).lower() != "segment":
+            continue
+        sx, sy, sz = _point_xyz(geom.get("start"))
+        ex, ey, ez = _point_xyz(geom.get("end"))
+        length = int(round(math.sqrt((ex - sx) ** 2 + (ey - sy) ** 2 + (ez - sz) ** 2)))
+        if length <= 0:
+            continue
+        elem_id = str(elem.get("id", "")) or f"elem-{index}"
+        segments.setdefault(str(elem.get("article", "")), []).append((elem_id, length))
+    return segments
+
+
+class _CapacityTree:
+    """
+    Max segment tree over bar remaining capacities.
+
+    Unopened bars hold full capacity, so the leftmost bar that fits a piece is
+    exactly the first-fit choice, found in O(log n) instead of scanning bars.
+    """
+
+    def __init__(self, size: int, capacity: int) -> None:
+        n = 1
+        while n < max(size, 1):
+            n *= 2
+        self._n = n
+        self._tree = [capacity] * (2 * n)
+
+    def first_fit(self, need: int) -> int:
+        tree = self._tree
+        if tree[1] < need:
+            return -1
+        node = 1
+        while node < self._n:
+            node = 2 * node if tree[2 * node] >= need else 2 * node + 1
+        return node - self._n
+
+    def consume(self, index: int, amount: int) -> None:
+        tree = self._tree
+        node = index + self._n
+        tree[node] -= amount
+        node //= 2
+        while node:
+            left = tree[2 * node]
+            right = tree[2 * node + 1]
+            tree[node] = left if left >= right else right
+            node //= 2
+
+
+def first_fit_decreasing(
+    pieces: list[tuple[str, int]],
+    stock_length: int,
+    kerf: int = 0,
+) -> list[list[tuple[str, int]]]:
+    """
+    Pack pieces into stock bars with first-fit-decreasing in O(n log n).
+    Each cut consumes `length + kerf`; the trailing cut of a bar needs no kerf.
+    """
+    capacity = stock_length + kerf
+    ordered = sorted(pieces, key=lambda p: (-p[1], p[0]))
+    tree = _CapacityTree(len(ordered), capacity)
+    bars: list[list[tuple[str, int]]] = []
+
+    for piece in ordered:
+        need = piece[1] + kerf
+        index = tree.first_fit(need)
+        if index < 0:
+            raise ValueError(f"Segment {piece[0]} ({piece[1]} mm) exceeds stock length {stock_length} mm")
+        if index == len(bars):
+            bars.append([])
+        bars[index].append(piece)
+        tree.consume(index, need)
+    return bars
+
+
+class _MasterLP:
+    """
+    Cutting-stock master `min sum(x)  s.t.  sum(x_p * pattern_p) >= demand, x >= 0`
+    solved by a revised simplex on an explicit basis inverse. Columns are
+    only ever added, so each re-solve starts from the previous optimal basis
+    instead of from scratch.
+    """
+
+    def __init__(self, patterns: list[list[int]], demands: list[float]) -> None:
+        # patterns[i] must hold only length i: those columns form a feasible diagonal basis.
+        m = len(demands)
+        self.patterns: list[list[int]] = []
+        self._columns: list[list[tuple[int, int]]] = []  # sparse (row, count) per pattern
+        for pattern in patterns:
+            self.add(pattern)
+        self.basis = list(range(m))  # column ids: pattern index, or -1 - i for row i's surplus
+        self.binv = [[1.0 / patterns[i][i] if k == i else 0.0 for k in range(m)] for i in range(m)]
+        self.x = [demands[i] / patterns[i][i] for i in range(m)]
+
+    def add(self, pattern: list[int]) -> None:
+        self.patterns.append(pattern)
+        self._columns.append([(i, count) for i, count in enumerate(pattern) if count])
+
+    def _entering(self, prices: list[float], bland: bool) -> int | None:
+        """Most attractive column (Dantzig), or the lowest id that improves at all (Bland)."""
+        # Pattern reduced cost is 1 - prices·pattern; a surplus column (cost 0, -e_i) has prices[i].
+        gains = [(-price, -1 - i) for i, price in enumerate(prices) if price < -_EPS]
+        for p, column in enumerate(self._columns):
+            gain = sum(prices[i] * count for i, count in column) - 1.0
+            if gain > _EPS:
+                gains.append((gain, p))
+        if not gains:
+            return None
+        if bland:
+            return min(col for _, col in gains)
+        return max(gains, key=lambda gc: (gc[0], -gc[1]))[1]
+
+    def solve(self, deadline: float = math.inf) -> list[float] | None:
+        """
+        Pivot to optimality; returns the row prices (duals) used to price new
+        patterns, or None once `deadline` (perf_counter) passes. Every basis
+        is feasible, so usage() is a valid plan either way.
+        """
+        m = len(self.x)
+        degenerate = 0
+        while True:
+            if time.perf_counter() > deadline:
+                return None
+            pattern_rows = [self.binv[k] for k, col in enumerate(self.basis) if col >= 0]
+            prices = [sum(column) for column in zip(*pattern_rows)] if pattern_rows else [0.0] * m
+            # Dantzig's rule needs far fewer pivots; Bland's cannot cycle on a degenerate run.
+            entering = self._entering(prices, bland=degenerate > m)
+            if entering is None:
+                return prices
+            column = self._columns[entering] if entering >= 0 else [(-1 - entering, -1)]
+            d = [sum(row[i] * count for i, count in column) for row in self.binv]
+
+            leaving = -1
+            best_ratio = math.inf
+            for k in range(m):
+                if d[k] > _EPS:
+                    ratio = self.x[k] / d[k]
+                    if ratio < best_ratio - _EPS or (
+                        abs(ratio - best_ratio) <= _EPS and self.basis[k] < self.basis[leaving]
+                    ):
+                        best_ratio = ratio
+                        leaving = k
+            if leaving < 0:
+                raise ValueError("cutting-stock LP is unbounded")
+            degenerate = degenerate + 1 if best_ratio <= _EPS else 0
+
+            pivot = d[leaving]
+            pivot_row = [v / pivot for v in self.binv[leaving]]
+            x_pivot = self.x[leaving] / pivot
+            for k in range(m):
+                if k != leaving and d[k]:
+                    factor = d[k]
+                    self.binv[k] = [a - factor * b for a, b in zip(self.binv[k], pivot_row)]
+                    self.x[k] = max(self.x[k] - factor * x_pivot, 0.0)
+            self.binv[leaving] = pivot_row
+            self.x[leaving] = x_pivot
+            self.basis[leaving] = entering
+
+    def usage(self) -> list[float]:
+        """How often each pattern is cut in the current basic solution."""
+        usage = [0.0] * len(self.patterns)
+        for k, col in enumerate(self.basis):
+            if col >= 0:
+                usage[col] = self.x[k]
+        return usage
+
+
+def _search_pattern(
+    weights: list[int], values: list[float], capacity: int, max_nodes: int
+) -> tuple[float, list[int], bool]:
+    """
+    Depth-first branch and bound for the unbounded knapsack, items by value
+    density. Returns (value, counts, exhausted); the result is only optimal
+    when exhausted, i.e. the search finished within `max_nodes`.
+    """
+    order = sorted(
+        (i for i, (w, v) in enumerate(zip(weights, values)) if v > _EPS and w <= capacity),
+        key=lambda i: (-values[i] / weights[i], i),
+    )
+    n = len(order)
+    ow = [weights[i] for i in order]
+    ov = [values[i] for i in order]
+    lightest = [capacity + 1] * (n + 1)  # lightest[k]: smallest weight among order[k:]
+    for k in range(n - 1, -1, -1):
+        lightest[k] = min(ow[k], lightest[k + 1])
+    counts = [0] * len(weights)
+    best_value, best_counts = 0.0, counts.copy()
+    nodes = 0
+    # One frame per item on the current path: [position in order, cap, value, next count to try].
+    # An explicit stack, since the path can be as long as there are distinct lengths.
+    stack: list[list[Any]] = []
+    k, cap, value = 0, capacity, 0.0
+    while True:
+        nodes += 1
+        if value > best_value + _EPS:
+            best_value, best_counts = value, counts.copy()
+        if lightest[k] <= cap:  # else nothing more fits: a leaf
+            while ow[k] > cap:
+                k += 1  # only a count of 0 fits
+            # Branch on order[k] unless even filling the rest at its density cannot win.
+            if value + cap * ov[k] / ow[k] > best_value + _EPS:
+                stack.append([k, cap, value, cap // ow[k]])
+        while stack:
+            frame = stack[-1]
+            i = order[frame[0]]
+            if frame[3] < 0 or nodes > max_nodes:
+                counts[i] = 0
+                stack.pop()
+                continue
+            count = frame[3]
+            frame[3] -= 1
+            counts[i] = count
+            k, cap, value = frame[0] + 1, frame[1] - count * ow[frame[0]], frame[2] + count * ov[frame[0]]
+            break
+        else:
+            break
+    return best_value, best_counts, nodes <= max_nodes
+
+
+def _best_pattern(
+    weights: list[int],
+    values: list[float],
+    capacity: int,
+    target: float = math.inf,
+    max_nodes: int = 20_000,
+    deadline: float = math.inf,
+) -> tuple[float, list[int]]:
+    """
+    Unbounded knapsack over integer widths; returns (value, counts per item).
+    Branch and bound usually settles it; when it runs out of nodes, a pattern
+    worth more than `target` is returned as found, else a DP over every
+    capacity gives the exact answer. Past `deadline` (perf_counter) the DP is
+    abandoned and the branch and bound result returned, which may not be optimal.
+    """
+    value, counts, exhausted = _search_pattern(weights, values, capacity, max_nodes)
+    if exhausted or value > target:
+        return value, counts
+    found = value, counts
+
+    items = [i for i, (w, v) in enumerate(zip(weights, values)) if v > _EPS and w <= capacity]
+    best = [0.0] * (capacity + 1)  # best value within each capacity
+    for i in items:
+        if time.perf_counter() > deadline:
+            return found
+        w, v = weights[i], values[i]
+        # best[cap] may take the item again through best[cap - w], so sweep in
+        # blocks of w: each block only reads the already updated one before it.
+        for start in range(w, capacity + 1, w):
+            stop = min(start + w, capacity + 1)
+            previous = best[start - w : stop - w]
+            best[start:stop] = [a if a >= b + v else b + v for a, b in zip(best[start:stop], previous)]
+
+    counts = [0] * len(weights)
+    cap = capacity
+    while best[cap] > _EPS:
+        fits = (i for i in items if weights[i] <= cap)
+        item = next((i for i in fits if best[cap - weights[i]] + values[i] >= best[cap] - _EPS), -1)
+        if item < 0:
+            cap -= 1  # best[cap] == best[cap - 1]: this millimetre stays unused
+            continue
+        counts[item] += 1
+        cap -= weights[item]
+    return sum(c * v for c, v in zip(counts, values)), counts
+
+
+def column_generation(
+    pieces: list[tuple[str, int]],
+    stock_length: int,
+    kerf: int = 0,
+    max_iterations: int = 200,
+    time_limit: float | None = DEFAULT_COLGEN_SECONDS,
+) -> tuple[list[list[tuple[str, int]]], int]:
+    """
+    Gilmore-Gomory column generation on the cutting-stock LP relaxation,
+    rounded down and completed with first-fit-decreasing on the residual.
+    Pricing stops after `max_iterations` new patterns or `time_limit` seconds,
+    checked between simplex pivots and between knapsack DP items, so a run
+    overshoots by at most one such step plus the final rounding. The plan is
+    never worse than plain first-fit-decreasing.
+
+    Returns `(bars, lower_bound)` where lower_bound is ceil(LP optimum), or the
+    material bound when pricing was cut short.
+    """
+    if not pieces:
+        return [], 0
+    capacity = stock_length + kerf
+    demand = Counter(length for _, length in pieces)
+    lengths = sorted(demand, reverse=True)
+    oversize = [length for length in lengths if length + kerf > capacity]
+    if oversize:
+        raise ValueError(f"Segment length {oversize[0]} mm exceeds stock length {stock_length} mm")
+
+    weights = [length + kerf for length in lengths]
+    demands = [float(demand[length]) for length in lengths]
+    patterns: list[list[int]] = []
+    for i, w in enumerate(weights):
+        pattern = [0] * len(lengths)
+        pattern[i] = capacity // w
+        patterns.append(pattern)
+
+    deadline = time.perf_counter() + time_limit if time_limit is not None else math.inf
+    master = _MasterLP(patterns, demands)
+    converged = False
+    for _ in range(max_iterations):
+        prices = master.solve(deadline)
+        if prices is None:
+            break
+        value, pattern = _best_pattern(weights, prices, capacity, target=1.0 + 1e-7, deadline=deadline)
+        if value > 1.0 + 1e-7 and pattern not in master.patterns:
+            master.add(pattern)
+            continue
+        # No improving pattern: the LP is optimal, unless pricing was cut short.
+        converged = time.perf_counter() <= deadline
+        break
+    patterns, usage = master.patterns, master.usage()
+
+    if converged:
+        lower_bound = math.ceil(sum(usage) - 1e-7)
+    else:
+        lower_bound = math.ceil(sum(weights[i] * demands[i] for i in range(len(lengths))) / capacity - 1e-7)
+
+    by_length: dict[int, list[tuple[str, int]]] = {}
+    for piece in sorted(pieces, key=lambda p: p[0]):
+        by_length.setdefault(piece[1], []).append(piece)
+
+    bars: list[list[tuple[str, int]]] = []
+    for pattern, amount in sorted(zip(patterns, usage), key=lambda pu: -pu[1]):
+        times = int(math.floor(amount + 1e-7))
+        cuts = [(by_length[lengths[i]], count) for i, count in enumerate(pattern) if count] if times else []
+        for _ in range(times):
+            bar = []
+            for queue, count in cuts:
+                for _ in range(min(count, len(queue))):
+                    bar.append(queue.pop())
+            if bar:
+                bars.append(bar)
+
+    residual = [piece for queue in by_length.values() for piece in queue]
+    bars.extend(first_fit_decreasing(residual, stock_length, kerf))
+    fallback = first_fit_decreasing(pieces, stock_length, kerf)
+    return (fallback if len(fallback) < len(bars) else bars), lower_bound
+
+
+def _bar_used(bar: list[tuple[str, int]], kerf: int) -> int:
+    return sum(length for _, length in bar) + kerf * max(len(bar) - 1, 0)
+
+
+def optimize_cut_list(
+    rivo_config: dict[str, Any],
+    stock_length: int = DEFAULT_STOCK_LENGTH,
+    kerf: int = 0,
+    method: str = "ffd",
+    time_limit: float | None = DEFAULT_COLGEN_SECONDS,
+) -> dict[str, Any]:
+    """
+    Build a deterministic cut plan for all profile segments in a RivoExportConfig.
+    `time_limit` caps column generation per article (see column_generation).
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of: {', '.join(METHODS)}")
+    if stock_length <= 0:
+        raise ValueError("stock_length must be positive")
+    if kerf < 0:
+        raise ValueError("kerf must not be negative")
+
+    segments = extract_profile_segments(rivo_config)
+    articles: list[dict[str, Any]] = []
+    for article in sorted(segments):
+        pieces = segments[article]
+        if method == "colgen":
+            bars, lower_bound = column_generation(pieces, stock_length, kerf, time_limit=time_limit)
+        else:
+            bars = first_fit_decreasing(pieces, stock_length, kerf)
+            lower_bound = math.ceil(sum(length + kerf for _, length in pieces) / (stock_length + kerf))
+
+        bar_rows = []
+        for bar in bars:
+            cuts = sorted(bar, key=lambda p: (-p[1], p[0]))
+            bar_rows.append(
+                {
+                    "cuts": [{"id": elem_id, "length": length} for elem_id, length in cuts],
+                    "waste": stock_length - _bar_used(cuts, kerf),
+                }
+            )
+        bar_rows.sort(key=lambda b: ([-c["length"] for c in b["cuts"]], [c["id"] for c in b["cuts"]]))
+
+        pattern_counts = Counter(tuple(c["length"] for c in b["cuts"]) for b in bar_rows)
+        total_length = sum(length for _, length in pieces)
+        articles.append(
+            {
+                "article": article,
+                "segmentCount": len(pieces),
+                "totalLength": total_length,
+                "barCount": len(bar_rows),
+                "lowerBound": lower_bound,
+                "wasteLength": sum(b["waste"] for b in bar_rows),
+                "patterns": [
+                    {"lengths": list(lengths), "count": count}
+                    for lengths, count in sorted(pattern_counts.items(), key=lambda pc: (-pc[1], pc[0]))
+                ],
+                "bars": bar_rows,
+            }
+        )
+
+    return {
+        "stockLength": stock_length,
+        "kerf": kerf,
+        "method": method,
+        "articles": articles,
+    }
+
+
+def cut_plan_bom_lines(cut_plan: dict[str, Any]) -> list[dict[str, Any]]:
+    """BOM lines (stock bars per profile article) derived from a cut plan."""
+    stock_length = cut_plan.get("stockLength", DEFAULT_STOCK_LENGTH)
+    return [
+        {
+            "article": row["article"],
+            "qty": row["barCount"],
+            "uom": "pcs",
+            "comment": f"Хлысты {stock_length} мм по карте раскроя",
+        }
+        for row in cut_plan.get("articles", [])
+    ]
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compute profile cut list (1D cutting stock) from Rivo export JSON.")
+    parser.add_argument("config", help="Path to .rivo.json (or compatible) input file.")
+    parser.add_argument("-o", "--output", help="Output cut plan path. Default: <input>.cutlist.json")
+    parser.add_argument("--method", choices=METHODS, default="ffd", help="ffd (fast heuristic) or colgen (LP column generation).")
+    parser.add_argument("--stock-length", type=int, default=None, help="Stock bar length in mm. Default: catalog maxLength.")
+    parser.add_argument("--kerf", type=int, default=0, help="Saw kerf per cut in mm.")
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=DEFAULT_COLGEN_SECONDS,
+        help="Seconds of column generation per article before settling for the best plan so far "
+        "(checked between simplex pivots and pricing steps).",
+    )
+    add_profile_option(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv or sys.argv[1:])
+    with profiled(args.profile, "cut_list"):
+        config_path = Path(args.config)
+        output_path = Path(args.output) if args.output else _derive_output_path(config_path)
+        stock_length = args.stock_length or catalog_stock_length()
+
+        try:
+            with span("cut_list.load"):
+                config = load_path(config_path)
+            with span("cut_list.optimize", method=args.method):
+                plan = optimize_cut_list(
+                    config, stock_length=stock_length, kerf=args.kerf, method=args.method, time_limit=args.time_limit
+                )
+        except Exception as exc:  # noqa: BLE001
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+
+        with span("cut_list.write"):
+            plan["bomLines"] = cut_plan_bom_lines(plan)
+            dump_path(plan, output_path, pretty=True)
+        print(output_path)
+        return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
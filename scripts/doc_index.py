@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import marshal
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from profiling import add_profile_option, profiled
+from text_norm import stem
+from text_norm import tokenize as word_tokens
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_INDEX_DIR = REPO_ROOT / ".cache/doc-index"
+DEFAULT_ROOTS = ("docs", "configs", "research")
+TEXT_SUFFIXES = {".md", ".txt", ".json", ".yaml", ".yml"}
+
+# Bump when chunking or tokenization changes: every file is re-indexed.
+INDEX_VERSION = "2"
+
+CHUNK_TOKENS = 200
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# index.bin layout (little-endian):
+#   header | dictionary (DICT entries sorted by term bytes) | term bytes
+#   | postings (u32: per document `doc_id, tf, pos * tf`) | doc lengths (u32)
+#   | doc -> file id (u32) | meta offsets (u64, n_docs + 1) | meta (JSON per doc)
+#   | files (JSON: path, mtime_ns, size per file)
+_MAGIC = b"DOCIDX\x00\x01"
+_HEADER = struct.Struct("<8s16sIIId8Q")
+_DICT = struct.Struct("<IIIQI")
+
+_HEADING_RE = re.compile(r"#{1,6}\s+(.*?)\s*#*\s*$")
+_PHRASE_RE = re.compile(r'"([^"]+)"')
+
+
+def tokenize(text: str) -> list[str]:
+    """Index terms: ru/en stems of the text's words, dropping single letters."""
+    return [stem(t) for t in word_tokens(text) if len(t) > 1 or t.isdigit()]
+
+
+def _chunk_text(text: str, markdown: bool) -> Iterator[dict[str, Any]]:
+    """
+    Split a file into chunks of about CHUNK_TOKENS tokens. Markdown headings
+    always start a new chunk; otherwise chunks end at a blank line once the
+    target is reached, or at any line once it is exceeded twice over.
+    """
+    heading = ""
+    lines: list[str] = []
+    start = 1
+    count = 0
+
+    def flush(end: int) -> Iterator[dict[str, Any]]:
+        body = "\n".join(lines).strip()
+        if body:
+            yield {"start_line": start, "end_line": end, "heading": heading, "text": body}
+
+    for lineno, line in enumerate(text.splitlines(), 1):
+        match = _HEADING_RE.match(line) if markdown else None
+        if match or (count >= CHUNK_TOKENS and not line.strip()) or count >= 2 * CHUNK_TOKENS:
+            yield from flush(lineno - 1)
+            lines, start, count = [], lineno, 0
+            if match:
+                heading = match.group(1)
+        lines.append(line)
+        count += len(tokenize(line))
+    yield from flush(start + len(lines) - 1)
+
+
+def _index_file(text: str, markdown: bool) -> list[dict[str, Any]]:
+    chunks = []
+    for chunk in _chunk_text(text, markdown):
+        terms: dict[str, list[int]] = {}
+        tokens = tokenize(chunk["heading"] + "\n" + chunk["text"])
+        for pos, term in enumerate(tokens):
+            terms.setdefault(term, []).append(pos)
+        chunk["length"] = len(tokens)
+        chunk["terms"] = terms
+        chunks.append(chunk)
+    return chunks
+
+
+def iter_corpus(repo_root: Path, roots: Iterable[str] = DEFAULT_ROOTS) -> Iterator[tuple[str, os.stat_result]]:
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(repo_root / root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            for filename in sorted(filenames):
+                if filename.startswith(".") or Path(filename).suffix.lower() not in TEXT_SUFFIXES:
+                    continue
+                path = Path(dirpath) / filename
+                yield path.relative_to(repo_root).as_posix(), path.stat()
+
+
+def _write_index(path: Path, files: dict[str, dict[str, Any]]) -> dict[str, int]:
+    postings: dict[str, list[tuple[int, list[int]]]] = {}
+    doc_lengths = array("I")
+    doc_files = array("I")
+    meta: list[bytes] = []
+    file_rows = []
+    for file_id, rel in enumerate(sorted(files)):
+        entry = files[rel]
+        file_rows.append({"path": rel, "mtime_ns": entry["mtime_ns"], "size": entry["size"]})
+        for chunk in entry["chunks"]:
+            doc_id = len(doc_lengths)
+            doc_lengths.append(chunk["length"])
+            doc_files.append(file_id)
+            row = {k: chunk[k] for k in ("start_line", "end_line", "heading", "text")}
+            meta.append(json.dumps(row, ensure_ascii=False).encode("utf-8"))
+            for term, positions in chunk["terms"].items():
+                postings.setdefault(term, []).append((doc_id, positions))
+
+    dictionary = bytearray()
+    term_bytes = bytearray()
+    words = array("I")
+    for term in sorted(postings, key=lambda t: t.encode("utf-8")):
+        encoded = term.encode("utf-8")
+        start = len(words)
+        for doc_id, positions in postings[term]:
+            words.append(doc_id)
+            words.append(len(positions))
+            words.extend(positions)
+        dictionary += _DICT.pack(len(term_bytes), len(encoded), len(postings[term]), start, len(words) - start)
+        term_bytes += encoded
+
+    meta_offsets = array("Q", [0])
+    for blob in meta:
+        meta_offsets.append(meta_offsets[-1] + len(blob))
+    if sys.byteorder != "little":
+        for arr in (words, doc_lengths, doc_files, meta_offsets):
+            arr.byteswap()
+
+    n_docs = len(doc_lengths)
+    avgdl = (sum(c["length"] for e in files.values() for c in e["chunks"]) / n_docs) if n_docs else 0.0
+    sections = [bytes(dictionary), bytes(term_bytes), words.tobytes(), doc_lengths.tobytes(), doc_files.tobytes(),
+                meta_offsets.tobytes(), b"".join(meta), json.dumps(file_rows, ensure_ascii=False).encode("utf-8")]
+    offsets = []
+    position = _HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += len(section)
+    version = INDEX_VERSION.encode("ascii").ljust(16, b"\0")
+    header = _HEADER.pack(_MAGIC, version, n_docs, len(postings), len(file_rows), avgdl, *offsets)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        f.write(header)
+        for section in sections:
+            f.write(section)
+    os.replace(tmp, path)
+    return {"chunks": n_docs, "terms": len(postings)}
+
+
+@dataclass
+class Hit:
+    doc_id: int
+    score: float
+    path: str
+    start_line: int
+    end_line: int
+    heading: str
+    text: str
+
+    @property
+    def citation(self) -> str:
+        return f"{self.path}:{self.start_line}-{self.end_line}"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "path": self.path,
+            "start_line": self.start_line,
+            "end_line": self.end_line,
+            "heading": self.heading,
+            "score": round(self.score, 4),
+            "text": self.text,
+        }
+
+
+class DocIndex:
+    """
+    Read-only view of index.bin over mmap. Only the small file table is
+    decoded on open; term lookups binary-search the dictionary in place and
+    postings are read as u32 views of the mapping.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self) -> None:
+        buf = memoryview(self._mm)
+        self._buf = buf
+        if len(buf) < _HEADER.size:
+            raise ValueError(f"Truncated index: {self.path}")
+        magic, version, self.n_docs, self.n_terms, n_files, self.avgdl, *offsets = _HEADER.unpack_from(buf)
+        if magic != _MAGIC or version.rstrip(b"\0").decode("ascii") != INDEX_VERSION:
+            raise ValueError(f"Unsupported index format: {self.path}")
+        dict_off, terms_off, post_off, len_off, file_off, moff_off, meta_off, files_off = offsets
+
+        def u32(start: int, end: int):
+            view = buf[start:end].cast("I")
+            return view if sys.byteorder == "little" else _swapped("I", view)
+
+        self._dict = buf[dict_off:terms_off]
+        self._terms = buf[terms_off:post_off]
+        self._postings = u32(post_off, len_off)
+        self._doc_lengths = u32(len_off, file_off)
+        self._doc_files = u32(file_off, moff_off)
+        moffs = buf[moff_off:meta_off].cast("Q")
+        self._meta_offsets = moffs if sys.byteorder == "little" else _swapped("Q", moffs)
+        self._meta = buf[meta_off:files_off]
+        self.files: list[dict[str, Any]] = json.loads(bytes(buf[files_off:]).decode("utf-8"))
+        if len(self.files) != n_files:
+            raise ValueError(f"Corrupt index file table: {self.path}")
+
+    def close(self) -> None:
+        for name in ("_dict", "_terms", "_postings", "_doc_lengths", "_doc_files", "_meta_offsets", "_meta", "_buf"):
+            view = getattr(self, name, None)
+            if isinstance(view, memoryview):
+                view.release()
+        self._mm.close()
+
+    def __enter__(self) -> DocIndex:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _lookup(self, term: str) -> tuple[int, int, int] | None:
+        """Return (df, start, length) of the term's postings, or None."""
+        key = term.encode("utf-8")
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            t_off, t_len, df, start, length = _DICT.unpack_from(self._dict, mid * _DICT.size)
+            candidate = self._terms[t_off : t_off + t_len].tobytes()
+            if candidate == key:
+                return df, start, length
+            if candidate < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def _postings_for(self, term: str) -> dict[int, memoryview]:
+        """doc_id -> positions of `term` in that document."""
+        found = self._lookup(term)
+        if found is None:
+            return {}
+        _df, start, length = found
+        words = self._postings[start : start + length]
+        out = {}
+        i = 0
+        while i < length:
+            tf = words[i + 1]
+            out[words[i]] = words[i + 2 : i + 2 + tf]
+            i += 2 + tf
+        return out
+
+    def hit(self, doc_id: int, score: float = 0.0) -> Hit:
+        raw = self._meta[self._meta_offsets[doc_id] : self._meta_offsets[doc_id + 1]]
+        row = json.loads(raw.tobytes().decode("utf-8"))
+        path = self.files[self._doc_files[doc_id]]["path"]
+        return Hit(doc_id, score, path, row["start_line"], row["end_line"], row["heading"], row["text"])
+
+    def search(self, query: str, *, sources: Iterable[str] | None = None, max_chunks: int = 3) -> list[Hit]:
+        """
+        BM25 over the query terms. Double-quoted parts of the query are
+        phrases: a chunk must contain each phrase's terms consecutively.
+        """
+        phrases = [tokenize(p) for p in _PHRASE_RE.findall(query)]
+        phrases = [p for p in phrases if p]
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or self.n_docs == 0:
+            return []
+
+        allowed = None
+        if sources:
+            prefixes = tuple(s.strip("/") + "/" for s in sources)
+            allowed = {i for i, f in enumerate(self.files) if f["path"].startswith(prefixes)}
+
+        postings = {term: self._postings_for(term) for term in terms}
+        scores: dict[int, float] = {}
+        for term, docs in postings.items():
+            if not docs:
+                continue
+            df = len(docs)
+            idf = math.log(1.0 + (self.n_docs - df + 0.5) / (df + 0.5))
+            for doc_id, positions in docs.items():
+                if allowed is not None and self._doc_files[doc_id] not in allowed:
+                    continue
+                tf = len(positions)
+                norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self._doc_lengths[doc_id] / (self.avgdl or 1.0))
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1.0) / (tf + norm)
+
+        if phrases:
+            scores = {d: s for d, s in scores.items() if all(_has_phrase(postings, p, d) for p in phrases)}
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[: max(0, max_chunks)]
+        return [self.hit(doc_id, score) for doc_id, score in ranked]
+
+
+def _swapped(fmt: str, view: memoryview) -> array:
+    arr = array(fmt, view.tobytes())
+    arr.byteswap()
+    return arr
+
+
+def _has_phrase(postings: dict[str, dict[int, memoryview]], phrase: list[str], doc_id: int) -> bool:
+    try:
+        position_sets = [set(postings[t][doc_id]) for t in phrase]
+    except KeyError:
+        return False
+    return any(all(p + i in position_sets[i] for i in range(1, len(phrase))) for p in position_sets[0])
+
+
+def _load_state(path: Path) -> dict[str, dict[str, Any]]:
+    try:
+        with path.open("rb") as f:
+            state = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    if not isinstance(state, dict) or state.get("version") != INDEX_VERSION:
+        return {}
+    return state.get("files", {})
+
+
+def _save_state(path: Path, files: dict[str, dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        marshal.dump({"version": INDEX_VERSION, "files": files}, f)
+    os.replace(tmp, path)
+
+
+def _is_fresh(index_path: Path, corpus: dict[str, os.stat_result]) -> bool:
+    try:
+        with DocIndex(index_path) as index:
+            indexed = {f["path"]: (f["mtime_ns"], f["size"]) for f in index.files}
+    except (OSError, ValueError):
+        return False
+    return indexed == {rel: (st.st_mtime_ns, st.st_size) for rel, st in corpus.items()}
+
+
+def build_index(
+    repo_root: Path = REPO_ROOT,
+    index_dir: Path = DEFAULT_INDEX_DIR,
+    *,
+    roots: Iterable[str] = DEFAULT_ROOTS,
+    full: bool = False,
+) -> dict[str, Any]:
+    """
+    Bring `index_dir/index.bin` up to date with the corpus. Files whose
+    (mtime, size) match the last build are not read; files whose content hash
+    still matches are not re-chunked. Per-file chunks and postings are kept in
+    `state.marshal` so only changed files are tokenized again.
+    """
+    started = time.perf_counter()
+    repo_root = Path(repo_root)
+    index_path = Path(index_dir) / "index.bin"
+    state_path = Path(index_dir) / "state.marshal"
+    corpus = dict(iter_corpus(repo_root, roots))
+    stats: dict[str, Any] = {"files": len(corpus), "reindexed": 0, "rehashed": 0, "removed": 0, "written": False}
+
+    if not full and _is_fresh(index_path, corpus):
+        stats["build_ms"] = round((time.perf_counter() - started) * 1000.0, 3)
+        return stats
+
+    previous = {} if full else _load_state(state_path)
+    files: dict[str, dict[str, Any]] = {}
+    for rel, st in corpus.items():
+        entry = previous.get(rel)
+        if entry is not None and (entry["mtime_ns"], entry["size"]) == (st.st_mtime_ns, st.st_size):
+            files[rel] = entry
+            continue
+        data = (repo_root / rel).read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        if entry is not None and entry["sha256"] == digest:
+            stats["rehashed"] += 1
+            chunks = entry["chunks"]
+        else:
+            stats["reindexed"] += 1
+            text = data.decode("utf-8", errors="replace")
+            chunks = _index_file(text, markdown=rel.endswith(".md"))
+        files[rel] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": digest, "chunks": chunks}
+    stats["removed"] = len(previous.keys() - files.keys())
+
+    stats.update(_write_index(index_path, files))
+    _save_state(state_path, files)
+    stats["written"] = True
+    stats["build_ms"] = round((time.perf_counter() - started) * 1000.0, 3)
+    return stats
+
+
+def retrieve(
+    query: str,
+    *,
+    sources: Iterable[str] | None = None,
+    max_chunks: int = 3,
+    repo_root: Path = REPO_ROOT,
+    index_dir: Path = DEFAULT_INDEX_DIR,
+    refresh: bool = True,
+) -> dict[str, Any]:
+    """
+    Retriever contract (configs/tooling/integration_contracts.json): returns
+    chunks, citations and retrieval_ms. With `refresh`, the index is first
+    brought up to date, which is a stat of each corpus file when nothing
+    changed.
+    """
+    started = time.perf_counter()
+    if refresh:
+        build_index(repo_root, index_dir)
+    with DocIndex(Path(index_dir) / "index.bin") as index:
+        hits = index.search(query, sources=sources, max_chunks=max_chunks)
+    return {
+        "chunks": [hit.to_dict() for hit in hits],
+        "citations": [hit.citation for hit in hits],
+        "retrieval_ms": int(round((time.perf_counter() - started) * 1000.0)),
+    }
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build or query the BM25 index of docs/, configs/ and research/.")
+    parser.add_argument("query", nargs="?", help='Query text; "quoted parts" must match as phrases')
+    parser.add_argument("--full", action="store_true", help="Re-index every file instead of only changed ones")
+    parser.add_argument("--source", action="append", dest="sources", help="Limit results to a corpus root (repeatable)")
+    parser.add_argument("-k", "--max-chunks", dest="max_chunks", type=int, default=5)
+    parser.add_argument("--index-dir", dest="index_dir", default=str(DEFAULT_INDEX_DIR))
+    add_profile_option(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv or sys.argv[1:])
+    with profiled(args.profile, "doc_index"):
+        index_dir = Path(args.index_dir)
+        try:
+            stats = build_index(REPO_ROOT, index_dir, full=args.full)
+            if args.query:
+                stats = retrieve(
+                    args.query, sources=args.sources, max_chunks=args.max_chunks, index_dir=index_dir, refresh=False
+                )
+        except (OSError, ValueError) as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+        return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
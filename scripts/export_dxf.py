@@ -2,10 +2,19 @@
 from __future__ import annotations
 
 import argparse
-import json
 import sys
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
+
+from json_io import load_path
+from json_stream import iter_rivo_sections
+from profiling import add_profile_option, profiled
+from tracing import span
+
+PREVIEW_HEADER = (
+    "DXF MAPPING PREVIEW",
+    "LAYERS: RIVO_PROFILE,RIVO_CONNECTORS,RIVO_SUPPORTS,RIVO_EQUIPMENT,RIVO_AXES,RIVO_DIMS,RIVO_TEXT",
+)
 
 
 def _derive_output_path(config_path: Path) -> Path:
@@ -38,32 +47,14 @@ def _sorted_elements(value: Any) -> list[dict[str, Any]]:
     return sorted(items, key=lambda e: (str(e.get("id", "")), str(e.get("article", ""))))
 
 
-def generate_dxf_stub(rivo_config: dict[str, Any], output_path: Path) -> Path:
-    """
-    Generate DXF with ezdxf, or a deterministic text preview when ezdxf is absent.
-    """
-    if not isinstance(rivo_config, dict):
-        raise ValueError("rivo_config must be a dictionary")
+def _preview_line(elem: dict[str, Any]) -> str:
+    art = str(elem.get("article", ""))
+    layer = _layer_for_article(art)
+    geom = elem.get("geom", {}) if isinstance(elem.get("geom"), dict) else {}
+    return f"LAYER={layer};ART={art};GEOM_TYPE={geom.get('type', '')}"
 
-    elements = _sorted_elements(rivo_config.get("elements"))
-
-    try:
-        import ezdxf
-    except ImportError:
-        lines = [
-            "DXF MAPPING PREVIEW",
-            "LAYERS: RIVO_PROFILE,RIVO_CONNECTORS,RIVO_SUPPORTS,RIVO_EQUIPMENT,RIVO_AXES,RIVO_DIMS,RIVO_TEXT",
-        ]
-        for elem in elements:
-            art = str(elem.get("article", ""))
-            layer = _layer_for_article(art)
-            geom = elem.get("geom", {}) if isinstance(elem.get("geom"), dict) else {}
-            lines.append(f"LAYER={layer};ART={art};GEOM_TYPE={geom.get('type', '')}")
-
-        preview_path = output_path.with_suffix(output_path.suffix + ".txt")
-        preview_path.write_text("\n".join(lines), encoding="utf-8")
-        return preview_path
 
+def _new_document(ezdxf: Any) -> Any:
     doc = ezdxf.new("R2010")
     doc.header["$INSUNITS"] = 4  # millimeters
     for name, color in (
@@ -77,50 +68,102 @@ def generate_dxf_stub(rivo_config: dict[str, Any], output_path: Path) -> Path:
     ):
         if name not in doc.layers:
             doc.layers.add(name=name, color=color)
+    return doc
+
+
+def _add_entity(msp: Any, elem: dict[str, Any]) -> None:
+    article = str(elem.get("article", ""))
+    layer = _layer_for_article(article)
+    geom = elem.get("geom", {}) if isinstance(elem.get("geom"), dict) else {}
+    geom_type = str(geom.get("type", "")).lower()
+
+    if geom_type == "segment":
+        start = _point_xy(geom.get("start"))
+        end = _point_xy(geom.get("end"))
+        msp.add_line(start, end, dxfattribs={"layer": layer})
+    elif geom_type == "point":
+        point = _point_xy(geom.get("point"))
+        msp.add_text(
+            f"ART:{article}",
+            dxfattribs={"layer": "RIVO_TEXT", "insert": point, "height": 2.5},
+        )
+
+
+def _write_elements(elements: Iterable[dict[str, Any]], output_path: Path) -> Path:
+    try:
+        import ezdxf
+    except ImportError:
+        preview_path = output_path.with_suffix(output_path.suffix + ".txt")
+        with open(preview_path, "w", encoding="utf-8") as fh:
+            fh.write("\n".join(PREVIEW_HEADER))
+            for elem in elements:
+                fh.write("\n")
+                fh.write(_preview_line(elem))
+        return preview_path
 
+    doc = _new_document(ezdxf)
     msp = doc.modelspace()
     for elem in elements:
-        article = str(elem.get("article", ""))
-        layer = _layer_for_article(article)
-        geom = elem.get("geom", {}) if isinstance(elem.get("geom"), dict) else {}
-        geom_type = str(geom.get("type", "")).lower()
-
-        if geom_type == "segment":
-            start = _point_xy(geom.get("start"))
-            end = _point_xy(geom.get("end"))
-            msp.add_line(start, end, dxfattribs={"layer": layer})
-        elif geom_type == "point":
-            point = _point_xy(geom.get("point"))
-            msp.add_text(
-                f"ART:{article}",
-                dxfattribs={"layer": "RIVO_TEXT", "insert": point, "height": 2.5},
-            )
-
+        _add_entity(msp, elem)
     doc.saveas(output_path)
     return output_path
 
 
+def generate_dxf_stub(rivo_config: dict[str, Any], output_path: Path) -> Path:
+    """
+    Generate DXF with ezdxf, or a deterministic text preview when ezdxf is absent.
+    """
+    if not isinstance(rivo_config, dict):
+        raise ValueError("rivo_config must be a dictionary")
+
+    return _write_elements(_sorted_elements(rivo_config.get("elements")), output_path)
+
+
+def generate_dxf_stream(sections: Iterable[tuple[str, Any]], output_path: Path) -> Path:
+    """
+    Write elements as they arrive from `json_stream.iter_rivo_sections`.
+
+    Elements keep document order instead of being sorted by id; exports from
+    export_mapping are already id-ordered, so the output matches the default path.
+    """
+    elements = (value for section, value in sections if section == "element" and isinstance(value, dict))
+    return _write_elements(elements, output_path)
+
+
 def _parse_args(argv: list[str]) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Generate DXF (or preview) from Rivo export JSON.")
     parser.add_argument("config", help="Path to .rivo.json (or compatible) input file.")
     parser.add_argument("-o", "--output", help="Output DXF path. Default: <input>.dxf")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Parse the input incrementally (bounded memory for very large exports; keeps document order).",
+    )
+    add_profile_option(parser)
     return parser.parse_args(argv)
 
 
 def main(argv: list[str] | None = None) -> int:
     args = _parse_args(argv or sys.argv[1:])
-    config_path = Path(args.config)
-    output_path = Path(args.output) if args.output else _derive_output_path(config_path)
-
-    try:
-        config = json.loads(config_path.read_text(encoding="utf-8"))
-        written = generate_dxf_stub(config, output_path)
-    except Exception as exc:  # noqa: BLE001
-        print(f"error: {exc}", file=sys.stderr)
-        return 1
-
-    print(written)
-    return 0
+    with profiled(args.profile, "export_dxf"):
+        config_path = Path(args.config)
+        output_path = Path(args.output) if args.output else _derive_output_path(config_path)
+
+        try:
+            if args.stream:
+                with span("export_dxf.stream"):
+                    written = generate_dxf_stream(iter_rivo_sections(config_path), output_path)
+            else:
+                with span("export_dxf.load"):
+                    config = load_path(config_path)
+                with span("export_dxf.write"):
+                    written = generate_dxf_stub(config, output_path)
+        except Exception as exc:  # noqa: BLE001
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+
+        print(written)
+        return 0
 
 
 if __name__ == "__main__":
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
-import json
-import sys
+import argparse
+
+from json_io import load_path
+from profiling import add_profile_option, profiled
+from tracing import span
 
 def generate_ifc_stub(rivo_config: dict, output_path: str):
     """
@@ -50,15 +53,23 @@ def generate_ifc_stub(rivo_config: dict, output_path: str):
         print(f"IFC Hierarchy mapping preview generated at {output_path}.txt")
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        config_path = sys.argv[1]
-    else:
-        config_path = "../research/RIVO_Deliverables_Passport_DXF_IFC_JSON/05_sample_project.rivo.json"
-    
+    parser = argparse.ArgumentParser(description="Generate the IFC4 hierarchy mapping preview from Rivo export JSON.")
+    parser.add_argument(
+        "config",
+        nargs="?",
+        default="../research/RIVO_Deliverables_Passport_DXF_IFC_JSON/05_sample_project.rivo.json",
+        help="Path to .rivo.json input file.",
+    )
+    add_profile_option(parser)
+    args = parser.parse_args()
+    config_path = args.config
+
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        output_file = config_path.replace(".rivo.json", ".ifc")
-        generate_ifc_stub(config, output_file)
+        with profiled(args.profile, "export_ifc"):
+            with span("export_ifc.load"):
+                config = load_path(config_path)
+            output_file = config_path.replace(".rivo.json", ".ifc")
+            with span("export_ifc.write"):
+                generate_ifc_stub(config, output_file)
     except Exception as e:
         print(f"Error processing {config_path}: {e}")
@@ -2,12 +2,24 @@
 from __future__ import annotations
 
 import argparse
-import json
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from json_io import dump_path, print_json
+from profiling import add_profile_option, profiled
+from snapshot_model import (
+    EMPTY_GRAPH,
+    ConfigurationSnapshot,
+    GraphEdge,
+    GraphNode,
+    StructureGraph,
+    decode_snapshot,
+    load_snapshot,
+)
+from tracing import span
+
 DEFAULT_ARTICLE = "100001.1"
 DEFAULT_FRAME = {"width": 1200, "height": 2500, "depth": 200}
 
@@ -16,42 +28,12 @@ def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
 
-def _as_int(value: Any, default: int) -> int:
-    try:
-        return int(value)
-    except (TypeError, ValueError):
-        return default
-
+def _sorted_edges(graph: StructureGraph) -> list[GraphEdge]:
+    return sorted(graph.edges, key=lambda e: (e.source, e.target, e.type or ""))
 
-def _as_dict(value: Any) -> dict[str, Any]:
-    return value if isinstance(value, dict) else {}
 
-
-def _as_list_of_dicts(value: Any) -> list[dict[str, Any]]:
-    if not isinstance(value, list):
-        return []
-    return [item for item in value if isinstance(item, dict)]
-
-
-def _sorted_edges(graph: dict[str, Any]) -> list[dict[str, Any]]:
-    edges = _as_list_of_dicts(graph.get("edges"))
-    return sorted(
-        edges,
-        key=lambda e: (
-            str(e.get("from", "")),
-            str(e.get("to", "")),
-            str(e.get("type", "")),
-        ),
-    )
-
-
-def _sorted_nodes(graph: dict[str, Any]) -> list[dict[str, Any]]:
-    raw_nodes = graph.get("nodes")
-    if isinstance(raw_nodes, dict):
-        nodes = [v for v in raw_nodes.values() if isinstance(v, dict)]
-    else:
-        nodes = _as_list_of_dicts(raw_nodes)
-    return sorted(nodes, key=lambda n: str(n.get("id", "")))
+def _sorted_nodes(graph: StructureGraph) -> list[GraphNode]:
+    return sorted(graph.nodes, key=lambda n: n.id)
 
 
 def _default_segment(frame_height: int) -> dict[str, Any]:
@@ -62,23 +44,25 @@ def _default_segment(frame_height: int) -> dict[str, Any]:
     }
 
 
-def map_snapshot_to_export_config(snapshot_data: dict[str, Any], project_id: str) -> dict[str, Any]:
+def map_snapshot_to_export_config(
+    snapshot_data: dict[str, Any] | ConfigurationSnapshot, project_id: str
+) -> dict[str, Any]:
     """
     Transform ConfigurationSnapshot into RivoExportConfig.
     Keeps deterministic ordering for export stability.
+    Accepts a raw snapshot dict or an already decoded ConfigurationSnapshot.
     """
-    if not isinstance(snapshot_data, dict):
-        raise ValueError("snapshot_data must be a dictionary")
+    snapshot = decode_snapshot(snapshot_data)
     if not project_id.strip():
         raise ValueError("project_id must not be empty")
 
-    dimensions = _as_dict(snapshot_data.get("dimensions"))
-    frame_height = _as_int(dimensions.get("height"), DEFAULT_FRAME["height"])
+    dimensions = snapshot.dimensions
+    frame_height = dimensions.height if dimensions.height is not None else DEFAULT_FRAME["height"]
 
     rivo_config: dict[str, Any] = {
         "meta": {
             "projectId": project_id,
-            "snapshotStateId": snapshot_data.get("stateId"),
+            "snapshotStateId": snapshot.state_id,
             "createdAt": _utc_now_iso(),
             "units": "mm",
             "version": "1.0.0",
@@ -86,9 +70,9 @@ def map_snapshot_to_export_config(snapshot_data: dict[str, Any], project_id: str
         },
         "frame": {
             "type": "falsewall",
-            "width": _as_int(dimensions.get("width"), DEFAULT_FRAME["width"]),
+            "width": dimensions.width if dimensions.width is not None else DEFAULT_FRAME["width"],
             "height": frame_height,
-            "depth": _as_int(dimensions.get("depth"), DEFAULT_FRAME["depth"]),
+            "depth": dimensions.depth if dimensions.depth is not None else DEFAULT_FRAME["depth"],
             "studStep": 600,
             "origin": {"x": 0, "y": 0, "z": 0},
             "grid": {"snapMm": 1, "roundMm": 0.1},
@@ -100,51 +84,52 @@ def map_snapshot_to_export_config(snapshot_data: dict[str, Any], project_id: str
         },
         "catalog": {"items": []},
         "elements": [],
-        "bom": {"lines": _as_list_of_dicts(snapshot_data.get("bom"))},
+        "bom": {"lines": list(snapshot.bom)},
         "views": {
             "front": {"mode": "cad", "dimensions": []},
             "side": {"mode": "cad", "dimensions": []},
         },
     }
 
-    graph = _as_dict(snapshot_data.get("graph"))
+    graph = snapshot.graph or EMPTY_GRAPH
     edges = _sorted_edges(graph)
     nodes = _sorted_nodes(graph)
+    elements = rivo_config["elements"]
 
     if nodes:
         outgoing_map: dict[str, list[dict[str, str]]] = {}
         for edge in edges:
-            src = str(edge.get("from", ""))
-            if not src:
+            if not edge.source:
                 continue
-            outgoing_map.setdefault(src, []).append(
-                {"to": str(edge.get("to", "")), "type": str(edge.get("type", "corner"))}
+            outgoing_map.setdefault(edge.source, []).append(
+                {"to": edge.target, "type": edge.type if edge.type is not None else "corner"}
             )
 
         for node in nodes:
-            node_id = str(node.get("id", "")).strip() or f"node-{len(rivo_config['elements'])}"
-            geom = _as_dict(node.get("geom")) or _default_segment(frame_height)
-            element = {
-                "id": node_id,
-                "article": str(node.get("article", DEFAULT_ARTICLE)),
-                "kind": str(node.get("kind", "profile")),
-                "transform": _as_dict(node.get("transform"))
-                or {"pos": {"x": 0, "y": 0, "z": 0}, "rot": {"rx": 0, "ry": 0, "rz": 0}},
-                "geom": geom,
-                "connections": outgoing_map.get(node_id, []),
-            }
-            rivo_config["elements"].append(element)
+            node_id = node.id.strip() or f"node-{len(elements)}"
+            elements.append(
+                {
+                    "id": node_id,
+                    "article": node.article if node.article is not None else DEFAULT_ARTICLE,
+                    "kind": node.kind if node.kind is not None else "profile",
+                    "transform": node.transform
+                    or {"pos": {"x": 0, "y": 0, "z": 0}, "rot": {"rx": 0, "ry": 0, "rz": 0}},
+                    "geom": node.geom or _default_segment(frame_height),
+                    "connections": outgoing_map.get(node_id, []),
+                }
+            )
     else:
         for index, edge in enumerate(edges):
-            element = {
-                "id": f"mapped-elem-{index}",
-                "article": DEFAULT_ARTICLE,
-                "kind": "profile",
-                "transform": {"pos": {"x": 0, "y": 0, "z": 0}, "rot": {"rx": 0, "ry": 0, "rz": 0}},
-                "geom": _default_segment(frame_height),
-                "connections": [{"to": edge.get("to", ""), "type": edge.get("type", "corner")}],
-            }
-            rivo_config["elements"].append(element)
+            elements.append(
+                {
+                    "id": f"mapped-elem-{index}",
+                    "article": DEFAULT_ARTICLE,
+                    "kind": "profile",
+                    "transform": {"pos": {"x": 0, "y": 0, "z": 0}, "rot": {"rx": 0, "ry": 0, "rz": 0}},
+                    "geom": _default_segment(frame_height),
+                    "connections": [{"to": edge.target, "type": edge.type if edge.type is not None else "corner"}],
+                }
+            )
 
     return rivo_config
 
@@ -157,28 +142,33 @@ def _parse_args(argv: list[str]) -> argparse.Namespace:
         "--output",
         help="Output path for mapped JSON. If omitted, prints mapped JSON to stdout.",
     )
+    add_profile_option(parser)
     return parser.parse_args(argv)
 
 
 def main(argv: list[str] | None = None) -> int:
     args = _parse_args(argv or sys.argv[1:])
-    snapshot_path = Path(args.snapshot)
-
-    try:
-        snapshot_data = json.loads(snapshot_path.read_text(encoding="utf-8"))
-        mapped = map_snapshot_to_export_config(snapshot_data, args.project_id)
-    except Exception as exc:  # noqa: BLE001
-        print(f"error: {exc}", file=sys.stderr)
-        return 1
-
-    if args.output:
-        output_path = Path(args.output)
-        output_path.write_text(json.dumps(mapped, ensure_ascii=False, indent=2), encoding="utf-8")
-        print(output_path)
-    else:
-        print(json.dumps(mapped, ensure_ascii=False, indent=2))
-
-    return 0
+    with profiled(args.profile, "export_mapping"):
+        snapshot_path = Path(args.snapshot)
+
+        try:
+            with span("export_mapping.load"):
+                snapshot = load_snapshot(snapshot_path)
+            with span("export_mapping.map"):
+                mapped = map_snapshot_to_export_config(snapshot, args.project_id)
+        except Exception as exc:  # noqa: BLE001
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+
+        if args.output:
+            output_path = Path(args.output)
+            with span("export_mapping.write"):
+                dump_path(mapped, output_path, pretty=True)
+            print(output_path)
+        else:
+            print_json(mapped)
+
+        return 0
 
 
 if __name__ == "__main__":
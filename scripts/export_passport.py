@@ -2,11 +2,17 @@
 from __future__ import annotations
 
 import argparse
-import json
+import shutil
 import sys
+import tempfile
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
+
+from json_io import load_path
+from json_stream import iter_rivo_sections
+from profiling import add_profile_option, profiled
+from tracing import span
 
 PASSPORT_TEMPLATE = """# ТЕХНИЧЕСКИЙ ПАСПОРТ ИЗДЕЛИЯ
 **Проект:** {project_id}
@@ -39,18 +45,20 @@ def _md_cell(value: Any) -> str:
     return text.replace("|", "\\|").replace("\n", " ").strip()
 
 
+BOM_TABLE_HEADER = ("| Артикул | Кол-во | Ед. изм. | Примечание |", "|---|---|---|---|")
+
+
+def _bom_row(line: dict[str, Any]) -> str:
+    return "| {article} | {qty} | {uom} | {comment} |".format(
+        article=_md_cell(line.get("article", "")),
+        qty=_md_cell(line.get("qty", 0)),
+        uom=_md_cell(line.get("uom", "шт")),
+        comment=_md_cell(line.get("comment", "")),
+    )
+
+
 def _build_bom_table(bom_lines: list[dict[str, Any]]) -> str:
-    rows = ["| Артикул | Кол-во | Ед. изм. | Примечание |", "|---|---|---|---|"]
-    for line in bom_lines:
-        rows.append(
-            "| {article} | {qty} | {uom} | {comment} |".format(
-                article=_md_cell(line.get("article", "")),
-                qty=_md_cell(line.get("qty", 0)),
-                uom=_md_cell(line.get("uom", "шт")),
-                comment=_md_cell(line.get("comment", "")),
-            )
-        )
-    return "\n".join(rows)
+    return "\n".join([*BOM_TABLE_HEADER, *(_bom_row(line) for line in bom_lines)])
 
 
 def _derive_output_path(config_path: Path) -> Path:
@@ -60,6 +68,20 @@ def _derive_output_path(config_path: Path) -> Path:
     return config_path.with_suffix(config_path.suffix + ".passport.md")
 
 
+def _template_fields(meta: dict[str, Any], frame: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "project_id": meta.get("projectId", "N/A"),
+        "date": meta.get("createdAt", "N/A"),
+        "author": meta.get("author", "N/A"),
+        "frame_type": frame.get("type", "N/A"),
+        "width": frame.get("width", 0),
+        "height": frame.get("height", 0),
+        "depth": frame.get("depth", 0),
+        "stud_step": frame.get("studStep", 0),
+        "current_time": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+    }
+
+
 def generate_passport(rivo_config: dict[str, Any], output_path: Path) -> Path:
     if not isinstance(rivo_config, dict):
         raise ValueError("rivo_config must be a dictionary")
@@ -69,44 +91,78 @@ def generate_passport(rivo_config: dict[str, Any], output_path: Path) -> Path:
     bom = rivo_config.get("bom", {}) if isinstance(rivo_config.get("bom"), dict) else {}
     bom_lines = [line for line in bom.get("lines", []) if isinstance(line, dict)] if isinstance(bom.get("lines"), list) else []
 
-    report = PASSPORT_TEMPLATE.format(
-        project_id=meta.get("projectId", "N/A"),
-        date=meta.get("createdAt", "N/A"),
-        author=meta.get("author", "N/A"),
-        bom_table=_build_bom_table(bom_lines),
-        frame_type=frame.get("type", "N/A"),
-        width=frame.get("width", 0),
-        height=frame.get("height", 0),
-        depth=frame.get("depth", 0),
-        stud_step=frame.get("studStep", 0),
-        current_time=datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
-    )
+    report = PASSPORT_TEMPLATE.format(bom_table=_build_bom_table(bom_lines), **_template_fields(meta, frame))
 
     output_path.write_text(report, encoding="utf-8")
     return output_path
 
 
+def generate_passport_stream(sections: Iterable[tuple[str, Any]], output_path: Path) -> Path:
+    """
+    Build the passport from `json_stream.iter_rivo_sections` output.
+
+    BOM rows are spooled to a temporary file as they arrive, so `meta` and
+    `frame` may appear anywhere in the document without buffering the lines.
+    """
+    meta: dict[str, Any] = {}
+    frame: dict[str, Any] = {}
+    head, tail = PASSPORT_TEMPLATE.split("{bom_table}")
+
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+        for section, value in sections:
+            if section == "bom_line":
+                if isinstance(value, dict):
+                    spool.write("\n")
+                    spool.write(_bom_row(value))
+            elif section == "meta" and isinstance(value, dict):
+                meta = value
+            elif section == "frame" and isinstance(value, dict):
+                frame = value
+
+        fields = _template_fields(meta, frame)
+        spool.seek(0)
+        with open(output_path, "w", encoding="utf-8") as out:
+            out.write(head.format(**fields))
+            out.write("\n".join(BOM_TABLE_HEADER))
+            shutil.copyfileobj(spool, out)
+            out.write(tail.format(**fields))
+    return output_path
+
+
 def _parse_args(argv: list[str]) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Generate markdown technical passport from Rivo export JSON.")
     parser.add_argument("config", help="Path to .rivo.json (or compatible) input file.")
     parser.add_argument("-o", "--output", help="Output markdown path. Default: <input>.passport.md")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Parse the input incrementally (bounded memory for very large exports).",
+    )
+    add_profile_option(parser)
     return parser.parse_args(argv)
 
 
 def main(argv: list[str] | None = None) -> int:
     args = _parse_args(argv or sys.argv[1:])
-    config_path = Path(args.config)
-    output_path = Path(args.output) if args.output else _derive_output_path(config_path)
-
-    try:
-        config = json.loads(config_path.read_text(encoding="utf-8"))
-        written = generate_passport(config, output_path)
-    except Exception as exc:  # noqa: BLE001
-        print(f"error: {exc}", file=sys.stderr)
-        return 1
-
-    print(written)
-    return 0
+    with profiled(args.profile, "export_passport"):
+        config_path = Path(args.config)
+        output_path = Path(args.output) if args.output else _derive_output_path(config_path)
+
+        try:
+            if args.stream:
+                with span("export_passport.stream"):
+                    written = generate_passport_stream(iter_rivo_sections(config_path), output_path)
+            else:
+                with span("export_passport.load"):
+                    config = load_path(config_path)
+                with span("export_passport.render"):
+                    written = generate_passport(config, output_path)
+        except Exception as exc:  # noqa: BLE001
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+
+        print(written)
+        return 0
 
 
 if __name__ == "__main__":
@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+Async HTTP service for the export endpoints of contracts/openapi.v1.yaml.
+
+Laid out like skills/api-design-principles/assets/rest-api-template.py
+(app, models, error handling, endpoints), on a bare asyncio server like
+scripts/mock_provider.py so it needs no web framework.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+import json_io
+from export_dxf import generate_dxf_stub
+from export_ifc import generate_ifc_stub
+from export_mapping import map_snapshot_to_export_config
+from export_passport import generate_passport
+from profiling import add_profile_option, profiled
+from schema_validator import compile_validator, error_envelope
+from tracing import span
+
+API_PREFIX = "/api/v1"  # servers[0].url
+CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_BODY_BYTES = 64 * 1024 * 1024
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+# Models
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    headers: dict[str, str]
+    body: bytes
+
+
+@dataclass
+class Response:
+    status: int = 200
+    body: bytes = b""
+    content_type: str = "application/json"
+    headers: dict[str, str] = field(default_factory=dict)
+    stream: AsyncIterator[bytes] | None = None  # sent with chunked transfer encoding instead of body
+    on_close: Callable[[], Awaitable[None]] | None = None  # after the response is written or abandoned
+
+
+def json_response(payload: Any, status: int = 200) -> Response:
+    return Response(status, json_io.dumps(payload))
+
+
+# Error handling
+
+
+class HTTPError(Exception):
+    """Raised by handlers; rendered as an ErrorEnvelope (contracts/schemas/error-envelope.schema.json)."""
+
+    def __init__(self, status: int, code: str, message: str, details: dict[str, Any] | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.envelope: dict[str, Any] = {"code": code, "message": message}
+        if details:
+            self.envelope["details"] = details
+
+
+def http_error_handler(exc: HTTPError) -> Response:
+    response = json_response(exc.envelope, exc.status)
+    if exc.status == 503:
+        response.headers["Retry-After"] = "1"
+    return response
+
+
+# Export jobs: run on the process pool; the body goes over as bytes so the
+# worker does the JSON parsing, schema validation and export.
+
+
+def _load_body(body: bytes, schema: str) -> Any:
+    try:
+        document = json_io.loads(body)
+    except ValueError as exc:
+        raise HTTPError(400, "invalid_json", f"Request body is not JSON: {exc}") from exc
+    errors = compile_validator(schema).errors(document)
+    if errors:
+        envelope = error_envelope(errors)
+        raise HTTPError(400, envelope["code"], envelope["message"], envelope["details"])
+    return document
+
+
+def _validation_items(body: bytes) -> dict[str, Any]:
+    try:
+        _load_body(body, "configuration-snapshot")
+    except HTTPError as exc:
+        if exc.envelope["code"] != "schema_validation_failed":
+            raise
+        return {
+            "valid": False,
+            "items": [
+                {
+                    "ruleId": f"SCHEMA_{error['keyword'].upper()}",
+                    "status": "error",
+                    "message": error["message"],
+                    "affected": {"kind": "field", "ids": [error["path"]]},
+                }
+                for error in exc.envelope["details"]["errors"]
+            ],
+        }
+    item = {"ruleId": "SCHEMA", "status": "pass", "message": "Matches ConfigurationSnapshot"}
+    return {"valid": True, "items": [item]}
+
+
+def _run_job(kind: str, body: bytes, work_dir: str) -> dict[str, Any]:
+    """
+    Returns {"payload": ...} for JSON answers, {"path", "content_type"} for
+    files written under a fresh directory in work_dir, or {"error", "status"}.
+    """
+    try:
+        if kind == "validate":
+            return {"payload": _validation_items(body)}
+
+        if kind == "rivo":
+            config = map_snapshot_to_export_config(_load_body(body, "configuration-snapshot"), "export-service")
+        else:
+            config = _load_body(body, "rivo-config")
+        out = Path(tempfile.mkdtemp(prefix=f"{kind}-", dir=work_dir))  # only once the body is known good
+        if kind == "rivo":
+            path = json_io.dump_path(config, out / "export.rivo.json", pretty=True)
+            return {"path": str(path), "content_type": "application/json"}
+        if kind == "dxf":
+            path = generate_dxf_stub(config, out / "export.dxf")
+            return {"path": str(path), "content_type": "application/dxf" if path.suffix == ".dxf" else "text/plain"}
+        if kind == "ifc":
+            with contextlib.redirect_stdout(io.StringIO()):  # it reports the path it wrote
+                generate_ifc_stub(config, str(out / "export.ifc"))
+            return {"path": str(out / "export.ifc.txt"), "content_type": "text/plain"}
+        if kind == "pdf":
+            path = generate_passport(config, out / "export.passport.md")
+            return {"path": str(path), "content_type": "text/markdown; charset=utf-8"}
+        raise ValueError(f"Unknown export kind: {kind}")
+    except HTTPError as exc:
+        return {"status": exc.status, "error": exc.envelope}
+
+
+# Request coalescing
+
+
+@dataclass
+class _Flight:
+    future: asyncio.Future
+    waiters: int = 0
+
+
+class Coalescer:
+    """
+    Identical concurrent requests (same key) share one computation. The
+    result stays shared while anyone still holds it; `release` runs once the
+    last holder is done (or when the computation ends with nobody left).
+    """
+
+    def __init__(self, release: Callable[[Any], None] | None = None) -> None:
+        self.release = release
+        self._flights: dict[str, _Flight] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._flights
+
+    @contextlib.asynccontextmanager
+    async def join(self, key: str, compute: Callable[[], Awaitable[Any]]) -> AsyncIterator[tuple[Any, bool]]:
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            flight = self._flights[key] = _Flight(asyncio.ensure_future(compute()))
+        flight.waiters += 1
+        try:
+            yield await asyncio.shield(flight.future), shared
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.future.add_done_callback(self._release)
+
+    def _release(self, future: asyncio.Future) -> None:
+        if self.release is not None and not future.cancelled() and future.exception() is None:
+            self.release(future.result())
+
+
+# App
+
+
+Handler = Callable[["ExportService", Request], Awaitable[Response]]
+ROUTES: dict[str, tuple[Handler, bool]] = {}  # POST path -> (handler, deprecated)
+
+
+def post(path: str, *, legacy: str | None = None, deprecated: bool = False) -> Callable[[Handler], Handler]:
+    """Route `path` (and a `legacy` alias with the same responses) to the handler."""
+
+    def register(handler: Handler) -> Handler:
+        ROUTES[API_PREFIX + path] = (handler, deprecated)
+        if legacy:
+            ROUTES[API_PREFIX + legacy] = (handler, True)
+        return handler
+
+    return register
+
+
+class ExportService:
+    """
+    Export jobs run on `executor` (a process pool of `workers` by default), at
+    most `workers` at a time. Up to `max_pending` distinct jobs may be running
+    or queued; beyond that new ones get 503 with Retry-After. Requests with
+    identical bodies to the same endpoint share one job.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int | None = None,
+        max_pending: int | None = None,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+        executor: Executor | None = None,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending if max_pending is not None else 4 * self.workers
+        self.max_body_bytes = max_body_bytes
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._slots = asyncio.Semaphore(self.workers)
+        self._work_dir = Path(tempfile.mkdtemp(prefix="rivo-export-"))
+        self.coalescer = Coalescer(release=self._remove_output)
+        self.stats = {"requests": 0, "jobs": 0, "coalesced": 0, "rejected": 0}
+        self.pending = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> ExportService:
+        if self._executor is None:
+            # Forked workers inherit the event loop's threads and locks mid-use and can hang on them.
+            spawn = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=spawn)
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+        shutil.rmtree(self._work_dir, ignore_errors=True)
+
+    async def __aenter__(self) -> ExportService:
+        return await self.start()
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.stop()
+
+    async def run_job(self, kind: str, request: Request) -> Response:
+        """Run (or join) the export job for this body and stream its result."""
+        key = hashlib.sha256(kind.encode("ascii") + b"\0" + request.body).hexdigest()
+        if key not in self.coalescer:
+            if self.pending >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise HTTPError(503, "overloaded", "Export queue is full; retry later", {"pending": self.pending})
+            self.pending += 1  # admitted now, so the check above sees queued jobs too
+
+        async def compute() -> dict[str, Any]:
+            try:
+                async with self._slots:
+                    self.stats["jobs"] += 1
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._executor, _run_job, kind, request.body, str(self._work_dir))
+            finally:
+                self.pending -= 1
+
+        # The join is held until the file has been streamed, so a shared result is not removed underneath us.
+        held = contextlib.AsyncExitStack()
+        result, shared = await held.enter_async_context(self.coalescer.join(key, compute))
+        self.stats["coalesced"] += shared
+        if "path" not in result:
+            await held.aclose()
+            if "error" in result:
+                return json_response(result["error"], result["status"])
+            return json_response(result["payload"])
+        return Response(
+            content_type=result["content_type"], stream=_read_chunks(Path(result["path"])), on_close=held.aclose
+        )
+
+    def _remove_output(self, result: dict[str, Any]) -> None:
+        if "path" in result:
+            shutil.rmtree(Path(result["path"]).parent, ignore_errors=True)
+
+    async def dispatch(self, request: Request) -> Response:
+        self.stats["requests"] += 1
+        route = ROUTES.get(request.path.split("?", 1)[0])
+        if route is None:
+            return http_error_handler(HTTPError(404, "not_found", f"No route: {request.path}"))
+        handler, deprecated = route
+        if request.method != "POST":
+            return http_error_handler(HTTPError(405, "method_not_allowed", f"{request.method} {request.path}"))
+        with span(f"export_service.{handler.__name__}", path=request.path) as current:
+            try:
+                response = await handler(self, request)
+            except HTTPError as exc:
+                response = http_error_handler(exc)
+            except Exception as exc:  # noqa: BLE001
+                response = http_error_handler(HTTPError(500, "internal_error", str(exc)))
+            current.set(status=response.status)
+        if deprecated:
+            response.headers["Deprecation"] = "true"
+        return response
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Request:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        method, path, _ = (request_line.split(" ", 2) + ["", ""])[:3]
+        headers: dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(411, "length_required", "Send the body with Content-Length")
+        length = int(headers.get("content-length", "0") or 0)
+        if length > self.max_body_bytes:
+            limit = self.max_body_bytes
+            raise HTTPError(413, "payload_too_large", f"Body exceeds {limit} bytes", {"limit": limit})
+        return Request(method, path, headers, await reader.readexactly(length))
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        response = None
+        try:
+            try:
+                response = await self.dispatch(await self._read_request(reader))
+            except HTTPError as exc:
+                response = http_error_handler(exc)
+            await _write_response(writer, response)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # client went away
+        finally:
+            if response is not None and response.on_close is not None:
+                await response.on_close()
+            writer.close()
+
+
+async def _read_chunks(path: Path) -> AsyncIterator[bytes]:
+    with open(path, "rb") as fh:
+        while chunk := await asyncio.to_thread(fh.read, CHUNK_SIZE):
+            yield chunk
+
+
+async def _write_response(writer: asyncio.StreamWriter, response: Response) -> None:
+    head = [
+        f"HTTP/1.1 {response.status} {REASONS.get(response.status, 'Error')}",
+        f"Content-Type: {response.content_type}",
+    ]
+    head += [f"{name}: {value}" for name, value in response.headers.items()]
+    head.append("Connection: close")
+    if response.stream is None:
+        head.append(f"Content-Length: {len(response.body)}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + response.body)
+        await writer.drain()
+        return
+    head.append("Transfer-Encoding: chunked")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+    async for chunk in response.stream:
+        writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        await writer.drain()  # backpressure from slow clients
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+# Endpoints
+
+
+@post("/configuration/validate")
+async def validate_configuration(service: ExportService, request: Request) -> Response:
+    """ValidationResponseEnvelope for a ConfigurationSnapshot."""
+    return await service.run_job("validate", request)
+
+
+@post("/configurations/validate", deprecated=True)
+async def validate_configurations_legacy(service: ExportService, request: Request) -> Response:
+    """The legacy alias answers with the bare list of ValidationResultItem."""
+    response = await service.run_job("validate", request)
+    if response.status != 200:
+        return response
+    return json_response(json_io.loads(response.body)["items"])
+
+
+@post("/export/rivo", legacy="/exports/rivo")
+async def export_rivo(service: ExportService, request: Request) -> Response:
+    """ConfigurationSnapshot -> canonical RivoExportConfig JSON."""
+    return await service.run_job("rivo", request)
+
+
+@post("/export/dxf", legacy="/exports/dxf")
+async def export_dxf(service: ExportService, request: Request) -> Response:
+    """RivoExportConfig -> DXF (text preview without ezdxf)."""
+    return await service.run_job("dxf", request)
+
+
+@post("/export/ifc", legacy="/exports/ifc")
+async def export_ifc(service: ExportService, request: Request) -> Response:
+    """RivoExportConfig -> IFC4 hierarchy mapping (the export_ifc stub)."""
+    return await service.run_job("ifc", request)
+
+
+@post("/export/pdf", legacy="/exports/pdf")
+async def export_pdf(service: ExportService, request: Request) -> Response:
+    """RivoExportConfig -> technical passport (Markdown until a PDF renderer exists)."""
+    return await service.run_job("pdf", request)
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve the export endpoints of contracts/openapi.v1.yaml.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None, help="Export processes. Default: CPU count.")
+    parser.add_argument(
+        "--max-pending", type=int, default=None, help="Running + queued jobs before 503. Default: 4 per worker."
+    )
+    parser.add_argument("--max-body-mb", type=int, default=DEFAULT_MAX_BODY_BYTES // (1024 * 1024))
+    add_profile_option(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv or sys.argv[1:])
+    with profiled(args.profile, "export_service"):
+
+        async def serve() -> None:
+            service = ExportService(
+                workers=args.workers, max_pending=args.max_pending, max_body_bytes=args.max_body_mb * 1024 * 1024
+            )
+            await service.start(args.host, args.port)
+            print(service.url, flush=True)
+            try:
+                await asyncio.Event().wait()
+            finally:
+                await service.stop()
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+        except OSError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+        return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import ssl
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Protocol
+from urllib.parse import urlsplit
+
+from json_io import dump_path, load_path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_LATENCY_PATH = REPO_ROOT / ".cache/route-latency.json"
+
+# Until a tier has MIN_SAMPLES latencies, hedges start after this delay.
+DEFAULT_HEDGE_DELAY_S = 2.0
+MIN_SAMPLES = 20
+MAX_SAMPLES = 256
+HEDGE_PERCENTILE = 0.95
+
+
+class ProviderError(Exception):
+    def __init__(self, message: str, *, status: int | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class AllModelsFailed(Exception):
+    def __init__(self, result: HedgeResult) -> None:
+        errors = "; ".join(f"{a.model}: {a.error}" for a in result.attempts if a.error)
+        super().__init__(f"No model answered ({errors or 'nothing was launched'})")
+        self.result = result
+
+
+@dataclass
+class Completion:
+    text: str
+    input_tokens: int
+    output_tokens: int
+    cost_usd: float = 0.0
+
+
+class ProviderClient(Protocol):
+    async def complete(self, model: str, prompt: str, max_output_tokens: int) -> Completion: ...
+
+
+def provider_api_key(base_url: str, env: dict[str, str] | None = None) -> str | None:
+    """
+    Bearer token for `base_url`: SWARM_PROVIDER_API_KEY when set, else
+    OPENROUTER_API_KEY, but that only for OpenRouter itself over https, so
+    it is never sent to a mock, a proxy or any other host.
+    """
+    env = os.environ if env is None else env
+    if env.get("SWARM_PROVIDER_API_KEY"):
+        return env["SWARM_PROVIDER_API_KEY"]
+    parts = urlsplit(base_url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme == "https" and (host == "openrouter.ai" or host.endswith(".openrouter.ai")):
+        return env.get("OPENROUTER_API_KEY")
+    return None
+
+
+class HttpProviderClient:
+    """
+    OpenAI-compatible chat completions over a bare asyncio connection (one
+    request per connection, so cancelling a hedge just closes its socket).
+    Works against OpenRouter and scripts/mock_provider.py.
+    """
+
+    def __init__(self, base_url: str, *, api_key: str | None = None, model_prefix: str = "") -> None:
+        parts = urlsplit(base_url.rstrip("/"))
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported provider URL: {base_url}")
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.path = f"{parts.path}/chat/completions"
+        self.api_key = api_key
+        self.model_prefix = model_prefix
+
+    async def complete(self, model: str, prompt: str, max_output_tokens: int) -> Completion:
+        if self.model_prefix and model.startswith(self.model_prefix):
+            model = model[len(self.model_prefix) :]
+        body = json.dumps(
+            {"model": model, "messages": [{"role": "user", "content": prompt}], "max_tokens": max_output_tokens}
+        ).encode("utf-8")
+        headers = [
+            f"POST {self.path} HTTP/1.1",
+            f"Host: {self.host}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            "Connection: close",
+        ]
+        if self.api_key:
+            headers.append(f"Authorization: Bearer {self.api_key}")
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        try:
+            writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+            await writer.drain()
+            status, payload = await _read_response(reader)
+        finally:
+            writer.close()
+        if status != 200:
+            message = (payload.get("error") or {}).get("message") if isinstance(payload, dict) else None
+            raise ProviderError(f"HTTP {status}: {message or 'request failed'}", status=status)
+        try:
+            text = payload["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError) as e:
+            raise ProviderError(f"Malformed completion: missing {e}") from e
+        usage = payload.get("usage") or {}
+        return Completion(
+            text=text,
+            input_tokens=int(usage.get("prompt_tokens", 0)),
+            output_tokens=int(usage.get("completion_tokens", 0)),
+            cost_usd=float(usage.get("cost", 0.0)),
+        )
+
+
+async def _read_response(reader: asyncio.StreamReader) -> tuple[int, Any]:
+    status_line = await reader.readline()
+    try:
+        status = int(status_line.split(b" ", 2)[1])
+    except (IndexError, ValueError) as e:
+        raise ProviderError(f"Malformed HTTP status line: {status_line!r}") from e
+    headers: dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+        body = b"".join(chunks)
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body = await reader.read()
+    try:
+        return status, json.loads(body) if body else {}
+    except ValueError as e:
+        raise ProviderError(f"Malformed JSON response (HTTP {status})") from e
+
+
+class LatencyTracker:
+    """Recent successful-request latencies per tier, persisted between runs."""
+
+    def __init__(self, path: Path | None = DEFAULT_LATENCY_PATH) -> None:
+        self.path = path
+        self._samples: dict[str, deque[float]] = {}
+        if path is not None and path.exists():
+            try:
+                data = load_path(path)
+            except (OSError, ValueError):
+                data = {}
+            for tier, values in (data if isinstance(data, dict) else {}).items():
+                self._samples[tier] = deque((float(v) for v in values), maxlen=MAX_SAMPLES)
+
+    def record(self, tier: str, seconds: float) -> None:
+        self._samples.setdefault(tier, deque(maxlen=MAX_SAMPLES)).append(seconds)
+
+    def hedge_delay(self, tier: str, default: float = DEFAULT_HEDGE_DELAY_S) -> float:
+        samples = self._samples.get(tier)
+        if not samples or len(samples) < MIN_SAMPLES:
+            return default
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, math.ceil(HEDGE_PERCENTILE * len(ordered)) - 1)]
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        dump_path({tier: [round(v, 6) for v in values] for tier, values in self._samples.items()}, tmp)
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class Budget:
+    """
+    Token and cost limits for one routed task. In-flight attempts reserve
+    their worst case (prompt estimate + max output tokens, priced if a price
+    is known); completion replaces the reservation with reported usage. A
+    cancelled attempt keeps its prompt tokens charged, since the provider
+    has already read them.
+    """
+
+    max_tokens: int
+    max_cost_usd: float
+    spent_tokens: int = 0
+    spent_cost_usd: float = 0.0
+    reserved_tokens: int = 0
+    reserved_cost_usd: float = 0.0
+
+    def try_reserve(self, tokens: int, cost_usd: float) -> bool:
+        if self.spent_tokens + self.reserved_tokens + tokens > self.max_tokens:
+            return False
+        if self.spent_cost_usd + self.reserved_cost_usd + cost_usd > self.max_cost_usd + 1e-12:
+            return False
+        self.reserved_tokens += tokens
+        self.reserved_cost_usd += cost_usd
+        return True
+
+    def settle(self, reserved_tokens: int, reserved_cost_usd: float, tokens: int, cost_usd: float) -> None:
+        self.reserved_tokens -= reserved_tokens
+        self.reserved_cost_usd -= reserved_cost_usd
+        self.spent_tokens += tokens
+        self.spent_cost_usd += cost_usd
+
+
+@dataclass
+class Attempt:
+    model: str
+    status: str = "pending"  # won | failed | cancelled | skipped_budget
+    started_s: float = 0.0
+    latency_ms: float | None = None
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "model": self.model,
+            "status": self.status,
+            "started_ms": round(self.started_s * 1000.0, 3),
+            "latency_ms": None if self.latency_ms is None else round(self.latency_ms, 3),
+            "error": self.error,
+        }
+
+
+@dataclass
+class HedgeResult:
+    model: str | None
+    completion: Completion | None
+    attempts: list[Attempt] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+    hedge_delay_s: float = 0.0
+    spent_tokens: int = 0
+    spent_cost_usd: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "model": self.model,
+            "text": self.completion.text if self.completion else None,
+            "input_tokens": self.completion.input_tokens if self.completion else 0,
+            "output_tokens": self.completion.output_tokens if self.completion else 0,
+            "elapsed_ms": round(self.elapsed_ms, 3),
+            "hedge_delay_s": round(self.hedge_delay_s, 4),
+            "spent_tokens": self.spent_tokens,
+            "spent_cost_usd": round(self.spent_cost_usd, 6),
+            "attempts": [a.to_dict() for a in self.attempts],
+        }
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+async def hedged_complete(
+    models: Iterable[str],
+    prompt: str,
+    *,
+    client: ProviderClient,
+    tier: str,
+    max_output_tokens: int,
+    budget: Budget,
+    timeout_s: float,
+    tracker: LatencyTracker | None = None,
+    prices_usd_per_1k: dict[str, float] | None = None,
+    hedge_delay_s: float | None = None,
+) -> HedgeResult:
+    """
+    Send `prompt` to the first model; if no answer arrives within the tier's
+    p95 latency, also send it to the next model, and so on. A failure starts
+    the next model immediately, whether or not other requests are still in
+    flight. The first success wins and every other
+    in-flight request is cancelled. A model whose worst-case usage would
+    exceed `budget` is skipped. Raises AllModelsFailed if nothing succeeds
+    within `timeout_s`.
+    """
+    tracker = tracker or LatencyTracker(None)
+    delay = hedge_delay_s if hedge_delay_s is not None else tracker.hedge_delay(tier)
+    queue = list(dict.fromkeys(models))
+    prices = prices_usd_per_1k or {}
+    prompt_tokens = estimate_tokens(prompt)
+    result = HedgeResult(None, None, hedge_delay_s=delay)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + timeout_s
+    running: dict[asyncio.Task, tuple[Attempt, int, float]] = {}
+
+    async def call(model: str) -> Completion:
+        return await client.complete(model, prompt, max_output_tokens)
+
+    def launch_next() -> bool:
+        while queue:
+            model = queue.pop(0)
+            attempt = Attempt(model, started_s=loop.time() - started)
+            result.attempts.append(attempt)
+            tokens = prompt_tokens + max_output_tokens
+            cost = tokens / 1000.0 * prices.get(model, 0.0)
+            if not budget.try_reserve(tokens, cost):
+                attempt.status = "skipped_budget"
+                attempt.error = "would exceed the token or cost budget"
+                continue
+            running[asyncio.create_task(call(model), name=f"hedge:{model}")] = (attempt, tokens, cost)
+            return True
+        return False
+
+    try:
+        launch_next()
+        next_hedge = loop.time() + delay
+        while running:
+            now = loop.time()
+            if now >= deadline:
+                break
+            wait_for = min(deadline, next_hedge if queue else deadline) - now
+            done, _ = await asyncio.wait(running, timeout=max(0.0, wait_for), return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                if queue and loop.time() >= next_hedge:
+                    launch_next()
+                    next_hedge = loop.time() + delay
+                continue
+            failed = 0
+            for task in done:
+                attempt, tokens, cost = running.pop(task)
+                attempt.latency_ms = (loop.time() - started - attempt.started_s) * 1000.0
+                try:
+                    completion = task.result()
+                except Exception as e:  # noqa: BLE001
+                    attempt.status, attempt.error = "failed", str(e) or type(e).__name__
+                    budget.settle(tokens, cost, prompt_tokens, 0.0)
+                    failed += 1
+                    continue
+                budget.settle(tokens, cost, completion.input_tokens + completion.output_tokens, completion.cost_usd)
+                if result.completion is None:
+                    attempt.status = "won"
+                    result.model, result.completion = attempt.model, completion
+                    tracker.record(tier, attempt.latency_ms / 1000.0)
+                else:
+                    attempt.status = "cancelled"  # finished in the same tick as the winner
+            if result.completion is not None:
+                break
+            if failed:
+                # Replace each failed attempt now, even while other hedges are still in flight.
+                for _ in range(failed):
+                    launch_next()
+                next_hedge = loop.time() + delay
+    finally:
+        for task, (attempt, tokens, cost) in running.items():
+            task.cancel()
+            attempt.status = "cancelled"
+            if attempt.error is None and result.completion is None:
+                attempt.error = "timed out"
+            budget.settle(tokens, cost, prompt_tokens, 0.0)
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        for attempt in result.attempts:
+            if attempt.status == "pending":
+                attempt.status = "cancelled"
+
+    result.elapsed_ms = (loop.time() - started) * 1000.0
+    result.spent_tokens = budget.spent_tokens
+    result.spent_cost_usd = budget.spent_cost_usd
+    if result.completion is None:
+        raise AllModelsFailed(result)
+    return result
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import gc
+import json
+import mmap
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator
+
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+try:
+    import msgspec as _msgspec
+except ImportError:
+    _msgspec = None
+
+BACKENDS = ("orjson", "msgspec", "stdlib")
+
+# Files below this size are read in one call; mapping them costs more than it saves.
+MMAP_MIN_BYTES = 1024 * 1024
+
+
+def available_backends() -> list[str]:
+    installed = {"orjson": _orjson is not None, "msgspec": _msgspec is not None, "stdlib": True}
+    return [name for name in BACKENDS if installed[name]]
+
+
+def _select_backend(requested: str | None) -> str:
+    available = available_backends()
+    if requested:
+        if requested not in BACKENDS:
+            raise ValueError(f"Unknown JSON backend: {requested} (expected one of: {', '.join(BACKENDS)})")
+        if requested not in available:
+            raise ValueError(f"JSON backend not installed: {requested}")
+        return requested
+    return available[0]
+
+
+# RIVO_JSON_BACKEND forces a backend (e.g. `stdlib`) for debugging and benchmarks.
+BACKEND = _select_backend(os.getenv("RIVO_JSON_BACKEND"))
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """
+    Parsed JSON is acyclic, so cyclic GC passes triggered by the many
+    allocations of a large decode only cost time.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def loads(data: bytes | bytearray | memoryview | str, *, backend: str | None = None) -> Any:
+    """Parse JSON from bytes-like or str. Decode errors are raised as ValueError."""
+    with gc_paused():
+        return _loads(data, backend or BACKEND)
+
+
+def _loads(data: bytes | bytearray | memoryview | str, backend: str) -> Any:
+    if backend == "orjson":
+        return _orjson.loads(data)
+    if backend == "msgspec":
+        try:
+            return _msgspec.json.decode(data)
+        except _msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def load_path(path: Path, *, backend: str | None = None) -> Any:
+    """
+    Parse a JSON file without a str round-trip. Large files are memory-mapped
+    and handed to orjson/msgspec as a buffer, so the raw bytes are never copied.
+    """
+    backend = backend or BACKEND
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if backend == "stdlib" or size < MMAP_MIN_BYTES:
+            return loads(f.read(), backend=backend)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view, gc_paused():
+            return _loads(view, backend)
+
+
+def dumps(obj: Any, *, pretty: bool = False, sort_keys: bool = False, backend: str | None = None) -> bytes:
+    """
+    Serialize to UTF-8 bytes (non-ASCII kept as-is). `pretty` matches
+    `json.dumps(indent=2)`; otherwise output is compact.
+    """
+    backend = backend or BACKEND
+    if backend == "orjson":
+        option = (_orjson.OPT_INDENT_2 if pretty else 0) | (_orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return _orjson.dumps(obj, option=option or None)
+    if backend == "msgspec":
+        if sort_keys:
+            obj = json.loads(json.dumps(obj, sort_keys=True))
+        encoded = _msgspec.json.encode(obj)
+        return _msgspec.json.format(encoded, indent=2) if pretty else encoded
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        indent=2 if pretty else None,
+        separators=None if pretty else (",", ":"),
+        sort_keys=sort_keys,
+    ).encode("utf-8")
+
+
+def dump(obj: Any, fh: BinaryIO, *, pretty: bool = False, sort_keys: bool = False, backend: str | None = None) -> None:
+    """
+    Write JSON to a binary file handle. Even for stdlib this encodes in one
+    shot: streaming json.dump falls back to the pure-Python encoder.
+    """
+    fh.write(dumps(obj, pretty=pretty, sort_keys=sort_keys, backend=backend))
+
+
+def dump_path(
+    obj: Any,
+    path: Path,
+    *,
+    pretty: bool = False,
+    sort_keys: bool = False,
+    trailing_newline: bool = False,
+    backend: str | None = None,
+) -> Path:
+    with open(path, "wb") as fh:
+        dump(obj, fh, pretty=pretty, sort_keys=sort_keys, backend=backend)
+        if trailing_newline:
+            fh.write(b"\n")
+    return path
+
+
+def print_json(obj: Any, *, pretty: bool = True) -> None:
+    """`print(json.dumps(obj, ensure_ascii=False, indent=2))` without the str round-trip."""
+    data = dumps(obj, pretty=pretty)
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        print(data.decode("utf-8"))
+        return
+    sys.stdout.flush()
+    buffer.write(data)
+    buffer.write(b"\n")
+    buffer.flush()
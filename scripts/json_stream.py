@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Iterator, TextIO
+
+try:
+    import ijson as _ijson
+except ImportError:
+    _ijson = None
+
+DEFAULT_CHUNK_CHARS = 64 * 1024
+
+# Containers that are walked instead of materialized: their children are
+# yielded one at a time. Anything else is decoded as a whole value.
+STREAMED_CONTAINERS = {"": "map", "elements": "array", "bom": "map", "bom.lines": "array"}
+
+_SECTION_NAMES = {"elements.item": "element", "bom.lines.item": "bom_line"}
+
+_OPENERS = {"map": "{", "array": "["}
+_WHITESPACE = " \t\n\r"
+_NUMBER_ENDS = ",]}" + _WHITESPACE
+
+
+def _section(prefix: str) -> str:
+    return _SECTION_NAMES.get(prefix, prefix)
+
+
+def _child_prefix(prefix: str, key: str) -> str:
+    return f"{prefix}.{key}" if prefix else key
+
+
+class _Reader:
+    """
+    Buffered cursor over a text stream. Whole values are decoded with the C
+    `raw_decode`; only the streamed containers are scanned in Python.
+    """
+
+    def __init__(self, fh: TextIO, chunk_chars: int) -> None:
+        self._fh = fh
+        self._chunk = chunk_chars
+        self._decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: int) -> bool:
+        if self.eof:
+            return False
+        data = self._fh.read(size)
+        if not data:
+            self.eof = True
+            return False
+        if self.pos > len(self.buf) // 2:
+            self.buf = self.buf[self.pos :]
+            self.pos = 0
+        self.buf += data
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill(self._chunk):
+                return ""
+
+    def expect(self, ch: str) -> None:
+        found = self.peek()
+        if found != ch:
+            raise ValueError(f"Expected {ch!r} but found {found or 'end of input'!r}")
+        self.pos += 1
+
+    def read_value(self) -> Any:
+        self.peek()
+        size = self._chunk
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill(size):
+                    raise
+                size *= 2  # keeps re-decoding of one large value linear overall
+                continue
+            # A number only ends at a delimiter or EOF: "12." or "1e" may continue in the next chunk.
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                complete = end < len(self.buf) and self.buf[end] in _NUMBER_ENDS
+                if not complete and self._fill(size):
+                    continue
+            self.pos = end
+            return value
+
+
+def _walk(reader: _Reader, prefix: str) -> Iterator[tuple[str, Any]]:
+    kind = STREAMED_CONTAINERS.get(prefix)
+    if kind is None or reader.peek() != _OPENERS[kind]:
+        yield _section(prefix), reader.read_value()
+        return
+
+    reader.expect(_OPENERS[kind])
+    closer = "}" if kind == "map" else "]"
+    if reader.peek() == closer:
+        reader.pos += 1
+        return
+    while True:
+        if kind == "map":
+            key = reader.read_value()
+            if not isinstance(key, str):
+                raise ValueError(f"Object key must be a string in {prefix or 'document root'}")
+            reader.expect(":")
+            yield from _walk(reader, _child_prefix(prefix, key))
+        else:
+            yield from _walk(reader, _child_prefix(prefix, "item"))
+        sep = reader.peek()
+        reader.pos += 1
+        if sep == closer:
+            return
+        if sep != ",":
+            raise ValueError(f"Expected ',' or {closer!r} in {prefix or 'document root'}, found {sep or 'end of input'!r}")
+
+
+def _iter_fallback(path: Path, chunk_chars: int) -> Iterator[tuple[str, Any]]:
+    with open(path, "r", encoding="utf-8") as fh:
+        reader = _Reader(fh, chunk_chars)
+        if reader.peek() != "{":
+            raise ValueError("rivo_config must be a dictionary")
+        yield from _walk(reader, "")
+        if reader.peek():
+            raise ValueError("Extra data after JSON document")
+
+
+def _iter_ijson(path: Path) -> Iterator[tuple[str, Any]]:
+    try:
+        yield from _iter_ijson_events(path)
+    except _ijson.JSONError as e:
+        raise ValueError(str(e)) from e
+
+
+def _iter_ijson_events(path: Path) -> Iterator[tuple[str, Any]]:
+    with open(path, "rb") as fh:
+        open_streams: set[str] = set()
+        builder = None
+        target = ""
+        for prefix, event, value in _ijson.parse(fh, use_float=True):
+            if builder is not None:
+                builder.event(event, value)
+                if prefix == target and event in ("end_map", "end_array"):
+                    yield _section(target), builder.value
+                    builder = None
+                continue
+            if event in ("end_map", "end_array") and prefix in open_streams:
+                open_streams.discard(prefix)
+                continue
+            if event == "map_key":
+                continue
+            kind = STREAMED_CONTAINERS.get(prefix)
+            if kind is not None and event == f"start_{kind}":
+                open_streams.add(prefix)
+                continue
+            if prefix == "":
+                raise ValueError("rivo_config must be a dictionary")
+            if event in ("start_map", "start_array"):
+                builder = _ijson.ObjectBuilder()
+                builder.event(event, value)
+                target = prefix
+            else:
+                yield _section(prefix), value
+
+
+def iter_rivo_sections(
+    path: Path,
+    *,
+    use_ijson: bool | None = None,
+    chunk_chars: int = DEFAULT_CHUNK_CHARS,
+) -> Iterator[tuple[str, Any]]:
+    """
+    Stream a RivoExportConfig as `(section, value)` pairs in document order.
+
+    Top-level keys (`meta`, `frame`, `catalog`, `views`, ...) and nested
+    `bom.<key>` values arrive whole; `elements` and `bom.lines` arrive one item
+    at a time as `("element", item)` / `("bom_line", item)`, so memory stays
+    bounded by the largest single item rather than the element count.
+    """
+    if use_ijson is None:
+        use_ijson = _ijson is not None
+    if use_ijson:
+        if _ijson is None:
+            raise ValueError("ijson is not installed")
+        return _iter_ijson(path)
+    return _iter_fallback(path, chunk_chars)
@@ -0,0 +1,512 @@
+from __future__ import annotations
+
+import fcntl
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+from uuid import uuid4
+
+from json_io import dumps, loads
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MEMORY_DIR = REPO_ROOT / ".cache/memory"
+
+DEFAULT_MAX_BATCH = 512
+DEFAULT_COMPACT_BYTES = 8 * 1024 * 1024
+
+# WAL record: payload length, crc32 of payload, then a JSON object
+# {"seq", "id", "key", "payload", "ts"}.
+_RECORD = struct.Struct("<II")
+# Store file: JSON records sorted by key, then a JSON index
+# {"keys": {key: [offset, length]}}, then the footer.
+_FOOTER = struct.Struct("<8sQQ")
+_STORE_MAGIC = b"MEMKV\x00\x00\x01"
+_STORE_NAME = "store.kv"
+# Every open WalMemoryStore logs to its own segments, wal-<writer>-<number>.log,
+# and holds an flock on wal-<writer>.lock until close. A lock file nobody holds
+# was left by a writer that died before checkpointing its segments.
+_WRITER_LOCK_GLOB = "wal-*.lock"
+
+
+@dataclass
+class MemoryResult:
+    """MemoryStore contract output (configs/tooling/integration_contracts.json)."""
+
+    result: dict[str, Any]
+    memory_ids: list[str] = field(default_factory=list)
+    confidence: float = 1.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"result": self.result, "memory_ids": self.memory_ids, "confidence": self.confidence}
+
+
+class MemoryBackend(Protocol):
+    """
+    Store of record behind a WalMemoryStore. Records are the logged dicts
+    ({"id", "key", "payload", "ts", ...}); `apply` gets them oldest first and
+    must keep the latest per key durably. After a crash a checkpoint may be
+    replayed, so `apply` can see records it already has.
+    """
+
+    def get(self, key: str) -> dict[str, Any] | None: ...
+
+    def search(self, prefix: str) -> list[dict[str, Any]]: ...
+
+    def apply(self, records: list[dict[str, Any]]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def _read_segment(path: Path) -> tuple[list[dict[str, Any]], int]:
+    """Records of a WAL segment and the length of its valid prefix (a torn tail is ignored)."""
+    data = path.read_bytes()
+    records = []
+    offset = 0
+    while offset + _RECORD.size <= len(data):
+        length, crc = _RECORD.unpack_from(data, offset)
+        body = data[offset + _RECORD.size : offset + _RECORD.size + length]
+        if len(body) < length or zlib.crc32(body) != crc:
+            break
+        records.append(loads(body))
+        offset += _RECORD.size + length
+    return records, offset
+
+
+def _fsync_dir(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _Store:
+    """Read-only view of one version of the key-value file."""
+
+    def __init__(self, path: Path) -> None:
+        self.keys: dict[str, list[int]] = {}
+        self.identity: tuple[int, int] | None = None
+        self._mm: mmap.mmap | None = None
+        try:
+            f = path.open("rb")
+        except FileNotFoundError:
+            return
+        with f:
+            st = os.fstat(f.fileno())
+            self.identity = (st.st_ino, st.st_dev)
+            if st.st_size == 0:
+                return
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_offset, index_length = _FOOTER.unpack_from(self._mm, len(self._mm) - _FOOTER.size)
+        if magic != _STORE_MAGIC:
+            self._mm.close()
+            raise ValueError(f"Not a memory store file: {path}")
+        self.keys = loads(self._mm[index_offset : index_offset + index_length])["keys"]
+
+    def raw(self, key: str) -> bytes | None:
+        location = self.keys.get(key)
+        if location is None or self._mm is None:
+            return None
+        offset, length = location
+        return self._mm[offset : offset + length]
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        raw = self.raw(key)
+        return None if raw is None else loads(raw)
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+
+class KvFileStore:
+    """
+    The default MemoryBackend: an indexed key-value file (`store.kv`), read
+    through mmap. `apply` rewrites it and replaces it atomically under the
+    directory's `LOCK` flock, so stores in several processes can share it;
+    a record older (by `ts`) than the stored one for its key is ignored.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_fd = os.open(self.path.parent / "LOCK", os.O_RDWR | os.O_CREAT, 0o644)
+        self._mutex = threading.Lock()
+        self._view = _Store(self.path)
+
+    def _current(self) -> _Store:
+        """The view of the file now at `path` (another process may have replaced it); caller holds `_mutex`."""
+        try:
+            st = self.path.stat()
+            identity: tuple[int, int] | None = (st.st_ino, st.st_dev)
+        except FileNotFoundError:
+            identity = None
+        if identity != self._view.identity:
+            self._view.close()
+            self._view = _Store(self.path)
+        return self._view
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._mutex:
+            return self._current().get(key)
+
+    def search(self, prefix: str) -> list[dict[str, Any]]:
+        with self._mutex:
+            view = self._current()
+            return [view.get(key) for key in sorted(k for k in view.keys if k.startswith(prefix))]
+
+    def apply(self, records: list[dict[str, Any]]) -> None:
+        latest = {record["key"]: record for record in records}
+        with self._mutex:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                view = self._current()
+                for key in list(latest):
+                    stored = view.get(key)
+                    if stored is not None and stored.get("ts", 0) > latest[key].get("ts", 0):
+                        del latest[key]  # a replayed checkpoint: keep the newer write
+                tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+                keys: dict[str, list[int]] = {}
+                with tmp.open("wb") as f:
+                    offset = 0
+                    for key in sorted(view.keys.keys() | latest.keys()):
+                        raw = dumps(latest[key]) if key in latest else view.raw(key)
+                        f.write(raw)
+                        keys[key] = [offset, len(raw)]
+                        offset += len(raw)
+                    index = dumps({"keys": keys})
+                    f.write(index)
+                    f.write(_FOOTER.pack(_STORE_MAGIC, offset, len(index)))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+                _fsync_dir(self.path.parent)
+                self._current()
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        with self._mutex:
+            self._view.close()
+        os.close(self._lock_fd)
+
+
+def _segment_number(path: Path) -> int:
+    return int(path.stem.rsplit("-", 1)[1])
+
+
+def _encode(record: dict[str, Any]) -> bytes:
+    body = dumps(record)
+    return _RECORD.pack(len(body), zlib.crc32(body)) + body
+
+
+def _writer_segments(root: Path, writer: str) -> list[Path]:
+    return sorted(root.glob(f"wal-{writer}-*.log"), key=_segment_number)
+
+
+class WalMemoryStore:
+    """
+    Batched write path in front of a MemoryBackend (default: KvFileStore on
+    `<root>/store.kv`): writes go to an in-memory table and a write-ahead
+    log, and are checkpointed into the backend in the background once the
+    log passes `compact_bytes`, and on close.
+
+    With `sync=True` every write is appended and fsynced before `write`
+    returns. Otherwise writes are queued and a writer thread group-commits
+    whatever has accumulated with one fsync per batch; `write` returns a
+    Future that resolves once the record is durable. Reads in the same
+    process see a write as soon as `write` returns (read-your-writes), before
+    it is committed or checkpointed.
+
+    Each store logs to segments of its own, so stores in several processes
+    can be open on one directory at once without waiting for each other, and
+    opening one replays nothing but the logs of writers that died before
+    their checkpoint (those are applied to the backend on open).
+    """
+
+    def __init__(
+        self,
+        root: Path = DEFAULT_MEMORY_DIR,
+        *,
+        backend: MemoryBackend | None = None,
+        sync: bool = False,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        compact_bytes: int = DEFAULT_COMPACT_BYTES,
+    ) -> None:
+        self.root = Path(root)
+        self.sync = sync
+        self.max_batch = max_batch
+        self.compact_bytes = compact_bytes
+        self.stats = {"writes": 0, "commits": 0, "compactions": 0}
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._owns_backend = backend is None
+        self.backend: MemoryBackend = backend if backend is not None else KvFileStore(self.root / _STORE_NAME)
+        self._writer_id = uuid4().hex[:12]
+        self._writer_lock = self.root / f"wal-{self._writer_id}.lock"
+        # Take the lock before the file appears, so recovery never sees it unheld.
+        tmp = self.root / f".{self._writer_lock.name}.tmp"
+        self._writer_lock_fd = os.open(tmp, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._writer_lock_fd, fcntl.LOCK_EX)
+        os.replace(tmp, self._writer_lock)
+
+        self._lock = threading.Lock()  # memtable, seq
+        self._io_lock = threading.Lock()  # active segment
+        self._compact_lock = threading.Lock()  # frozen segments
+        self._memtable: dict[str, tuple[int, dict[str, Any]]] = {}
+        self._seq = 0
+        self._recover()
+        self._segment = self.root / f"wal-{self._writer_id}-{1:08d}.log"
+        self._fh = self._segment.open("ab")
+
+        self._queue: queue.Queue[tuple[bytes, str, Future] | Future | None] = queue.Queue()
+        self._writer: threading.Thread | None = None
+        self._compactor: threading.Thread | None = None
+        self._closed = False
+
+    # -- recovery and segments -------------------------------------------
+
+    def _recover(self) -> None:
+        """Apply and remove the segments of writers whose lock is no longer held."""
+        for lock_path in sorted(self.root.glob(_WRITER_LOCK_GLOB)):
+            if lock_path == self._writer_lock:
+                continue
+            try:
+                fd = os.open(lock_path, os.O_RDWR)
+            except FileNotFoundError:
+                continue  # recovered by someone else meanwhile
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # its writer is alive
+                segments = _writer_segments(self.root, lock_path.stem.split("-", 1)[1])
+                records = [record for path in segments for record in _read_segment(path)[0]]  # torn tails dropped
+                if records:
+                    self.backend.apply(records)
+                for path in segments:
+                    path.unlink(missing_ok=True)
+                lock_path.unlink(missing_ok=True)
+            finally:
+                os.close(fd)
+
+    def _rotate(self) -> None:
+        """Start a new active segment; caller holds `_io_lock`."""
+        self._fh.close()
+        self._segment = self._segment.with_name(f"wal-{self._writer_id}-{_segment_number(self._segment) + 1:08d}.log")
+        self._fh = self._segment.open("ab")
+
+    def _append(self, blobs: list[bytes]) -> bool:
+        """Append and fsync; returns True if the segment should be checkpointed. Caller holds `_io_lock`."""
+        self._fh.write(b"".join(blobs))
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self.stats["commits"] += 1
+        if self._fh.tell() < self.compact_bytes:
+            return False
+        self._rotate()
+        return True
+
+    # -- writes ----------------------------------------------------------
+
+    def write(self, key: str, payload: Any) -> Future:
+        """Store `payload` under `key`; the Future resolves to the memory id once durable."""
+        return self._write(key, payload)[1]
+
+    def _write(self, key: str, payload: Any) -> tuple[str, Future]:
+        if self._closed:
+            raise ValueError("Memory store is closed")
+        record = {"id": uuid4().hex, "key": key, "payload": payload, "ts": time.time()}
+        future: Future = Future()
+        if self.sync:
+            with self._io_lock:
+                with self._lock:
+                    self._stage(record)
+                rotate = self._append([_encode(record)])
+            future.set_result(record["id"])
+            if rotate:
+                self._start_compaction()
+            return record["id"], future
+        with self._lock:
+            self._stage(record)
+            self._queue.put((_encode(record), record["id"], future))
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="memory-wal", daemon=True)
+                    self._writer.start()
+        return record["id"], future
+
+    def _stage(self, record: dict[str, Any]) -> None:
+        """
+        Assign the next seq and make the record readable; caller holds `_lock`.
+        The sync path also holds `_io_lock` through its append, and the async
+        path queues the record before releasing `_lock`, so the log is in seq
+        order: checkpoints, which apply older segments first, never let an
+        older write of a key overwrite a newer one.
+        """
+        self._seq += 1
+        record["seq"] = self._seq
+        self._memtable[record["key"]] = (self._seq, record)
+        self.stats["writes"] += 1
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch: list[tuple[bytes, str, Future]] = []
+            barriers: list[Future] = []
+            stop = False
+            # Group commit: everything queued while the last fsync ran goes in this one.
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, Future):
+                    barriers.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    with self._io_lock:
+                        rotate = self._append([blob for blob, _, _ in batch])
+                except OSError as e:
+                    for _, _, future in batch:
+                        future.set_exception(e)
+                else:
+                    for _, memory_id, future in batch:
+                        future.set_result(memory_id)
+                    if rotate:
+                        self._start_compaction()
+            for barrier in barriers:
+                barrier.set_result(None)
+            if stop:
+                return
+
+    def flush(self) -> None:
+        """Block until every write made so far is durable."""
+        if self._writer is not None and self._writer.is_alive():
+            barrier: Future = Future()
+            self._queue.put(barrier)
+            barrier.result()
+
+    # -- reads -----------------------------------------------------------
+
+    def read(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._memtable.get(key)
+        # A record leaves the memtable only after the backend has it.
+        return entry[1] if entry is not None else self.backend.get(key)
+
+    def search(self, prefix: str = "", limit: int | None = None) -> list[dict[str, Any]]:
+        with self._lock:
+            pending = {k: record for k, (_, record) in self._memtable.items() if k.startswith(prefix)}
+        records = {record["key"]: record for record in self.backend.search(prefix)}
+        records.update(pending)
+        keys = sorted(records)
+        if limit is not None:
+            keys = keys[:limit]
+        return [records[k] for k in keys]
+
+    def operate(self, op: str, key: str, payload: Any = None) -> MemoryResult:
+        """MemoryStore contract: op is read, write or search (`key` is a prefix for search)."""
+        if op == "write":
+            memory_id, future = self._write(key, payload)
+            return MemoryResult({"key": key, "status": "committed" if future.done() else "queued"}, [memory_id])
+        if op == "read":
+            record = self.read(key)
+            if record is None:
+                return MemoryResult({"key": key, "found": False}, [], 0.0)
+            return MemoryResult({"key": key, "found": True, "payload": record["payload"]}, [record["id"]])
+        if op == "search":
+            records = self.search(key)
+            return MemoryResult(
+                {"prefix": key, "items": [{"key": r["key"], "payload": r["payload"]} for r in records]},
+                [r["id"] for r in records],
+                1.0 if records else 0.0,
+            )
+        raise ValueError(f"Unknown memory op: {op} (expected read, write or search)")
+
+    # -- checkpoints -----------------------------------------------------
+
+    def _start_compaction(self) -> None:
+        with self._lock:
+            if self._closed or (self._compactor is not None and self._compactor.is_alive()):
+                return
+            self._compactor = threading.Thread(target=self._compact_frozen, name="memory-compact", daemon=True)
+            self._compactor.start()
+
+    def compact(self) -> None:
+        """Checkpoint every committed write into the backend now."""
+        self.flush()
+        with self._io_lock:
+            if self._fh.tell():
+                self._rotate()
+        self._compact_frozen()
+
+    def _compact_frozen(self) -> None:
+        with self._io_lock:
+            active = self._segment
+        with self._compact_lock:
+            self._checkpoint([p for p in _writer_segments(self.root, self._writer_id) if p != active])
+
+    def _checkpoint(self, segments: list[Path]) -> None:
+        """Apply `segments` (no longer written to) to the backend, then drop them and their memtable entries."""
+        if not segments:
+            return
+        records = [record for path in segments for record in _read_segment(path)[0]]
+        if records:
+            self.backend.apply(records)
+            applied = {record["key"]: record["seq"] for record in records}
+            with self._lock:
+                for key, seq in applied.items():
+                    entry = self._memtable.get(key)
+                    if entry is not None and entry[0] <= seq:
+                        del self._memtable[key]
+                self.stats["compactions"] += 1
+        for path in segments:
+            path.unlink()
+
+    # -- lifecycle -------------------------------------------------------
+
+    def close(self) -> None:
+        """Commit queued writes and checkpoint the whole log into the backend."""
+        if self._closed:
+            return
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+        with self._lock:
+            self._closed = True
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._io_lock:
+            self._fh.close()
+        try:
+            with self._compact_lock:
+                self._checkpoint(_writer_segments(self.root, self._writer_id))
+            # Nothing left to recover: drop the lock file before releasing it.
+            self._writer_lock.unlink()
+        finally:
+            os.close(self._writer_lock_fd)  # if the checkpoint failed, the next open recovers the log
+            if self._owns_backend:
+                self.backend.close()
+
+    def __enter__(self) -> WalMemoryStore:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import dataclass
+from typing import Any
+
+from profiling import add_profile_option, profiled
+
+# A local OpenAI-compatible chat completions endpoint for exercising hedged
+# routing offline: each model gets a configurable latency, failure mode and
+# price. Only what HttpProviderClient sends is implemented.
+
+
+@dataclass
+class MockModel:
+    latency_s: float = 0.05
+    fail: bool = False
+    status: int = 200
+    usd_per_1k_tokens: float = 0.0
+    completion_tokens: int = 32
+
+
+class MockProviderServer:
+    def __init__(self, models: dict[str, MockModel] | None = None, *, default: MockModel | None = None) -> None:
+        self.models = dict(models or {})
+        self.default = default or MockModel()
+        self.requests: list[str] = []
+        self.cancelled: list[str] = []
+        self._server: asyncio.AbstractServer | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/v1"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> MockProviderServer:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> MockProviderServer:
+        return await self.start()
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        model_name = "?"
+        try:
+            request_line = await reader.readline()
+            headers: dict[str, str] = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", "0")))
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+            if method != "POST" or not path.endswith("/chat/completions"):
+                await self._respond(writer, 404, {"error": {"message": f"No route: {method} {path}"}})
+                return
+            request = json.loads(body)
+            model_name = request.get("model", "?")
+            self.requests.append(model_name)
+            model = self.models.get(model_name, self.default)
+            await asyncio.sleep(model.latency_s)
+            if model.fail or model.status != 200:
+                status = model.status if model.status != 200 else 503
+                await self._respond(writer, status, {"error": {"message": f"{model_name} unavailable"}})
+                return
+            prompt = " ".join(str(m.get("content", "")) for m in request.get("messages", []))
+            prompt_tokens = max(1, len(prompt) // 4)
+            completion_tokens = min(model.completion_tokens, int(request.get("max_tokens") or model.completion_tokens))
+            total = prompt_tokens + completion_tokens
+            await self._respond(
+                writer,
+                200,
+                {
+                    "id": f"mock-{len(self.requests)}",
+                    "model": model_name,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": f"[{model_name}] ok"}}],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": total,
+                        "cost": round(total / 1000.0 * model.usd_per_1k_tokens, 8),
+                    },
+                },
+            )
+        except asyncio.CancelledError:
+            self.cancelled.append(model_name)
+            raise
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.cancelled.append(model_name)  # client hung up (a cancelled hedge)
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+def _parse_model(spec: str) -> tuple[str, MockModel]:
+    # name=latency[:fail][:usd_per_1k]
+    name, _, rest = spec.partition("=")
+    parts = rest.split(":") if rest else []
+    model = MockModel()
+    if parts and parts[0]:
+        model.latency_s = float(parts[0])
+    if len(parts) > 1:
+        model.fail = parts[1] in ("fail", "1", "true")
+    if len(parts) > 2:
+        model.usd_per_1k_tokens = float(parts[2])
+    return name, model
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve a mock OpenAI-compatible provider for offline routing tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--model",
+        action="append",
+        default=[],
+        help="name=latency_s[:fail][:usd_per_1k] (repeatable); unknown models answer after 50ms",
+    )
+    add_profile_option(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv or sys.argv[1:])
+    with profiled(args.profile, "mock_provider"):
+        try:
+            models = dict(_parse_model(spec) for spec in args.model)
+        except ValueError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+
+        async def serve() -> None:
+            server = await MockProviderServer(models).start(args.host, args.port)
+            print(server.url, flush=True)
+            await asyncio.Event().wait()
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Any, ContextManager, Iterator
+
+import tracing
+from json_io import dump_path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_PROFILE_DIR = REPO_ROOT / ".cache/profiles"
+SAMPLE_INTERVAL_S = 0.005
+
+
+class _ProfileFlag(argparse.Action):
+    """`--profile` takes no value, so it cannot swallow a following subcommand; an explicit --profile-dir wins."""
+
+    def __call__(
+        self, parser: argparse.ArgumentParser, namespace: argparse.Namespace, values: Any, option: Any = None
+    ) -> None:
+        if getattr(namespace, self.dest) is None:
+            setattr(namespace, self.dest, self.const)
+
+
+def add_profile_option(parser: argparse.ArgumentParser) -> None:
+    """Adds --profile and --profile-dir DIR; both set `args.profile` to the output directory (None when off)."""
+    parser.add_argument(
+        "--profile",
+        action=_ProfileFlag,
+        nargs=0,
+        const=str(DEFAULT_PROFILE_DIR),
+        default=None,
+        help="Profile this run: write .pstats, .collapsed (flamegraph stacks) and .memory.json "
+        f"(tracemalloc peak per stage) to {DEFAULT_PROFILE_DIR.relative_to(REPO_ROOT)}",
+    )
+    parser.add_argument("--profile-dir", dest="profile", metavar="DIR", help="Profile into DIR (implies --profile).")
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Samples the profiled thread's stack every `interval_s` from a helper
+    thread and counts identical stacks, i.e. collapsed-stack output for
+    flamegraph.pl / speedscope. cProfile only sees the thread it runs in, so
+    the sampler itself stays out of the pstats.
+    """
+
+    def __init__(self, thread_id: int, interval_s: float = SAMPLE_INTERVAL_S) -> None:
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            for stack, count in sorted(self.stacks.items()):
+                fh.write(f"{stack} {count}\n")
+
+
+class MemoryStages:
+    """
+    tracemalloc peak per tracing span ("stage") on the profiled thread: the
+    highest traced memory above what was allocated when the stage began.
+    Stages reset tracemalloc's peak, so the run-wide peak is kept here too.
+    """
+
+    def __init__(self, thread_id: int) -> None:
+        self.thread_id = thread_id
+        self.peaks: dict[str, int] = {}
+        self.run_peak = 0
+        self._stack: list[list[Any]] = []  # [name, traced at entry, peak seen before a child reset it]
+
+    def enter(self, name: str) -> None:
+        if threading.get_ident() != self.thread_id:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        self.run_peak = max(self.run_peak, peak)
+        if self._stack:
+            self._stack[-1][2] = max(self._stack[-1][2], peak)
+        tracemalloc.reset_peak()
+        self._stack.append([name, current, 0])
+
+    def exit(self, name: str) -> None:
+        if threading.get_ident() != self.thread_id or not self._stack:
+            return
+        stage, started, seen = self._stack.pop()
+        peak = max(seen, tracemalloc.get_traced_memory()[1])
+        self.run_peak = max(self.run_peak, peak)
+        self.peaks[stage] = max(self.peaks.get(stage, 0), peak - started)
+        if self._stack:
+            self._stack[-1][2] = max(self._stack[-1][2], peak)
+
+
+@contextlib.contextmanager
+def _profile(profile_dir: Path, name: str) -> Iterator[None]:
+    import cProfile
+
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    stem = profile_dir / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    thread_id = threading.get_ident()
+    stages = MemoryStages(thread_id)
+    sampler = StackSampler(thread_id)
+    profiler = cProfile.Profile()
+
+    tracemalloc.start()
+    tracing.add_stage_hooks(stages.enter, stages.exit)
+    sampler.start()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        wall_s = time.perf_counter() - started
+        sampler.stop()
+        tracing.remove_stage_hooks(stages.enter, stages.exit)
+        peak = max(stages.run_peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+        profiler.dump_stats(f"{stem}.pstats")
+        sampler.write(Path(f"{stem}.collapsed"))
+        dump_path(
+            {
+                "name": name,
+                "argv": sys.argv[1:],
+                "wall_s": round(wall_s, 6),
+                "peak_bytes": peak,
+                "stages": dict(sorted(stages.peaks.items())),
+                "samples": sum(sampler.stacks.values()),
+                "sample_interval_s": sampler.interval_s,
+            },
+            Path(f"{stem}.memory.json"),
+            pretty=True,
+        )
+        print(f"profile: {stem}.{{pstats,collapsed,memory.json}}", file=sys.stderr)
+
+
+def profiled(profile_dir: str | Path | None, name: str) -> ContextManager[None]:
+    """
+    Profile the enclosed block when `profile_dir` is set (the --profile
+    value); otherwise a no-op context with nothing installed. Nothing is
+    hooked or imported beyond this module unless profiling.
+    """
+    if profile_dir is None:
+        return contextlib.nullcontext()
+    return _profile(Path(profile_dir), name)
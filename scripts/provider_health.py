@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import fcntl
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping
+
+from json_io import dump_path, load_path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_HEALTH_PATH = REPO_ROOT / ".cache/provider-health.json"
+
+STATE_VERSION = 1
+EWMA_ALPHA = 0.2
+
+# Latency histogram: bucket i holds latencies up to BUCKET_BASE_MS * BUCKET_GROWTH**i
+# (25ms .. ~150s in 25% steps). Counts decay on every sample, so the histogram
+# describes roughly the last 1 / (1 - HIST_DECAY) requests in fixed memory.
+BUCKET_BASE_MS = 25.0
+BUCKET_GROWTH = 1.25
+BUCKETS = 40
+HIST_DECAY = 0.97
+
+# Circuit breaker: open after FAILURE_THRESHOLD consecutive failures, or when
+# the error-rate EWMA reaches ERROR_RATE_THRESHOLD over at least
+# ERROR_RATE_MIN_SAMPLES requests. An open model is skipped for `open_for_s`,
+# then half-open (routable again); a failure there reopens it for twice as long.
+FAILURE_THRESHOLD = 3
+ERROR_RATE_THRESHOLD = 0.5
+ERROR_RATE_MIN_SAMPLES = 10
+OPEN_BASE_S = 30.0
+OPEN_MAX_S = 600.0
+
+# Models need this many successful samples before their p50 reorders a route.
+RANK_MIN_SAMPLES = 5
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+def _bucket(latency_ms: float) -> int:
+    if latency_ms <= BUCKET_BASE_MS:
+        return 0
+    return min(BUCKETS - 1, math.ceil(math.log(latency_ms / BUCKET_BASE_MS, BUCKET_GROWTH) - 1e-9))
+
+
+def _ewma(previous: float | None, value: float) -> float:
+    return value if previous is None else previous + EWMA_ALPHA * (value - previous)
+
+
+@dataclass
+class ModelHealth:
+    samples: int = 0
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    latency_ewma_ms: float | None = None
+    error_rate: float = 0.0
+    usd_per_1k: float | None = None
+    hist: list[float] = field(default_factory=lambda: [0.0] * BUCKETS)
+    state: str = CLOSED
+    opened_at: float = 0.0
+    open_for_s: float = 0.0
+    last_error: str | None = None
+    last_seen: float = 0.0
+
+    def state_at(self, now: float) -> str:
+        if self.state == OPEN and now >= self.opened_at + self.open_for_s:
+            return HALF_OPEN
+        return self.state
+
+    def percentile_ms(self, q: float) -> float | None:
+        total = sum(self.hist)
+        if total <= 0:
+            return None
+        target = q * total
+        running = 0.0
+        for i, count in enumerate(self.hist):
+            running += count
+            if running >= target:
+                return BUCKET_BASE_MS * BUCKET_GROWTH**i
+        return BUCKET_BASE_MS * BUCKET_GROWTH ** (BUCKETS - 1)
+
+    def record_success(self, latency_s: float, tokens: int, cost_usd: float, now: float) -> None:
+        latency_ms = latency_s * 1000.0
+        self.samples += 1
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.latency_ewma_ms = _ewma(self.latency_ewma_ms, latency_ms)
+        self.error_rate = _ewma(self.error_rate, 0.0)
+        if tokens > 0:
+            self.usd_per_1k = _ewma(self.usd_per_1k, cost_usd / tokens * 1000.0)
+        self.hist = [c * HIST_DECAY for c in self.hist]
+        self.hist[_bucket(latency_ms)] += 1.0
+        self.state, self.open_for_s = CLOSED, 0.0
+        self.last_seen = now
+
+    def record_failure(self, error: str | None, now: float) -> None:
+        previous = self.state_at(now)
+        self.samples += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.error_rate = _ewma(self.error_rate, 1.0)
+        self.last_error = error
+        self.last_seen = now
+        if previous == HALF_OPEN:
+            self._open(now, min(OPEN_MAX_S, max(OPEN_BASE_S, self.open_for_s * 2)))
+        elif previous == CLOSED and (
+            self.consecutive_failures >= FAILURE_THRESHOLD
+            or (self.samples >= ERROR_RATE_MIN_SAMPLES and self.error_rate >= ERROR_RATE_THRESHOLD)
+        ):
+            self._open(now, OPEN_BASE_S)
+
+    def _open(self, now: float, seconds: float) -> None:
+        self.state, self.opened_at, self.open_for_s = OPEN, now, seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "samples": self.samples,
+            "successes": self.successes,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "latency_ewma_ms": self.latency_ewma_ms,
+            "error_rate": round(self.error_rate, 6),
+            "usd_per_1k": self.usd_per_1k,
+            "hist": [round(c, 4) for c in self.hist],
+            "state": self.state,
+            "opened_at": self.opened_at,
+            "open_for_s": self.open_for_s,
+            "last_error": self.last_error,
+            "last_seen": self.last_seen,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> ModelHealth:
+        known = {k: data[k] for k in cls.__dataclass_fields__ if k in data}
+        health = cls(**known)
+        if len(health.hist) != BUCKETS:
+            health.hist = [0.0] * BUCKETS
+        return health
+
+
+def model_tiers(providers: Mapping[str, Any]) -> dict[str, str]:
+    """Map every model listed in model_providers.json to its tier."""
+    tiers: dict[str, str] = {}
+    for tier, spec in (providers.get("tiers") or {}).items():
+        for key in ("gateway_models", "direct_models"):
+            for model in spec.get(key) or []:
+                tiers.setdefault(model, tier)
+    return tiers
+
+
+class ProviderHealth:
+    """
+    Per-model latency and error-rate tracker with circuit breakers, persisted
+    in `path`. Observations are applied in memory at once and replayed onto
+    the latest on-disk state by save(), under a file lock, so concurrent
+    `swarmctl run` processes do not lose each other's updates.
+    """
+
+    def __init__(self, path: Path | None = DEFAULT_HEALTH_PATH, *, clock: Callable[[], float] = time.time) -> None:
+        self.path = path
+        self.clock = clock
+        self.models: dict[str, ModelHealth] = self._load()
+        self._pending: list[tuple[Any, ...]] = []
+
+    def _load(self) -> dict[str, ModelHealth]:
+        if self.path is None or not self.path.exists():
+            return {}
+        try:
+            data = load_path(self.path)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != STATE_VERSION:
+            return {}
+        return {name: ModelHealth.from_dict(spec) for name, spec in (data.get("models") or {}).items()}
+
+    def get(self, model: str) -> ModelHealth:
+        return self.models.setdefault(model, ModelHealth())
+
+    def record_success(self, model: str, latency_s: float, *, tokens: int = 0, cost_usd: float = 0.0) -> None:
+        op = ("ok", model, latency_s, tokens, cost_usd, self.clock())
+        self._pending.append(op)
+        self._apply(self.models, op)
+
+    def record_failure(self, model: str, error: str | None = None) -> None:
+        op = ("fail", model, error, self.clock())
+        self._pending.append(op)
+        self._apply(self.models, op)
+
+    @staticmethod
+    def _apply(models: dict[str, ModelHealth], op: tuple[Any, ...]) -> None:
+        health = models.setdefault(op[1], ModelHealth())
+        if op[0] == "ok":
+            health.record_success(op[2], op[3], op[4], op[5])
+        else:
+            health.record_failure(op[2], op[3])
+
+    def state(self, model: str) -> str:
+        health = self.models.get(model)
+        return health.state_at(self.clock()) if health else CLOSED
+
+    def unavailable(self) -> set[str]:
+        """Models whose breaker is open right now (ModelRouter's `unavailable_models`)."""
+        now = self.clock()
+        return {name for name, health in self.models.items() if health.state_at(now) == OPEN}
+
+    def _rank_key(self, model: str) -> tuple[int, float] | None:
+        health = self.models.get(model)
+        if health is None or health.successes < RANK_MIN_SAMPLES or health.state_at(self.clock()) != CLOSED:
+            return None
+        p50 = health.percentile_ms(0.5)
+        if p50 is None:
+            return None
+        # Equal histogram buckets (p50 within ~25%) are ties, broken by cost.
+        return _bucket(p50), health.usd_per_1k or 0.0
+
+    def rank(self, models: Iterable[str], tiers: Mapping[str, str], *, pinned: Iterable[str] = ()) -> list[str]:
+        """
+        Reorder `models` within each tier by observed p50 latency, then cost.
+        Only models with enough samples move, and only into positions held by
+        other such models of the same tier; untracked, pinned and half-open
+        models keep their place, as does the order between tiers.
+        """
+        ordered = list(models)
+        pinned = set(pinned)
+        slots: dict[str, list[int]] = {}
+        keys: dict[str, tuple[int, float]] = {}
+        for i, model in enumerate(ordered):
+            tier = tiers.get(model)
+            key = None if tier is None or model in pinned else self._rank_key(model)
+            if key is not None:
+                slots.setdefault(tier, []).append(i)
+                keys[model] = key
+        result = list(ordered)
+        for positions in slots.values():
+            movable = sorted((ordered[i] for i in positions), key=lambda m: keys[m])
+            for i, model in zip(positions, movable):
+                result[i] = model
+        return result
+
+    def table(self, models: Iterable[str] = (), tiers: Mapping[str, str] | None = None) -> list[dict[str, Any]]:
+        """Rows for `swarmctl providers`: the given models plus every tracked one."""
+        now = self.clock()
+        tiers = tiers or {}
+        rows = []
+        for name in dict.fromkeys([*models, *sorted(self.models)]):
+            health = self.models.get(name, ModelHealth())
+            state = health.state_at(now)
+            p50, p95 = health.percentile_ms(0.5), health.percentile_ms(0.95)
+            rows.append(
+                {
+                    "model": name,
+                    "tier": tiers.get(name),
+                    "state": state,
+                    "p50_ms": None if p50 is None else round(p50, 1),
+                    "p95_ms": None if p95 is None else round(p95, 1),
+                    "latency_ewma_ms": None if health.latency_ewma_ms is None else round(health.latency_ewma_ms, 1),
+                    "error_rate": round(health.error_rate, 4),
+                    "usd_per_1k": None if health.usd_per_1k is None else round(health.usd_per_1k, 6),
+                    "samples": health.samples,
+                    "retry_in_s": round(health.opened_at + health.open_for_s - now, 1) if state == OPEN else None,
+                    "last_error": health.last_error,
+                }
+            )
+        return rows
+
+    def save(self) -> None:
+        if self.path is None or not self._pending:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path.with_name(f"{self.path.name}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            models = self._load()
+            for op in self._pending:
+                self._apply(models, op)
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            dump_path(
+                {"version": STATE_VERSION, "models": {name: h.to_dict() for name, h in sorted(models.items())}}, tmp
+            )
+            os.replace(tmp, self.path)
+        finally:
+            os.close(fd)
+        self.models = models
+        self._pending.clear()
@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
 """Validate that changes are within allowed lock_paths from Issue."""
 
+import argparse
+import os
 import sys
 import re
+import subprocess
+from collections import defaultdict
 from pathlib import Path
 
+DIFF_CHUNK_BYTES = 64 * 1024
+MAX_EXAMPLES_PER_GROUP = 10
+
 
 def extract_lock_paths_from_issue(issue_body):
     lock_paths_match = re.search(r"## Lock Paths\s*\n([^\n]+)", issue_body)
@@ -19,61 +26,143 @@ def extract_lock_paths_from_issue(issue_body):
     return lock_paths
 
 
-def get_changed_files():
-    import subprocess
-
+class LockPathMatcher:
+    """
+    Segment trie over lock paths. `contracts/schemas/` and `contracts/schemas`
+    both allow the path itself and everything below it, so a file is allowed
+    as soon as its walk reaches a terminal node.
+    """
+
+    def __init__(self, lock_paths):
+        self._root = {}
+        for lock_path in lock_paths:
+            segments = [s for s in str(lock_path).split("/") if s]
+            if not segments:
+                continue
+            node = self._root
+            for segment in segments:
+                if None in node:
+                    break  # a shorter lock path already covers this one
+                node = node.setdefault(segment, {})
+            else:
+                node.clear()
+                node[None] = True
+
+    def allows(self, file_path):
+        node = self._root
+        for segment in str(file_path).split("/"):
+            node = node.get(segment)
+            if node is None:
+                return False
+            if None in node:
+                return True
+        return False
+
+
+def iter_diff_entries(base="origin/main", head="HEAD", detect_renames=True):
+    """
+    Stream `(status, path, old_path)` from `git diff --name-status -z base...head`.
+    `old_path` is set for renames and copies; output is parsed in chunks so
+    large diffs never materialize as one string.
+    """
+    cmd = ["git", "diff", "--name-status", "-z", "--no-color"]
+    cmd.append("-M" if detect_renames else "--no-renames")
+    cmd.append(f"{base}...{head}")
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    completed = False
     try:
-        result = subprocess.run(
-            ["git", "diff", "--name-only", "HEAD~1", "HEAD"],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        return [Path(f) for f in result.stdout.strip().split("\n") if f]
-    except subprocess.CalledProcessError:
-        return []
+        fields = _iter_nul_fields(proc.stdout)
+        for status in fields:
+            if status[:1] in ("R", "C"):
+                old_path = next(fields)
+                yield status, next(fields), old_path
+            else:
+                yield status, next(fields), None
+        completed = True
+    finally:
+        proc.stdout.close()
+        stderr = proc.stderr.read()
+        proc.stderr.close()
+        # An abandoned stream kills git with SIGPIPE; only a full read is checked.
+        if proc.wait() != 0 and completed:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+
+
+def _iter_nul_fields(stream):
+    pending = b""
+    while True:
+        chunk = stream.read(DIFF_CHUNK_BYTES)
+        if not chunk:
+            break
+        parts = (pending + chunk).split(b"\0")
+        pending = parts.pop()
+        for part in parts:
+            yield os.fsdecode(part)
+    if pending:
+        yield os.fsdecode(pending)
+
+
+def get_changed_files(base="origin/main", head="HEAD"):
+    """Raises CalledProcessError when git cannot diff (e.g. missing base in a shallow clone)."""
+    paths = []
+    for _status, path, old_path in iter_diff_entries(base, head):
+        if old_path is not None:
+            paths.append(Path(old_path))
+        paths.append(Path(path))
+    return paths
 
 
 def is_path_allowed(file_path, lock_paths):
-    file_str = str(file_path)
+    matcher = lock_paths if isinstance(lock_paths, LockPathMatcher) else LockPathMatcher(lock_paths)
+    return matcher.allows(Path(file_path).as_posix())
 
-    for lock_path in lock_paths:
-        if lock_path.endswith("/"):
-            if file_str.startswith(lock_path) or file_str + "/" == lock_path:
-                return True
-        else:
-            if file_str == lock_path or file_str.startswith(lock_path + "/"):
-                return True
 
-    return False
+def group_violations(violations, depth=2):
+    """Group paths by their first `depth` directory segments."""
+    groups = defaultdict(list)
+    for path in violations:
+        parts = Path(path).as_posix().split("/")[:-1][:depth]
+        groups["/".join(parts) + "/" if parts else "./"].append(path)
+    return dict(sorted(groups.items()))
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: check_lock_paths.py <issue_body>")
-        sys.exit(1)
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Validate that changes are within allowed lock_paths from Issue.")
+    parser.add_argument("issue_body", help="Issue body containing a '## Lock Paths' section.")
+    parser.add_argument("--base", default="origin/main", help="Diff base (default: origin/main, i.e. every commit of the PR).")
+    parser.add_argument("--head", default="HEAD", help="Diff head (default: HEAD).")
+    parser.add_argument("--group-depth", type=int, default=2, help="Directory depth used to group violations.")
+    return parser.parse_args(argv)
+
 
-    issue_body = sys.argv[1]
-    lock_paths = extract_lock_paths_from_issue(issue_body)
+def main(argv=None):
+    args = _parse_args(argv if argv is not None else sys.argv[1:])
+    lock_paths = extract_lock_paths_from_issue(args.issue_body)
 
     print(f"Allowed lock paths: {lock_paths}")
 
-    changed_files = get_changed_files()
+    try:
+        changed_files = get_changed_files(args.base, args.head)
+    except subprocess.CalledProcessError as e:
+        detail = os.fsdecode(e.stderr or b"").strip()
+        print(f"ERROR: git diff {args.base}...{args.head} failed: {detail or e}")
+        sys.exit(1)
 
     if not changed_files:
         print("No changed files to check")
         return
 
-    violations = []
-
-    for file_path in changed_files:
-        if not is_path_allowed(file_path, lock_paths):
-            violations.append(file_path)
+    matcher = LockPathMatcher(lock_paths)
+    violations = [p for p in changed_files if not matcher.allows(p.as_posix())]
 
     if violations:
-        print("\nLock path violations detected:")
-        for v in violations:
-            print(f"  - {v} is outside allowed lock_paths")
+        print(f"\nLock path violations detected ({len(violations)} files):")
+        for prefix, paths in group_violations(violations, args.group_depth).items():
+            print(f"  {prefix} ({len(paths)} files outside allowed lock_paths)")
+            for v in paths[:MAX_EXAMPLES_PER_GROUP]:
+                print(f"    - {v}")
+            if len(paths) > MAX_EXAMPLES_PER_GROUP:
+                print(f"    ... and {len(paths) - MAX_EXAMPLES_PER_GROUP} more")
         sys.exit(1)
 
     print("All changes are within allowed lock_paths")
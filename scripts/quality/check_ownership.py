@@ -1,10 +1,123 @@
 #!/usr/bin/env python3
 """Check ownership compliance against governance/ownership-map.yaml."""
 
+import argparse
+import re
 import sys
 from pathlib import Path
 import yaml
 
+# Match kinds at equal depth: an exact path beats a glob, a glob beats a `/**` prefix.
+PREFIX, GLOB, EXACT = 0, 1, 2
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+def _glob_to_regex(pattern):
+    """Translate a path glob: `*`/`?`/`[...]` stay within a segment, `**` spans segments."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(pattern[i]))
+                i += 1
+                continue
+            body = pattern[i + 1 : end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append(f"(?!/)[{body}]")
+            i = end + 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(out) + r"\Z")
+
+
+class _Node:
+    __slots__ = ("children", "exact", "prefix", "globs")
+
+    def __init__(self):
+        self.children = {}
+        self.exact = []
+        self.prefix = []
+        self.globs = []
+
+
+class OwnershipIndex:
+    """
+    Path-segment trie compiled from the `owners` section of the ownership map.
+
+    `governance/**` owns everything below `governance/`, `AGENTS.md` owns
+    exactly that path, and glob patterns (`backend/**/*.sql`) are anchored at
+    their longest literal directory prefix. Lookups walk the file's segments
+    once; the deepest match wins, and owners tied at the winning match are
+    reported as a conflict.
+    """
+
+    def __init__(self, ownership_map):
+        self._root = _Node()
+        for owner_name, owner_config in (ownership_map.get("owners") or {}).items():
+            for pattern in (owner_config or {}).get("paths") or []:
+                self.add(str(pattern), owner_name)
+
+    def add(self, pattern, owner):
+        segments = pattern.strip("/").split("/")
+        node = self._root
+        for depth, segment in enumerate(segments):
+            rest = segments[depth:]
+            if rest == ["**"]:
+                node.prefix.append(owner)
+                return
+            if _GLOB_CHARS.search(segment):
+                node.globs.append((_glob_to_regex("/".join(rest)), owner))
+                return
+            node = node.children.setdefault(segment, _Node())
+        node.exact.append(owner)
+
+    def matches(self, file_path):
+        """Return the owners tied at the most specific matching pattern."""
+        segments = Path(file_path).as_posix().split("/")
+        best, best_key = [], None
+        node = self._root
+        for depth in range(len(segments) + 1):
+            candidates = []
+            if depth == len(segments):
+                candidates.append((EXACT, node.exact))
+            else:
+                candidates.append((PREFIX, node.prefix))
+                if node.globs:
+                    rest = "/".join(segments[depth:])
+                    candidates.append((GLOB, [owner for regex, owner in node.globs if regex.match(rest)]))
+            for kind, owners in candidates:
+                if owners and (best_key is None or (depth, kind) >= best_key):
+                    if (depth, kind) != best_key:
+                        best, best_key = [], (depth, kind)
+                    best.extend(o for o in owners if o not in best)
+            if depth == len(segments):
+                break
+            node = node.children.get(segments[depth])
+            if node is None:
+                break
+        return best
+
+    def owner_of(self, file_path):
+        owners = self.matches(file_path)
+        return owners[0] if owners else None
+
 
 def load_ownership_map():
     ownership_path = (
@@ -35,40 +148,65 @@ def get_changed_files():
         return []
 
 
-def check_file_ownership(file_path, ownership_map):
-    file_str = str(file_path)
+def get_tracked_files():
+    import subprocess
+
+    result = subprocess.run(
+        ["git", "ls-files", "-z"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return [Path(f) for f in result.stdout.split("\0") if f]
 
-    for owner_name, owner_config in ownership_map.get("owners", {}).items():
-        for pattern in owner_config.get("paths", []):
-            if pattern.endswith("/**"):
-                dir_pattern = pattern[:-3]
-                if file_str.startswith(dir_pattern):
-                    return owner_name
-            elif file_str == pattern:
-                return owner_name
 
-    return None
+def check_file_ownership(file_path, ownership_map):
+    index = ownership_map if isinstance(ownership_map, OwnershipIndex) else OwnershipIndex(ownership_map)
+    return index.owner_of(file_path)
+
+
+def audit_files(files, index):
+    """Single pass over `files`; returns (unowned, {file: [owners]} for conflicts)."""
+    unowned = []
+    conflicts = {}
+    for file_path in files:
+        owners = index.matches(file_path)
+        if not owners:
+            unowned.append(file_path)
+        elif len(owners) > 1:
+            conflicts[file_path] = owners
+    return unowned, conflicts
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Check file ownership against governance/ownership-map.yaml.")
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Audit every tracked file instead of the diff against origin/main.",
+    )
+    return parser.parse_args(argv)
 
 
-def main():
-    ownership_map = load_ownership_map()
-    changed_files = get_changed_files()
+def main(argv=None):
+    args = _parse_args(argv if argv is not None else sys.argv[1:])
+    index = OwnershipIndex(load_ownership_map())
+    files = get_tracked_files() if args.all else get_changed_files()
 
-    if not changed_files:
+    if not files:
         print("No changed files to check")
         return
 
-    violations = []
-
-    for file_path in changed_files:
-        owner = check_file_ownership(file_path, ownership_map)
-        if owner is None:
-            violations.append(file_path)
+    unowned, conflicts = audit_files(files, index)
 
-    if violations:
+    if unowned or conflicts:
         print("\nOwnership violations detected:")
-        for v in violations:
+        for v in unowned:
             print(f"  - {v} has no owner in ownership-map.yaml")
+        for v, owners in conflicts.items():
+            print(f"  - {v} is claimed by multiple owners: {', '.join(owners)}")
+        if args.all:
+            print(f"\n{len(unowned)} unowned, {len(conflicts)} conflicting of {len(files)} tracked files")
         sys.exit(1)
 
     print("All files have valid ownership")
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from json_io import dump_path, load_path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_PATH = REPO_ROOT / ".cache/route-cache.json"
+ROUTE_CONFIG_FILES = (
+    "configs/tooling/model_providers.json",
+    "configs/tooling/model_routing.json",
+    ".agent/config/model_router.yaml",
+)
+
+DEFAULT_MAXSIZE = 256
+DEFAULT_TTL_S = 300.0
+CACHE_VERSION = 1
+
+# (mtime_ns, size) -> sha256 per path, so unchanged files are not re-read.
+_digests: dict[str, tuple[int, int, str]] = {}
+
+
+def _file_digest(path: Path) -> str:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return "missing"
+    cached = _digests.get(str(path))
+    if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    _digests[str(path)] = (st.st_mtime_ns, st.st_size, digest)
+    return digest
+
+
+def config_fingerprint(paths: Iterable[Path]) -> str:
+    """One hash over the given files' contents; changes whenever any of them does."""
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(f"{path}\0{_file_digest(Path(path))}\0".encode("utf-8"))
+    return h.hexdigest()[:32]
+
+
+def route_key(
+    *,
+    task_type: str,
+    complexity: str,
+    token_budget: int,
+    cost_budget: float,
+    preferred: Iterable[str],
+    unavailable: Iterable[str],
+    mode: str | None,
+    fingerprint: str,
+) -> str:
+    fields = [task_type, complexity, int(token_budget), float(cost_budget), list(preferred), sorted(unavailable), mode]
+    return json.dumps([*fields, fingerprint])  # the fingerprint stays last (see RouteCache._load)
+
+
+class RouteCache:
+    """
+    LRU + TTL cache of route decisions. Keys embed the config fingerprint, so
+    editing a routing config simply stops old entries from matching (they are
+    dropped when loaded or evicted). With a `path`, entries survive between
+    processes in a small JSON file written on put().
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int = DEFAULT_MAXSIZE,
+        ttl_s: float = DEFAULT_TTL_S,
+        path: Path | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self.path = path
+        self.clock = clock
+        self.hits = self.misses = self.expired = self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._loaded = path is None
+
+    def _load(self, fingerprint: str) -> None:
+        self._loaded = True
+        if not self.path.exists():
+            return
+        try:
+            data = load_path(self.path)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return
+        now = self.clock()
+        for key, stored_at, value in data.get("entries") or []:
+            # Entries for an older config can never hit again.
+            if json.loads(key)[-1] == fingerprint and now - stored_at < self.ttl_s:
+                self._entries[key] = (stored_at, value)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        if not self._loaded:
+            self._load(json.loads(key)[-1])
+        entry = self._entries.get(key)
+        if entry is not None and self.clock() - entry[0] >= self.ttl_s:
+            del self._entries[key]
+            self.expired += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        if not self._loaded:
+            self._load(json.loads(key)[-1])
+        self._entries[key] = (self.clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        self.save()
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        dump_path(
+            {"version": CACHE_VERSION, "entries": [[k, ts, v] for k, (ts, v) in self._entries.items()]}, tmp
+        )
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.save()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "persistent": self.path is not None,
+        }
+
+
+_shared: dict[Path | None, RouteCache] = {}
+
+
+def shared_cache(path: Path | None = DEFAULT_CACHE_PATH) -> RouteCache:
+    """The process-wide cache for `path` (None: memory only)."""
+    cache = _shared.get(path)
+    if cache is None:
+        cache = _shared[path] = RouteCache(path=path)
+    return cache
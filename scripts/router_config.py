@@ -0,0 +1,419 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import marshal
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from schema_validator import compile_validator
+
+try:
+    import yaml as _yaml
+except ImportError:
+    _yaml = None
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+ROUTER_CONFIG_PATH = REPO_ROOT / ".agent/config/model_router.yaml"
+ROUTER_SCHEMAS_DIR = REPO_ROOT / "configs/tooling/schemas"
+ROUTER_SCHEMA = "model-router"
+DEFAULT_CACHE_DIR = REPO_ROOT / ".cache/router-config"
+
+# Bump when the cached payload changes shape, so stale cache entries are ignored.
+LOADER_VERSION = "1"
+
+
+@dataclass(frozen=True, slots=True)
+class RouterConfig:
+    version: str | None
+    strategy: str | None
+    retries: int
+    timeout_seconds: dict[str, float]
+    tiers: dict[str, tuple[str, ...]]
+    env_required: tuple[str, ...]
+    env_defaults: dict[str, Any]
+    sha256: str
+
+    def models_for(self, tier: str) -> tuple[str, ...]:
+        return self.tiers.get(tier, ())
+
+    def timeout_for(self, tier: str, default: float | None = None) -> float | None:
+        return self.timeout_seconds.get(tier, default)
+
+
+# ---------------------------------------------------------------------------
+# YAML subset parser (used when PyYAML is not installed)
+# ---------------------------------------------------------------------------
+
+_INT_RE = re.compile(r"[-+]?(?:0|[1-9][0-9]*)\Z")
+_FLOAT_RE = re.compile(r"[-+]?(?:[0-9]+\.[0-9]*|\.[0-9]+|[0-9]+)(?:[eE][-+]?[0-9]+)?\Z")
+_BOOLS = {
+    "true": True, "True": True, "TRUE": True, "yes": True, "Yes": True, "YES": True, "on": True, "On": True, "ON": True,
+    "false": False, "False": False, "FALSE": False, "no": False, "No": False, "NO": False, "off": False, "Off": False, "OFF": False,
+}
+_NULLS = {"", "~", "null", "Null", "NULL"}
+
+
+def _resolve_plain(text: str) -> Any:
+    if text in _NULLS:
+        return None
+    if text in _BOOLS:
+        return _BOOLS[text]
+    if _INT_RE.match(text):
+        return int(text)
+    if _FLOAT_RE.match(text) and any(c.isdigit() for c in text):
+        return float(text)
+    if text[0] in "&*!|>%@`":
+        raise ValueError(f"Unsupported YAML construct: {text}")
+    return text
+
+
+def _strip_comment(line: str) -> str:
+    if "#" not in line:
+        return line.rstrip()
+    quote = None
+    escaped = False
+    for i, ch in enumerate(line):
+        if quote:
+            if escaped:
+                escaped = False
+            elif ch == "\\" and quote == '"':
+                escaped = True
+            elif ch == quote:
+                quote = None
+        elif ch in "'\"" and (i == 0 or line[i - 1] in " \t[{,"):
+            quote = ch  # only at the start of a token: `it's` is a plain scalar
+        elif ch == "#" and (i == 0 or line[i - 1] in " \t"):
+            return line[:i].rstrip()
+    return line.rstrip()
+
+
+class _Flow:
+    """Single-line scalars and flow collections (`[a, b]`, `{k: v}`)."""
+
+    def __init__(self, text: str, lineno: int) -> None:
+        self.text = text
+        self.pos = 0
+        self.lineno = lineno
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"YAML syntax error on line {self.lineno}: {message}")
+
+    def skip_ws(self) -> None:
+        while self.pos < len(self.text) and self.text[self.pos] in " \t":
+            self.pos += 1
+
+    def value(self, terminators: str) -> Any:
+        self.skip_ws()
+        if self.pos >= len(self.text):
+            return None
+        ch = self.text[self.pos]
+        if ch == "[":
+            return self.sequence()
+        if ch == "{":
+            return self.mapping()
+        if ch in "'\"":
+            return self.quoted()
+        start = self.pos
+        while self.pos < len(self.text):
+            ch = self.text[self.pos]
+            if ch in terminators:
+                break
+            if ch == ":" and "}" in terminators and self.text[self.pos + 1 : self.pos + 2] in (" ", ",", "}", ""):
+                break
+            self.pos += 1
+        return _resolve_plain(self.text[start : self.pos].strip())
+
+    def quoted(self) -> str:
+        quote = self.text[self.pos]
+        if quote == '"':
+            end = self.pos + 1
+            while end < len(self.text) and self.text[end] != '"':
+                end += 2 if self.text[end] == "\\" else 1
+            if end >= len(self.text):
+                raise self.error("unterminated double-quoted string")
+            try:
+                value = json.loads(self.text[self.pos : end + 1])
+            except ValueError as e:
+                raise self.error(f"invalid escape in string: {e}") from e
+            self.pos = end + 1
+            return value
+        chunks = []
+        self.pos += 1
+        while True:
+            end = self.text.find("'", self.pos)
+            if end == -1:
+                raise self.error("unterminated single-quoted string")
+            chunks.append(self.text[self.pos : end])
+            if self.text[end + 1 : end + 2] == "'":
+                chunks.append("'")
+                self.pos = end + 2
+                continue
+            self.pos = end + 1
+            return "".join(chunks)
+
+    def expect(self, ch: str) -> None:
+        self.skip_ws()
+        if self.text[self.pos : self.pos + 1] != ch:
+            raise self.error(f"expected {ch!r}")
+        self.pos += 1
+
+    def sequence(self) -> list[Any]:
+        self.expect("[")
+        items: list[Any] = []
+        while True:
+            self.skip_ws()
+            if self.text[self.pos : self.pos + 1] == "]":
+                self.pos += 1
+                return items
+            items.append(self.value(",]"))
+            self.skip_ws()
+            if self.text[self.pos : self.pos + 1] == ",":
+                self.pos += 1
+            elif self.text[self.pos : self.pos + 1] != "]":
+                raise self.error("expected ',' or ']' (multi-line flow collections are not supported)")
+
+    def mapping(self) -> dict[str, Any]:
+        self.expect("{")
+        out: dict[str, Any] = {}
+        while True:
+            self.skip_ws()
+            if self.text[self.pos : self.pos + 1] == "}":
+                self.pos += 1
+                return out
+            key = self.value(",}")
+            self.skip_ws()
+            value = None
+            if self.text[self.pos : self.pos + 1] == ":":
+                self.pos += 1
+                value = self.value(",}")
+            out[_key(key, self.lineno)] = value
+            self.skip_ws()
+            if self.text[self.pos : self.pos + 1] == ",":
+                self.pos += 1
+            elif self.text[self.pos : self.pos + 1] != "}":
+                raise self.error("expected ',' or '}' (multi-line flow collections are not supported)")
+
+    def scalar(self) -> Any:
+        value = self.value("")
+        self.skip_ws()
+        if self.pos != len(self.text):
+            raise self.error(f"unexpected trailing text: {self.text[self.pos:]}")
+        return value
+
+
+def _key(value: Any, lineno: int) -> str:
+    if isinstance(value, (dict, list)):
+        raise ValueError(f"YAML syntax error on line {lineno}: complex mapping keys are not supported")
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def _split_key(content: str, lineno: int) -> tuple[str, str] | None:
+    """Split `key: rest` at the first `:` outside quotes that ends the key."""
+    quote = None
+    for i, ch in enumerate(content):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"" and i == 0:
+            quote = ch
+        elif ch == ":" and (i + 1 == len(content) or content[i + 1] in " \t"):
+            key_text = content[:i].strip()
+            key = _Flow(key_text, lineno).scalar() if key_text[:1] in "'\"" else key_text
+            return _key(key, lineno), content[i + 1 :].strip()
+        elif ch in "[{" and i == 0:
+            return None
+    return None
+
+
+def _is_seq_item(content: str) -> bool:
+    return content == "-" or content.startswith("- ")
+
+
+class _Block:
+    def __init__(self, text: str) -> None:
+        self.lines: list[tuple[int, str, int]] = []
+        for lineno, raw in enumerate(text.splitlines(), start=1):
+            line = _strip_comment(raw)
+            stripped = line.lstrip(" ")
+            if not stripped or stripped in ("---", "..."):
+                continue
+            if stripped.startswith("\t"):
+                raise ValueError(f"YAML syntax error on line {lineno}: tabs are not allowed in indentation")
+            if stripped.startswith("%"):
+                continue
+            self.lines.append((len(line) - len(stripped), stripped, lineno))
+        self.i = 0
+
+    def parse(self) -> Any:
+        if not self.lines:
+            return None
+        value = self.node(self.lines[0][0])
+        if self.i < len(self.lines):
+            raise ValueError(f"YAML syntax error on line {self.lines[self.i][2]}: unexpected indentation")
+        return value
+
+    def node(self, indent: int) -> Any:
+        _, content, lineno = self.lines[self.i]
+        if _is_seq_item(content):
+            return self.sequence(indent)
+        if _split_key(content, lineno) is not None:
+            return self.mapping(indent)
+        self.i += 1
+        return _Flow(content, lineno).scalar()
+
+    def mapping(self, indent: int) -> dict[str, Any]:
+        out: dict[str, Any] = {}
+        while self.i < len(self.lines):
+            line_indent, content, lineno = self.lines[self.i]
+            if line_indent < indent:
+                break
+            if line_indent > indent or _is_seq_item(content):
+                raise ValueError(f"YAML syntax error on line {lineno}: unexpected indentation")
+            split = _split_key(content, lineno)
+            if split is None:
+                raise ValueError(f"YAML syntax error on line {lineno}: expected `key: value`")
+            key, rest = split
+            if key in out:
+                raise ValueError(f"YAML syntax error on line {lineno}: duplicate key {key!r}")
+            self.i += 1
+            if rest:
+                out[key] = _Flow(rest, lineno).scalar()
+            elif self.i < len(self.lines) and (
+                self.lines[self.i][0] > indent
+                or (self.lines[self.i][0] == indent and _is_seq_item(self.lines[self.i][1]))
+            ):
+                out[key] = self.node(self.lines[self.i][0])
+            else:
+                out[key] = None
+        return out
+
+    def sequence(self, indent: int) -> list[Any]:
+        out: list[Any] = []
+        while self.i < len(self.lines):
+            line_indent, content, lineno = self.lines[self.i]
+            if line_indent != indent or not _is_seq_item(content):
+                if line_indent > indent:
+                    raise ValueError(f"YAML syntax error on line {lineno}: unexpected indentation")
+                break
+            rest = content[1:].lstrip(" ")
+            if not rest:
+                self.i += 1
+                if self.i < len(self.lines) and self.lines[self.i][0] > indent:
+                    out.append(self.node(self.lines[self.i][0]))
+                else:
+                    out.append(None)
+                continue
+            # `- key: value` / `- - item`: re-read the remainder as a block at its own column.
+            child_indent = indent + len(content) - len(rest)
+            self.lines[self.i] = (child_indent, rest, lineno)
+            out.append(self.node(child_indent))
+        return out
+
+
+def parse_yaml_subset(text: str) -> Any:
+    """
+    Parse the block-style YAML subset used by repo configs: nested mappings,
+    sequences (including sequences of mappings), single-line flow collections,
+    quoted and plain scalars with YAML 1.1 bool/null/number resolution.
+    Mapping keys and timestamps stay strings (PyYAML turns `on:` into True and
+    dates into `datetime.date`). Anchors, tags and block scalars raise ValueError.
+    """
+    return _Block(text).parse()
+
+
+def parse_router_yaml(text: str, *, use_pyyaml: bool | None = None) -> dict[str, Any]:
+    if use_pyyaml is None:
+        use_pyyaml = _yaml is not None
+    if use_pyyaml:
+        loader = getattr(_yaml, "CSafeLoader", None) or _yaml.SafeLoader
+        try:
+            data = _yaml.load(text, Loader=loader)
+        except _yaml.YAMLError as e:
+            raise ValueError(str(e)) from e
+    else:
+        data = parse_yaml_subset(text)
+    if not isinstance(data, dict):
+        raise ValueError("model_router.yaml: top level must be a mapping")
+    return data
+
+
+# ---------------------------------------------------------------------------
+# Loader with validation and on-disk cache
+# ---------------------------------------------------------------------------
+
+_MEMO: dict[str, RouterConfig] = {}
+
+
+def _cache_key(raw: bytes, schemas_dir: Path) -> str:
+    digest = hashlib.sha256()
+    digest.update(LOADER_VERSION.encode("ascii"))
+    digest.update((schemas_dir / f"{ROUTER_SCHEMA}.schema.json").read_bytes())
+    digest.update(raw)
+    return digest.hexdigest()
+
+
+def _build(data: dict[str, Any], key: str) -> RouterConfig:
+    env = data.get("env") or {}
+    version = data.get("version")
+    return RouterConfig(
+        version=None if version is None else str(version),
+        strategy=data.get("strategy"),
+        retries=int(data.get("retries", 0)),
+        timeout_seconds={str(k): float(v) for k, v in (data.get("timeout_seconds") or {}).items()},
+        tiers={str(name): tuple(tier["models"]) for name, tier in data["tiers"].items()},
+        env_required=tuple(env.get("required") or ()),
+        env_defaults=dict(env.get("defaults") or {}),
+        sha256=key,
+    )
+
+
+def load_router_config(
+    path: Path = ROUTER_CONFIG_PATH,
+    *,
+    cache_dir: Path | None = DEFAULT_CACHE_DIR,
+    schemas_dir: Path = ROUTER_SCHEMAS_DIR,
+) -> RouterConfig:
+    """
+    Parse and validate model_router.yaml once per content hash.
+
+    The validated document is marshalled to `<cache_dir>/<sha256>.marshal`,
+    keyed by the YAML bytes, the router schema and LOADER_VERSION, so later
+    invocations only hash the file. Invalid configs raise ValueError.
+    """
+    raw = path.read_bytes()
+    key = _cache_key(raw, schemas_dir)
+    if key in _MEMO:
+        return _MEMO[key]
+
+    cached = cache_dir / f"{key}.marshal" if cache_dir is not None else None
+    data = None
+    if cached is not None and cached.exists():
+        try:
+            data = marshal.loads(cached.read_bytes())
+        except (EOFError, ValueError, TypeError):
+            data = None
+
+    if data is None:
+        data = parse_router_yaml(raw.decode("utf-8"))
+        errors = compile_validator(ROUTER_SCHEMA, schemas_dir=schemas_dir).errors(data)
+        if errors:
+            first = errors[0]
+            raise ValueError(f"{path.name}: {first['path']}: {first['message']}")
+        if cached is not None:
+            try:
+                blob = marshal.dumps(data)
+            except ValueError:
+                blob = None  # e.g. YAML timestamps; such configs are simply re-parsed
+            if blob is not None:
+                cached.parent.mkdir(parents=True, exist_ok=True)
+                tmp = cached.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_bytes(blob)
+                os.replace(tmp, cached)
+
+    config = _build(data, key)
+    _MEMO[key] = config
+    return config
@@ -1,17 +1,20 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
 import json
 import subprocess
 import sys
 from pathlib import Path
 
+from profiling import add_profile_option, profiled
+
 ROOT = Path(__file__).resolve().parents[4]
 TASKS_PATH = ROOT / "repos/packages/agent-os/tests/regression_tasks.json"
 SWARMCTL = ROOT / "repos/packages/agent-os/scripts/swarmctl.py"
 
 
-def main() -> int:
+def _run_suite() -> int:
     tasks = json.loads(TASKS_PATH.read_text(encoding="utf-8"))
     results: list[dict] = []
 
@@ -57,5 +60,13 @@ def main() -> int:
     return 0 if passed == total else 2
 
 
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay regression routing tasks through swarmctl route.")
+    add_profile_option(parser)
+    args = parser.parse_args()
+    with profiled(args.profile, "run_regression_suite"):
+        return _run_suite()
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,742 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Mapping
+from urllib.parse import unquote, urldefrag, urljoin
+
+import json_io
+from profiling import add_profile_option, profiled
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCHEMAS_DIR = REPO_ROOT / "contracts/schemas"
+DEFAULT_CACHE_DIR = REPO_ROOT / ".cache/schema-validators"
+
+# Bump when generated code changes shape, so stale cache entries are ignored.
+COMPILER_VERSION = "2"
+MAX_ENVELOPE_ERRORS = 50
+
+_ANNOTATIONS = {
+    "$schema",
+    "$id",
+    "$comment",
+    "$defs",
+    "definitions",
+    "title",
+    "description",
+    "default",
+    "examples",
+    "deprecated",
+    "readOnly",
+    "writeOnly",
+}
+
+_TYPE_CHECKS = {
+    "string": "isinstance({v}, str)",
+    "number": "(isinstance({v}, (int, float)) and not isinstance({v}, bool))",
+    "integer": "((isinstance({v}, int) and not isinstance({v}, bool)) or (isinstance({v}, float) and {v}.is_integer()))",
+    "object": "isinstance({v}, dict)",
+    "array": "isinstance({v}, list)",
+    "boolean": "isinstance({v}, bool)",
+    "null": "({v} is None)",
+}
+
+_ASSERTED_FORMATS = {"uuid", "date", "date-time"}
+
+_PRELUDE = '''\
+import math
+import re
+from fractions import Fraction
+
+_UUID_RE = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
+_DATE_RE = re.compile(r"^\\d{4}-\\d{2}-\\d{2}$")
+_DATE_TIME_RE = re.compile(
+    r"^\\d{4}-\\d{2}-\\d{2}[Tt ]\\d{2}:\\d{2}:\\d{2}(\\.\\d+)?([Zz]|[+-]\\d{2}:\\d{2})$"
+)
+_FORMATS = {"uuid": _UUID_RE, "date": _DATE_RE, "date-time": _DATE_TIME_RE}
+
+
+def _json_equal(a, b):
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool) and a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def _in_enum(value, options):
+    return any(_json_equal(value, option) for option in options)
+
+
+def _ptr(key):
+    return "/" + str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _err(errors, path, keyword, message):
+    errors.append({"path": path or "/", "keyword": keyword, "message": message})
+
+
+def _multiple_of(value, step):
+    if isinstance(value, int) and isinstance(step, int):
+        return value % step == 0
+    if not math.isfinite(value):
+        return False
+    # Exact arithmetic on the decimal literals, so 0.3 is a multiple of 0.1.
+    return Fraction(repr(value)) % Fraction(repr(step)) == 0
+'''
+
+
+class SchemaValidationError(ValueError):
+    def __init__(self, schema_id: str, errors: list[dict[str, str]]) -> None:
+        first = errors[0] if errors else {"path": "/", "message": "invalid document"}
+        super().__init__(f"{schema_id}: {first['path']}: {first['message']}")
+        self.schema_id = schema_id
+        self.errors = errors
+
+
+class SchemaRegistry:
+    """
+    All schemas of a directory, addressable by `$id`, file name or short name
+    (`bom-item`), so relative `$ref`s resolve across files.
+    """
+
+    def __init__(self, schemas_dir: Path = SCHEMAS_DIR) -> None:
+        self.schemas_dir = schemas_dir.resolve()
+        self.resources: dict[str, Any] = {}
+        self._aliases: dict[str, str] = {}
+        for path in sorted(self.schemas_dir.glob("*.json")):
+            try:
+                doc = json.loads(path.read_text(encoding="utf-8"))
+            except ValueError as e:
+                raise ValueError(f"Invalid JSON schema: {path}: {e}") from e
+            uri = str(doc.get("$id") or path.as_uri()) if isinstance(doc, dict) else path.as_uri()
+            self.resources[uri] = doc
+            self._aliases[path.name] = uri
+            self._aliases[path.name.removesuffix(".json").removesuffix(".schema")] = uri
+
+    def resolve_name(self, name: str) -> str:
+        if name in self.resources:
+            return name
+        uri = self._aliases.get(Path(name).name)
+        if uri is None:
+            raise KeyError(f"Unknown schema: {name}")
+        return uri
+
+    def lookup(self, uri: str, pointer: str) -> Any:
+        if uri not in self.resources:
+            raise KeyError(f"Unresolvable $ref target: {uri}")
+        node = self.resources[uri]
+        for token in [t for t in pointer.split("/") if t]:
+            token = unquote(token).replace("~1", "/").replace("~0", "~")
+            node = node[int(token)] if isinstance(node, list) else node[token]
+        return node
+
+    def reachable(self, root_uri: str) -> list[str]:
+        """Resource URIs reachable from root_uri through `$ref`s."""
+        seen = [root_uri]
+        queue = [root_uri]
+        while queue:
+            uri = queue.pop()
+            for ref in _iter_refs(self.resources[uri]):
+                target = urldefrag(urljoin(uri, ref))[0] or uri
+                if target not in seen:
+                    if target not in self.resources:
+                        raise KeyError(f"Unresolvable $ref target: {target}")
+                    seen.append(target)
+                    queue.append(target)
+        return sorted(seen)
+
+    def cache_key(self, root_uri: str) -> str:
+        payload = {
+            "compiler": COMPILER_VERSION,
+            "root": root_uri,
+            "resources": {uri: self.resources[uri] for uri in self.reachable(root_uri)},
+        }
+        blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _iter_refs(node: Any) -> Iterator[str]:
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "$ref" and isinstance(value, str):
+                yield value
+            else:
+                yield from _iter_refs(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _iter_refs(value)
+
+
+class _Compiler:
+    """
+    Generate one Python function per `$ref` target; everything else is inlined
+    so validation is straight-line code with no schema interpretation at runtime.
+    """
+
+    def __init__(self, registry: SchemaRegistry) -> None:
+        self.registry = registry
+        self._functions: dict[str, str] = {}
+        self._pending: list[tuple[str, str, str]] = []
+        self._constants: list[str] = []
+        self._counter = 0
+
+    def compile(self, root_uri: str) -> str:
+        root = self._function_for(root_uri, "")
+        chunks: list[str] = []
+        while self._pending:
+            uri, pointer, name = self._pending.pop(0)
+            body: list[str] = []
+            self._gen(self.registry.lookup(uri, pointer), uri, "data", "path", "errors", body, 1)
+            chunks.append(f"def {name}(data, path, errors):  # {uri}#{pointer}\n" + "\n".join(body or ["    pass"]))
+
+        parts = [
+            f"# Generated by scripts/schema_validator.py (compiler v{COMPILER_VERSION}); do not edit.",
+            _PRELUDE,
+            *self._constants,
+            "",
+            *(chunk + "\n\n" for chunk in chunks),
+            f"SCHEMA_ID = {root_uri!r}",
+            "",
+            "",
+            "def validate(data):",
+            "    errors = []",
+            f"    {root}(data, '', errors)",
+            "    return errors",
+            "",
+        ]
+        return "\n".join(parts)
+
+    def _function_for(self, uri: str, pointer: str) -> str:
+        key = f"{uri}#{pointer}"
+        if key not in self._functions:
+            name = f"_v{len(self._functions)}"
+            self._functions[key] = name
+            self._pending.append((uri, pointer, name))
+        return self._functions[key]
+
+    def _const(self, value: Any) -> str:
+        name = f"_C{len(self._constants)}"
+        self._constants.append(f"{name} = {value!r}")
+        return name
+
+    def _var(self, prefix: str) -> str:
+        self._counter += 1
+        return f"{prefix}{self._counter}"
+
+    def _gen(self, schema: Any, uri: str, v: str, path: str, errs: str, out: list[str], depth: int) -> None:
+        pad = "    " * depth
+        if schema is True or schema == {}:
+            return
+        if schema is False:
+            out.append(f"{pad}_err({errs}, {path}, 'false', 'no value is allowed here')")
+            return
+        if not isinstance(schema, dict):
+            raise ValueError(f"Invalid schema node in {uri}: {schema!r}")
+
+        handled = set(_ANNOTATIONS)
+
+        if "$ref" in schema:
+            handled.add("$ref")
+            target, fragment = urldefrag(urljoin(uri, schema["$ref"]))
+            out.append(f"{pad}{self._function_for(target or uri, fragment)}({v}, {path}, {errs})")
+
+        if "type" in schema:
+            handled.add("type")
+            types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+            check = " or ".join(_TYPE_CHECKS[t].format(v=v) for t in types)
+            out.append(f"{pad}if not ({check}):")
+            out.append(f"{pad}    _err({errs}, {path}, 'type', {('must be ' + ' or '.join(types))!r})")
+
+        if "enum" in schema:
+            handled.add("enum")
+            options = schema["enum"]
+            message = repr("must be one of: " + ", ".join(json.dumps(o, ensure_ascii=False) for o in options))
+            if all(isinstance(o, str) for o in options):
+                name = self._const(frozenset(options))
+                out.append(f"{pad}if not (isinstance({v}, str) and {v} in {name}):")
+            else:
+                name = self._const(tuple(options))
+                out.append(f"{pad}if not _in_enum({v}, {name}):")
+            out.append(f"{pad}    _err({errs}, {path}, 'enum', {message})")
+
+        if "const" in schema:
+            handled.add("const")
+            name = self._const(schema["const"])
+            out.append(f"{pad}if not _json_equal({v}, {name}):")
+            out.append(f"{pad}    _err({errs}, {path}, 'const', {('must equal ' + json.dumps(schema['const']))!r})")
+
+        self._gen_object(schema, uri, v, path, errs, out, depth, handled)
+        self._gen_array(schema, uri, v, path, errs, out, depth, handled)
+        self._gen_string(schema, v, path, errs, out, depth, handled)
+        self._gen_number(schema, v, path, errs, out, depth, handled)
+        self._gen_combinators(schema, uri, v, path, errs, out, depth, handled)
+
+        unknown = sorted(set(schema) - handled)
+        if unknown:
+            raise ValueError(f"Unsupported schema keyword(s) in {uri}: {', '.join(unknown)}")
+
+    def _gen_object(self, schema, uri, v, path, errs, out, depth, handled) -> None:
+        keys = {"required", "properties", "patternProperties", "additionalProperties", "minProperties", "maxProperties"}
+        present = keys & set(schema)
+        if not present:
+            return
+        handled.update(present)
+        pad = "    " * depth
+        inner = pad + "    "
+        out.append(f"{pad}if isinstance({v}, dict):")
+        start = len(out)
+
+        for key in schema.get("required", []):
+            out.append(f"{inner}if {key!r} not in {v}:")
+            out.append(f"{inner}    _err({errs}, {path}, 'required', {('missing required property ' + repr(key))!r})")
+        if "minProperties" in schema:
+            out.append(f"{inner}if len({v}) < {int(schema['minProperties'])}:")
+            out.append(f"{inner}    _err({errs}, {path}, 'minProperties', 'too few properties')")
+        if "maxProperties" in schema:
+            out.append(f"{inner}if len({v}) > {int(schema['maxProperties'])}:")
+            out.append(f"{inner}    _err({errs}, {path}, 'maxProperties', 'too many properties')")
+
+        for key, sub in schema.get("properties", {}).items():
+            if sub is True or sub == {}:
+                continue
+            item = self._var("p")
+            out.append(f"{inner}if {key!r} in {v}:")
+            out.append(f"{inner}    {item} = {v}[{key!r}]")
+            self._gen(sub, uri, item, f"({path} + _ptr({key!r}))", errs, out, depth + 2)
+
+        patterns = schema.get("patternProperties", {})
+        additional = schema.get("additionalProperties", True)
+        if patterns or additional is not True:
+            known = self._const(frozenset(schema.get("properties", {})))
+            regexes = {p: self._const_regex(p) for p in patterns}
+            key_var = self._var("k")
+            val_var = self._var("x")
+            matched = self._var("m")
+            out.append(f"{inner}for {key_var}, {val_var} in {v}.items():")
+            out.append(f"{inner}    {matched} = {key_var} in {known}")
+            for pattern, regex in regexes.items():
+                out.append(f"{inner}    if {regex}.search({key_var}):")
+                out.append(f"{inner}        {matched} = True")
+                self._gen(patterns[pattern], uri, val_var, f"({path} + _ptr({key_var}))", errs, out, depth + 3)
+            if additional is False:
+                out.append(f"{inner}    if not {matched}:")
+                out.append(
+                    f"{inner}        _err({errs}, {path} + _ptr({key_var}), 'additionalProperties', "
+                    f"'property ' + repr({key_var}) + ' is not allowed')"
+                )
+            elif additional is not True:
+                out.append(f"{inner}    if not {matched}:")
+                self._gen(additional, uri, val_var, f"({path} + _ptr({key_var}))", errs, out, depth + 3)
+
+        if len(out) == start:
+            out.append(f"{inner}pass")
+
+    def _const_regex(self, pattern: str) -> str:
+        name = f"_R{len(self._constants)}"
+        self._constants.append(f"{name} = re.compile({pattern!r})")
+        return name
+
+    def _gen_array(self, schema, uri, v, path, errs, out, depth, handled) -> None:
+        keys = {"items", "prefixItems", "minItems", "maxItems", "uniqueItems"}
+        present = keys & set(schema)
+        if not present:
+            return
+        handled.update(present)
+        pad = "    " * depth
+        inner = pad + "    "
+        out.append(f"{pad}if isinstance({v}, list):")
+        start = len(out)
+
+        if "minItems" in schema:
+            out.append(f"{inner}if len({v}) < {int(schema['minItems'])}:")
+            out.append(f"{inner}    _err({errs}, {path}, 'minItems', 'too few items')")
+        if "maxItems" in schema:
+            out.append(f"{inner}if len({v}) > {int(schema['maxItems'])}:")
+            out.append(f"{inner}    _err({errs}, {path}, 'maxItems', 'too many items')")
+        if schema.get("uniqueItems"):
+            out.append(f"{inner}if any(_json_equal(a, b) for i, a in enumerate({v}) for b in {v}[i + 1:]):")
+            out.append(f"{inner}    _err({errs}, {path}, 'uniqueItems', 'items must be unique')")
+
+        prefix = schema.get("prefixItems", [])
+        for index, sub in enumerate(prefix):
+            item = self._var("p")
+            out.append(f"{inner}if len({v}) > {index}:")
+            out.append(f"{inner}    {item} = {v}[{index}]")
+            self._gen(sub, uri, item, f"({path} + '/{index}')", errs, out, depth + 2)
+
+        items = schema.get("items", True)
+        if items is not True and items != {}:
+            index_var = self._var("i")
+            item = self._var("x")
+            source = f"{v}[{len(prefix)}:]" if prefix else v
+            out.append(f"{inner}for {index_var}, {item} in enumerate({source}, {len(prefix)}):")
+            body_start = len(out)
+            self._gen(items, uri, item, f"({path} + '/' + str({index_var}))", errs, out, depth + 2)
+            if len(out) == body_start:
+                out.append(f"{inner}    pass")
+
+        if len(out) == start:
+            out.append(f"{inner}pass")
+
+    def _gen_string(self, schema, v, path, errs, out, depth, handled) -> None:
+        keys = {"minLength", "maxLength", "pattern", "format"}
+        present = keys & set(schema)
+        if not present:
+            return
+        handled.update(present)
+        pad = "    " * depth
+        inner = pad + "    "
+        out.append(f"{pad}if isinstance({v}, str):")
+        if "minLength" in schema:
+            out.append(f"{inner}if len({v}) < {int(schema['minLength'])}:")
+            out.append(f"{inner}    _err({errs}, {path}, 'minLength', 'string is too short')")
+        if "maxLength" in schema:
+            out.append(f"{inner}if len({v}) > {int(schema['maxLength'])}:")
+            out.append(f"{inner}    _err({errs}, {path}, 'maxLength', 'string is too long')")
+        if "pattern" in schema:
+            regex = self._const_regex(schema["pattern"])
+            out.append(f"{inner}if not {regex}.search({v}):")
+            out.append(f"{inner}    _err({errs}, {path}, 'pattern', {('must match ' + schema['pattern'])!r})")
+        fmt = schema.get("format")
+        # Unknown formats are annotations only (JSON Schema 2020-12 default).
+        if fmt in _ASSERTED_FORMATS:
+            out.append(f"{inner}if not _FORMATS[{fmt!r}].match({v}):")
+            out.append(f"{inner}    _err({errs}, {path}, 'format', {('must be a valid ' + fmt)!r})")
+        if out[-1] == f"{pad}if isinstance({v}, str):":
+            out.append(f"{inner}pass")
+
+    def _gen_number(self, schema, v, path, errs, out, depth, handled) -> None:
+        bounds = {
+            "minimum": ("<", "must be >= {}"),
+            "maximum": (">", "must be <= {}"),
+            "exclusiveMinimum": ("<=", "must be > {}"),
+            "exclusiveMaximum": (">=", "must be < {}"),
+        }
+        present = (set(bounds) | {"multipleOf"}) & set(schema)
+        if not present:
+            return
+        handled.update(present)
+        pad = "    " * depth
+        inner = pad + "    "
+        out.append(f"{pad}if isinstance({v}, (int, float)) and not isinstance({v}, bool):")
+        for keyword, (op, message) in bounds.items():
+            if keyword in schema:
+                limit = schema[keyword]
+                out.append(f"{inner}if {v} {op} {limit!r}:")
+                out.append(f"{inner}    _err({errs}, {path}, {keyword!r}, {message.format(limit)!r})")
+        if "multipleOf" in schema:
+            step = schema["multipleOf"]
+            out.append(f"{inner}if not _multiple_of({v}, {step!r}):")
+            out.append(f"{inner}    _err({errs}, {path}, 'multipleOf', {('must be a multiple of ' + str(step))!r})")
+
+    def _gen_combinators(self, schema, uri, v, path, errs, out, depth, handled) -> None:
+        pad = "    " * depth
+
+        for sub in schema.get("allOf", []):
+            self._gen(sub, uri, v, path, errs, out, depth)
+        if "allOf" in schema:
+            handled.add("allOf")
+
+        if "anyOf" in schema:
+            handled.add("anyOf")
+            ok = self._var("ok")
+            out.append(f"{pad}{ok} = False")
+            for sub in schema["anyOf"]:
+                branch = self._var("b")
+                out.append(f"{pad}if not {ok}:")
+                out.append(f"{pad}    {branch} = []")
+                self._gen(sub, uri, v, path, branch, out, depth + 1)
+                out.append(f"{pad}    {ok} = not {branch}")
+            out.append(f"{pad}if not {ok}:")
+            out.append(f"{pad}    _err({errs}, {path}, 'anyOf', 'must match at least one allowed shape')")
+
+        if "oneOf" in schema:
+            handled.add("oneOf")
+            hits = self._var("n")
+            out.append(f"{pad}{hits} = 0")
+            for sub in schema["oneOf"]:
+                branch = self._var("b")
+                out.append(f"{pad}{branch} = []")
+                self._gen(sub, uri, v, path, branch, out, depth)
+                out.append(f"{pad}{hits} += not {branch}")
+            out.append(f"{pad}if {hits} != 1:")
+            out.append(f"{pad}    _err({errs}, {path}, 'oneOf', 'must match exactly one allowed shape')")
+
+        if "not" in schema:
+            handled.add("not")
+            branch = self._var("b")
+            out.append(f"{pad}{branch} = []")
+            self._gen(schema["not"], uri, v, path, branch, out, depth)
+            out.append(f"{pad}if not {branch}:")
+            out.append(f"{pad}    _err({errs}, {path}, 'not', 'must not match the forbidden shape')")
+
+        if "if" in schema:
+            handled.update({"if", "then", "else"})
+            branch = self._var("b")
+            out.append(f"{pad}{branch} = []")
+            self._gen(schema["if"], uri, v, path, branch, out, depth)
+            out.append(f"{pad}if not {branch}:")
+            start = len(out)
+            self._gen(schema.get("then", True), uri, v, path, errs, out, depth + 1)
+            if len(out) == start:
+                out.append(f"{pad}    pass")
+            out.append(f"{pad}else:")
+            start = len(out)
+            self._gen(schema.get("else", True), uri, v, path, errs, out, depth + 1)
+            if len(out) == start:
+                out.append(f"{pad}    pass")
+
+
+@dataclass(frozen=True)
+class CompiledValidator:
+    schema_id: str
+    cache_key: str
+    source: str = field(repr=False)
+    _validate: Callable[[Any], list[dict[str, str]]] = field(repr=False, compare=False)
+
+    def errors(self, document: Any) -> list[dict[str, str]]:
+        return self._validate(document)
+
+    def is_valid(self, document: Any) -> bool:
+        return not self._validate(document)
+
+    def check(self, document: Any) -> None:
+        errors = self._validate(document)
+        if errors:
+            raise SchemaValidationError(self.schema_id, errors)
+
+
+def _load_source(source: str, origin: str) -> Callable[[Any], list[dict[str, str]]]:
+    namespace: dict[str, Any] = {"__name__": "rivo_schema_validator"}
+    exec(compile(source, origin, "exec"), namespace)  # noqa: S102 - generated by _Compiler
+    return namespace["validate"]
+
+
+_MEMO: dict[tuple[str, str, str], CompiledValidator] = {}
+
+
+def compile_validator(
+    schema: str,
+    *,
+    schemas_dir: Path = SCHEMAS_DIR,
+    cache_dir: Path | None = DEFAULT_CACHE_DIR,
+    registry: SchemaRegistry | None = None,
+) -> CompiledValidator:
+    """
+    Return a compiled validator for `schema` (`$id`, file name or short name).
+
+    Generated code is cached in-process and, unless cache_dir is None, on disk
+    as `<cache_dir>/<sha256>.py`, keyed by the schema and every schema it
+    references, so editing any referenced schema recompiles.
+    """
+    registry = registry or SchemaRegistry(schemas_dir)
+    root_uri = registry.resolve_name(schema)
+    key = registry.cache_key(root_uri)
+    memo_key = (root_uri, key, str(cache_dir))
+    if memo_key in _MEMO:
+        return _MEMO[memo_key]
+
+    cached = cache_dir / f"{key}.py" if cache_dir is not None else None
+    source = None
+    if cached is not None and cached.exists():
+        source = cached.read_text(encoding="utf-8")
+    if source is None:
+        source = _Compiler(registry).compile(root_uri)
+        if cached is not None:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cached.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(source, encoding="utf-8")
+            os.replace(tmp, cached)
+
+    validator = CompiledValidator(
+        schema_id=root_uri,
+        cache_key=key,
+        source=source,
+        _validate=_load_source(source, str(cached or f"<schema {root_uri}>")),
+    )
+    _MEMO[memo_key] = validator
+    return validator
+
+
+def error_envelope(errors: list[dict[str, str]]) -> dict[str, Any]:
+    """ErrorEnvelope (contracts/schemas/error-envelope.schema.json) for schema violations."""
+    first = errors[0]
+    return {
+        "code": "schema_validation_failed",
+        "message": f"{len(errors)} schema violation(s); first at {first['path']}: {first['message']}",
+        "details": {"errors": errors[:MAX_ENVELOPE_ERRORS], "errorCount": len(errors)},
+    }
+
+
+def _validate_line(validator: CompiledValidator, line_no: int, text: str | bytes) -> dict[str, Any]:
+    try:
+        document = json_io.loads(text)
+    except ValueError as e:
+        return {"line": line_no, "valid": False, "error": {"code": "invalid_json", "message": str(e), "details": {}}}
+    errors = validator.errors(document)
+    if errors:
+        return {"line": line_no, "valid": False, "error": error_envelope(errors)}
+    return {"line": line_no, "valid": True}
+
+
+_WORKER_VALIDATOR: CompiledValidator | None = None
+
+
+def _init_worker(schema: str, schemas_dir: str, cache_dir: str | None) -> None:
+    global _WORKER_VALIDATOR
+    _WORKER_VALIDATOR = compile_validator(
+        schema,
+        schemas_dir=Path(schemas_dir),
+        cache_dir=Path(cache_dir) if cache_dir else None,
+    )
+
+
+def _validate_batch(batch: list[tuple[int, str | bytes]]) -> list[dict[str, Any]]:
+    assert _WORKER_VALIDATOR is not None
+    return [_validate_line(_WORKER_VALIDATOR, line_no, text) for line_no, text in batch]
+
+
+def _iter_batches(lines: Iterable[str | bytes], batch_size: int) -> Iterator[list[tuple[int, str | bytes]]]:
+    batch: list[tuple[int, str | bytes]] = []
+    for line_no, raw in enumerate(lines, 1):
+        if not raw.strip():
+            continue
+        batch.append((line_no, raw))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def validate_ndjson(
+    lines: Iterable[str | bytes],
+    schema: str,
+    *,
+    schemas_dir: Path = SCHEMAS_DIR,
+    cache_dir: Path | None = DEFAULT_CACHE_DIR,
+    workers: int | None = None,
+    batch_size: int = 256,
+) -> Iterator[dict[str, Any]]:
+    """
+    Validate an NDJSON stream, yielding `{"line", "valid"[, "error"]}` per
+    document in input order. With workers > 1 batches run on a process pool;
+    at most 2 * workers batches are in flight, so memory stays bounded.
+    """
+    validator = compile_validator(schema, schemas_dir=schemas_dir, cache_dir=cache_dir)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1:
+        for batch in _iter_batches(lines, batch_size):
+            for line_no, text in batch:
+                yield _validate_line(validator, line_no, text)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(validator.schema_id, str(schemas_dir), str(cache_dir) if cache_dir else None),
+    ) as pool:
+        in_flight: list[Future[list[dict[str, Any]]]] = []
+        for batch in _iter_batches(lines, batch_size):
+            in_flight.append(pool.submit(_validate_batch, batch))
+            if len(in_flight) >= 2 * workers:
+                yield from in_flight.pop(0).result()
+        for future in in_flight:
+            yield from future.result()
+
+
+def _validate_file(path: str, schema: str, schemas_dir: str, cache_dir: str | None) -> list[dict[str, str]]:
+    validator = compile_validator(
+        schema, schemas_dir=Path(schemas_dir), cache_dir=Path(cache_dir) if cache_dir else None
+    )
+    data = json_io.load_path(Path(path))
+    return [error for document in (data if isinstance(data, list) else [data]) for error in validator.errors(document)]
+
+
+def validate_files(
+    jobs: Mapping[Path, str],
+    *,
+    schemas_dir: Path = SCHEMAS_DIR,
+    cache_dir: Path | None = DEFAULT_CACHE_DIR,
+    workers: int | None = None,
+) -> dict[Path, list[dict[str, str]]]:
+    """
+    Validate each file against its schema (`{path: schema}`) on a process
+    pool and return `{path: errors}`; a top-level array is validated item by
+    item. Validators are compiled here first, so workers load them from cache_dir.
+    """
+    registry = SchemaRegistry(schemas_dir)
+    for schema in set(jobs.values()):
+        compile_validator(schema, schemas_dir=schemas_dir, cache_dir=cache_dir, registry=registry)
+    args = (str(schemas_dir), str(cache_dir) if cache_dir else None)
+    if workers is None:
+        workers = min(len(jobs), os.cpu_count() or 1)
+    if workers <= 1:
+        return {path: _validate_file(str(path), schema, *args) for path, schema in jobs.items()}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {path: pool.submit(_validate_file, str(path), schema, *args) for path, schema in jobs.items()}
+        return {path: future.result() for path, future in futures.items()}
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Validate JSON documents against contracts/schemas with compiled validators.")
+    parser.add_argument("schema", help="Schema $id, file name or short name (e.g. configuration-snapshot).")
+    parser.add_argument("inputs", nargs="*", default=["-"], help="Input files ('-' for stdin).")
+    parser.add_argument("--ndjson", action="store_true", help="Treat inputs as NDJSON streams (one document per line).")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size for --ndjson. Default: CPU count.")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the on-disk validator cache.")
+    add_profile_option(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv or sys.argv[1:])
+    with profiled(args.profile, "schema_validator"):
+        cache_dir = None if args.no_cache else DEFAULT_CACHE_DIR
+
+        try:
+            validator = compile_validator(args.schema, cache_dir=cache_dir)
+        except Exception as exc:  # noqa: BLE001
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+
+        ok = True
+        for name in args.inputs:
+            handle = sys.stdin.buffer if name == "-" else open(name, "rb")
+            try:
+                if args.ndjson:
+                    results: Iterable[dict[str, Any]] = validate_ndjson(
+                        handle, args.schema, cache_dir=cache_dir, workers=args.workers
+                    )
+                else:
+                    data = json_io.loads(handle.read())
+                    documents = data if isinstance(data, list) else [data]
+                    results = (
+                        {"index": i, "valid": True} if not errs else {"index": i, "valid": False, "error": error_envelope(errs)}
+                        for i, errs in enumerate(validator.errors(doc) for doc in documents)
+                    )
+                for result in results:
+                    ok = ok and result["valid"]
+                    json_io.print_json({"input": name, **result}, pretty=False)
+            finally:
+                if handle is not sys.stdin.buffer:
+                    handle.close()
+
+        return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
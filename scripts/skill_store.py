@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import errno
+import hashlib
+import os
+import shutil
+import stat
+from pathlib import Path
+from typing import Iterable
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_STORE_DIR = REPO_ROOT / ".cache/skill-blobs"
+
+LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+
+_FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+# Errors meaning "this filesystem/pair of paths cannot do that", not real I/O failures.
+_UNSUPPORTED = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.EINVAL, errno.ENOTTY, errno.EOPNOTSUPP, errno.ENOSYS}
+# Every blob is stamped with this mtime when stored; a write to the blob moves it.
+BLOB_MTIME_NS = 0
+
+
+def _sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    import fcntl
+
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            dst.unlink()
+            raise
+
+
+class BlobStore:
+    """
+    Content-addressed file store: `<root>/<sha[:2]>/<sha>` (`.x` suffix for
+    executables, since linked files share one mode). Blobs are read-only so a
+    hardlinked file cannot be edited in place and corrupt the store, and carry
+    a fixed mtime (BLOB_MTIME_NS) so an edit that gets past the mode (root, a
+    chmod) is still noticed: such a blob is neither reused nor trusted.
+
+    `materialize` places a blob at a destination by reflink, then hardlink,
+    then plain copy, remembering which methods the filesystem rejected.
+    """
+
+    def __init__(self, root: Path = DEFAULT_STORE_DIR, link_mode: str = "auto") -> None:
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"Unknown link mode: {link_mode} (expected one of: {', '.join(LINK_MODES)})")
+        self.root = Path(root)
+        self.link_mode = link_mode
+        self._reflink_ok = link_mode in ("auto", "reflink")
+        self._hardlink_ok = link_mode in ("auto", "hardlink")
+        self.stats = {"reflink": 0, "hardlink": 0, "copy": 0, "stored": 0, "reused": 0}
+
+    def path_for(self, digest: str, executable: bool = False) -> Path:
+        return self.root / digest[:2] / (digest + (".x" if executable else ""))
+
+    def put(self, source: Path) -> tuple[str, bool]:
+        """Store `source` unless an identical blob exists; returns (sha256, executable)."""
+        executable = bool(source.stat().st_mode & stat.S_IXUSR)
+        digest = _sha256_file(source)
+        blob = self.path_for(digest, executable)
+        if self._intact(blob):
+            self.stats["reused"] += 1
+            return digest, executable
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp = blob.with_name(f".{blob.name}.{os.getpid()}.tmp")
+        shutil.copyfile(source, tmp)
+        # The copy may race with an edit of the source; store what was actually copied.
+        actual = _sha256_file(tmp)
+        if actual != digest:
+            digest, blob = actual, self.path_for(actual, executable)
+            blob.parent.mkdir(parents=True, exist_ok=True)
+        os.chmod(tmp, 0o555 if executable else 0o444)
+        os.utime(tmp, ns=(BLOB_MTIME_NS, BLOB_MTIME_NS))
+        os.replace(tmp, blob)
+        self.stats["stored"] += 1
+        return digest, executable
+
+    @staticmethod
+    def _intact(blob: Path) -> bool:
+        try:
+            return blob.stat().st_mtime_ns == BLOB_MTIME_NS
+        except OSError:
+            return False
+
+    def materialize(self, digest: str, executable: bool, dest: Path) -> str:
+        blob = self.path_for(digest, executable)
+        if self._reflink_ok:
+            try:
+                _reflink(blob, dest)
+                os.chmod(dest, 0o755 if executable else 0o644)
+                self.stats["reflink"] += 1
+                return "reflink"
+            except (OSError, ImportError) as e:
+                if isinstance(e, OSError) and e.errno not in _UNSUPPORTED:
+                    raise
+                self._reflink_ok = False
+        if self._hardlink_ok:
+            try:
+                os.link(blob, dest)
+                self.stats["hardlink"] += 1
+                return "hardlink"
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+                self._hardlink_ok = False
+        if self.link_mode not in ("auto", "copy"):
+            raise OSError(errno.EOPNOTSUPP, f"{self.link_mode} is not supported for {dest}")
+        shutil.copyfile(blob, dest)
+        os.chmod(dest, 0o755 if executable else 0o644)
+        self.stats["copy"] += 1
+        return "copy"
+
+    def is_linked(self, path: Path, digest: str) -> bool:
+        """
+        True if `path` is a hardlink of the blob and the blob still has the
+        mtime it was stored with, so its content is known without hashing.
+        """
+        try:
+            st = path.stat()
+        except OSError:
+            return False
+        if st.st_mtime_ns != BLOB_MTIME_NS:
+            return False
+        for executable in (False, True):
+            try:
+                blob_st = self.path_for(digest, executable).stat()
+            except OSError:
+                continue
+            if (st.st_ino, st.st_dev) == (blob_st.st_ino, blob_st.st_dev):
+                return True
+        return False
+
+    def gc(self, referenced: Iterable[str]) -> list[Path]:
+        """
+        Remove blobs whose digest is not in `referenced`, and shard directories
+        left empty. Run it while nothing is publishing: a blob stored for a
+        manifest that is not written yet looks unreferenced. Returns the removed
+        blobs.
+        """
+        keep = set(referenced)
+        removed: list[Path] = []
+        if not self.root.is_dir():
+            return removed
+        for shard in sorted(self.root.iterdir()):
+            if not shard.is_dir():
+                continue
+            for blob in sorted(shard.iterdir()):
+                if blob.name.startswith(".") or blob.name.removesuffix(".x") in keep:
+                    continue  # in-flight `.tmp` files belong to a running put
+                blob.unlink()
+                removed.append(blob)
+            try:
+                shard.rmdir()
+            except OSError:
+                pass  # not empty
+        return removed
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+from active_set_lib import parse_active_skills_md, sync_active_set
+from skill_store import BlobStore
+
+# inotify(7) constants
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+DEFAULT_DEBOUNCE_S = 0.2
+DEFAULT_POLL_INTERVAL_S = 0.5
+
+
+def _ignored(path: Path) -> bool:
+    # Same exclusions as sha256_tree, plus editor swap/backup files.
+    name = path.name
+    return "__pycache__" in path.parts or name.endswith((".pyc", ".swp", "~")) or name.startswith(".#")
+
+
+class PollingWatcher:
+    """Stat-polling fallback: diffs (mtime_ns, size, inode) snapshots of the roots."""
+
+    def __init__(self, roots: Iterable[Path], interval: float = DEFAULT_POLL_INTERVAL_S) -> None:
+        self.roots = [Path(r) for r in roots]
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int, int]]:
+        snapshot: dict[Path, tuple[int, int, int]] = {}
+        for root in self.roots:
+            paths = [root] if root.is_file() else (p for p in root.rglob("*") if p.is_file())
+            for path in paths:
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                snapshot[path] = (st.st_mtime_ns, st.st_size, st.st_ino)
+        return snapshot
+
+    def read(self, timeout: float) -> set[Path]:
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._scan()
+        previous, self._snapshot = self._snapshot, snapshot
+        return {p for p in previous.keys() | snapshot.keys() if previous.get(p) != snapshot.get(p)}
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    Linux inotify via libc. Directories are watched recursively (new
+    subdirectories are added as they appear); a file root is watched through
+    its parent directory because editors usually replace files by rename.
+    """
+
+    def __init__(self, roots: Iterable[Path]) -> None:
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, Path] = {}
+        self.roots = [Path(r) for r in roots]
+        try:
+            for root in self.roots:
+                if root.is_dir():
+                    self._watch_tree(root)
+                else:
+                    self._watch(root.parent)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if directory.exists():
+                raise OSError(err, f"inotify_add_watch failed: {directory}")
+            return
+        self._dirs[wd] = directory
+
+    def _watch_tree(self, root: Path) -> None:
+        self._watch(root)
+        for path in root.rglob("*"):
+            if path.is_dir():
+                self._watch(path)
+
+    def read(self, timeout: float) -> set[Path]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: set[Path] = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, size = _EVENT_HEADER.unpack_from(data, offset)
+            raw_name = data[offset + _EVENT_HEADER.size : offset + _EVENT_HEADER.size + size].rstrip(b"\0")
+            offset += _EVENT_HEADER.size + size
+
+            if mask & _IN_Q_OVERFLOW:
+                changed.update(self.roots)  # events were lost: treat everything as changed
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & _IN_IGNORED:
+                del self._dirs[wd]
+                continue
+            path = directory / os.fsdecode(raw_name) if raw_name else directory
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                try:
+                    self._watch_tree(path)
+                except OSError:
+                    pass  # watch limit reached; the directory event itself still triggers a resync
+            # Siblings of a watched file are reported too; callers map paths
+            # to what they care about and drop the rest.
+            changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def open_watcher(roots: Iterable[Path], *, use_inotify: bool | None = None, interval: float = DEFAULT_POLL_INTERVAL_S):
+    roots = list(roots)
+    if use_inotify is None:
+        use_inotify = sys.platform.startswith("linux")
+    if use_inotify:
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError):
+            pass  # no inotify (non-Linux libc, exhausted watch limit): fall back to polling
+    return PollingWatcher(roots, interval)
+
+
+def watch_active_set(
+    *,
+    repo_root: Path,
+    active_md: Path,
+    dest_dir: Path,
+    on_sync: Callable[[dict], None] | None = None,
+    stop: threading.Event | None = None,
+    debounce: float = DEFAULT_DEBOUNCE_S,
+    use_inotify: bool | None = None,
+    interval: float = DEFAULT_POLL_INTERVAL_S,
+    store: BlobStore | None = None,
+) -> None:
+    """
+    Keep `dest_dir` and its manifest in sync with ACTIVE_SKILLS.md and the
+    source skill directories until `stop` is set.
+
+    Events are collected until `debounce` seconds pass without new ones; then
+    only the skills whose files changed are re-hashed and, if their content
+    differs from the manifest, re-copied. An edit to ACTIVE_SKILLS.md re-reads
+    the skill list and re-creates the watches.
+    """
+    stop = stop or threading.Event()
+    store = store or BlobStore()
+    active_md = active_md.resolve()
+
+    def report(result: dict) -> None:
+        if on_sync is not None:
+            on_sync(result)
+
+    def resync(names: Iterable[str] | None) -> None:
+        # A half-edited skill (e.g. SKILL.md briefly missing) must not end the watch.
+        try:
+            result = sync_active_set(
+                repo_root=repo_root, active_md=active_md, dest_dir=dest_dir, names=names, store=store
+            )
+        except (OSError, ValueError) as e:
+            result = {"republished": [], "removed": [], "manifest": None, "error": str(e)}
+        report(result)
+
+    resync(None)
+    specs: dict[str, Path] = {}
+    while not stop.is_set():
+        # ACTIVE_SKILLS.md may be mid-save or briefly gone (editors replace it by
+        # rename); keep watching the last good skill list until it is readable again.
+        try:
+            specs = {spec.name: spec.source_dir for spec in parse_active_skills_md(active_md)}
+        except (OSError, ValueError) as e:
+            report({"republished": [], "removed": [], "manifest": None, "error": str(e)})
+        watcher = open_watcher([active_md, *specs.values()], use_inotify=use_inotify, interval=interval)
+        try:
+            pending: set[Path] = set()
+            deadline = None
+            while not stop.is_set():
+                timeout = interval if deadline is None else max(0.0, deadline - time.monotonic())
+                changed = {p for p in watcher.read(timeout) if not _ignored(p)}
+                if changed:
+                    pending |= changed
+                    deadline = time.monotonic() + debounce
+                    continue
+                if deadline is None or time.monotonic() < deadline:
+                    continue
+
+                if active_md in pending:
+                    resync(None)
+                    break  # skill list may have changed: rebuild the watches
+                names = {
+                    name
+                    for name, source_dir in specs.items()
+                    if any(p == source_dir or p.is_relative_to(source_dir) for p in pending)
+                }
+                pending.clear()
+                deadline = None
+                if names:
+                    resync(names)
+        finally:
+            watcher.close()
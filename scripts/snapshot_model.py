@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import json_io
+
+# Typed view of contracts/schemas/configuration-snapshot.schema.json and
+# structure-graph.schema.json. Field names follow the schema properties
+# (snake_case); tests/unit/test_snapshot_model.py keeps them in sync.
+
+
+@dataclass(slots=True)
+class Dimensions:
+    width: int | None
+    height: int | None
+    depth: int | None
+
+
+@dataclass(slots=True)
+class GraphNode:
+    id: str
+    kind: str | None
+    article: str | None
+    geom: dict[str, Any] | None
+    transform: dict[str, Any] | None
+
+
+@dataclass(slots=True)
+class GraphEdge:
+    source: str
+    target: str
+    type: str | None
+
+
+@dataclass(slots=True)
+class GraphMember:
+    id: str
+    source: str
+    target: str
+    type: str | None
+
+
+@dataclass(slots=True)
+class StructureGraph:
+    id: str | None
+    root_node: str | None
+    nodes: tuple[GraphNode, ...]
+    members: tuple[GraphMember, ...]
+    edges: tuple[GraphEdge, ...]
+    supports: tuple[dict[str, Any], ...]
+    fasteners: tuple[dict[str, Any], ...]
+    metadata: dict[str, Any]
+
+
+@dataclass(slots=True)
+class ConfigurationSnapshot:
+    state_id: str | None
+    dimensions: Dimensions
+    selected_options: dict[str, Any]
+    derived_values: dict[str, Any]
+    structure_graph: StructureGraph | None
+    graph: StructureGraph | None
+    bom: tuple[dict[str, Any], ...]
+    calculated_price: dict[str, Any] | None
+    validation_state: list[Any] | dict[str, Any] | None
+    version_tag: dict[str, str]
+
+
+EMPTY_GRAPH = StructureGraph(
+    id=None,
+    root_node=None,
+    nodes=(),
+    members=(),
+    edges=(),
+    supports=(),
+    fasteners=(),
+    metadata={},
+)
+
+
+def _int_or_none(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _dict_or_none(value: Any) -> dict[str, Any] | None:
+    return value if isinstance(value, dict) else None
+
+
+def _str_or_none(value: Any) -> str | None:
+    return None if value is None else str(value)
+
+
+def _dicts(value: Any) -> tuple[dict[str, Any], ...]:
+    if not isinstance(value, list):
+        return ()
+    return tuple(item for item in value if isinstance(item, dict))
+
+
+def _decode_graph(value: Any) -> StructureGraph | None:
+    if not isinstance(value, dict):
+        return None
+
+    raw_nodes = value.get("nodes")
+    node_dicts = (
+        [v for v in raw_nodes.values() if isinstance(v, dict)] if isinstance(raw_nodes, dict) else _dicts(raw_nodes)
+    )
+    nodes = tuple(
+        GraphNode(
+            id=str(n.get("id", "")),
+            kind=_str_or_none(n.get("kind")),
+            article=_str_or_none(n.get("article")),
+            geom=_dict_or_none(n.get("geom")),
+            transform=_dict_or_none(n.get("transform")),
+        )
+        for n in node_dicts
+    )
+    members = tuple(
+        GraphMember(
+            id=str(m.get("id", "")),
+            source=str(m.get("from", "")),
+            target=str(m.get("to", "")),
+            type=_str_or_none(m.get("type")),
+        )
+        for m in _dicts(value.get("members"))
+    )
+    edges = tuple(
+        GraphEdge(
+            source=str(e.get("from", "")),
+            target=str(e.get("to", "")),
+            type=_str_or_none(e.get("type")),
+        )
+        for e in _dicts(value.get("edges"))
+    )
+    return StructureGraph(
+        id=_str_or_none(value.get("id")),
+        root_node=_str_or_none(value.get("rootNode")),
+        nodes=nodes,
+        members=members,
+        edges=edges,
+        supports=_dicts(value.get("supports")),
+        fasteners=_dicts(value.get("fasteners")),
+        metadata=_dict_or_none(value.get("metadata")) or {},
+    )
+
+
+def decode_snapshot(data: Any) -> ConfigurationSnapshot:
+    """
+    Normalize a parsed ConfigurationSnapshot in one pass.
+
+    Malformed members degrade to None/empty instead of raising, matching the
+    lenient behaviour exporters had when checking shapes at each access.
+    """
+    if isinstance(data, ConfigurationSnapshot):
+        return data
+    if not isinstance(data, dict):
+        raise ValueError("snapshot_data must be a dictionary")
+
+    dimensions = data.get("dimensions") if isinstance(data.get("dimensions"), dict) else {}
+    validation_state = data.get("validationState")
+    version_tag = data.get("versionTag") if isinstance(data.get("versionTag"), dict) else {}
+    return ConfigurationSnapshot(
+        state_id=_str_or_none(data.get("stateId")),
+        dimensions=Dimensions(
+            width=_int_or_none(dimensions.get("width")),
+            height=_int_or_none(dimensions.get("height")),
+            depth=_int_or_none(dimensions.get("depth")),
+        ),
+        selected_options=_dict_or_none(data.get("selectedOptions")) or {},
+        derived_values=_dict_or_none(data.get("derivedValues")) or {},
+        structure_graph=_decode_graph(data.get("structureGraph")),
+        graph=_decode_graph(data.get("graph")),
+        bom=_dicts(data.get("bom")),
+        calculated_price=_dict_or_none(data.get("calculatedPrice")),
+        validation_state=validation_state if isinstance(validation_state, (list, dict)) else None,
+        version_tag={str(k): str(v) for k, v in version_tag.items()},
+    )
+
+
+def parse_snapshot_bytes(raw: bytes) -> ConfigurationSnapshot:
+    """Parse JSON bytes with the fastest installed json_io backend and decode them."""
+    with json_io.gc_paused():
+        return decode_snapshot(json_io.loads(raw))
+
+
+def load_snapshot(path: Path) -> ConfigurationSnapshot:
+    with json_io.gc_paused():
+        return decode_snapshot(json_io.load_path(path))
@@ -3,12 +3,14 @@
 from __future__ import annotations
 
 import argparse
-import json
+import asyncio
+import copy
+import math
 import os
-import subprocess
 import sys
+import time
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable
 from uuid import uuid4
 
 SCRIPT_DIR = Path(__file__).resolve().parent
@@ -27,13 +29,27 @@ if SRC_DIR is None:
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from active_set_lib import parse_active_skills_md, publish_active_set, sha256_tree
+from active_set_lib import gc_blob_store, parse_active_skills_md, publish_active_set, published_tree_hash
+from budget_ledger import DIMENSIONS, BudgetLedger, downgrade_complexity, utc_day
+from check_graph import FAIL, SKIP, Check, CheckContext, run_checks
+from doc_index import retrieve
+from hedged_router import AllModelsFailed, Budget, HttpProviderClient, LatencyTracker, hedged_complete, provider_api_key
+from json_io import load_path, print_json
+from memory_wal import MemoryResult, WalMemoryStore
+from profiling import add_profile_option, profiled
+from provider_health import ProviderHealth, model_tiers
+from route_cache import DEFAULT_CACHE_PATH, ROUTE_CONFIG_FILES, config_fingerprint, route_key, shared_cache
+from router_config import load_router_config
+from skill_store import LINK_MODES, BlobStore
+from skill_watch import watch_active_set
+from tool_pool import ToolCall, ToolPool
+from tracing import DEFAULT_TRACE_DIR, event, get_tracer, iter_spans, span, summarize
+from triage_rules import guess_complexity, guess_task_type
 from agent_os.agent_runtime import AgentRuntime
-from agent_os.contracts import AgentInput, MemoryStoreInput, ModelRouteInput, RetrieverInput, ToolInput
+from agent_os.contracts import AgentInput, MemoryStoreInput, ModelRouteInput, ToolInput
 from agent_os.memory_store import MemoryStore
 from agent_os.model_router import ModelRouter
 from agent_os.observability import emit_event
-from agent_os.retriever import Retriever
 from agent_os.tool_runner import ToolRunner
 
 
@@ -43,97 +59,11 @@ def _repo_root() -> Path:
 
 def _load_json(path: Path) -> Any:
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        return load_path(path)
     except Exception as e:
         raise ValueError(f"Invalid JSON: {path}: {e}") from e
 
 
-def _strip_yaml_comment(line: str) -> str:
-    in_single = False
-    in_double = False
-    out: list[str] = []
-    for ch in line:
-        if ch == "'" and not in_double:
-            in_single = not in_single
-        elif ch == '"' and not in_single:
-            in_double = not in_double
-        if ch == "#" and not in_single and not in_double:
-            break
-        out.append(ch)
-    return "".join(out).rstrip()
-
-
-def _parse_simple_yaml(yaml_text: str) -> dict:
-    """
-    Minimal YAML subset parser for our router config:
-    - mappings via `key: value` or `key:`
-    - lists via `- item`
-    - scalar values: strings/ints
-    """
-    cleaned_lines: list[tuple[int, str]] = []
-    for raw in yaml_text.splitlines():
-        raw = _strip_yaml_comment(raw)
-        if not raw.strip():
-            continue
-        indent = len(raw) - len(raw.lstrip(" "))
-        cleaned_lines.append((indent, raw.lstrip(" ")))
-
-    root: dict[str, Any] = {}
-    stack: list[tuple[int, Any]] = [(0, root)]
-
-    def current_container() -> Any:
-        return stack[-1][1]
-
-    for idx, (indent, line) in enumerate(cleaned_lines):
-
-        while len(stack) > 1 and indent < stack[-1][0]:
-            stack.pop()
-
-        container = current_container()
-
-        if line.startswith("- "):
-            item = line[2:].strip()
-            if not isinstance(container, list):
-                raise ValueError("YAML structure error: list item in non-list container")
-            container.append(_coerce_scalar(item))
-            continue
-
-        if ":" not in line:
-            raise ValueError(f"YAML syntax error: {line}")
-
-        key, rest = line.split(":", 1)
-        key = key.strip()
-        rest = rest.strip()
-
-        if not isinstance(container, dict):
-            raise ValueError("YAML structure error: key/value in non-dict container")
-
-        if rest == "":
-            nested: Any = {}
-            if idx + 1 < len(cleaned_lines):
-                next_indent, next_line = cleaned_lines[idx + 1]
-                if next_indent > indent and next_line.startswith("- "):
-                    nested = []
-            container[key] = nested
-            stack.append((indent + 2, container[key]))
-        else:
-            container[key] = _coerce_scalar(rest)
-
-    return root
-
-
-def _coerce_scalar(value: str) -> Any:
-    if value.isdigit():
-        return int(value)
-    if (value.startswith('"') and value.endswith('"')) or (value.startswith("'") and value.endswith("'")):
-        return value[1:-1]
-    if value.lower() == "true":
-        return True
-    if value.lower() == "false":
-        return False
-    return value
-
-
 def _routing_lookup_model_tier(model_routing: dict, task_type: str, complexity: str) -> str:
     for row in model_routing.get("routing", []):
         if row.get("task_type") == task_type and row.get("complexity") == complexity:
@@ -156,12 +86,78 @@ def _default_budgets(repo_root: Path, complexity: str) -> tuple[int, float]:
     return token_budget, cost_budget
 
 
-def cmd_publish_skills(_: argparse.Namespace) -> int:
+def _budget_complexity(
+    repo_root: Path, model_routing: dict, task_type: str, complexity: str
+) -> tuple[str, tuple[int, float] | None, dict | None]:
+    """
+    Route as a lower complexity (and so a cheaper tier) when today's spend in
+    the budget ledger leaves no room under budgets.daily for a worst-case run
+    of the requested one. Returns (complexity to route as, (tokens, usd) left
+    today or None, downgrade details or None).
+    """
+    budgets = _load_json(repo_root / "configs/tooling/model_providers.json").get("budgets", {})
+    with BudgetLedger() as ledger:
+        remaining = ledger.remaining_today(budgets.get("daily") or {})
+    routable = [row.get("complexity") for row in model_routing.get("routing", []) if row.get("task_type") == task_type]
+    routed = downgrade_complexity(budgets.get("per_complexity", {}), complexity, remaining, routable)
+    if routed == complexity:
+        return complexity, remaining, None
+    return routed, remaining, {
+        "from_complexity": complexity,
+        "to_complexity": routed,
+        "from_tier": _routing_lookup_model_tier(model_routing, task_type, complexity),
+        "to_tier": _routing_lookup_model_tier(model_routing, task_type, routed),
+        "remaining_tokens": remaining[0],
+        "remaining_cost_usd": round(remaining[1], 6),
+    }
+
+
+def cmd_publish_skills(args: argparse.Namespace) -> int:
     repo_root = _repo_root()
     active_md = repo_root / "configs/skills/ACTIVE_SKILLS.md"
     dest_dir = repo_root / ".agent/skills"
-    publish_active_set(repo_root=repo_root, active_md=active_md, dest_dir=dest_dir)
-    print("OK: published active skills")
+    store = BlobStore(link_mode=getattr(args, "link_mode", "auto"))
+    publish_active_set(repo_root=repo_root, active_md=active_md, dest_dir=dest_dir, store=store)
+    linked = ", ".join(f"{k}={v}" for k, v in store.stats.items() if v)
+    print(f"OK: published active skills ({linked})")
+    return 0
+
+
+def cmd_gc_skills(args: argparse.Namespace) -> int:
+    repo_root = _repo_root()
+    try:
+        removed = gc_blob_store([repo_root / ".agent/skills"])
+    except (OSError, ValueError) as e:
+        print(f"error: cannot read the skills manifest ({e}); run publish-skills first", file=sys.stderr)
+        return 1
+    print(f"OK: removed {len(removed)} unreferenced blob(s)")
+    return 0
+
+
+def cmd_watch(args: argparse.Namespace) -> int:
+    repo_root = _repo_root()
+
+    def report(result: dict) -> None:
+        if result.get("error"):
+            print(f"error: {result['error']}", file=sys.stderr)
+        for name in result["republished"]:
+            print(f"OK: republished {name}", flush=True)
+        for name in result["removed"]:
+            print(f"OK: removed {name}", flush=True)
+
+    print("Watching active skills (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        watch_active_set(
+            repo_root=repo_root,
+            active_md=repo_root / "configs/skills/ACTIVE_SKILLS.md",
+            dest_dir=repo_root / ".agent/skills",
+            on_sync=report,
+            debounce=args.debounce,
+            use_inotify=False if args.poll else None,
+            interval=args.interval,
+        )
+    except KeyboardInterrupt:
+        pass
     return 0
 
 
@@ -173,9 +169,20 @@ def _iter_skill_dirs(agent_skills_dir: Path) -> Iterable[Path]:
             yield p
 
 
-def cmd_doctor(_: argparse.Namespace) -> int:
-    repo_root = _repo_root()
+def _skill_hash_check(name: str, skill_dir: Path, expected_hash: Any, files: Any) -> Check:
+    def run(ctx: CheckContext) -> None:
+        if not skill_dir.exists():
+            ctx.fail(f"Missing published skill dir: {skill_dir}")
+            return
+        # Hardlinked files are verified against the manifest's per-file hashes without re-reading them.
+        actual_hash = published_tree_hash(skill_dir, files if isinstance(files, dict) else None)
+        if expected_hash != actual_hash:
+            ctx.fail(f"Hash mismatch for {name}: manifest={expected_hash} actual={actual_hash}")
 
+    return Check(f"skill:{name}", run)
+
+
+def _doctor_checks(repo_root: Path) -> list[Check]:
     active_md = repo_root / "configs/skills/ACTIVE_SKILLS.md"
     model_routing_path = repo_root / "configs/tooling/model_routing.json"
     mcp_profiles_path = repo_root / "configs/tooling/mcp_profiles.json"
@@ -184,58 +191,42 @@ def cmd_doctor(_: argparse.Namespace) -> int:
     agent_skills_dir = repo_root / ".agent/skills"
     manifest_path = agent_skills_dir / ".active_set_manifest.json"
 
-    failures: list[str] = []
+    def json_config(path: Path) -> Callable[[CheckContext], Any]:
+        def run(ctx: CheckContext) -> Any:
+            if not path.exists():
+                ctx.fail(f"Missing: {path}")
+                return None
+            return _load_json(path)
 
-    for p in [active_md, model_routing_path, mcp_profiles_path, model_providers_path, router_yaml_path]:
-        if not p.exists():
-            failures.append(f"Missing: {p}")
+        return run
 
-    model_routing = None
-    mcp_profiles = None
-    if model_routing_path.exists():
-        try:
-            model_routing = _load_json(model_routing_path)
-        except Exception as e:
-            failures.append(str(e))
+    def check_providers(ctx: CheckContext) -> None:
+        providers = ctx.inputs["model_providers"]
+        if providers is not None and providers.get("provider_topology") not in {"hybrid", "gateway-only", "direct-only"}:
+            ctx.fail("model_providers.json: invalid provider_topology")
 
-    if mcp_profiles_path.exists():
+    def check_router_yaml(ctx: CheckContext) -> None:
+        if not router_yaml_path.exists():
+            ctx.fail(f"Missing: {router_yaml_path}")
+            return
         try:
-            mcp_profiles = _load_json(mcp_profiles_path)
+            load_router_config(router_yaml_path)
         except Exception as e:
-            failures.append(str(e))
-
-    if model_providers_path.exists():
-        try:
-            providers = _load_json(model_providers_path)
-            if providers.get("provider_topology") not in {"hybrid", "gateway-only", "direct-only"}:
-                failures.append("model_providers.json: invalid provider_topology")
-        except Exception as e:
-            failures.append(str(e))
-
-    if router_yaml_path.exists():
-        try:
-            data = _parse_simple_yaml(router_yaml_path.read_text(encoding="utf-8"))
-            tiers = data.get("tiers")
-            if not isinstance(tiers, dict):
-                raise ValueError("model_router.yaml: missing `tiers` mapping")
-            for tier in ("reasoning", "quality", "light"):
-                if tier not in tiers:
-                    raise ValueError(f"model_router.yaml: missing tiers.{tier}")
-                models = tiers[tier].get("models") if isinstance(tiers[tier], dict) else None
-                if not isinstance(models, list) or not models:
-                    raise ValueError(f"model_router.yaml: tiers.{tier}.models must be a non-empty list")
-        except Exception as e:
-            failures.append(f"Invalid YAML: {router_yaml_path}: {e}")
-
-    warnings: list[str] = []
-    if not os.getenv("OPENROUTER_API_KEY"):
-        warnings.append("Missing env var: OPENROUTER_API_KEY")
-
-    if not agent_skills_dir.exists():
-        failures.append(f"Missing directory: {agent_skills_dir}")
-    elif not manifest_path.exists():
-        failures.append(f"Missing manifest: {manifest_path} (run publish-skills)")
-    else:
+            ctx.fail(f"Invalid YAML: {router_yaml_path}: {e}")
+
+    def check_env(ctx: CheckContext) -> None:
+        if not os.getenv("OPENROUTER_API_KEY"):
+            ctx.warn("Missing env var: OPENROUTER_API_KEY")
+
+    def check_manifest(ctx: CheckContext) -> None:
+        if not active_md.exists():
+            ctx.fail(f"Missing: {active_md}")
+        if not agent_skills_dir.exists():
+            ctx.fail(f"Missing directory: {agent_skills_dir}")
+            return
+        if not manifest_path.exists():
+            ctx.fail(f"Missing manifest: {manifest_path} (run publish-skills)")
+            return
         try:
             manifest = _load_json(manifest_path)
             expected = {s.name for s in parse_active_skills_md(active_md)}
@@ -243,249 +234,83 @@ def cmd_doctor(_: argparse.Namespace) -> int:
             missing = sorted(expected - published)
             extra = sorted(published - expected)
             if missing:
-                failures.append(f"Manifest missing skills: {', '.join(missing)}")
+                ctx.fail(f"Manifest missing skills: {', '.join(missing)}")
             if extra:
-                failures.append(f"Manifest has extra skills: {', '.join(extra)}")
+                ctx.fail(f"Manifest has extra skills: {', '.join(extra)}")
 
+            # Tree hashes are the expensive part; each skill is its own check.
             for row in manifest.get("skills", []):
                 name = row.get("name")
-                expected_hash = row.get("sha256_tree")
-                skill_dir = agent_skills_dir / str(name)
-                if not skill_dir.exists():
-                    failures.append(f"Missing published skill dir: {skill_dir}")
-                    continue
-                actual_hash = sha256_tree(skill_dir)
-                if expected_hash != actual_hash:
-                    failures.append(f"Hash mismatch for {name}: manifest={expected_hash} actual={actual_hash}")
+                ctx.spawn(
+                    _skill_hash_check(str(name), agent_skills_dir / str(name), row.get("sha256_tree"), row.get("files"))
+                )
 
             actual_dirs = {p.name for p in _iter_skill_dirs(agent_skills_dir)}
             if actual_dirs - expected:
-                failures.append(f"Extra directories in .agent/skills: {', '.join(sorted(actual_dirs - expected))}")
+                ctx.fail(f"Extra directories in .agent/skills: {', '.join(sorted(actual_dirs - expected))}")
         except Exception as e:
-            failures.append(f"Manifest invalid: {e}")
+            ctx.fail(f"Manifest invalid: {e}")
+
+    def check_routing(ctx: CheckContext) -> None:
+        model_routing = ctx.inputs["model_routing"]
+        mcp_profiles = ctx.inputs["mcp_profiles"]
+        if model_routing and mcp_profiles:
+            try:
+                _routing_lookup_model_tier(model_routing, "T2", "C1")
+                _routing_lookup_mcp_profile(mcp_profiles, "T6", "C3")
+            except Exception as e:
+                ctx.fail(f"Routing sanity failed: {e}")
+
+    return [
+        Check("model_routing", json_config(model_routing_path)),
+        Check("mcp_profiles", json_config(mcp_profiles_path)),
+        Check("model_providers", json_config(model_providers_path)),
+        Check("provider_topology", check_providers, deps=("model_providers",)),
+        Check("router_yaml", check_router_yaml),
+        Check("env", check_env),
+        Check("manifest", check_manifest),
+        Check("routing_sanity", check_routing, deps=("model_routing", "mcp_profiles")),
+    ]
 
-    if model_routing and mcp_profiles:
-        try:
-            _routing_lookup_model_tier(model_routing, "T2", "C1")
-            _routing_lookup_mcp_profile(mcp_profiles, "T6", "C3")
-        except Exception as e:
-            failures.append(f"Routing sanity failed: {e}")
 
-    if warnings:
-        for w in warnings:
-            print(f"WARN: {w}", file=sys.stderr)
+def cmd_doctor(args: argparse.Namespace) -> int:
+    as_json = bool(getattr(args, "json", False))
+    started = time.perf_counter()
+    results = []
 
-    if failures:
-        for f in failures:
+    for result in run_checks(
+        _doctor_checks(_repo_root()),
+        workers=getattr(args, "jobs", None),
+        fail_fast=bool(getattr(args, "fail_fast", False)),
+    ):
+        results.append(result)
+        if as_json or result.status == SKIP:
+            continue
+        for w in result.warnings:
+            print(f"WARN: {w}", file=sys.stderr)
+        for f in result.failures:
             print(f"FAIL: {f}", file=sys.stderr)
-        return 2
 
-    print("OK: doctor passed")
-    return 0
-
-
-def _guess_task_type(text: str) -> str:
-    t = text.lower()
-    error_signals = [
-        "ошибка",
-        "error",
-        "exception",
-        "исключ",
-        "stack trace",
-        "падает",
-        "fail",
-        "failing",
-        "слом",
-        "не работает",
-        "lint",
-        "опечат",
-        "typo",
-    ]
-    if any(s in t for s in error_signals):
-        return "T2"
-
-    payment_signals = ["payments", "оплат", "платеж", "stars", "звезд", "ton", "тон", "ton connect"]
-    if any(s in t for s in payment_signals):
-        return "T7"
-
-    buckets = {
-        "T7": [
-            "telegram",
-            "телеграм",
-            "mini app",
-            "миниапп",
-            "miniapp",
-            "бот",
-            "bot",
-            "stars",
-            "звезд",
-            "ton",
-            "тон",
-            "ton connect",
-            "payments",
-            "оплат",
-            "платеж",
-            "webapp",
-            "мини апп",
-        ],
-        "T6": [
-            "ui",
-            "ux",
-            "theme",
-            "layout",
-            "animation",
-            "color",
-            "typography",
-            "design",
-            "дизайн",
-            "интерфейс",
-            "верстк",
-            "анимац",
-            "цвет",
-            "типограф",
-            "тема",
-        ],
-        "T1": [
-            ".env",
-            "dependencies",
-            "зависимост",
-            "package.json",
-            "config",
-            "конфиг",
-            "настрой",
-            "tsconfig",
-            "pyproject",
-            "docker",
-            "ci",
-        ],
-        "T2": [
-            "bug",
-            "баг",
-            "error",
-            "ошибка",
-            "fail",
-            "падает",
-            "failing",
-            "stack trace",
-            "exception",
-            "исключ",
-            "lint",
-            "typo",
-            "опечат",
-            "broken",
-            "слом",
-            "не работает",
-            "исправ",
-        ],
-        "T3": [
-            "feature",
-            "фича",
-            "endpoint",
-            "эндпоинт",
-            "api",
-            "component",
-            "компонент",
-            "screen",
-            "экран",
-            "implement",
-            "реализ",
-            "add",
-            "добав",
-            "сделай",
-        ],
-        "T4": [
-            "architecture",
-            "архитектур",
-            "refactor",
-            "рефактор",
-            "migration",
-            "миграц",
-            "redesign",
-            "system design",
-            "new project",
-            "новый проект",
-        ],
-        "T5": [
-            "analyze",
-            "анализ",
-            "compare",
-            "сравни",
-            "choose",
-            "выбери",
-            "investigate",
-            "исслед",
-            "research",
-            "ресерч",
-        ],
-    }
-    scores: dict[str, int] = {k: 0 for k in buckets}
-    for key, words in buckets.items():
-        for w in words:
-            if w in t:
-                scores[key] += 2
-    best_score = max(scores.values()) if scores else 0
-    if best_score == 0:
-        return "T3"
-
-    order = ["T7", "T6", "T4", "T1", "T2", "T3", "T5"]
-    for k in order:
-        if scores.get(k, 0) == best_score:
-            return k
-    return "T3"
-
-
-def _guess_complexity(text: str) -> str:
-    t = text.lower()
-    if any(
-        k in t
-        for k in [
-            "security",
-            "безопасн",
-            "production",
-            "прод",
-            "infra",
-            "инфра",
-            "token",
-            "токен",
-            "rotate key",
-            "pci",
-        ]
-    ):
-        return "C5"
-    if any(k in t for k in ["payments", "оплат", "платеж", "auth", "авторизац", "логин"]):
-        return "C4"
-    if any(k in t for k in ["экран", "screen"]) and any(
-        k in t for k in ["telegram", "телеграм", "mini app", "миниапп", "ui", "ux", "интерфейс"]
-    ):
-        return "C3"
-    if any(
-        k in t
-        for k in [
-            "migration",
-            "миграц",
-            "refactor",
-            "рефактор",
-            "architecture",
-            "архитектур",
-            "cross-domain",
-            "breaking change",
-        ]
-    ):
-        return "C4"
-    if any(k in t for k in ["test", "тест", "integration", "интеграц", "e2e", "multiple files", "3-10 files"]):
-        return "C3"
-    if any(
-        k in t
-        for k in ["typo", "опечат", "readme", "ридми", "copy", "rename", "<50 lines", "one file", "1 file", "один файл"]
-    ):
-        return "C1"
-    return "C2"
+    ok = not any(r.status == FAIL for r in results)
+    if as_json:
+        print_json(
+            {
+                "status": "pass" if ok else "fail",
+                "wall_ms": round((time.perf_counter() - started) * 1000.0, 3),
+                "checks": [r.to_dict() for r in results],
+            }
+        )
+    elif ok:
+        print("OK: doctor passed")
+    return 0 if ok else 2
 
 
 def _task_complexity_from_args(args: argparse.Namespace, text_field: str = "text") -> tuple[str, str]:
     text = getattr(args, text_field, "") or ""
-    task_type = getattr(args, "task_type", None) or _guess_task_type(text)
-    complexity = getattr(args, "complexity", None) or _guess_complexity(text)
+    with span("triage") as current:
+        task_type = getattr(args, "task_type", None) or guess_task_type(text)
+        complexity = getattr(args, "complexity", None) or guess_complexity(text)
+        current.set(task_type=task_type, complexity=complexity)
     return task_type, complexity
 
 
@@ -494,8 +319,7 @@ def cmd_triage(args: argparse.Namespace) -> int:
     model_routing = _load_json(repo_root / "configs/tooling/model_routing.json")
     mcp_profiles = _load_json(repo_root / "configs/tooling/mcp_profiles.json")
 
-    task_type = args.task_type or _guess_task_type(args.text)
-    complexity = args.complexity or _guess_complexity(args.text)
+    task_type, complexity = _task_complexity_from_args(args)
     model_tier = _routing_lookup_model_tier(model_routing, task_type, complexity)
     mcp_profile = _routing_lookup_mcp_profile(mcp_profiles, task_type, complexity)
 
@@ -505,7 +329,7 @@ def cmd_triage(args: argparse.Namespace) -> int:
         "model_tier": model_tier,
         "mcp_profile": mcp_profile,
     }
-    print(json.dumps(result, indent=2, ensure_ascii=False))
+    print_json(result)
     return 0
 
 
@@ -514,61 +338,305 @@ def cmd_route(args: argparse.Namespace) -> int:
     model_routing = _load_json(repo_root / "configs/tooling/model_routing.json")
     mcp_profiles = _load_json(repo_root / "configs/tooling/mcp_profiles.json")
 
-    task_type = args.task_type or _guess_task_type(args.text)
-    complexity = args.complexity or _guess_complexity(args.text)
+    task_type, complexity = _task_complexity_from_args(args)
+    routed_complexity, _, downgrade = _budget_complexity(repo_root, model_routing, task_type, complexity)
 
-    default_token, default_cost = _default_budgets(repo_root, complexity)
+    default_token, default_cost = _default_budgets(repo_root, routed_complexity)
     token_budget = int(args.token_budget or default_token)
     cost_budget = float(args.cost_budget or default_cost)
 
     route_input = ModelRouteInput(
         task_type=task_type,
-        complexity=complexity,
+        complexity=routed_complexity,
         token_budget=token_budget,
         cost_budget=cost_budget,
         preferred_models=list(args.preferred_model or []),
     )
 
-    router = ModelRouter(repo_root=repo_root)
-    route_output = router.route(
-        route_input,
-        mode=args.mode,
-        unavailable_models=set(args.unavailable_model or []),
-    )
+    health = None if args.ignore_health else ProviderHealth()
+    unavailable = _unavailable_models(args, health)
+    route = _route(repo_root, args, route_input, unavailable)
 
     mcp_profile = _routing_lookup_mcp_profile(mcp_profiles, task_type, complexity)
-    model_tier = _routing_lookup_model_tier(model_routing, task_type, complexity)
+    model_tier = _routing_lookup_model_tier(model_routing, task_type, routed_complexity)
 
-    payload = route_output.to_dict()
+    payload = _rank_route(repo_root, health, route, args.preferred_model)
+    payload["unavailable_models"] = sorted(unavailable)
     payload["mcp_profile"] = mcp_profile
     payload["model_tier"] = model_tier
     payload["task_type"] = task_type
     payload["complexity"] = complexity
+    if downgrade is not None:
+        payload["budget_downgrade"] = downgrade
 
-    emit_event("route_decision", payload)
-    print(json.dumps(payload, indent=2, ensure_ascii=False))
+    event("route_decision", payload)
+    print_json(payload)
     return 0
 
 
-def cmd_run(args: argparse.Namespace) -> int:
+def cmd_budget(args: argparse.Namespace) -> int:
+    budgets = _load_json(_repo_root() / "configs/tooling/model_providers.json").get("budgets", {})
+    with BudgetLedger() as ledger:
+        remaining = ledger.remaining_today(budgets.get("daily") or {})
+        report = {
+            "day": utc_day(time.time()),
+            "total": ledger.spend().to_dict(),
+            "remaining_today": None
+            if remaining is None
+            else {"tokens": remaining[0], "cost_usd": round(remaining[1], 6)},
+            "by": args.by,
+            "spend": {key: spend.to_dict() for key, spend in ledger.spend_by(args.by).items()},
+        }
+    print_json(report)
+    return 0
+
+
+_PROVIDER_COLUMNS = [
+    ("model", "MODEL"),
+    ("tier", "TIER"),
+    ("state", "STATE"),
+    ("p50_ms", "P50_MS"),
+    ("p95_ms", "P95_MS"),
+    ("latency_ewma_ms", "EWMA_MS"),
+    ("error_rate", "ERR"),
+    ("usd_per_1k", "USD/1K"),
+    ("samples", "N"),
+    ("retry_in_s", "RETRY_S"),
+]
+
+
+def _print_table(rows: list[dict], columns: list[tuple[str, str]]) -> None:
+    cells = [[title for _, title in columns]]
+    cells += [["-" if row[key] is None else str(row[key]) for key, _ in columns] for row in rows]
+    widths = [max(len(line[i]) for line in cells) for i in range(len(columns))]
+    for line in cells:
+        print("  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip())
+
+
+def cmd_providers(args: argparse.Namespace) -> int:
     repo_root = _repo_root()
+    tiers = model_tiers(_load_json(repo_root / "configs/tooling/model_providers.json"))
+    while True:
+        rows = ProviderHealth().table(tiers, tiers)
+        if args.json:
+            print_json({"providers": rows})
+        else:
+            _print_table(rows, _PROVIDER_COLUMNS)
+        if not args.watch:
+            return 0
+        try:
+            time.sleep(args.watch)
+        except KeyboardInterrupt:
+            return 0
+        print()
 
-    task_type = args.task_type or _guess_task_type(args.objective)
-    complexity = args.complexity or _guess_complexity(args.objective)
-    default_token, default_cost = _default_budgets(repo_root, complexity)
 
-    router = ModelRouter(repo_root=repo_root)
-    route_output = router.route(
-        ModelRouteInput(
-            task_type=task_type,
-            complexity=complexity,
-            token_budget=int(args.token_budget or default_token),
-            cost_budget=float(args.cost_budget or default_cost),
-            preferred_models=list(args.preferred_model or []),
-        ),
+ROUTE_CACHE_MODES = ("disk", "memory", "off")
+
+
+def _route(
+    repo_root: Path, args: argparse.Namespace, route_input: ModelRouteInput, unavailable: set[str]
+) -> dict:
+    """
+    ModelRouter.route() as a dict, memoized per input tuple and config
+    fingerprint (route_cache.RouteCache); hit/miss counters go to a route_cache event.
+    """
+
+    def compute() -> dict:
+        router = ModelRouter(repo_root=repo_root)
+        return router.route(route_input, mode=args.mode, unavailable_models=unavailable).to_dict()
+
+    mode = getattr(args, "route_cache", "disk")
+    if mode == "off":
+        with span("route", cache="off"):
+            return compute()
+    cache = shared_cache(DEFAULT_CACHE_PATH if mode == "disk" else None)
+    # The router's own source counts as config: a new agent-os build must not reuse old routes.
+    router_src = getattr(sys.modules.get("agent_os.model_router"), "__file__", None)
+    config_paths = [repo_root / p for p in ROUTE_CONFIG_FILES] + ([Path(router_src)] if router_src else [])
+    key = route_key(
+        task_type=route_input.task_type,
+        complexity=route_input.complexity,
+        token_budget=route_input.token_budget,
+        cost_budget=route_input.cost_budget,
+        preferred=route_input.preferred_models,
+        unavailable=unavailable,
         mode=args.mode,
-        unavailable_models=set(args.unavailable_model or []),
+        fingerprint=config_fingerprint(config_paths),
     )
+    with span("route", cache=mode) as current:
+        route = cache.get(key)
+        hit = route is not None
+        if route is None:
+            route = compute()
+            cache.put(key, route)
+        current.set(hit=hit)
+    event("route_cache", {"hit": hit, **cache.stats()})
+    return copy.deepcopy(route)
+
+
+_TRACE_COLUMNS = [
+    ("span", "SPAN"),
+    ("count", "N"),
+    ("errors", "ERR"),
+    ("p50_ms", "P50_MS"),
+    ("p95_ms", "P95_MS"),
+    ("p99_ms", "P99_MS"),
+    ("max_ms", "MAX_MS"),
+]
+
+
+def cmd_trace(args: argparse.Namespace) -> int:
+    trace_dir = Path(args.dir) if args.dir else get_tracer().trace_dir or DEFAULT_TRACE_DIR
+    since_ns = int((time.time() - args.since) * 1e9) if args.since else 0
+    rows = summarize(iter_spans(sorted(trace_dir.glob("spans.*"))), since_ns=since_ns)
+    if args.span:
+        rows = [row for row in rows if row["span"].startswith(args.span)]
+    if args.json:
+        print_json({"trace_dir": str(trace_dir), "spans": rows})
+    elif rows:
+        _print_table(rows, _TRACE_COLUMNS)
+    else:
+        print(f"No spans recorded in {trace_dir}", file=sys.stderr)
+    return 0
+
+
+def _unavailable_models(args: argparse.Namespace, health: ProviderHealth | None) -> set[str]:
+    """--unavailable-model values plus every model whose circuit breaker is open."""
+    unavailable = set(args.unavailable_model or [])
+    if health is not None:
+        unavailable |= health.unavailable()
+    return unavailable
+
+
+def _rank_route(repo_root: Path, health: ProviderHealth | None, route: dict, pinned: Iterable[str]) -> dict:
+    """Reorder primary_model + fallback_chain within each tier by observed p50 latency and cost."""
+    chain = [m for m in [route.get("primary_model"), *(route.get("fallback_chain") or [])] if m]
+    if health is None or not chain:
+        return route
+    tiers = model_tiers(_load_json(repo_root / "configs/tooling/model_providers.json"))
+    ranked = health.rank(chain, tiers, pinned=pinned or ())
+    if ranked == chain:
+        return route
+    return {
+        **route,
+        "primary_model": ranked[0],
+        "fallback_chain": ranked[1:],
+        "route_reason": f"{route.get('route_reason')}; reordered by provider health",
+    }
+
+
+def _hedged_completion(
+    repo_root: Path,
+    args: argparse.Namespace,
+    route: dict,
+    tier: str,
+    token_budget: int,
+    cost_budget: float,
+    health: ProviderHealth,
+) -> dict:
+    """Send the objective to the routed models with hedging (see hedged_router.hedged_complete)."""
+    client = HttpProviderClient(
+        args.provider_url, api_key=provider_api_key(args.provider_url), model_prefix="openrouter/"
+    )
+    tracker = LatencyTracker()
+    models = [route.get("primary_model"), *(route.get("fallback_chain") or [])]
+    try:
+        result = asyncio.run(
+            hedged_complete(
+                [m for m in models if m],
+                args.objective,
+                client=client,
+                tier=tier,
+                max_output_tokens=int(route.get("max_output_tokens") or 2000),
+                budget=Budget(token_budget, cost_budget),
+                timeout_s=load_router_config(repo_root / ".agent/config/model_router.yaml").timeout_for(tier, 60.0),
+                tracker=tracker,
+            )
+        )
+    except AllModelsFailed as e:
+        result, error = e.result, str(e)
+    else:
+        error = None
+    finally:
+        tracker.save()
+
+    for attempt in result.attempts:
+        if attempt.status == "won":
+            completion = result.completion
+            health.record_success(
+                attempt.model,
+                attempt.latency_ms / 1000.0,
+                tokens=completion.input_tokens + completion.output_tokens,
+                cost_usd=completion.cost_usd,
+            )
+        elif attempt.status == "failed" or (attempt.status == "cancelled" and attempt.error == "timed out"):
+            health.record_failure(attempt.model, attempt.error)
+    health.save()
+    return result.to_dict() if error is None else {"error": error, **result.to_dict()}
+
+
+class _AgentOsMemory:
+    """agent-os's MemoryStore as the store of record behind the run-memory WAL (a memory_wal.MemoryBackend)."""
+
+    def __init__(self, repo_root: Path) -> None:
+        self._store = MemoryStore(repo_root)
+
+    def _operate(self, op: str, key: str, payload: dict) -> dict[str, Any]:
+        return self._store.operate(MemoryStoreInput(op=op, key=key, payload=payload)).to_dict()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        out = self._operate("read", key, {})
+        ids = out.get("memory_ids") or []
+        return {"id": ids[0], "key": key, "payload": (out.get("result") or {}).get("payload")} if ids else None
+
+    def search(self, prefix: str) -> list[dict[str, Any]]:
+        out = self._operate("search", prefix, {})
+        items = (out.get("result") or {}).get("items") or []
+        return [
+            {"id": memory_id, "key": item.get("key"), "payload": item.get("payload")}
+            for memory_id, item in zip(out.get("memory_ids") or [], items)
+        ]
+
+    def apply(self, records: list[dict[str, Any]]) -> None:
+        for record in {r["key"]: r for r in records}.values():
+            self._operate("write", record["key"], record["payload"])
+
+    def close(self) -> None:
+        pass
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    repo_root = _repo_root()
+
+    task_type, complexity = _task_complexity_from_args(args, "objective")
+    model_routing = _load_json(repo_root / "configs/tooling/model_routing.json")
+    routed_complexity, remaining, downgrade = _budget_complexity(repo_root, model_routing, task_type, complexity)
+    tier = _routing_lookup_model_tier(model_routing, task_type, routed_complexity)
+    default_token, default_cost = _default_budgets(repo_root, routed_complexity)
+    token_budget = int(args.token_budget or default_token)
+    cost_budget = float(args.cost_budget or default_cost)
+
+    health = ProviderHealth()
+    route_input = ModelRouteInput(
+        task_type=task_type,
+        complexity=routed_complexity,
+        token_budget=token_budget,
+        cost_budget=cost_budget,
+        preferred_models=list(args.preferred_model or []),
+    )
+    route = _route(repo_root, args, route_input, _unavailable_models(args, None if args.ignore_health else health))
+    if not args.ignore_health:
+        route = _rank_route(repo_root, health, route, args.preferred_model)
+
+    completion = None
+    if args.provider_url:
+        # Never let one run spend more than is left of today's budget.
+        hedge_tokens, hedge_cost = token_budget, cost_budget
+        if remaining is not None:
+            hedge_tokens, hedge_cost = min(hedge_tokens, remaining[0]), min(hedge_cost, remaining[1])
+        with span("completion", tier=tier):
+            completion = _hedged_completion(repo_root, args, route, tier, hedge_tokens, hedge_cost, health)
 
     runtime = AgentRuntime()
     run_id = str(uuid4())
@@ -581,41 +649,53 @@ def cmd_run(args: argparse.Namespace) -> int:
             "verify",
             "report",
         ],
-        route_decision=route_output.to_dict(),
+        route_decision=route,
     )
     output = runtime.run(agent_input)
 
-    retriever = Retriever(repo_root)
-    retrieval = retriever.query(
-        RetrieverInput(
-            query=args.objective,
-            sources=["docs", "configs"],
-            max_chunks=3,
-            freshness="workspace",
-        )
-    )
-
-    memory = MemoryStore(repo_root)
-    memory_write = memory.operate(
-        MemoryStoreInput(
-            op="write",
-            key=f"run:{run_id}",
-            payload={
+    # Refreshes .cache/doc-index for files edited since the last run, then queries it.
+    with span("retrieval"):
+        retrieval = retrieve(args.objective, sources=["docs", "configs", "research"], max_chunks=3, repo_root=repo_root)
+
+    # Logged to this run's own WAL segment, then checkpointed into agent-os's
+    # MemoryStore by close(); runs in other processes do not wait on it.
+    memory_key = f"run:{run_id}"
+    with span("memory_write"), WalMemoryStore(
+        repo_root / ".cache/memory-wal", backend=_AgentOsMemory(repo_root)
+    ) as memory:
+        memory_id = memory.write(
+            memory_key,
+            {
                 "objective": args.objective,
-                "route": route_output.to_dict(),
+                "route": route,
                 "status": output.status,
             },
+        ).result()
+    memory_write = MemoryResult({"key": memory_key, "status": "committed"}, [memory_id])
+
+    with BudgetLedger() as ledger:
+        ledger.append(
+            run_id=run_id,
+            task_type=task_type,
+            complexity=complexity,
+            tier=tier,
+            model=(completion or {}).get("model") or route.get("primary_model"),
+            tokens=(completion or {}).get("spent_tokens", 0),
+            cost_usd=(completion or {}).get("spent_cost_usd", 0.0),
         )
-    )
 
     payload = {
         "run_id": run_id,
-        "route": route_output.to_dict(),
+        "route": route,
         "agent": output.to_dict(),
-        "retrieval": retrieval.to_dict(),
+        "retrieval": retrieval,
         "memory_write": memory_write.to_dict(),
     }
-    print(json.dumps(payload, ensure_ascii=False, indent=2))
+    if completion is not None:
+        payload["completion"] = completion
+    if downgrade is not None:
+        payload["budget_downgrade"] = downgrade
+    print_json(payload)
     return 0
 
 
@@ -623,7 +703,7 @@ def cmd_smoke(_: argparse.Namespace) -> int:
     repo_root = _repo_root()
     report: dict[str, Any] = {"checks": []}
 
-    doctor_code = cmd_doctor(argparse.Namespace())
+    doctor_code = cmd_doctor(argparse.Namespace(json=False, fail_fast=False, jobs=None))
     report["checks"].append({"name": "doctor", "ok": doctor_code == 0, "code": doctor_code})
 
     try:
@@ -645,59 +725,81 @@ def cmd_smoke(_: argparse.Namespace) -> int:
     tool_out = tool.run(ToolInput(tool_name="echo", args=["smoke-ok"], mode="read", correlation_id="smoke"))
     report["checks"].append({"name": "tool_runner", "ok": tool_out.exit_code == 0, "stdout": tool_out.stdout.strip()})
 
-    retriever = Retriever(repo_root)
-    retrieval = retriever.query(RetrieverInput(query="Agent OS", sources=["docs"], max_chunks=1, freshness="workspace"))
-    report["checks"].append({"name": "retriever", "ok": len(retrieval.chunks) >= 0, "retrieval_ms": retrieval.retrieval_ms})
+    try:
+        with span("retrieval"):
+            retrieval = retrieve("Agent OS", sources=["docs"], max_chunks=1, repo_root=repo_root)
+        report["checks"].append({"name": "retriever", "ok": True, "retrieval_ms": retrieval["retrieval_ms"]})
+    except (OSError, ValueError) as e:
+        report["checks"].append({"name": "retriever", "ok": False, "error": str(e)})
 
     ok = all(bool(c.get("ok")) for c in report["checks"]) and doctor_code == 0
     report["status"] = "pass" if ok else "fail"
-    print(json.dumps(report, ensure_ascii=False, indent=2))
+    print_json(report)
     return 0 if ok else 2
 
 
 def cmd_contracts(_: argparse.Namespace) -> int:
     repo_root = _repo_root()
     contracts = _load_json(repo_root / "configs/tooling/integration_contracts.json")
-    print(json.dumps(contracts, ensure_ascii=False, indent=2))
+    print_json(contracts)
     return 0
 
 
-def cmd_integration(_: argparse.Namespace) -> int:
+def _echo_output(_call: ToolCall, stream: str, data: bytes) -> None:
+    out = sys.stdout if stream == "stdout" else sys.stderr
+    out.buffer.write(data)
+    out.flush()
+
+
+def cmd_integration(args: argparse.Namespace) -> int:
     repo_root = _repo_root()
     tests_dir = repo_root / "repos/packages/agent-os/tests"
-    proc = subprocess.run(
-        [
-            sys.executable,
-            "-m",
-            "unittest",
-            "discover",
-            "-s",
-            str(tests_dir),
-            "-p",
-            "test_*.py",
-        ],
-        cwd=repo_root,
-        capture_output=True,
-        text=True,
-        check=False,
+    call = ToolCall(
+        tool_name=sys.executable,
+        args=("-m", "unittest", "discover", "-s", str(tests_dir), "-p", "test_*.py"),
+        mode="read",
+        correlation_id="integration",
+        timeout=args.timeout if args.timeout is not None else math.inf,  # not a model call: no tier budget
+        cwd=str(repo_root),
     )
-
-    if proc.stdout:
-        print(proc.stdout, end="")
-    if proc.stderr:
-        print(proc.stderr, end="", file=sys.stderr)
-
-    return int(proc.returncode)
+    # Output is streamed as the suite runs; only a bounded tail is kept in memory.
+    with ToolPool(observer=_echo_output) as pool:
+        result = pool.run(call)
+    if result.error == "TIMEOUT":
+        print(f"error: integration tests timed out after {result.timeout_s:g}s", file=sys.stderr)
+    elif result.error == "TOOL_NOT_FOUND":
+        print(f"error: {result.stderr}", file=sys.stderr)
+    return int(result.exit_code)
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(prog="swarmctl", description="Agent OS v2 utilities")
+    add_profile_option(parser)
     sub = parser.add_subparsers(dest="cmd", required=True)
 
     p_pub = sub.add_parser("publish-skills", help="Publish ACTIVE_SKILLS.md into .agent/skills/")
+    p_pub.add_argument(
+        "--link-mode",
+        dest="link_mode",
+        choices=LINK_MODES,
+        default="auto",
+        help="How files are placed from the blob store (auto: reflink, then hardlink, then copy)",
+    )
     p_pub.set_defaults(fn=cmd_publish_skills)
 
+    p_gc = sub.add_parser("gc-skills", help="Remove skill blobs no longer referenced by the published manifest")
+    p_gc.set_defaults(fn=cmd_gc_skills)
+
+    p_watch = sub.add_parser("watch", help="Keep .agent/skills and its manifest in sync with skill sources")
+    p_watch.add_argument("--debounce", type=float, default=0.2, help="Quiet period in seconds before republishing")
+    p_watch.add_argument("--interval", type=float, default=0.5, help="Polling interval in seconds (polling mode)")
+    p_watch.add_argument("--poll", action="store_true", help="Use stat polling instead of inotify")
+    p_watch.set_defaults(fn=cmd_watch)
+
     p_doc = sub.add_parser("doctor", help="Validate configs, env, and published active skills")
+    p_doc.add_argument("--json", action="store_true", help="Print a JSON report with per-check wall time")
+    p_doc.add_argument("--fail-fast", dest="fail_fast", action="store_true", help="Stop starting checks after the first failure")
+    p_doc.add_argument("--jobs", type=int, default=None, help="Worker threads (default: Python's thread pool default)")
     p_doc.set_defaults(fn=cmd_doctor)
 
     p_tri = sub.add_parser("triage", help="Triage task text to (task_type, complexity, tiers)")
@@ -715,6 +817,19 @@ def main() -> int:
     p_route.add_argument("--mode", choices=["legacy", "hybrid"], default=None)
     p_route.add_argument("--preferred-model", action="append", default=[])
     p_route.add_argument("--unavailable-model", action="append", default=[])
+    p_route.add_argument(
+        "--route-cache",
+        dest="route_cache",
+        choices=ROUTE_CACHE_MODES,
+        default="disk",
+        help="Reuse route decisions for identical inputs and configs (disk: .cache/route-cache.json)",
+    )
+    p_route.add_argument(
+        "--ignore-health",
+        dest="ignore_health",
+        action="store_true",
+        help="Do not skip open-circuit models or reorder by observed latency (see `swarmctl providers`)",
+    )
     p_route.set_defaults(fn=cmd_route)
 
     p_run = sub.add_parser("run", help="Run minimal agent runtime contract")
@@ -726,12 +841,46 @@ def main() -> int:
     p_run.add_argument("--mode", choices=["legacy", "hybrid"], default=None)
     p_run.add_argument("--preferred-model", action="append", default=[])
     p_run.add_argument("--unavailable-model", action="append", default=[])
+    p_run.add_argument("--route-cache", dest="route_cache", choices=ROUTE_CACHE_MODES, default="disk")
+    p_run.add_argument(
+        "--ignore-health",
+        dest="ignore_health",
+        action="store_true",
+        help="Do not skip open-circuit models or reorder by observed latency (outcomes are still recorded)",
+    )
+    p_run.add_argument(
+        "--provider-url",
+        dest="provider_url",
+        default=os.environ.get("SWARM_PROVIDER_URL"),
+        help="OpenAI-compatible base URL (e.g. https://openrouter.ai/api/v1 or scripts/mock_provider.py); "
+        "when set, the objective is sent to the routed models with hedged requests. OPENROUTER_API_KEY is "
+        "only sent to https://openrouter.ai; SWARM_PROVIDER_API_KEY, if set, is sent to any provider URL",
+    )
     p_run.set_defaults(fn=cmd_run)
 
+    p_prov = sub.add_parser("providers", help="Show per-model latency, error rate and circuit-breaker state")
+    p_prov.add_argument("--json", action="store_true", help="Print rows as JSON")
+    p_prov.add_argument("--watch", type=float, default=None, metavar="SECONDS", help="Reprint every SECONDS")
+    p_prov.set_defaults(fn=cmd_providers)
+
+    p_budget = sub.add_parser("budget", help="Show spend recorded in the budget ledger and what is left today")
+    p_budget.add_argument("--by", choices=DIMENSIONS, default="day", help="Group spend by this dimension")
+    p_budget.set_defaults(fn=cmd_budget)
+
+    p_trace = sub.add_parser("trace", help="Summarize recorded span latencies (p50/p95/p99 per span)")
+    p_trace.add_argument("--dir", default=None, help="Trace directory (default: SWARM_TRACE or .cache/traces)")
+    p_trace.add_argument("--since", type=float, default=None, metavar="SECONDS", help="Only spans from the last SECONDS")
+    p_trace.add_argument("--span", default=None, metavar="PREFIX", help="Only spans whose name starts with PREFIX")
+    p_trace.add_argument("--json", action="store_true", help="Print rows as JSON")
+    p_trace.set_defaults(fn=cmd_trace)
+
     p_smoke = sub.add_parser("smoke", help="Run smoke checks for core integrations")
     p_smoke.set_defaults(fn=cmd_smoke)
 
     p_int = sub.add_parser("integration", help="Run integration tests for agent-os")
+    p_int.add_argument(
+        "--timeout", type=float, metavar="SECONDS", help="Kill the test run after SECONDS (default: no timeout)"
+    )
     p_int.set_defaults(fn=cmd_integration)
 
     p_contracts = sub.add_parser("contracts", help="Print machine-readable integration contracts")
@@ -739,7 +888,10 @@ def main() -> int:
 
 
     args = parser.parse_args()
-    return int(args.fn(args))
+    if callable(emit_event):
+        get_tracer().forward_events(emit_event)  # agent-os observability, off the hot path
+    with profiled(args.profile, f"swarmctl-{args.cmd}"), span(f"swarmctl.{args.cmd}"):
+        return int(args.fn(args))
 
 
 if __name__ == "__main__":
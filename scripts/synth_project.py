@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+from json_io import dump_path, load_path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_ARTICLE_CATALOG = REPO_ROOT / "research/RIVO_Deliverables_Passport_DXF_IFC_JSON/05_sample_project.rivo.json"
+STUD_STEP = 600
+FRAME = {"width": 1200, "height": 2500, "depth": 200}
+
+# Share of graph nodes per catalog category, roughly what a falsewall frame
+# uses: mostly profile segments and the connectors joining them, a fixing per
+# few joints, and one installation plus flush panel per wall.
+CATEGORY_WEIGHTS = {
+    "profile": 0.42,
+    "connector": 0.24,
+    "fastener": 0.14,
+    "support": 0.1,
+    "plate": 0.02,
+    "cap": 0.02,
+    "hinge_kit": 0.01,
+    "installation": 0.03,
+    "flush_panel": 0.02,
+}
+EDGE_TYPES = ("corner", "inline", "tee")
+
+
+def load_article_catalog(path: Path = DEFAULT_ARTICLE_CATALOG) -> dict[str, list[dict[str, Any]]]:
+    """Catalog items from a .rivo.json `catalog.items` list, grouped by category."""
+    config = load_path(path)
+    items = config.get("catalog", {}).get("items", []) if isinstance(config, dict) else []
+    by_category: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for item in items:
+        if isinstance(item, dict) and item.get("article"):
+            by_category[str(item.get("category") or "other")].append(item)
+    if not by_category:
+        raise ValueError(f"No catalog items in {path}")
+    return dict(by_category)
+
+
+def _segment(rng: random.Random, wall: int, index: int) -> dict[str, Any]:
+    x = wall * FRAME["width"] * 2 + (index % 8) * STUD_STEP
+    if rng.random() < 0.6:  # stud
+        length = rng.choice((FRAME["height"], FRAME["height"] - 300, 1200, 900))
+        return {"type": "segment", "start": {"x": x, "y": 0, "z": 0}, "end": {"x": x, "y": length, "z": 0}}
+    y = rng.choice((0, 400, 1000, FRAME["height"]))  # rail / crossbar
+    length = rng.choice((STUD_STEP, FRAME["width"], 450))
+    return {"type": "segment", "start": {"x": x, "y": y, "z": 0}, "end": {"x": x + length, "y": y, "z": 0}}
+
+
+def _segment_length(geom: dict[str, Any]) -> int:
+    start, end = geom["start"], geom["end"]
+    return abs(end["x"] - start["x"]) + abs(end["y"] - start["y"])
+
+
+def generate_snapshot(
+    nodes: int,
+    edges: int | None = None,
+    walls: int | None = None,
+    seed: int = 0,
+    catalog: dict[str, list[dict[str, Any]]] | None = None,
+) -> dict[str, Any]:
+    """
+    Deterministic ConfigurationSnapshot (legacy `graph` shape) with `nodes`
+    nodes, `edges` edges (default 1.5 per node) and BOM lines aggregated per
+    wall and article, so BOM size grows with `walls` (default one per 500 nodes).
+    """
+    if nodes < 1:
+        raise ValueError("nodes must be >= 1")
+    edges = int(nodes * 1.5) if edges is None else edges
+    if edges < 0:
+        raise ValueError("edges must be >= 0")
+    walls = max(1, nodes // 500) if walls is None else walls
+    if walls < 1:
+        raise ValueError("walls must be >= 1")
+
+    rng = random.Random(seed)
+    catalog = catalog if catalog is not None else load_article_catalog()
+    categories = [c for c in CATEGORY_WEIGHTS if c in catalog] or sorted(catalog)
+    weights = [CATEGORY_WEIGHTS.get(c, 0.01) for c in categories]
+
+    graph_nodes: list[dict[str, Any]] = []
+    bom: dict[tuple[int, str], list[Any]] = {}  # (wall, article) -> [qty, uom]
+    for i in range(nodes):
+        wall = i * walls // nodes
+        category = rng.choices(categories, weights)[0]
+        item = rng.choice(catalog[category])
+        article = str(item["article"])
+        node: dict[str, Any] = {"id": f"w{wall:04d}-n{i:07d}", "kind": category, "article": article}
+        if category == "profile":
+            node["geom"] = _segment(rng, wall, i)
+            qty, uom = _segment_length(node["geom"]), "mm"
+        else:
+            node["geom"] = {"type": "block", "blockName": f"RIVO_{article}"}
+            qty, uom = 1, "pcs"
+        graph_nodes.append(node)
+        line = bom.setdefault((wall, article), [0, uom])
+        line[0] += qty
+
+    ids = [n["id"] for n in graph_nodes]
+    graph_edges: list[dict[str, str]] = []
+    for i in range(min(edges, nodes - 1)):  # spanning chain first, so every node is connected
+        graph_edges.append({"from": ids[i], "to": ids[i + 1], "type": rng.choice(EDGE_TYPES)})
+    while len(graph_edges) < edges and nodes > 1:
+        a = rng.randrange(nodes)
+        b = min(nodes - 1, a + rng.randint(1, 16))  # joints are local
+        if a != b:
+            graph_edges.append({"from": ids[a], "to": ids[b], "type": rng.choice(EDGE_TYPES)})
+
+    return {
+        "stateId": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "dimensions": {"width": FRAME["width"] * walls, "height": FRAME["height"], "depth": FRAME["depth"]},
+        "selectedOptions": {"mountingType": "floor-wall", "equipmentModules": ["toilet"]},
+        "graph": {"rootNode": ids[0], "nodes": graph_nodes, "edges": graph_edges},
+        "bom": [
+            {"article": article, "qty": qty, "uom": uom, "comment": f"Стена {wall + 1}"}
+            for (wall, article), (qty, uom) in sorted(bom.items())
+        ],
+        "versionTag": {
+            "catalogVersion": "1.0.0",
+            "rulesVersion": "1.0.0",
+            "pricingVersion": "1.0.0",
+            "assetsVersion": "1.0.0",
+        },
+    }
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate a synthetic large ConfigurationSnapshot for benchmarks.")
+    parser.add_argument("output", help="Output snapshot JSON path.")
+    parser.add_argument("--nodes", type=int, default=10_000, help="Graph nodes.")
+    parser.add_argument("--edges", type=int, default=None, help="Graph edges. Default: 1.5 per node.")
+    parser.add_argument("--walls", type=int, default=None, help="Walls (BOM groups). Default: one per 500 nodes.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--catalog", default=str(DEFAULT_ARTICLE_CATALOG), help="A .rivo.json with catalog.items.")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv or sys.argv[1:])
+    try:
+        snapshot = generate_snapshot(
+            args.nodes, args.edges, args.walls, args.seed, catalog=load_article_catalog(Path(args.catalog))
+        )
+    except (OSError, ValueError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    output_path = Path(args.output)
+    dump_path(snapshot, output_path)
+    graph = snapshot["graph"]
+    print(f"{output_path}: {len(graph['nodes'])} nodes, {len(graph['edges'])} edges, {len(snapshot['bom'])} BOM lines")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
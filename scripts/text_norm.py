@@ -0,0 +1,388 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Mapping
+
+# Shared tokenizer/stemmer for triage keyword matching and retrieval.
+# Stemmers follow the Snowball algorithms for English (Porter2) and Russian;
+# words in other scripts (and mixed-script or numeric tokens) pass through.
+
+_WORD_RE = re.compile(r"[^\W_]+")
+_CYRILLIC_RE = re.compile(r"[а-я]+")
+_LATIN_RE = re.compile(r"[a-z]+")
+
+
+# ---------------------------------------------------------------------------
+# English (Porter2)
+# ---------------------------------------------------------------------------
+
+_EN_VOWELS = frozenset("aeiouy")
+_EN_DOUBLES = ("bb", "dd", "ff", "gg", "mm", "nn", "pp", "rr", "tt")
+_EN_LI_ENDING = frozenset("cdeghkmnrt")
+_EN_EXCEPTIONS = {
+    "skis": "ski", "skies": "sky", "dying": "die", "lying": "lie", "tying": "tie", "idly": "idl",
+    "gently": "gentl", "ugly": "ugli", "early": "earli", "only": "onli", "singly": "singl",
+    "sky": "sky", "news": "news", "howe": "howe", "atlas": "atlas", "cosmos": "cosmos", "bias": "bias",
+    "andes": "andes",
+}
+_EN_AFTER_1A = frozenset(["inning", "outing", "canning", "herring", "earring", "proceed", "exceed", "succeed"])
+_EN_STEP2 = (
+    ("ization", "ize"), ("ational", "ate"), ("fulness", "ful"), ("ousness", "ous"), ("iveness", "ive"),
+    ("tional", "tion"), ("biliti", "ble"), ("lessli", "less"), ("entli", "ent"), ("ation", "ate"),
+    ("alism", "al"), ("aliti", "al"), ("ousli", "ous"), ("iviti", "ive"), ("fulli", "ful"), ("enci", "ence"),
+    ("anci", "ance"), ("abli", "able"), ("izer", "ize"), ("ator", "ate"), ("alli", "al"), ("bli", "ble"),
+    ("ogi", "og"), ("li", ""),
+)
+_EN_STEP3 = (
+    ("ational", "ate"), ("tional", "tion"), ("alize", "al"), ("icate", "ic"), ("iciti", "ic"), ("ative", ""),
+    ("ical", "ic"), ("ness", ""), ("ful", ""),
+)
+_EN_STEP4 = (
+    "ement", "ance", "ence", "able", "ible", "ment", "ant", "ent", "ism", "ate", "iti", "ous", "ive", "ize", "ion",
+    "al", "er", "ic",
+)
+
+
+def _en_region(word: str, start: int) -> int:
+    for i in range(start + 1, len(word)):
+        if word[i] not in _EN_VOWELS and word[i - 1] in _EN_VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _en_short_syllable_at_end(word: str) -> bool:
+    if len(word) == 2:
+        return word[0] in _EN_VOWELS and word[1] not in _EN_VOWELS
+    return (
+        len(word) >= 3
+        and word[-3] not in _EN_VOWELS
+        and word[-2] in _EN_VOWELS
+        and word[-1] not in _EN_VOWELS
+        and word[-1] not in "wxY"
+    )
+
+
+def _en_has_vowel(text: str) -> bool:
+    return any(c in _EN_VOWELS for c in text)
+
+
+def stem_english(word: str) -> str:
+    if len(word) <= 2:
+        return word
+    if word in _EN_EXCEPTIONS:
+        return _EN_EXCEPTIONS[word]
+
+    chars = list(word)
+    for i, c in enumerate(chars):
+        if c == "y" and (i == 0 or chars[i - 1] in _EN_VOWELS):
+            chars[i] = "Y"
+    w = "".join(chars)
+
+    for prefix in ("gener", "commun", "arsen"):
+        if w.startswith(prefix):
+            r1 = len(prefix)
+            break
+    else:
+        r1 = _en_region(w, 0)
+    r2 = _en_region(w, r1)
+
+    # Step 1a
+    if w.endswith("sses"):
+        w = w[:-2]
+    elif w.endswith(("ied", "ies")):
+        w = w[:-2] if len(w) > 4 else w[:-1]
+    elif w.endswith(("us", "ss")):
+        pass
+    elif w.endswith("s") and _en_has_vowel(w[:-2]):
+        w = w[:-1]
+
+    if w in _EN_AFTER_1A:
+        return w
+
+    # Step 1b
+    for suffix in ("eedly", "ingly", "edly", "eed", "ing", "ed"):
+        if not w.endswith(suffix):
+            continue
+        if suffix in ("eed", "eedly"):
+            if len(w) - len(suffix) >= r1:
+                w = w[: -len(suffix)] + "ee"
+        elif _en_has_vowel(w[: -len(suffix)]):
+            w = w[: -len(suffix)]
+            if w.endswith(("at", "bl", "iz")):
+                w += "e"
+            elif w.endswith(_EN_DOUBLES):
+                w = w[:-1]
+            elif r1 >= len(w) and _en_short_syllable_at_end(w):
+                w += "e"
+        break
+
+    # Step 1c
+    if len(w) > 2 and w[-1] in "yY" and w[-2] not in _EN_VOWELS:
+        w = w[:-1] + "i"
+
+    # Step 2
+    for suffix, repl in _EN_STEP2:
+        if w.endswith(suffix):
+            if len(w) - len(suffix) >= r1:
+                if suffix == "ogi":
+                    if w[-4:-3] == "l":
+                        w = w[:-3] + repl
+                elif suffix == "li":
+                    if w[-3:-2] in _EN_LI_ENDING and len(w) > 2:
+                        w = w[:-2]
+                else:
+                    w = w[: -len(suffix)] + repl
+            break
+
+    # Step 3
+    for suffix, repl in _EN_STEP3:
+        if w.endswith(suffix):
+            if len(w) - len(suffix) >= r1 and (suffix != "ative" or len(w) - len(suffix) >= r2):
+                w = w[: -len(suffix)] + repl
+            break
+
+    # Step 4
+    for suffix in _EN_STEP4:
+        if w.endswith(suffix):
+            if len(w) - len(suffix) >= r2 and (suffix != "ion" or w[-4:-3] in ("s", "t")):
+                w = w[: -len(suffix)]
+            break
+
+    # Step 5
+    if w.endswith("e"):
+        if len(w) - 1 >= r2 or (len(w) - 1 >= r1 and not _en_short_syllable_at_end(w[:-1])):
+            w = w[:-1]
+    elif w.endswith("ll") and len(w) - 1 >= r2:
+        w = w[:-1]
+
+    return w.replace("Y", "y")
+
+
+# ---------------------------------------------------------------------------
+# Russian (Snowball)
+# ---------------------------------------------------------------------------
+
+_RU_VOWELS = frozenset("аеиоуыэюя")
+
+
+def _ru_endings(group1: str, group2: str = "") -> list[tuple[str, bool]]:
+    # (ending, needs a preceding "а"/"я"), longest first.
+    items = [(e, True) for e in group1.split()] + [(e, False) for e in group2.split()]
+    return sorted(items, key=lambda item: -len(item[0]))
+
+
+_RU_PERFECTIVE_GERUND = _ru_endings("в вши вшись", "ив ивши ившись ыв ывши ывшись")
+_RU_ADJECTIVE = _ru_endings("", "ее ие ые ое ими ыми ей ий ый ой ем им ым ом его ого ему ому их ых ую юю ая яя ою ею")
+_RU_PARTICIPLE = _ru_endings("ем нн вш ющ щ", "ивш ывш ующ")
+_RU_REFLEXIVE = _ru_endings("", "ся сь")
+_RU_VERB = _ru_endings(
+    "ла на ете йте ли й л ем н ло но ет ют ны ть ешь нно",
+    "ила ыла ена ейте уйте ите или ыли ей уй ил ыл им ым ен ило ыло ено ят ует уют ит ыт ены ить ыть ишь ую ю",
+)
+_RU_NOUN = _ru_endings(
+    "", "а ев ов ие ье е иями ями ами еи ии и ией ей ой ий й иям ям ием ем ам ом о у ах иях ях ы ь ию ью ю ия ья я"
+)
+_RU_DERIVATIONAL = _ru_endings("", "ост ость")
+_RU_SUPERLATIVE = _ru_endings("", "ейш ейше")
+
+
+def _ru_strip(word: str, rv: int, endings: list[tuple[str, bool]]) -> str | None:
+    """Remove the longest matching ending inside RV; None if there is none."""
+    for ending, needs_a in endings:
+        if not word.endswith(ending):
+            continue
+        cut = len(word) - len(ending)
+        if cut < rv:
+            continue  # only the part of the word inside RV is searched
+        if needs_a and (cut - 1 < rv or word[cut - 1] not in "ая"):
+            return None
+        return word[:cut]
+    return None
+
+
+def stem_russian(word: str) -> str:
+    word = word.replace("ё", "е")
+    rv = next((i + 1 for i, c in enumerate(word) if c in _RU_VOWELS), len(word))
+    r1 = next((i + 1 for i in range(1, len(word)) if word[i] not in _RU_VOWELS and word[i - 1] in _RU_VOWELS), len(word))
+    r2 = next(
+        (i + 1 for i in range(r1 + 1, len(word)) if word[i] not in _RU_VOWELS and word[i - 1] in _RU_VOWELS), len(word)
+    )
+
+    # Step 1
+    stripped = _ru_strip(word, rv, _RU_PERFECTIVE_GERUND)
+    if stripped is not None:
+        word = stripped
+    else:
+        word = _ru_strip(word, rv, _RU_REFLEXIVE) or word
+        adjective = _ru_strip(word, rv, _RU_ADJECTIVE)
+        if adjective is not None:
+            word = _ru_strip(adjective, rv, _RU_PARTICIPLE) or adjective
+        else:
+            word = _ru_strip(word, rv, _RU_VERB) or _ru_strip(word, rv, _RU_NOUN) or word
+
+    # Step 2
+    if word.endswith("и") and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    # Step 3
+    for ending, _ in _RU_DERIVATIONAL:
+        if word.endswith(ending) and len(word) - len(ending) >= max(r2, rv):
+            word = word[: -len(ending)]
+            break
+
+    # Step 4
+    if word.endswith("нн") and len(word) - 1 >= rv:
+        word = word[:-1]
+    else:
+        superlative = _ru_strip(word, rv, _RU_SUPERLATIVE)
+        if superlative is not None:
+            word = superlative[:-1] if superlative.endswith("нн") and len(superlative) - 1 >= rv else superlative
+        elif word.endswith("ь") and len(word) - 1 >= rv:
+            word = word[:-1]
+    return word
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=65536)
+def stem(token: str) -> str:
+    """Stem one lowercase token; the language is picked from its script."""
+    if _CYRILLIC_RE.fullmatch(token):
+        return stem_russian(token)
+    if _LATIN_RE.fullmatch(token):
+        return stem_english(token)
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens (letters and digits; "_" and punctuation split)."""
+    return _WORD_RE.findall(text.lower().replace("ё", "е"))
+
+
+def stems(tokens: Iterable[str]) -> list[str]:
+    return [stem(t) for t in tokens]
+
+
+@dataclass(frozen=True, slots=True)
+class Analyzed:
+    tokens: tuple[str, ...]
+    stems: tuple[str, ...]
+    stem_set: frozenset[str]
+
+
+@lru_cache(maxsize=1024)
+def analyze(text: str) -> Analyzed:
+    """Tokens and stems of `text`, cached per text (triage runs many tables over one input)."""
+    tokens = tuple(tokenize(text))
+    stemmed = tuple(stem(t) for t in tokens)
+    return Analyzed(tokens, stemmed, frozenset(stemmed))
+
+
+# How a KeywordTable word is compared with a token.
+_STEM, _PREFIX, _TOKEN = "stem", "prefix", "token"
+
+
+class KeywordTable:
+    """
+    Precompiled keyword lists, matched on whole tokens in O(tokens).
+
+    Each keyword is one or more words matched at consecutive token
+    positions. A word is compared by stem, so inflections match ("ошибки"
+    and "ошибкой" both match "ошибка"); a word ending in `*` is instead a
+    prefix of the token ("рефактор*" matches "рефакторинг") for truncated
+    stems that the stemmer would not produce, and a word starting with `=`
+    must equal the token, for short words whose stem collides with a common
+    one ("=тема" does not match "тем более").
+    """
+
+    def __init__(self, groups: Mapping[str, Iterable[str]]) -> None:
+        # kind -> first word -> (keyword index, words); kinds are STEM, PREFIX and TOKEN.
+        self._index: dict[str, dict[str, list[tuple[int, tuple[tuple[str, str], ...]]]]] = {
+            _STEM: {}, _PREFIX: {}, _TOKEN: {}
+        }
+        self._labels: list[str] = []
+        self._keywords: list[str] = []
+        for label, keywords in groups.items():
+            for keyword in keywords:
+                words = self._compile(keyword)
+                entry = (len(self._labels), words)
+                self._labels.append(label)
+                self._keywords.append(keyword)
+                kind, key = words[0]
+                self._index[kind].setdefault(key, []).append(entry)
+        self._prefix_lengths = sorted({len(p) for p in self._index[_PREFIX]})
+        # token -> keywords that may start at it; most tokens map to ().
+        self._candidates: dict[str, tuple[tuple[int, tuple[tuple[str, str], ...]], ...]] = {}
+
+    @staticmethod
+    def _compile(keyword: str) -> tuple[tuple[str, str], ...]:
+        words: list[tuple[str, str]] = []
+        for part in keyword.split():
+            is_prefix = part.endswith("*")
+            is_exact = part.startswith("=")
+            tokens = tokenize(part.rstrip("*").lstrip("="))
+            # "package.json" or "3-10" become several consecutive words; `*` applies to the last one.
+            for i, token in enumerate(tokens):
+                if is_prefix and i == len(tokens) - 1:
+                    words.append((_PREFIX, token))
+                else:
+                    words.append((_TOKEN, token) if is_exact else (_STEM, stem(token)))
+        if not words:
+            raise ValueError(f"Keyword has no word characters: {keyword!r}")
+        return tuple(words)
+
+    def matches(self, text: str) -> dict[str, list[str]]:
+        """label -> distinct keywords found in `text`, in table order."""
+        doc = analyze(text)
+        found: set[int] = set()
+        cache = self._candidates
+        for i, token in enumerate(doc.tokens):
+            candidates = cache.get(token)
+            if candidates is None:
+                candidates = self._lookup(token, doc.stems[i])
+                if len(cache) < 65536:
+                    cache[token] = candidates
+            for index, words in candidates:
+                if index not in found and self._matches_at(doc, i, words):
+                    found.add(index)
+        out: dict[str, list[str]] = {}
+        for index in sorted(found):
+            out.setdefault(self._labels[index], []).append(self._keywords[index])
+        return out
+
+    def _lookup(self, token: str, token_stem: str) -> tuple[tuple[int, tuple[tuple[str, str], ...]], ...]:
+        candidates = list(self._index[_STEM].get(token_stem, ()))
+        candidates.extend(self._index[_TOKEN].get(token, ()))
+        by_prefix = self._index[_PREFIX]
+        for length in self._prefix_lengths:
+            if length > len(token):
+                break
+            candidates.extend(by_prefix.get(token[:length], ()))
+        return tuple(candidates)
+
+    @staticmethod
+    def _matches_at(doc: Analyzed, start: int, words: tuple[tuple[str, str], ...]) -> bool:
+        if start + len(words) > len(doc.tokens):
+            return False
+        for offset, (kind, key) in enumerate(words):
+            i = start + offset
+            if kind == _STEM:
+                ok = doc.stems[i] == key
+            elif kind == _PREFIX:
+                ok = doc.tokens[i].startswith(key)
+            else:
+                ok = doc.tokens[i] == key
+            if not ok:
+                return False
+        return True
+
+    def counts(self, text: str) -> dict[str, int]:
+        return {label: len(words) for label, words in self.matches(text).items()}
+
+    def any(self, text: str) -> bool:
+        return bool(self.matches(text))
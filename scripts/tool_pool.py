@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import math
+import os
+import selectors
+import shutil
+import signal
+import subprocess
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping
+
+from router_config import ROUTER_CONFIG_PATH, RouterConfig, load_router_config
+
+MODES = ("read", "write")
+DEFAULT_LIMITS = {"read": 8, "write": 1}
+DEFAULT_TIER = "light"
+# Used when model_router.yaml has no timeout for the tier (Tool contract default).
+FALLBACK_TIMEOUT_S = 60.0
+DEFAULT_CAPTURE_BYTES = 1024 * 1024
+
+_READ_CHUNK = 64 * 1024
+_KILL_GRACE_S = 2.0
+
+# Observer signature: (call, stream name "stdout"/"stderr", raw chunk).
+Observer = Callable[["ToolCall", str, bytes], None]
+
+
+class RingBuffer:
+    """Keeps the last `limit` bytes written; `total` counts everything."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = max(0, int(limit))
+        self.total = 0
+        self._buf = bytearray(self.limit)
+        self._pos = 0
+
+    def write(self, data: bytes) -> None:
+        self.total += len(data)
+        limit = self.limit
+        if not limit or not data:
+            return
+        if len(data) >= limit:
+            self._buf[:] = data[-limit:]
+            self._pos = 0
+            return
+        end = self._pos + len(data)
+        if end <= limit:
+            self._buf[self._pos : end] = data
+        else:
+            first = limit - self._pos
+            self._buf[self._pos :] = data[:first]
+            self._buf[: len(data) - first] = data[first:]
+        self._pos = end % limit
+
+    @property
+    def dropped(self) -> int:
+        return max(0, self.total - self.limit)
+
+    def getvalue(self) -> bytes:
+        if self.total < self.limit:
+            return bytes(self._buf[: self.total])
+        return bytes(self._buf[self._pos :] + self._buf[: self._pos])
+
+
+@dataclass(frozen=True)
+class ToolCall:
+    """
+    Tool contract input, plus the routing tier whose timeout applies (or an
+    explicit timeout; `math.inf` runs the tool without one).
+    """
+
+    tool_name: str
+    args: tuple[str, ...] = ()
+    mode: str = "read"
+    correlation_id: str = ""
+    tier: str = DEFAULT_TIER
+    timeout: float | None = None
+    cwd: str | None = None
+    env: Mapping[str, str] | None = None
+
+
+@dataclass
+class ToolResult:
+    status: str
+    stdout: str
+    stderr: str
+    exit_code: int
+    error: str | None = None
+    artifacts: list[str] = field(default_factory=list)
+    duration_ms: float = 0.0
+    timeout_s: float | None = None
+    stdout_dropped: int = 0
+    stderr_dropped: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "status": self.status,
+            "stdout": self.stdout,
+            "stderr": self.stderr,
+            "artifacts": self.artifacts,
+            "exit_code": self.exit_code,
+            "error": self.error,
+            "duration_ms": round(self.duration_ms, 3),
+            "timeout_s": self.timeout_s,
+            "stdout_dropped": self.stdout_dropped,
+            "stderr_dropped": self.stderr_dropped,
+        }
+
+
+def _kill_group(proc: subprocess.Popen) -> None:
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        proc.kill()
+
+
+class ToolPool:
+    """
+    Runs tool calls on per-mode thread pools: at most `limits[mode]` calls of
+    a mode run at once (by default many reads, one write). Output is read
+    incrementally, handed to `observer` chunk by chunk, and captured in ring
+    buffers of `capture_bytes` per stream, so a chatty tool costs bounded
+    memory. Each call is killed (with its process group) once its explicit
+    timeout, or else that of its routing tier in model_router.yaml, expires.
+    """
+
+    def __init__(
+        self,
+        *,
+        limits: Mapping[str, int] | None = None,
+        router: RouterConfig | None = None,
+        router_path: Path = ROUTER_CONFIG_PATH,
+        capture_bytes: int = DEFAULT_CAPTURE_BYTES,
+        observer: Observer | None = None,
+    ) -> None:
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        unknown = set(self.limits) - set(MODES)
+        if unknown:
+            raise ValueError(f"Unknown tool mode: {', '.join(sorted(unknown))} (expected read or write)")
+        self.router = router if router is not None else load_router_config(router_path)
+        self.capture_bytes = capture_bytes
+        self.observer = observer
+        self._executors = {
+            mode: ThreadPoolExecutor(max_workers=max(1, int(limit)), thread_name_prefix=f"tool-{mode}")
+            for mode, limit in self.limits.items()
+        }
+
+    def timeout_for(self, call: ToolCall) -> float:
+        if call.timeout is not None:
+            return float(call.timeout)
+        return float(self.router.timeout_for(call.tier, FALLBACK_TIMEOUT_S))
+
+    def submit(self, call: ToolCall) -> Future:
+        executor = self._executors.get(call.mode)
+        if executor is None:
+            raise ValueError(f"Unknown tool mode: {call.mode} (expected read or write)")
+        return executor.submit(self._execute, call)
+
+    def run(self, call: ToolCall) -> ToolResult:
+        return self.submit(call).result()
+
+    def map(self, calls: Iterable[ToolCall]) -> list[ToolResult]:
+        """Run independent calls concurrently (within the mode limits); results in input order."""
+        futures = [self.submit(call) for call in calls]
+        return [f.result() for f in futures]
+
+    def _execute(self, call: ToolCall) -> ToolResult:
+        timeout = self.timeout_for(call)
+        limit = timeout if math.isfinite(timeout) else None  # reported as timeout_s
+        started = time.perf_counter()
+
+        def failed(error: str, message: str, exit_code: int) -> ToolResult:
+            elapsed = (time.perf_counter() - started) * 1000.0
+            return ToolResult("error", "", message, exit_code, error, duration_ms=elapsed, timeout_s=limit)
+
+        executable = shutil.which(call.tool_name, path=(call.env or os.environ).get("PATH"))
+        if executable is None:
+            return failed("TOOL_NOT_FOUND", f"Tool not found: {call.tool_name}", 127)
+        try:
+            proc = subprocess.Popen(
+                [executable, *call.args],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=call.cwd,
+                env=dict(call.env) if call.env is not None else None,
+                start_new_session=True,
+            )
+        except PermissionError as e:
+            return failed("PERMISSION_DENIED", str(e), 126)
+
+        buffers = {"stdout": RingBuffer(self.capture_bytes), "stderr": RingBuffer(self.capture_bytes)}
+        try:
+            timed_out = self._pump(call, proc, buffers, time.monotonic() + timeout)
+        except BaseException:
+            _kill_group(proc)  # e.g. a failing observer: do not leave the tool running
+            proc.wait()
+            raise
+        exit_code = proc.wait()
+        elapsed = (time.perf_counter() - started) * 1000.0
+
+        if timed_out:
+            status, error = "error", "TIMEOUT"
+        elif exit_code != 0:
+            status, error = "error", "NON_ZERO_EXIT"
+        else:
+            status, error = "ok", None
+        return ToolResult(
+            status,
+            buffers["stdout"].getvalue().decode("utf-8", errors="replace"),
+            buffers["stderr"].getvalue().decode("utf-8", errors="replace"),
+            exit_code,
+            error,
+            duration_ms=elapsed,
+            timeout_s=limit,
+            stdout_dropped=buffers["stdout"].dropped,
+            stderr_dropped=buffers["stderr"].dropped,
+        )
+
+    def _pump(self, call: ToolCall, proc: subprocess.Popen, buffers: dict[str, RingBuffer], deadline: float) -> bool:
+        """Copy output into the buffers until both pipes close; returns True if the deadline hit first."""
+        timed_out = False
+        with selectors.DefaultSelector() as selector:
+            selector.register(proc.stdout, selectors.EVENT_READ, "stdout")
+            selector.register(proc.stderr, selectors.EVENT_READ, "stderr")
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    if timed_out:
+                        break  # the group ignored SIGKILL's pipe close (e.g. orphaned grandchildren)
+                    timed_out = True
+                    _kill_group(proc)
+                    deadline = time.monotonic() + _KILL_GRACE_S
+                    continue
+                for key, _ in selector.select(remaining if math.isfinite(remaining) else None):
+                    data = os.read(key.fd, _READ_CHUNK)
+                    if not data:
+                        selector.unregister(key.fileobj)
+                        continue
+                    buffers[key.data].write(data)
+                    if self.observer is not None:
+                        self.observer(call, key.data, data)
+        proc.stdout.close()
+        proc.stderr.close()
+        return timed_out
+
+    def close(self) -> None:
+        for executor in self._executors.values():
+            executor.shutdown(wait=True)
+
+    def __enter__(self) -> ToolPool:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
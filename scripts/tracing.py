@@ -0,0 +1,444 @@
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Iterator
+
+from json_io import dumps, loads
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_TRACE_DIR = REPO_ROOT / ".cache/traces"
+FORMATS = ("ndjson", "otlp")
+
+DEFAULT_CAPACITY = 8192
+DEFAULT_FLUSH_INTERVAL_S = 0.5
+ROTATE_BYTES = 16 * 1024 * 1024
+
+# SWARM_TRACE: "off" (or "0") disables tracing, anything else is the output
+# directory (default .cache/traces). SWARM_TRACE_FORMAT picks ndjson or otlp;
+# SWARM_TRACE_SAMPLE is the fraction of traces (root spans) kept.
+ENV_TRACE = "SWARM_TRACE"
+ENV_FORMAT = "SWARM_TRACE_FORMAT"
+ENV_SAMPLE = "SWARM_TRACE_SAMPLE"
+
+_current: ContextVar[Span | None] = ContextVar("rivo_span", default=None)
+
+# (enter, exit) callbacks run around every span, traced or not (profiling.py
+# uses them for per-stage memory peaks). Empty unless a profiler is active.
+_stage_hooks: list[tuple[Callable[[str], None], Callable[[str], None]]] = []
+
+
+def add_stage_hooks(enter: Callable[[str], None], exit: Callable[[str], None]) -> None:
+    _stage_hooks.append((enter, exit))
+
+
+def remove_stage_hooks(enter: Callable[[str], None], exit: Callable[[str], None]) -> None:
+    _stage_hooks.remove((enter, exit))
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    sampled: bool
+    attrs: dict[str, Any] = field(default_factory=dict)
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+
+def _hex_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": value if isinstance(value, str) else _encode(value).decode("utf-8")}
+
+
+def _encode(obj: Any) -> bytes:
+    try:
+        return dumps(obj)
+    except TypeError:  # e.g. a Path in an event payload
+        return json.dumps(obj, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _otlp_span(record: dict[str, Any]) -> dict[str, Any]:
+    end_ns = record["start_ns"] + record["duration_ns"]
+    span = {
+        "traceId": record["trace_id"],
+        "spanId": record["span_id"],
+        "name": record["name"],
+        "kind": 1,
+        "startTimeUnixNano": str(record["start_ns"]),
+        "endTimeUnixNano": str(end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in (record.get("attrs") or {}).items()],
+        "status": {"code": 2, "message": record["error"]} if record["status"] == "error" else {"code": 1},
+    }
+    if record.get("parent_id"):
+        span["parentSpanId"] = record["parent_id"]
+    return span
+
+
+class _NullSpan(Span):
+    """What span() yields when tracing is off: set() is a no-op."""
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def __enter__(self) -> Span:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan("", "", "", None, False)
+
+
+class Tracer:
+    """
+    Records spans and point events into a bounded in-memory ring (a deque,
+    whose appends and pops are atomic, so the hot path takes no lock) and
+    writes them from a background thread to `<trace_dir>/spans.ndjson` or,
+    in otlp format, `spans.otlp.jsonl` (one OTLP/JSON export request per
+    line). When the ring is full the oldest records are dropped. Sampling is
+    decided per trace at its root span; children and events follow it.
+    """
+
+    def __init__(
+        self,
+        trace_dir: Path | None = DEFAULT_TRACE_DIR,
+        *,
+        fmt: str = "ndjson",
+        sample_rate: float = 1.0,
+        capacity: int = DEFAULT_CAPACITY,
+        flush_interval_s: float = DEFAULT_FLUSH_INTERVAL_S,
+        service: str | None = None,
+    ) -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown trace format: {fmt} (expected one of: {', '.join(FORMATS)})")
+        self.trace_dir = trace_dir
+        self.fmt = fmt
+        self.sample_rate = max(0.0, min(1.0, float(sample_rate)))
+        self.service = service or Path(sys.argv[0] if sys.argv and sys.argv[0] else "rivo").stem
+        self.capacity = capacity
+        self.flush_interval_s = flush_interval_s
+        self.dropped = 0
+        self._ring: deque[dict[str, Any]] = deque(maxlen=capacity)
+        self._forwarders: list[Callable[[str, dict[str, Any]], Any]] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._write_lock = threading.Lock()  # flusher vs. an explicit flush(); never taken by span()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.trace_dir is not None or bool(self._forwarders)
+
+    @property
+    def path(self) -> Path | None:
+        if self.trace_dir is None:
+            return None
+        return self.trace_dir / ("spans.ndjson" if self.fmt == "ndjson" else "spans.otlp.jsonl")
+
+    def forward_events(self, fn: Callable[[str, dict[str, Any]], Any]) -> None:
+        """Also hand every event to `fn(name, payload)`, from the flusher thread."""
+        self._forwarders.append(fn)
+
+    # -- recording ---------------------------------------------------------
+
+    def _push(self, record: dict[str, Any]) -> None:
+        size = len(self._ring)
+        if size == self.capacity:
+            self.dropped += 1
+        elif size >= self.capacity // 2:
+            self._wake.set()  # flush early rather than drop
+        self._ring.append(record)
+        if self._thread is None:
+            self._start()
+
+    def span(self, name: str, **attrs: Any) -> ContextManager[Span]:
+        if _stage_hooks:
+            return self._staged(name, attrs)
+        if not self.enabled and _current.get() is None:
+            return _NULL_SPAN
+        return self._span(name, attrs)
+
+    @contextmanager
+    def _staged(self, name: str, attrs: dict[str, Any]) -> Iterator[Span]:
+        hooks = list(_stage_hooks)
+        for enter, _ in hooks:
+            enter(name)
+        try:
+            with self._span(name, attrs) as current:
+                yield current
+        finally:
+            for _, exit in reversed(hooks):
+                exit(name)
+
+    @contextmanager
+    def _span(self, name: str, attrs: dict[str, Any]) -> Iterator[Span]:
+        parent = _current.get()
+        if parent is None:
+            sampled = self.enabled and (self.sample_rate >= 1.0 or random.random() < self.sample_rate)
+            current = Span(name, _hex_id(128), _hex_id(64), None, sampled, attrs)
+        else:
+            current = Span(name, parent.trace_id, _hex_id(64), parent.span_id, parent.sampled, attrs)
+        token = _current.set(current)
+        start_ns = time.time_ns()
+        started = time.perf_counter_ns()
+        error = None
+        try:
+            yield current
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current.reset(token)
+            if current.sampled:
+                self._push(
+                    {
+                        "type": "span",
+                        "name": name,
+                        "trace_id": current.trace_id,
+                        "span_id": current.span_id,
+                        "parent_id": current.parent_id,
+                        "start_ns": start_ns,
+                        "duration_ns": time.perf_counter_ns() - started,
+                        "status": "error" if error else "ok",
+                        "error": error,
+                        "attrs": current.attrs,
+                    }
+                )
+
+    def event(self, name: str, payload: dict[str, Any]) -> None:
+        """Queue a point event (the emit_event replacement); returns at once."""
+        parent = _current.get()
+        if parent is not None and not parent.sampled and not self._forwarders:
+            return
+        if parent is None and not self.enabled:
+            return
+        self._push(
+            {
+                "type": "event",
+                "name": name,
+                "trace_id": parent.trace_id if parent else None,
+                "span_id": parent.span_id if parent else None,
+                "ts_ns": time.time_ns(),
+                "payload": payload,
+                "sampled": parent.sampled if parent else True,
+            }
+        )
+
+    # -- flushing ----------------------------------------------------------
+
+    def _start(self) -> None:
+        with self._write_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="trace-flusher", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval_s)
+            self._wake.clear()
+            self.flush()
+
+    def _drain(self) -> list[dict[str, Any]]:
+        batch = []
+        while True:
+            try:
+                batch.append(self._ring.popleft())
+            except IndexError:
+                return batch
+
+    def flush(self) -> None:
+        with self._write_lock:
+            batch = self._drain()
+            if not batch:
+                return
+            for record in batch:
+                if record["type"] == "event":
+                    for fn in self._forwarders:
+                        try:
+                            fn(record["name"], record["payload"])
+                        except Exception:  # noqa: BLE001 - observability must not break the command
+                            pass
+            if self.path is not None:
+                self._write([r for r in batch if r["type"] == "span" or r.get("sampled")])
+
+    def _write(self, batch: list[dict[str, Any]]) -> None:
+        if not batch:
+            return
+        path = self.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if self.fmt == "ndjson":
+            data = b"".join(_encode(r) + b"\n" for r in batch)
+        else:
+            spans = [_otlp_span(r) for r in batch if r["type"] == "span"]
+            if not spans:
+                return
+            request = {
+                "resourceSpans": [
+                    {
+                        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service}}]},
+                        "scopeSpans": [{"scope": {"name": "rivo.tracing"}, "spans": spans}],
+                    }
+                ]
+            }
+            data = _encode(request) + b"\n"
+        try:
+            if path.exists() and path.stat().st_size > ROTATE_BYTES:
+                os.replace(path, path.with_name(path.name + ".1"))
+            # One O_APPEND write per batch keeps concurrent processes' lines whole.
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+
+_tracer: Tracer | None = None
+
+
+def configure(tracer: Tracer | None = None) -> Tracer:
+    """Install `tracer` as the process tracer (default: from SWARM_TRACE* env vars)."""
+    global _tracer
+    if _tracer is not None:
+        _tracer.close()
+    if tracer is None:
+        target = os.getenv(ENV_TRACE, "")
+        trace_dir = None if target.lower() in ("off", "0", "false") else Path(target) if target else DEFAULT_TRACE_DIR
+        tracer = Tracer(
+            trace_dir, fmt=os.getenv(ENV_FORMAT, "ndjson"), sample_rate=float(os.getenv(ENV_SAMPLE, "1.0"))
+        )
+    _tracer = tracer
+    return tracer
+
+
+def get_tracer() -> Tracer:
+    return _tracer if _tracer is not None else configure()
+
+
+def span(name: str, **attrs: Any):
+    return get_tracer().span(name, **attrs)
+
+
+def event(name: str, payload: dict[str, Any]) -> None:
+    get_tracer().event(name, payload)
+
+
+def traced(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator form of span()."""
+
+    def wrap(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def inner(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return inner
+
+    return wrap
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    if _tracer is not None:
+        _tracer.close()
+
+
+# -- reading ---------------------------------------------------------------
+
+
+def iter_spans(paths: list[Path]) -> Iterator[dict[str, Any]]:
+    """Span records from NDJSON and OTLP/JSON trace files (name, duration_ns, status, start_ns)."""
+    for path in paths:
+        try:
+            fh = open(path, "rb")
+        except FileNotFoundError:
+            continue
+        with fh:
+            for line in fh:
+                try:
+                    row = loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
+                if "resourceSpans" in row:
+                    for resource in row["resourceSpans"]:
+                        for scope in resource.get("scopeSpans", []):
+                            for s in scope.get("spans", []):
+                                start = int(s["startTimeUnixNano"])
+                                yield {
+                                    "name": s["name"],
+                                    "start_ns": start,
+                                    "duration_ns": int(s["endTimeUnixNano"]) - start,
+                                    "status": "error" if s.get("status", {}).get("code") == 2 else "ok",
+                                }
+                elif row.get("type") == "span":
+                    yield row
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, min(len(ordered), math.ceil(q * len(ordered))))
+    return ordered[rank - 1]
+
+
+def summarize(spans: Iterator[dict[str, Any]], *, since_ns: int = 0) -> list[dict[str, Any]]:
+    """Per span name: count, errors and p50/p95/p99/max latency in ms."""
+    durations: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    for s in spans:
+        if s.get("start_ns", 0) < since_ns:
+            continue
+        durations.setdefault(s["name"], []).append(s["duration_ns"] / 1e6)
+        if s.get("status") == "error":
+            errors[s["name"]] = errors.get(s["name"], 0) + 1
+    rows = []
+    for name, values in sorted(durations.items()):
+        values.sort()
+        rows.append(
+            {
+                "span": name,
+                "count": len(values),
+                "errors": errors.get(name, 0),
+                "p50_ms": round(percentile(values, 0.50), 3),
+                "p95_ms": round(percentile(values, 0.95), 3),
+                "p99_ms": round(percentile(values, 0.99), 3),
+                "max_ms": round(values[-1], 3),
+            }
+        )
+    return rows
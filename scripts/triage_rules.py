@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from text_norm import KeywordTable
+
+# Keyword triage of task texts into a task type (T1-T7) and a complexity
+# (C1-C5), used by `swarmctl triage`/`route`/`run`.
+
+# Keyword tables, compiled once. Words match by stem (so "ошибки" and
+# "errors" count), `*` marks a token prefix and `=` an exact token; see
+# text_norm.KeywordTable.
+_ERROR_SIGNALS = [
+    "ошиб*", "error", "exception*", "исключ*", "stack trace", "пада*", "fail*", "слом*", "не работает", "lint",
+    "опечат*", "typo",
+]
+_PAYMENT_SIGNALS = ["payment", "оплат*", "платеж*", "stars", "звезд*", "ton", "тон", "ton connect"]
+_TASK_TYPE_TABLE = KeywordTable(
+    {
+        "error": _ERROR_SIGNALS,
+        "payment": _PAYMENT_SIGNALS,
+        "T7": [
+            "telegram", "телеграм*", "mini app", "миниапп*", "miniapp", "бот", "bot", "stars", "звезд*", "ton", "тон",
+            "ton connect", "payment", "оплат*", "платеж*", "webapp", "мини апп*",
+        ],
+        "T6": [
+            "ui", "ux", "theme", "layout", "animation", "color", "colour", "typography", "design", "дизайн*",
+            "интерфейс*", "верстк*", "анимац*", "цвет*", "типограф*", "=тема",
+        ],
+        "T1": [
+            ".env", "dependencies", "зависимост*", "package.json", "config*", "конфиг*", "настрой*", "tsconfig",
+            "pyproject", "docker", "ci",
+        ],
+        "T2": [
+            "bug", "баг", "error", "ошиб*", "fail*", "пада*", "stack trace", "exception*", "исключ*", "lint", "typo",
+            "опечат*", "broken", "слом*", "не работает", "исправ*",
+        ],
+        "T3": [
+            "feature", "фич*", "endpoint", "эндпоинт*", "api", "component", "компонент*", "screen", "экран*",
+            "implement", "реализ*", "add", "adding", "added", "добав*", "сделай",
+        ],
+        "T4": [
+            "architecture", "архитектур*", "refactor", "рефактор*", "migration", "миграц*", "redesign",
+            "system design", "new project", "новый проект",
+        ],
+        "T5": [
+            "analyze", "analysis", "анализ*", "compare", "comparison", "сравни*", "choose", "выбер*", "investigate",
+            "исслед*", "research", "ресерч*",
+        ],
+    }
+)
+_TASK_TYPE_ORDER = ["T7", "T6", "T4", "T1", "T2", "T3", "T5"]
+
+_COMPLEXITY_TABLE = KeywordTable(
+    {
+        "critical": [
+            "security", "безопасн*", "production*", "прод", "продакшн*", "продакшен*", "infra*", "инфра*", "token",
+            "токен*", "rotate key", "pci",
+        ],
+        "payments": ["payment", "оплат*", "платеж*", "auth*", "авторизац*", "логин*"],
+        "screen": ["экран*", "screen"],
+        "mini_app": ["telegram", "телеграм*", "mini app", "миниапп*", "ui", "ux", "интерфейс*"],
+        "structural": [
+            "migration", "миграц*", "refactor", "рефактор*", "architecture", "архитектур*", "cross-domain",
+            "breaking change",
+        ],
+        "testing": ["test", "тест*", "integration", "интеграц*", "e2e", "multiple files", "3-10 files"],
+        "trivial": [
+            "typo", "опечат*", "readme", "ридми", "copy", "rename", "<50 lines", "one file", "1 file", "один файл",
+        ],
+    }
+)
+
+
+def guess_task_type(text: str) -> str:
+    scores = _TASK_TYPE_TABLE.counts(text)
+    if scores.get("error"):
+        return "T2"
+    if scores.get("payment"):
+        return "T7"
+
+    best_score = max((scores.get(k, 0) for k in _TASK_TYPE_ORDER), default=0)
+    if best_score == 0:
+        return "T3"
+    for k in _TASK_TYPE_ORDER:
+        if scores.get(k, 0) == best_score:
+            return k
+    return "T3"
+
+
+def guess_complexity(text: str) -> str:
+    found = _COMPLEXITY_TABLE.counts(text)
+    if found.get("critical"):
+        return "C5"
+    if found.get("payments"):
+        return "C4"
+    if found.get("screen") and found.get("mini_app"):
+        return "C3"
+    if found.get("structural"):
+        return "C4"
+    if found.get("testing"):
+        return "C3"
+    if found.get("trivial"):
+        return "C1"
+    return "C2"
@@ -1,6 +1,22 @@
-import pytest
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 
+import pytest
+import yaml
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+for _path in (SCRIPTS_DIR, SCRIPTS_DIR / "quality"):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+# Scripts trace into .cache/traces by default; tests that want spans configure their own tracer.
+os.environ.setdefault("SWARM_TRACE", "off")
+
 
 @pytest.fixture
 def project_root():
@@ -20,3 +36,128 @@ def schemas_dir(contracts_dir):
 @pytest.fixture
 def examples_dir(contracts_dir):
     return contracts_dir / "examples"
+
+
+# Schema used for each file under contracts/examples; an example missing here fails the contract tests.
+EXAMPLE_SCHEMAS = {
+    "example.snapshot.json": "configuration-snapshot",
+    "example.validation.json": "validation-result-item",
+    "example.pricequote.json": "price-quote",
+    "example.bom.json": "bom-item",
+    "example.export.rivo.json": "rivo-config",
+}
+
+_CONTRACT_TIMINGS = {}
+
+
+def pytest_generate_tests(metafunc):
+    # Tests taking an `example` argument run once per mapped example file.
+    if "example" in metafunc.fixturenames:
+        metafunc.parametrize("example", sorted(EXAMPLE_SCHEMAS))
+
+
+@dataclass
+class ContractRegistry:
+    """Contracts parsed, ref-checked and validated once per session (see the `contracts` fixture)."""
+
+    schemas: dict  # file name -> parsed schema
+    openapi: dict
+    registry: object  # schema_validator.SchemaRegistry
+    unresolved_refs: list  # "<file>: <ref>" for $refs that do not resolve
+    example_errors: dict  # example file name -> validation errors
+    unmapped_examples: list  # files under contracts/examples with no EXAMPLE_SCHEMAS entry
+    validator_cache: Path  # compiled validators, shared by the session
+
+
+def _parse_contract(path):
+    text = path.read_text(encoding="utf-8")
+    return path, yaml.safe_load(text) if path.suffix in (".yaml", ".yml") else json.loads(text)
+
+
+def _iter_refs(node):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "$ref" and isinstance(value, str):
+                yield value
+            else:
+                yield from _iter_refs(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _iter_refs(value)
+
+
+def _resolves(ref, base, parsed):
+    """Whether `ref` (relative file and/or #/json/pointer) resolves from the file `base` among `parsed` documents."""
+    target, _, pointer = ref.partition("#")
+    node = parsed.get((base.parent / target).resolve() if target else base)
+    if node is None:
+        return False
+    for token in [t for t in pointer.split("/") if t]:
+        token = token.replace("~1", "/").replace("~0", "~")
+        if not isinstance(node, dict) or token not in node:
+            return False
+        node = node[token]
+    return True
+
+
+@pytest.fixture(scope="session")
+def contracts(tmp_path_factory):
+    """
+    Parse every schema and openapi.v1.yaml once (on a thread pool), resolve
+    their $refs, and validate contracts/examples on a process pool with
+    validators compiled once into a session cache. Timings go to the report.
+    """
+    from schema_validator import SchemaRegistry, validate_files
+
+    contracts_dir = (Path(__file__).parent.parent / "contracts").resolve()
+    schemas_dir = contracts_dir / "schemas"
+    openapi_path = contracts_dir / "openapi.v1.yaml"
+    if not schemas_dir.exists() or not openapi_path.exists():
+        pytest.skip("Contracts not found")
+
+    started = time.perf_counter()
+    paths = [openapi_path, *sorted(p for p in schemas_dir.glob("*") if p.suffix in (".json", ".yaml", ".yml"))]
+    with ThreadPoolExecutor() as pool:
+        registry_future = pool.submit(SchemaRegistry, schemas_dir)
+        parsed = dict(pool.map(_parse_contract, paths))
+        registry = registry_future.result()
+    unresolved = [
+        f"{openapi_path.name}: {ref}" for ref in _iter_refs(parsed[openapi_path]) if not _resolves(ref, openapi_path, parsed)
+    ]
+    openapi = parsed.pop(openapi_path)
+    for uri in registry.resources:
+        try:
+            registry.reachable(uri)
+        except KeyError as exc:
+            unresolved.append(f"{uri}: {exc.args[0]}")
+    _CONTRACT_TIMINGS["parse_s"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    validator_cache = tmp_path_factory.mktemp("schema-validators")
+    examples = sorted((contracts_dir / "examples").glob("*.json"))
+    jobs = {p: EXAMPLE_SCHEMAS[p.name] for p in examples if p.name in EXAMPLE_SCHEMAS}
+    errors = validate_files(jobs, schemas_dir=schemas_dir, cache_dir=validator_cache)
+    _CONTRACT_TIMINGS["validate_s"] = time.perf_counter() - started
+    _CONTRACT_TIMINGS["schemas"] = len(parsed)
+    _CONTRACT_TIMINGS["examples"] = len(jobs)
+
+    return ContractRegistry(
+        schemas={path.name: doc for path, doc in parsed.items()},
+        openapi=openapi,
+        registry=registry,
+        unresolved_refs=unresolved,
+        example_errors={path.name: errs for path, errs in errors.items()},
+        unmapped_examples=[p.name for p in examples if p.name not in EXAMPLE_SCHEMAS],
+        validator_cache=validator_cache,
+    )
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _CONTRACT_TIMINGS:
+        return
+    t = _CONTRACT_TIMINGS
+    terminalreporter.write_sep("-", "contract registry")
+    terminalreporter.write_line(
+        f"parsed {t['schemas']} schemas + openapi.v1.yaml in {t['parse_s'] * 1000:.1f} ms; "
+        f"validated {t['examples']} examples in {t['validate_s'] * 1000:.1f} ms"
+    )
@@ -1,28 +1,85 @@
-import pytest
-from pathlib import Path
-import yaml
 import json
 
 
 class TestContractSchemas:
-    def test_schemas_are_valid_yaml_or_json(self, schemas_dir):
-        if not schemas_dir.exists():
-            pytest.skip("Schemas directory not found")
-
-        for schema_file in schemas_dir.glob("*"):
-            if schema_file.suffix in [".yaml", ".yml"]:
-                content = yaml.safe_load(schema_file.read_text())
-                assert isinstance(content, dict), f"Invalid YAML schema: {schema_file}"
-            elif schema_file.suffix == ".json":
-                content = json.loads(schema_file.read_text())
-                assert isinstance(content, dict), f"Invalid JSON schema: {schema_file}"
-
-    def test_openapi_spec_valid(self, contracts_dir):
-        openapi_path = contracts_dir / "openapi.v1.yaml"
-        if not openapi_path.exists():
-            pytest.skip("OpenAPI spec not found")
-
-        content = yaml.safe_load(openapi_path.read_text())
+    def test_schemas_are_valid_yaml_or_json(self, contracts):
+        assert contracts.schemas
+        for name, content in contracts.schemas.items():
+            assert isinstance(content, dict), f"Invalid schema: {name}"
+
+    def test_openapi_spec_valid(self, contracts):
+        content = contracts.openapi
         assert "openapi" in content, "OpenAPI version field missing"
         assert "info" in content, "OpenAPI info field missing"
         assert "paths" in content, "OpenAPI paths field missing"
+
+    def test_refs_resolve(self, contracts):
+        assert contracts.unresolved_refs == []
+
+
+class TestCompiledValidators:
+    def test_every_example_has_a_schema(self, contracts):
+        assert contracts.unmapped_examples == []
+
+    def test_examples_validate(self, contracts, example):
+        assert contracts.example_errors[example] == []
+
+    def test_validator_is_cached_on_disk_by_hash(self, schemas_dir, tmp_path):
+        from schema_validator import compile_validator
+
+        validator = compile_validator("configuration-snapshot", schemas_dir=schemas_dir, cache_dir=tmp_path)
+        assert (tmp_path / f"{validator.cache_key}.py").exists()
+
+    def test_cross_file_refs_are_enforced(self, contracts, schemas_dir, tmp_path):
+        from schema_validator import compile_validator
+
+        validator = compile_validator(
+            "configuration-snapshot", schemas_dir=schemas_dir, cache_dir=tmp_path, registry=contracts.registry
+        )
+        snapshot = {
+            "stateId": "3b1f7c77-3b0c-4d6f-9e2a-2c4dbf516f2f",
+            "dimensions": {"width": 1200, "height": 2500, "depth": 200},
+            "bom": [{"article": "100002", "qty": -1, "uom": "pcs"}],
+        }
+        errors = validator.errors(snapshot)
+        assert {"path": "/bom/0/qty", "keyword": "minimum", "message": "must be >= 0"} in errors
+
+    def test_multiple_of_uses_exact_decimal_arithmetic(self, tmp_path):
+        from schema_validator import compile_validator
+
+        schemas = tmp_path / "schemas"
+        schemas.mkdir()
+        (schemas / "step.schema.json").write_text(json.dumps({"type": "number", "multipleOf": 0.1}))
+        validator = compile_validator("step", schemas_dir=schemas, cache_dir=None)
+        assert validator.is_valid(0.3) and validator.is_valid(7) and validator.is_valid(1e30)
+        for value in (0.35, float("inf"), float("-inf"), float("nan")):
+            assert [e["keyword"] for e in validator.errors(value)] == ["multipleOf"]
+
+    def test_ndjson_batch_returns_error_envelopes(self, contracts, schemas_dir, tmp_path):
+        from schema_validator import validate_ndjson
+
+        envelope_schema = contracts.schemas["error-envelope.schema.json"]
+        lines = [
+            json.dumps({"ruleId": "r1", "status": "pass"}),
+            "",
+            "{not json",
+            json.dumps({"ruleId": "r2", "status": "unknown"}),
+        ]
+        results = list(validate_ndjson(lines, "validation-result-item", schemas_dir=schemas_dir, cache_dir=tmp_path, workers=2))
+        assert [(r["line"], r["valid"]) for r in results] == [(1, True), (3, False), (4, False)]
+        assert results[1]["error"]["code"] == "invalid_json"
+        assert results[2]["error"]["code"] == "schema_validation_failed"
+        for result in results[1:]:
+            assert set(result["error"]) <= set(envelope_schema["properties"])
+
+    def test_validate_files_reports_errors_per_file(self, contracts, schemas_dir, tmp_path):
+        from schema_validator import validate_files
+
+        good, bad = tmp_path / "good.json", tmp_path / "bad.json"
+        good.write_text(json.dumps([{"article": "100002", "qty": 1, "uom": "pcs"}]))
+        bad.write_text(json.dumps([{"article": "100002", "qty": 1, "uom": "pcs"}, {"article": "100002", "qty": -1, "uom": "pcs"}]))
+        errors = validate_files(
+            {good: "bom-item", bad: "bom-item"}, schemas_dir=schemas_dir, cache_dir=contracts.validator_cache, workers=2
+        )
+        assert errors[good] == []
+        assert [e["path"] for e in errors[bad]] == ["/qty"]
@@ -0,0 +1,69 @@
+import uuid
+
+import pytest
+
+from budget_ledger import GROW_RECORDS, BudgetLedger, downgrade_complexity, utc_day
+
+DAY1 = 1_760_000_000.0  # 2025-10-09 UTC
+DAY2 = DAY1 + 86_400
+
+
+def _append(ledger, **overrides):
+    row = dict(
+        run_id=str(uuid.uuid4()), task_type="T3", complexity="C3", tier="quality", model="m", tokens=1000,
+        cost_usd=0.5, ts=DAY1,
+    )
+    row.update(overrides)
+    return ledger.append(**row)
+
+
+def test_append_reads_back_and_aggregates(tmp_path):
+    with BudgetLedger(tmp_path) as ledger:
+        run_id = str(uuid.uuid4())
+        record = _append(ledger, run_id=run_id, model="openrouter/google/gemini-2.5-pro")
+        _append(ledger, task_type="T2", complexity="C1", tier="light", tokens=200, cost_usd=0.01, ts=DAY2)
+        assert record.run_id == run_id and record.model == "openrouter/google/gemini-2.5-pro"
+        assert len(ledger) == 2
+        assert ledger.spend().to_dict() == {"runs": 2, "tokens": 1200, "cost_usd": 0.51}
+        assert ledger.spend("task_type", "T2").tokens == 200
+        assert set(ledger.spend_by("day")) == {utc_day(DAY1), utc_day(DAY2)}
+        with pytest.raises(ValueError):
+            ledger.spend_by("weekday")
+
+
+def test_other_processes_appends_and_lost_counters_are_folded_in(tmp_path):
+    reader = BudgetLedger(tmp_path)
+    with BudgetLedger(tmp_path) as writer:
+        for _ in range(3):
+            _append(writer)
+    assert reader.spend("tier", "quality").runs == 3  # caught up from the newer records only
+    reader.close()
+
+    (tmp_path / "counters.json").unlink()
+    with BudgetLedger(tmp_path) as ledger:
+        assert ledger.spend("complexity", "C3").to_dict() == {"runs": 3, "tokens": 3000, "cost_usd": 1.5}
+
+
+def test_ledger_grows_past_preallocated_records(tmp_path):
+    with BudgetLedger(tmp_path) as ledger:
+        for i in range(GROW_RECORDS + 1):
+            _append(ledger, run_id=f"run-{i}", tokens=1, cost_usd=0.0)
+        assert ledger.spend().tokens == GROW_RECORDS + 1
+
+
+def test_remaining_today_and_downgrade(tmp_path):
+    with BudgetLedger(tmp_path) as ledger:
+        _append(ledger, tokens=95_000, cost_usd=1.0)
+        remaining = ledger.remaining_today({"max_total_tokens": 150_000, "max_cost_usd": 5.0}, now=DAY1 + 60)
+        assert remaining == (55_000, 4.0)
+        assert ledger.remaining_today({}) is None
+
+    per_complexity = {
+        "C1": {"max_total_tokens": 10_000, "max_cost_usd": 0.15},
+        "C3": {"max_total_tokens": 40_000, "max_cost_usd": 0.8},
+        "C5": {"max_total_tokens": 120_000, "max_cost_usd": 4.0},
+    }
+    assert downgrade_complexity(per_complexity, "C5", remaining) == "C3"
+    assert downgrade_complexity(per_complexity, "C5", remaining, routable=["C1", "C5"]) == "C1"
+    assert downgrade_complexity(per_complexity, "C5", (0, 0.0)) == "C1"
+    assert downgrade_complexity(per_complexity, "C5", None) == "C5"
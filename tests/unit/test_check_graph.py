@@ -0,0 +1,63 @@
+import threading
+
+from check_graph import FAIL, OK, SKIP, WARN, Check, run_checks
+
+
+def _statuses(results):
+    return {r.name: r.status for r in results}
+
+
+def test_dependencies_receive_values_and_failures_skip_dependents():
+    def load(ctx):
+        return {"tier": "light"}
+
+    def use(ctx):
+        assert ctx.inputs["load"] == {"tier": "light"}
+        ctx.warn("looks odd")
+
+    def broken(ctx):
+        raise ValueError("bad config")
+
+    checks = [
+        Check("use", use, deps=("load",)),
+        Check("load", load),
+        Check("broken", broken),
+        Check("after_broken", lambda ctx: None, deps=("broken",)),
+        Check("after_skip", lambda ctx: None, deps=("after_broken",)),
+    ]
+    results = list(run_checks(checks, workers=2))
+
+    assert _statuses(results) == {"load": OK, "use": WARN, "broken": FAIL, "after_broken": SKIP, "after_skip": SKIP}
+    assert next(r for r in results if r.name == "broken").failures == ["bad config"]
+    assert [r.name for r in results].index("load") < [r.name for r in results].index("use")
+
+
+def test_independent_checks_run_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+    checks = [Check(f"c{i}", lambda ctx: barrier.wait()) for i in range(3)]
+    assert set(_statuses(run_checks(checks, workers=3)).values()) == {OK}
+
+
+def test_spawned_checks_join_the_graph():
+    def discover(ctx):
+        for i in range(3):
+            ctx.spawn(Check(f"item:{i}", lambda c, i=i: c.fail("odd") if i % 2 else None))
+
+    statuses = _statuses(run_checks([Check("discover", discover)], workers=2))
+    assert statuses == {"discover": OK, "item:0": OK, "item:1": FAIL, "item:2": OK}
+
+
+def test_fail_fast_stops_starting_new_checks():
+    checks = [Check("first", lambda ctx: ctx.fail("boom"))] + [Check(f"c{i}", lambda ctx: None) for i in range(5)]
+    statuses = _statuses(run_checks(checks, workers=1, fail_fast=True))
+    assert statuses["first"] == FAIL
+    assert [s for name, s in statuses.items() if name != "first"] == [SKIP] * 5
+
+
+def test_cycles_and_unknown_dependencies_fail():
+    checks = [
+        Check("a", lambda ctx: None, deps=("b",)),
+        Check("b", lambda ctx: None, deps=("a",)),
+        Check("c", lambda ctx: None, deps=("missing",)),
+    ]
+    assert _statuses(run_checks(checks)) == {"a": FAIL, "b": FAIL, "c": FAIL}
@@ -0,0 +1,90 @@
+import subprocess
+
+import pytest
+
+from check_lock_paths import LockPathMatcher, group_violations, is_path_allowed, iter_diff_entries, main
+
+
+def _linear_is_allowed(file_str, lock_paths):
+    for lock_path in lock_paths:
+        if lock_path.endswith("/"):
+            if file_str.startswith(lock_path) or file_str + "/" == lock_path:
+                return True
+        elif file_str == lock_path or file_str.startswith(lock_path + "/"):
+            return True
+    return False
+
+
+def test_matcher_agrees_with_linear_scan():
+    lock_paths = ["contracts/openapi.v1.yaml", "contracts/schemas/", "scripts/quality", "scripts/quality/sub/"]
+    paths = [
+        "contracts/openapi.v1.yaml",
+        "contracts/openapi.v1.yaml.bak",
+        "contracts/schemas",
+        "contracts/schemas/bom.schema.json",
+        "contracts/schemasx/bom.json",
+        "contracts/examples/a.json",
+        "scripts/quality/check.py",
+        "scripts/quality",
+        "scripts/qualityx.py",
+        "README.md",
+    ]
+    matcher = LockPathMatcher(lock_paths)
+    for path in paths:
+        assert matcher.allows(path) == _linear_is_allowed(path, lock_paths), path
+    assert is_path_allowed("contracts/schemas/x.json", lock_paths)
+
+
+def test_violations_grouped_by_prefix():
+    groups = group_violations(["backend/api/a.py", "backend/api/v1/b.py", "README.md", "backend/engine/c.py"])
+    assert groups == {
+        "./": ["README.md"],
+        "backend/api/": ["backend/api/a.py", "backend/api/v1/b.py"],
+        "backend/engine/": ["backend/engine/c.py"],
+    }
+
+
+@pytest.fixture
+def git_repo(tmp_path, monkeypatch):
+    def git(*args):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git("init", "-q", "-b", "main")
+    git("config", "user.email", "ci@example.com")
+    git("config", "user.name", "ci")
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "guide.md").write_text("line\n" * 50)
+    (tmp_path / "keep.txt").write_text("keep\n")
+    git("add", ".")
+    git("commit", "-q", "-m", "base")
+    git("branch", "base")
+    (tmp_path / "src").mkdir()
+    git("mv", "docs/guide.md", "src/guide.md")
+    git("commit", "-q", "-m", "move")
+    (tmp_path / "keep.txt").write_text("changed\n")
+    (tmp_path / "new file.txt").write_text("new\n")
+    git("add", ".")
+    git("commit", "-q", "-m", "edit")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_diff_covers_every_commit_and_detects_renames(git_repo):
+    entries = sorted(iter_diff_entries("base", "HEAD"))
+    assert entries == [
+        ("A", "new file.txt", None),
+        ("M", "keep.txt", None),
+        ("R100", "src/guide.md", "docs/guide.md"),
+    ]
+
+
+def test_diff_errors_for_unknown_base(git_repo):
+    with pytest.raises(subprocess.CalledProcessError):
+        list(iter_diff_entries("no-such-ref", "HEAD"))
+
+
+def test_main_fails_when_the_diff_base_is_missing(git_repo, capsys):
+    with pytest.raises(SystemExit) as exc:
+        main(["## Lock Paths\nsrc/", "--base", "no-such-ref"])
+    assert exc.value.code == 1
+    assert "no-such-ref" in capsys.readouterr().out
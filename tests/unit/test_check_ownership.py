@@ -0,0 +1,52 @@
+import yaml
+
+from check_ownership import OwnershipIndex, audit_files, check_file_ownership
+
+OWNERSHIP_MAP = {
+    "owners": {
+        "orchestrator": {"paths": ["AGENTS.md", "governance/**"]},
+        "backend": {"paths": ["backend/**"]},
+        "engine": {"paths": ["backend/engine/**"]},
+        "sql": {"paths": ["backend/**/*.sql", "docs/adr-[0-9]*.md"]},
+        "docs": {"paths": ["docs/**"]},
+        "release": {"paths": ["docs/adr-0001.md"]},
+        "tooling": {"paths": ["docs/**"]},
+    }
+}
+
+
+def test_longest_match_wins():
+    index = OwnershipIndex(OWNERSHIP_MAP)
+    assert index.owner_of("AGENTS.md") == "orchestrator"
+    assert index.owner_of("governance/policy/rules.md") == "orchestrator"
+    assert index.owner_of("backend/api/app.py") == "backend"
+    assert index.owner_of("backend/engine/solver.py") == "engine"
+    assert index.owner_of("backend/engine/migrations/001.sql") == "engine"
+    assert index.owner_of("backend/db/schema.sql") == "sql"
+    assert index.owner_of("docs/adr-0001.md") == "release"
+
+
+def test_unowned_paths():
+    index = OwnershipIndex(OWNERSHIP_MAP)
+    assert index.owner_of("governance") is None
+    assert index.owner_of("AGENTS.md/extra") is None
+    assert check_file_ownership("README.md", OWNERSHIP_MAP) is None
+
+
+def test_audit_reports_unowned_and_conflicts():
+    index = OwnershipIndex(OWNERSHIP_MAP)
+    files = ["AGENTS.md", "README.md", "docs/guide.md", "docs/adr-0002.md", "backend/x.py"]
+    unowned, conflicts = audit_files(files, index)
+    assert unowned == ["README.md"]
+    assert conflicts == {"docs/guide.md": ["docs", "tooling"]}
+
+
+def test_repository_map_matches_linear_scan(project_root):
+    ownership_map = yaml.safe_load((project_root / "governance" / "ownership-map.yaml").read_text(encoding="utf-8"))
+    index = OwnershipIndex(ownership_map)
+    for path in ["AGENTS.md", "models/catalog/v1-catalog.json", "tests/conftest.py", "scripts/quality/x.py", "scripts/a.py"]:
+        expected = None
+        for owner, config in ownership_map["owners"].items():
+            if any(path.startswith(p[:-3]) if p.endswith("/**") else path == p for p in config["paths"]):
+                expected = expected or owner
+        assert index.owner_of(path) == expected
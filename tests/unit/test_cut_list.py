@@ -0,0 +1,88 @@
+import random
+import time
+
+import pytest
+
+from cut_list import (
+    _best_pattern,
+    column_generation,
+    cut_plan_bom_lines,
+    extract_profile_segments,
+    first_fit_decreasing,
+    optimize_cut_list,
+)
+
+
+def _profile(elem_id, length, article="100001.1"):
+    return {
+        "id": elem_id,
+        "article": article,
+        "kind": "profile",
+        "geom": {"type": "segment", "start": {"x": 0, "y": 0, "z": 0}, "end": {"x": 0, "y": length, "z": 0}},
+    }
+
+
+class TestCutList:
+    def test_extracts_only_profile_segments(self):
+        config = {
+            "elements": [
+                _profile("stud-1", 2500),
+                {"id": "corner-1", "article": "100002", "kind": "connector", "geom": {"type": "block"}},
+            ]
+        }
+        assert extract_profile_segments(config) == {"100001.1": [("stud-1", 2500)]}
+
+    def test_ffd_respects_stock_length_and_kerf(self):
+        pieces = [(f"p{i}", 2000) for i in range(6)]
+        assert len(first_fit_decreasing(pieces, 6000)) == 2
+        assert len(first_fit_decreasing(pieces, 6000, kerf=5)) == 3
+
+    def test_oversize_segment_is_rejected(self):
+        with pytest.raises(ValueError):
+            first_fit_decreasing([("long", 7000)], 6000)
+
+    def test_colgen_reaches_lp_bound(self):
+        pieces = [(f"a{i}", 2500) for i in range(10)] + [(f"b{i}", 1200) for i in range(15)]
+        pieces += [(f"c{i}", 450) for i in range(20)]
+        bars, lower_bound = column_generation(pieces, 6000)
+        assert sorted(p for bar in bars for p in bar) == sorted(pieces)
+        assert all(sum(length for _, length in bar) <= 6000 for bar in bars)
+        assert len(bars) == lower_bound
+
+    def test_pattern_search_agrees_with_dp(self):
+        rng = random.Random(7)
+        for _ in range(20):
+            weights = [rng.randint(300, 3000) for _ in range(12)]
+            values = [rng.random() * w / 6000 for w in weights]
+            searched, counts = _best_pattern(weights, values, 6000)
+            exact, _ = _best_pattern(weights, values, 6000, max_nodes=0)  # no search budget: DP only
+            assert searched == pytest.approx(exact)
+            assert sum(c * w for c, w in zip(counts, weights)) <= 6000
+
+    def test_colgen_out_of_time_is_no_worse_than_ffd(self):
+        rng = random.Random(3)
+        pieces = [(f"p{i}", rng.randint(300, 3000)) for i in range(60)]
+        bars, lower_bound = column_generation(pieces, 6000, kerf=3, time_limit=0)
+        assert sorted(p for bar in bars for p in bar) == sorted(pieces)
+        assert lower_bound <= len(bars) <= len(first_fit_decreasing(pieces, 6000, kerf=3))
+
+    def test_colgen_with_thousands_of_distinct_lengths_keeps_its_time_limit(self):
+        # One frame per distinct length on the pricing search path: this used to hit the recursion limit.
+        rng = random.Random(5)
+        pieces = [(f"p{i}", rng.randint(200, 3000)) for i in range(6000)]
+        assert len({length for _, length in pieces}) > 1000
+        started = time.perf_counter()
+        bars, lower_bound = column_generation(pieces, 6000, time_limit=0.5)
+        assert time.perf_counter() - started < 5
+        assert sorted(p for bar in bars for p in bar) == sorted(pieces)
+        assert lower_bound <= len(bars) <= len(first_fit_decreasing(pieces, 6000))
+
+    def test_plan_feeds_bom(self):
+        config = {"elements": [_profile("stud-1", 2500), _profile("beam-top", 1200)]}
+        plan = optimize_cut_list(config)
+        assert plan["articles"][0]["barCount"] == 1
+        assert plan["articles"][0]["wasteLength"] == 2300
+        lines = cut_plan_bom_lines(plan)
+        assert lines == [
+            {"article": "100001.1", "qty": 1, "uom": "pcs", "comment": "Хлысты 6000 мм по карте раскроя"}
+        ]
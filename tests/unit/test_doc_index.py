@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from doc_index import DocIndex, build_index, retrieve
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "solver.md").write_text(
+        "# Solution Engine\n\nThe solution engine checks every constraint.\n\n"
+        "## Pricing\n\nCPQ pricing rules apply after the engine runs.\n",
+        encoding="utf-8",
+    )
+    (docs / "bom.md").write_text("# BOM\n\nСпецификация профилей и крепежа.\n", encoding="utf-8")
+    (tmp_path / "configs").mkdir()
+    (tmp_path / "configs/router.yaml").write_text("engine: solution\nretries: 2\n", encoding="utf-8")
+    (docs / "diagram.pdf").write_bytes(b"%PDF-1.4 solution engine")
+    return tmp_path
+
+
+def test_bm25_ranking_citations_and_sources(corpus):
+    stats = build_index(corpus, corpus / "index", roots=("docs", "configs"))
+    assert stats["files"] == 3 and stats["written"]
+
+    result = retrieve("constraint engine", repo_root=corpus, index_dir=corpus / "index", refresh=False)
+    assert result["citations"][0] == "docs/solver.md:1-4"
+    assert result["chunks"][0]["heading"] == "Solution Engine"
+    assert isinstance(result["retrieval_ms"], int)
+
+    only_configs = retrieve("solution", sources=["configs"], repo_root=corpus, index_dir=corpus / "index", refresh=False)
+    assert only_configs["citations"] == ["configs/router.yaml:1-2"]
+    cyrillic = retrieve("крепежа", repo_root=corpus, index_dir=corpus / "index", refresh=False)
+    assert cyrillic["citations"] == ["docs/bom.md:1-3"]
+
+
+def test_quoted_phrases_use_positions(corpus):
+    build_index(corpus, corpus / "index", roots=("docs", "configs"))
+    with DocIndex(corpus / "index/index.bin") as index:
+        loose = {h.citation for h in index.search("engine solution", max_chunks=10)}
+        phrase = {h.citation for h in index.search('"solution engine"', max_chunks=10)}
+    assert "configs/router.yaml:1-2" in loose
+    assert phrase == {"docs/solver.md:1-4"}
+
+
+def test_rebuild_only_touches_changed_files(corpus):
+    index_dir = corpus / "index"
+    roots = ("docs", "configs")
+    build_index(corpus, index_dir, roots=roots)
+    assert build_index(corpus, index_dir, roots=roots)["written"] is False
+
+    solver = corpus / "docs/solver.md"
+    st = solver.stat()
+    os.utime(solver, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    stats = build_index(corpus, index_dir, roots=roots)
+    assert (stats["reindexed"], stats["rehashed"]) == (0, 1)
+
+    (corpus / "docs/bom.md").write_text("# BOM\n\nnew rivet table\n", encoding="utf-8")
+    (corpus / "configs/router.yaml").unlink()
+    stats = build_index(corpus, index_dir, roots=roots)
+    assert (stats["reindexed"], stats["removed"]) == (1, 1)
+    with DocIndex(index_dir / "index.bin") as index:
+        assert [h.path for h in index.search("rivet")] == ["docs/bom.md"]
+        assert index.search("retries") == []
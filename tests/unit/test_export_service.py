@@ -0,0 +1,145 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import export_service
+from export_service import API_PREFIX, ExportService
+
+
+async def _post(service, path, body, method="POST"):
+    host, port = service._server.sockets[0].getsockname()[:2]
+    reader, writer = await asyncio.open_connection(host, port)
+    head = f"{method} {API_PREFIX}{path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n\r\n"
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    headers = {k.lower(): v.strip() for k, _, v in (line.partition(":") for line in header_lines)}
+    if headers.get("transfer-encoding") == "chunked":
+        chunks = []
+        while True:
+            size, _, payload = payload.partition(b"\r\n")
+            if int(size, 16) == 0:
+                break
+            chunks.append(payload[: int(size, 16)])
+            payload = payload[int(size, 16) + 2 :]
+        payload = b"".join(chunks)
+    return int(status_line.split()[1]), headers, payload
+
+
+@pytest.fixture
+def snapshot_body(examples_dir):
+    return (examples_dir / "example.snapshot.json").read_bytes()
+
+
+@pytest.fixture
+def config_body(examples_dir):
+    return (examples_dir / "example.export.rivo.json").read_bytes()
+
+
+def test_endpoints_export_validate_and_stream(snapshot_body, config_body):
+    async def scenario():
+        async with ExportService(workers=2) as service:
+            rivo = await _post(service, "/export/rivo", snapshot_body)
+            dxf = await _post(service, "/export/dxf", config_body)
+            ifc = await _post(service, "/exports/ifc", config_body)
+            pdf = await _post(service, "/export/pdf", config_body)
+            valid = await _post(service, "/configuration/validate", snapshot_body)
+            invalid = await _post(service, "/configuration/validate", b'{"stateId": "x"}')
+            bad_json = await _post(service, "/export/dxf", b"{nope")
+            bad_config = await _post(service, "/export/pdf", b"{}")
+            missing = await _post(service, "/export/svg", b"{}")
+            leftovers = list(service._work_dir.iterdir())
+        return rivo, dxf, ifc, pdf, valid, invalid, bad_json, bad_config, missing, leftovers
+
+    rivo, dxf, ifc, pdf, valid, invalid, bad_json, bad_config, missing, leftovers = asyncio.run(scenario())
+
+    assert rivo[0] == 200 and rivo[1]["transfer-encoding"] == "chunked"
+    assert [line["sku"] for line in json.loads(rivo[2])["bom"]["lines"]] == ["100001.1"]
+    assert dxf[0] == 200 and b"RIVO" in dxf[2]
+    assert ifc[0] == 200 and ifc[2].startswith(b"IFC4 HIERARCHY MAPPING") and ifc[1]["deprecation"] == "true"
+    assert pdf[0] == 200 and pdf[1]["content-type"].startswith("text/markdown") and pdf[2]
+    passed = {"ruleId": "SCHEMA", "status": "pass", "message": "Matches ConfigurationSnapshot"}
+    assert json.loads(valid[2]) == {"valid": True, "items": [passed]}
+    report = json.loads(invalid[2])
+    assert invalid[0] == 200 and report["valid"] is False and {i["status"] for i in report["items"]} == {"error"}
+    assert bad_json[0] == 400 and json.loads(bad_json[2])["code"] == "invalid_json"
+    assert bad_config[0] == 400 and json.loads(bad_config[2])["code"] == "schema_validation_failed"
+    assert missing[0] == 404
+    assert leftovers == []  # outputs are removed once streamed
+
+
+def test_legacy_paths_answer_in_their_own_shape(snapshot_body):
+    async def scenario():
+        async with ExportService(workers=1, executor=ThreadPoolExecutor(1)) as service:
+            valid = await _post(service, "/configurations/validate", snapshot_body)
+            invalid = await _post(service, "/configurations/validate", b'{"stateId": "x"}')
+            rivo = await _post(service, "/exports/rivo", snapshot_body)
+        return valid, invalid, rivo
+
+    valid, invalid, rivo = asyncio.run(scenario())
+
+    assert valid[0] == 200 and valid[1]["deprecation"] == "true"
+    assert json.loads(valid[2]) == [{"ruleId": "SCHEMA", "status": "pass", "message": "Matches ConfigurationSnapshot"}]
+    items = json.loads(invalid[2])
+    assert isinstance(items, list) and items and {i["status"] for i in items} == {"error"}
+    assert rivo[0] == 200 and rivo[1]["deprecation"] == "true" and json.loads(rivo[2])["meta"]
+
+
+@pytest.fixture
+def gated_jobs(monkeypatch):
+    gate = threading.Event()
+    calls = []
+
+    def run_job(kind, body, work_dir):
+        calls.append(body)
+        gate.wait(5)
+        return {"payload": {"kind": kind, "body": body.decode()}}
+
+    monkeypatch.setattr(export_service, "_run_job", run_job)
+    return gate, calls
+
+
+def test_identical_concurrent_requests_share_one_job(gated_jobs):
+    gate, calls = gated_jobs
+
+    async def scenario():
+        with ThreadPoolExecutor(2) as pool:
+            async with ExportService(workers=2, executor=pool) as service:
+                requests = [_post(service, "/export/dxf", b'{"a": 1}') for _ in range(5)]
+                requests.append(_post(service, "/export/dxf", b'{"a": 2}'))
+                tasks = [asyncio.ensure_future(r) for r in requests]
+                await asyncio.sleep(0.1)
+                gate.set()
+                return await asyncio.gather(*tasks), dict(service.stats)
+
+    responses, stats = asyncio.run(scenario())
+    assert [json.loads(r[2])["body"] for r in responses] == ['{"a": 1}'] * 5 + ['{"a": 2}']
+    assert sorted(calls) == [b'{"a": 1}', b'{"a": 2}']
+    assert stats["jobs"] == 2 and stats["coalesced"] == 4
+
+
+def test_full_queue_rejects_new_jobs_but_not_coalesced_ones(gated_jobs):
+    gate, calls = gated_jobs
+
+    async def scenario():
+        with ThreadPoolExecutor(1) as pool:
+            async with ExportService(workers=1, max_pending=2, executor=pool) as service:
+                first = [asyncio.ensure_future(_post(service, "/export/ifc", b"%d" % i)) for i in range(2)]
+                await asyncio.sleep(0.1)
+                rejected = await _post(service, "/export/ifc", b"3")
+                duplicate = asyncio.ensure_future(_post(service, "/export/ifc", b"0"))
+                await asyncio.sleep(0.1)
+                gate.set()
+                return rejected, await asyncio.gather(*first, duplicate), dict(service.stats)
+
+    rejected, accepted, stats = asyncio.run(scenario())
+    assert rejected[0] == 503 and rejected[1]["retry-after"] == "1"
+    assert json.loads(rejected[2])["code"] == "overloaded"
+    assert [r[0] for r in accepted] == [200, 200, 200]
+    assert stats == {"requests": 4, "jobs": 2, "coalesced": 1, "rejected": 1}
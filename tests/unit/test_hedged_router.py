@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+
+from hedged_router import AllModelsFailed, Budget, HttpProviderClient, LatencyTracker, hedged_complete, provider_api_key
+from mock_provider import MockModel, MockProviderServer
+
+
+def _run(models, *, budget=None, delay=0.1, timeout=5.0, **kwargs):
+    async def scenario():
+        async with MockProviderServer(models) as server:
+            result = await hedged_complete(
+                list(models),
+                "Summarise the BOM",
+                client=HttpProviderClient(server.url, model_prefix="openrouter/"),
+                tier="light",
+                max_output_tokens=100,
+                budget=budget or Budget(10_000, 1.0),
+                timeout_s=timeout,
+                hedge_delay_s=delay,
+                **kwargs,
+            )
+            await asyncio.sleep(0.05)  # let the server notice cancelled connections
+            return result, server
+
+    return asyncio.run(scenario())
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    started = time.monotonic()
+    result, server = _run({"slow": MockModel(latency_s=2.0), "fast": MockModel(latency_s=0.01, usd_per_1k_tokens=1.0)})
+    assert time.monotonic() - started < 1.0
+    assert result.model == "fast" and result.completion.text == "[fast] ok"
+    assert [(a.model, a.status) for a in result.attempts] == [("slow", "cancelled"), ("fast", "won")]
+    assert result.attempts[1].started_s >= 0.1
+    assert "slow" in server.cancelled
+    assert result.spent_cost_usd > 0
+
+
+def test_failure_falls_back_without_waiting_for_the_hedge_delay():
+    result, _ = _run({"down": MockModel(fail=True, latency_s=0.0), "up": MockModel(latency_s=0.0)}, delay=3.0)
+    assert result.model == "up" and result.elapsed_ms < 1000
+    assert result.attempts[0].status == "failed" and "503" in result.attempts[0].error
+
+
+def test_a_failed_hedge_is_replaced_while_another_is_in_flight():
+    # "slow" is still running when the "down" hedge fails: "up" starts at once, not a hedge delay later.
+    result, _ = _run(
+        {"slow": MockModel(latency_s=2.0), "down": MockModel(fail=True, latency_s=0.0), "up": MockModel(latency_s=0.0)},
+        delay=0.2,
+    )
+    assert result.model == "up" and result.elapsed_ms < 380
+    assert [(a.model, a.status) for a in result.attempts] == [("slow", "cancelled"), ("down", "failed"), ("up", "won")]
+    assert result.attempts[2].started_s - result.attempts[1].started_s < 0.15
+
+
+def test_openrouter_key_only_goes_to_openrouter_over_https():
+    env = {"OPENROUTER_API_KEY": "sk-or"}
+    assert provider_api_key("https://openrouter.ai/api/v1", env) == "sk-or"
+    assert provider_api_key("http://openrouter.ai/api/v1", env) is None
+    assert provider_api_key("http://127.0.0.1:8089/v1", env) is None
+    assert provider_api_key("https://openrouter.ai.example.com/v1", env) is None
+    assert provider_api_key("http://127.0.0.1:8089/v1", {**env, "SWARM_PROVIDER_API_KEY": "sk-mine"}) == "sk-mine"
+
+
+def test_budget_blocks_hedges_that_could_overspend():
+    # Room for one worst-case request (prompt estimate + 100 output tokens) at a time.
+    result, server = _run(
+        {"slow": MockModel(latency_s=0.3), "fast": MockModel(latency_s=0.0)}, budget=Budget(150, 1.0)
+    )
+    assert result.model == "slow"
+    assert [a.status for a in result.attempts] == ["won", "skipped_budget"]
+    assert server.requests == ["slow"]
+
+
+def test_all_models_failing_raises_with_attempts():
+    with pytest.raises(AllModelsFailed) as info:
+        _run({"a": MockModel(fail=True), "b": MockModel(fail=True)})
+    assert [a.status for a in info.value.result.attempts] == ["failed", "failed"]
+
+
+def test_latency_tracker_uses_p95_and_persists(tmp_path):
+    tracker = LatencyTracker(tmp_path / "latency.json")
+    assert tracker.hedge_delay("light") == 2.0
+    for i in range(1, 101):
+        tracker.record("light", i / 100)
+    tracker.save()
+    assert LatencyTracker(tmp_path / "latency.json").hedge_delay("light") == pytest.approx(0.95)
@@ -0,0 +1,23 @@
+import json
+
+import pytest
+
+import json_io
+
+DOCUMENT = {"meta": {"projectId": "demo", "author": "Конфигуратор"}, "elements": [{"id": "a", "len": 2500.5}], "x": {}}
+
+
+@pytest.mark.parametrize("backend", json_io.available_backends())
+class TestJsonIo:
+    def test_pretty_output_matches_stdlib_format(self, backend):
+        expected = json.dumps(DOCUMENT, ensure_ascii=False, indent=2).encode("utf-8")
+        assert json_io.dumps(DOCUMENT, pretty=True, backend=backend) == expected
+
+    def test_round_trip_through_mmap(self, backend, tmp_path, monkeypatch):
+        monkeypatch.setattr(json_io, "MMAP_MIN_BYTES", 0)
+        path = json_io.dump_path(DOCUMENT, tmp_path / "doc.json", backend=backend)
+        assert json_io.load_path(path, backend=backend) == DOCUMENT
+
+    def test_decode_errors_are_value_errors(self, backend):
+        with pytest.raises(ValueError):
+            json_io.loads(b"{broken", backend=backend)
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+import json_stream
+from export_dxf import generate_dxf_stream, generate_dxf_stub
+from export_passport import generate_passport, generate_passport_stream
+from json_stream import iter_rivo_sections
+
+DOCUMENT = {
+    "elements": [
+        {"id": "E1", "article": "1000010001", "geom": {"type": "segment", "start": {"x": 0, "y": 0}, "end": {"x": 0, "y": 2500.5}}},
+        {"id": "E2", "article": "2000", "geom": {"type": "point", "point": {"x": 1, "y": 2}}, "tags": ["a", "]", "\"{"]},
+    ],
+    "meta": {"projectId": "demo", "author": "Конфигуратор"},
+    "bom": {"currency": "RUB", "lines": [{"article": "1000010001", "qty": 12, "uom": "м"}, {"article": "2000", "qty": 1e3}]},
+    "frame": {"type": "wall", "width": 1200},
+    "views": [],
+}
+
+
+def _modes():
+    return [False, True] if json_stream._ijson is not None else [False]
+
+
+@pytest.mark.parametrize("use_ijson", _modes())
+class TestIterRivoSections:
+    @pytest.mark.parametrize("indent", [None, 2])
+    def test_sections_in_document_order(self, use_ijson, indent, tmp_path):
+        path = tmp_path / "doc.rivo.json"
+        path.write_text(json.dumps(DOCUMENT, ensure_ascii=False, indent=indent), encoding="utf-8")
+
+        sections = list(iter_rivo_sections(path, use_ijson=use_ijson, chunk_chars=7))
+
+        assert sections == [
+            ("element", DOCUMENT["elements"][0]),
+            ("element", DOCUMENT["elements"][1]),
+            ("meta", DOCUMENT["meta"]),
+            ("bom.currency", "RUB"),
+            ("bom_line", DOCUMENT["bom"]["lines"][0]),
+            ("bom_line", DOCUMENT["bom"]["lines"][1]),
+            ("frame", DOCUMENT["frame"]),
+            ("views", []),
+        ]
+
+    def test_scalar_numbers_split_across_chunks(self, use_ijson, tmp_path):
+        path = tmp_path / "numbers.rivo.json"
+        path.write_text(
+            '{"meta": {}, "scale": 12.5, "offset": -3.25e-2, "count": 1E+3, "zero": 0,'
+            ' "bom": {"factor": 123456.789, "lines": [{"qty": 2.5}]}, "elements": []}',
+            encoding="utf-8",
+        )
+        expected = [
+            ("meta", {}),
+            ("scale", 12.5),
+            ("offset", -3.25e-2),
+            ("count", 1e3),
+            ("zero", 0),
+            ("bom.factor", 123456.789),
+            ("bom_line", {"qty": 2.5}),
+        ]
+        for chunk_chars in range(1, 65):
+            assert list(iter_rivo_sections(path, use_ijson=use_ijson, chunk_chars=chunk_chars)) == expected, chunk_chars
+
+    def test_non_object_document_is_rejected(self, use_ijson, tmp_path):
+        path = tmp_path / "list.json"
+        path.write_text("[1, 2]", encoding="utf-8")
+        with pytest.raises(ValueError):
+            list(iter_rivo_sections(path, use_ijson=use_ijson))
+
+    def test_truncated_document_is_rejected(self, use_ijson, tmp_path):
+        path = tmp_path / "cut.json"
+        path.write_text(json.dumps(DOCUMENT)[:-20], encoding="utf-8")
+        with pytest.raises(ValueError):
+            list(iter_rivo_sections(path, use_ijson=use_ijson))
+
+
+def test_streamed_writers_match_in_memory_output(examples_dir, tmp_path):
+    source = examples_dir / "example.export.rivo.json"
+    config = json.loads(source.read_text(encoding="utf-8"))
+
+    dxf = generate_dxf_stub(config, tmp_path / "a.dxf")
+    dxf_streamed = generate_dxf_stream(iter_rivo_sections(source), tmp_path / "b.dxf")
+    # The streamed writer keeps document order instead of sorting by id.
+    assert sorted(dxf.read_text(encoding="utf-8").splitlines()) == sorted(
+        dxf_streamed.read_text(encoding="utf-8").splitlines()
+    )
+
+    passport = generate_passport(config, tmp_path / "a.md").read_text(encoding="utf-8")
+    streamed = generate_passport_stream(iter_rivo_sections(source), tmp_path / "b.md").read_text(encoding="utf-8")
+    # Only the generation timestamp on the last line may differ.
+    assert passport.splitlines()[:-1] == streamed.splitlines()[:-1]
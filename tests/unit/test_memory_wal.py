@@ -0,0 +1,160 @@
+import os
+import threading
+
+import pytest
+
+from memory_wal import WalMemoryStore, _read_segment
+
+
+def test_batched_writes_are_readable_immediately_and_survive_reopen(tmp_path):
+    store = WalMemoryStore(tmp_path)
+    futures = []
+    barrier = threading.Barrier(8)
+
+    def writer(n):
+        barrier.wait()
+        for i in range(50):
+            key = f"run:{n}:{i}"
+            futures.append(store.write(key, {"n": n, "i": i}))
+            assert store.read(key)["payload"] == {"n": n, "i": i}
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    store.write("run:0:0", {"n": 0, "i": "latest"})
+    store.close()
+
+    assert all(f.done() and f.exception() is None for f in futures)
+    assert store.stats["commits"] < store.stats["writes"] == 401
+
+    with WalMemoryStore(tmp_path) as reopened:
+        assert len(reopened.search("run:")) == 400
+        assert reopened.read("run:0:0")["payload"]["i"] == "latest"
+
+
+def test_compaction_folds_log_into_indexed_store(tmp_path):
+    with WalMemoryStore(tmp_path, sync=True, compact_bytes=2048) as store:
+        for i in range(100):
+            store.write(f"k{i:03d}", {"v": i})
+        store.write("k000", {"v": "new"})
+        store.compact()
+        assert store.stats["compactions"] >= 1
+        assert list(tmp_path.glob("wal-*.log")) == [store._segment]
+        assert store.read("k000")["payload"] == {"v": "new"}
+
+    with WalMemoryStore(tmp_path) as reopened:
+        assert reopened.read("k099")["payload"] == {"v": 99}
+        assert reopened.read("k000")["payload"] == {"v": "new"}
+        assert [r["key"] for r in reopened.search("k00")] == [f"k00{i}" for i in range(10)]
+
+
+@pytest.mark.parametrize("sync", [False, True])
+def test_concurrent_writes_reach_the_log_in_seq_order(tmp_path, sync):
+    # Checkpoints apply older segments first, which is only safe if no record
+    # is logged after one with a higher seq.
+    with WalMemoryStore(tmp_path, sync=sync, max_batch=4) as store:
+
+        def writer(n):
+            for i in range(200):
+                store.write(f"w{n}:{i:03d}", i)
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        store.flush()
+
+        seqs = [r["seq"] for path in sorted(tmp_path.glob("wal-*.log")) for r in _read_segment(path)[0]]
+        assert seqs == sorted(seqs) and len(seqs) == 1600
+    assert list(tmp_path.glob("wal-*")) == []  # checkpointed on close
+    with WalMemoryStore(tmp_path) as reopened:
+        assert len(reopened.search("w")) == 1600
+
+
+def _crash(store):
+    """Drop a store the way a killed process would: no checkpoint, locks released."""
+    store._fh.close()
+    os.close(store._writer_lock_fd)
+    store.backend.close()
+    store._closed = True
+
+
+def test_torn_log_tail_is_dropped_on_recovery(tmp_path):
+    store = WalMemoryStore(tmp_path, sync=True)
+    store.write("a", 1)
+    store.write("b", 2)
+    _crash(store)
+    segment = next(tmp_path.glob("wal-*.log"))
+    data = segment.read_bytes()
+    segment.write_bytes(data[:-3])
+
+    with WalMemoryStore(tmp_path) as store:
+        assert store.read("a")["payload"] == 1
+        assert store.read("b") is None
+        assert list(tmp_path.glob("wal-*.log")) == [store._segment]  # the dead writer's log was applied
+        store.write("c", 3)
+    with WalMemoryStore(tmp_path) as store:
+        assert [r["key"] for r in store.search()] == ["a", "c"]
+
+
+def test_stores_in_several_processes_do_not_wait_for_each_other(tmp_path):
+    # flock conflicts between open files even within one process, so two
+    # stores here stand in for two `swarmctl run`s.
+    first = WalMemoryStore(tmp_path)
+    second = WalMemoryStore(tmp_path)
+    first.write("run:1", "one").result()
+    second.write("run:2", "two").result()
+    first.close()
+    assert second.read("run:1")["payload"] == "one"  # checkpointed into the shared store.kv
+    second.close()
+
+    with WalMemoryStore(tmp_path) as store:
+        assert [r["payload"] for r in store.search("run:")] == ["one", "two"]
+
+
+class DictBackend:
+    def __init__(self):
+        self.records = {}
+        self.applied = []
+
+    def get(self, key):
+        return self.records.get(key)
+
+    def search(self, prefix):
+        return [self.records[k] for k in sorted(self.records) if k.startswith(prefix)]
+
+    def apply(self, records):
+        self.applied.append([r["key"] for r in records])
+        self.records.update((r["key"], r) for r in records)
+
+    def close(self):
+        pass
+
+
+def test_wal_sits_in_front_of_a_backend(tmp_path):
+    backend = DictBackend()
+    backend.records["old"] = {"id": "x", "key": "old", "payload": 0}
+    with WalMemoryStore(tmp_path, backend=backend) as store:
+        store.write("new", 1)
+        store.write("new", 2)
+        assert store.read("new")["payload"] == 2 and store.read("old")["payload"] == 0
+        assert [r["key"] for r in store.search()] == ["new", "old"]
+        assert backend.applied == []  # nothing reaches the backend before a checkpoint
+    assert backend.applied == [["new", "new"]]
+    assert backend.records["new"]["payload"] == 2
+    assert list(tmp_path.iterdir()) == []  # no log, and no store.kv of its own
+
+
+def test_operate_follows_the_memory_store_contract(tmp_path):
+    with WalMemoryStore(tmp_path) as store:
+        written = store.operate("write", "run:1", {"status": "ok"}).to_dict()
+        assert written["result"]["key"] == "run:1" and len(written["memory_ids"]) == 1
+        read = store.operate("read", "run:1").to_dict()
+        assert read["result"]["payload"] == {"status": "ok"} and read["memory_ids"] == written["memory_ids"]
+        assert store.operate("read", "run:2").confidence == 0.0
+        assert [i["key"] for i in store.operate("search", "run:").result["items"]] == ["run:1"]
+        with pytest.raises(ValueError):
+            store.operate("delete", "run:1")
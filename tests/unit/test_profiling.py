@@ -0,0 +1,51 @@
+import argparse
+import contextlib
+import pstats
+import time
+
+import tracing
+from json_io import load_path
+from profiling import DEFAULT_PROFILE_DIR, add_profile_option, profiled
+
+
+def test_profile_off_is_a_plain_null_context():
+    assert isinstance(profiled(None, "x"), contextlib.nullcontext)
+
+
+def test_profile_flag_leaves_a_following_subcommand_alone():
+    parser = argparse.ArgumentParser()
+    add_profile_option(parser)
+    parser.add_subparsers(dest="cmd").add_parser("triage")
+    assert parser.parse_args(["--profile", "triage"]).profile == str(DEFAULT_PROFILE_DIR)
+    assert parser.parse_args(["--profile-dir", "out", "--profile", "triage"]).profile == "out"
+    assert parser.parse_args(["triage"]).profile is None
+
+
+def test_profile_writes_pstats_collapsed_stacks_and_stage_peaks(tmp_path):
+    tracer = tracing.Tracer(None)
+    with profiled(tmp_path, "export"):
+        with tracer.span("export.load"):
+            blob = [bytes(1024) for _ in range(512)]
+            with tracer.span("export.parse"):
+                small = bytearray(64 * 1024)
+        del blob, small
+        with tracer.span("export.write"):
+            deadline = time.perf_counter() + 0.05
+            while time.perf_counter() < deadline:
+                pass
+    assert not tracing._stage_hooks
+
+    (memory,) = tmp_path.glob("export-*.memory.json")
+    stem = str(memory)[: -len(".memory.json")]
+    report = load_path(memory)
+    assert report["name"] == "export"
+    assert report["stages"]["export.load"] >= 512 * 1024
+    assert 64 * 1024 <= report["stages"]["export.parse"] < report["stages"]["export.load"]
+    assert report["peak_bytes"] >= report["stages"]["export.load"]
+
+    stats = pstats.Stats(f"{stem}.pstats")
+    assert any(func[2] == "_staged" for func in stats.stats)
+
+    lines = open(f"{stem}.collapsed", encoding="utf-8").read().splitlines()
+    assert lines and sum(int(line.rsplit(" ", 1)[1]) for line in lines) == report["samples"]
+    assert any("test_profile_writes_pstats_collapsed_stacks_and_stage_peaks" in line for line in lines)
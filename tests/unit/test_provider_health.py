@@ -0,0 +1,62 @@
+import pytest
+
+from provider_health import CLOSED, HALF_OPEN, OPEN, OPEN_BASE_S, ProviderHealth, model_tiers
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def test_breaker_opens_half_opens_and_backs_off(tmp_path, clock):
+    health = ProviderHealth(tmp_path / "health.json", clock=clock)
+    for _ in range(3):
+        health.record_failure("m", "HTTP 503")
+    assert health.state("m") == OPEN and health.unavailable() == {"m"}
+
+    clock.now += OPEN_BASE_S
+    assert health.state("m") == HALF_OPEN and health.unavailable() == set()
+    health.record_failure("m", "HTTP 503")  # failed probe: open again, twice as long
+    clock.now += OPEN_BASE_S
+    assert health.state("m") == OPEN
+    clock.now += OPEN_BASE_S
+    health.record_success("m", 0.3)
+    assert health.state("m") == CLOSED
+
+
+def test_rank_reorders_within_tier_by_p50_then_cost(clock):
+    health = ProviderHealth(None, clock=clock)
+    for _ in range(5):
+        health.record_success("slow", 2.0, tokens=1000, cost_usd=0.001)
+        health.record_success("fast-pricey", 0.20, tokens=1000, cost_usd=0.01)
+        health.record_success("fast-cheap", 0.21, tokens=1000, cost_usd=0.001)
+        health.record_success("other-tier", 0.01)
+    tiers = {"slow": "light", "fast-pricey": "light", "fast-cheap": "light", "untracked": "light", "other-tier": "quality"}
+    chain = ["slow", "untracked", "fast-pricey", "other-tier", "fast-cheap"]
+    assert health.rank(chain, tiers) == ["fast-cheap", "untracked", "fast-pricey", "other-tier", "slow"]
+    assert health.rank(chain, tiers, pinned=["slow"]) == ["slow", "untracked", "fast-cheap", "other-tier", "fast-pricey"]
+
+
+def test_save_merges_concurrent_writers(tmp_path, clock):
+    path = tmp_path / "health.json"
+    first, second = ProviderHealth(path, clock=clock), ProviderHealth(path, clock=clock)
+    first.record_success("a", 0.5)
+    second.record_failure("b", "timed out")
+    first.save()
+    second.save()
+    merged = ProviderHealth(path, clock=clock)
+    assert merged.models["a"].successes == 1 and merged.models["b"].failures == 1
+    assert merged.table(["a"])[0]["p50_ms"] == pytest.approx(568.4, abs=0.1)  # upper bound of the 500ms bucket
+
+
+def test_model_tiers_lists_gateway_and_direct_models():
+    tiers = model_tiers({"tiers": {"light": {"gateway_models": ["g"], "direct_models": ["d"]}}})
+    assert tiers == {"g": "light", "d": "light"}
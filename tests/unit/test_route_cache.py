@@ -0,0 +1,58 @@
+from route_cache import RouteCache, config_fingerprint, route_key
+
+
+class Clock:
+    now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _key(fingerprint="f1", complexity="C2", unavailable=()):
+    return route_key(
+        task_type="T3",
+        complexity=complexity,
+        token_budget=20000,
+        cost_budget=0.3,
+        preferred=[],
+        unavailable=unavailable,
+        mode=None,
+        fingerprint=fingerprint,
+    )
+
+
+ROUTE = {"primary_model": "a", "fallback_chain": ["b"]}
+
+
+def test_hits_misses_ttl_and_lru():
+    clock = Clock()
+    cache = RouteCache(maxsize=2, ttl_s=10, clock=clock)
+    assert cache.get(_key()) is None
+    cache.put(_key(), ROUTE)
+    assert cache.get(_key()) == ROUTE
+    assert _key(unavailable=["x", "y"]) == _key(unavailable=["y", "x"])
+
+    cache.put(_key(complexity="C3"), ROUTE)
+    cache.get(_key())  # C2 is now the most recent
+    cache.put(_key(complexity="C4"), ROUTE)
+    assert cache.get(_key(complexity="C3")) is None and cache.evictions == 1
+
+    clock.now += 10
+    assert cache.get(_key()) is None and cache.expired == 1
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 3
+
+
+def test_disk_cache_is_shared_and_invalidated_by_config_changes(tmp_path):
+    config = tmp_path / "model_routing.json"
+    config.write_text('{"tiers": ["light"]}')
+    path = tmp_path / "route-cache.json"
+    before = config_fingerprint([config])
+    RouteCache(path=path).put(_key(before), ROUTE)
+    assert RouteCache(path=path).get(_key(before)) == ROUTE
+
+    config.write_text('{"tiers": ["light", "quality"]}')
+    after = config_fingerprint([config])
+    assert after != before
+    cache = RouteCache(path=path)
+    assert cache.get(_key(after)) is None
+    assert cache.stats()["size"] == 0  # stale entries were dropped on load
@@ -0,0 +1,65 @@
+import pytest
+import yaml
+
+import router_config
+from router_config import load_router_config, parse_router_yaml, parse_yaml_subset
+
+SUBSET_CASES = [
+    'a:\n- x\n- y: 1\n  z: [1, "two", {k: v}]\n-\n  - n\n',
+    "k: 'it''s' # comment\nq: \"a#b\\n\"\nn: ~\nf: 1.5\nb: yes\nplain: it's # comment\n",
+    "s: {a: [1, 2], b: {c: d}}\nt: []\nu: {}\nurl: http://x:80/a#b\n",
+    "outer:\n  inner:\n    - name: a\n      tags: [x]\n    - name: b\n  after: 2\n",
+]
+
+ROUTER_YAML = """\
+version: "2.0"
+tiers:
+  reasoning:
+    models: ["r1"]
+  quality:
+    models:
+      - "q1"
+  light:
+    models:
+      - l1  # trailing comment
+timeout_seconds:
+  light: 60
+"""
+
+
+@pytest.mark.parametrize("text", SUBSET_CASES)
+def test_subset_parser_matches_pyyaml(text):
+    assert parse_yaml_subset(text) == yaml.safe_load(text)
+
+
+def test_subset_parser_matches_pyyaml_on_router_config(project_root):
+    text = (project_root / ".agent/config/model_router.yaml").read_text(encoding="utf-8")
+    assert parse_router_yaml(text, use_pyyaml=False) == parse_router_yaml(text, use_pyyaml=True)
+
+
+@pytest.mark.parametrize("text", ["a: |\n  block\n", "a: &x 1\n", "a:\n  - x\n  b: 1\n", "a: 1\na: 2\n", "a: [1, 2\n"])
+def test_subset_parser_rejects_unsupported_yaml(text):
+    with pytest.raises(ValueError):
+        parse_yaml_subset(text)
+
+
+def test_load_router_config_uses_cache(tmp_path, monkeypatch):
+    path = tmp_path / "model_router.yaml"
+    path.write_text(ROUTER_YAML, encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+
+    config = load_router_config(path, cache_dir=cache_dir)
+    assert config.models_for("quality") == ("q1",)
+    assert config.timeout_for("light") == 60.0
+    assert len(list(cache_dir.glob("*.marshal"))) == 1
+
+    router_config._MEMO.clear()
+    monkeypatch.setattr(router_config, "parse_router_yaml", lambda *_a, **_k: pytest.fail("cache miss"))
+    assert load_router_config(path, cache_dir=cache_dir) == config
+
+
+def test_load_router_config_rejects_schema_violations(tmp_path):
+    path = tmp_path / "model_router.yaml"
+    path.write_text(ROUTER_YAML.replace('models: ["r1"]', "models: []"), encoding="utf-8")
+    with pytest.raises(ValueError, match="/tiers/reasoning/models"):
+        load_router_config(path, cache_dir=None)
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+from active_set_lib import gc_blob_store, publish_active_set, published_tree_hash, sha256_tree
+from skill_store import BlobStore
+
+SHARED = "def handler():\n    return {'ok': True}\n"
+
+
+@pytest.fixture
+def skills_repo(tmp_path):
+    for name in ("alpha", "beta"):
+        skill = tmp_path / "skills" / name
+        (skill / "assets").mkdir(parents=True)
+        (skill / "SKILL.md").write_text(f"# {name}\n", encoding="utf-8")
+        (skill / "assets" / "rest-api-template.py").write_text(SHARED, encoding="utf-8")
+    os.chmod(tmp_path / "skills/alpha/assets/rest-api-template.py", 0o755)
+    active_md = tmp_path / "configs/skills/ACTIVE_SKILLS.md"
+    active_md.parent.mkdir(parents=True)
+    active_md.write_text("- `skills/alpha`\n- `skills/beta`\n", encoding="utf-8")
+    return tmp_path, active_md, tmp_path / ".agent/skills"
+
+
+def _publish(skills_repo, link_mode):
+    repo_root, active_md, dest_dir = skills_repo
+    store = BlobStore(repo_root / "blobs", link_mode=link_mode)
+    manifest = publish_active_set(repo_root=repo_root, active_md=active_md, dest_dir=dest_dir, store=store)
+    return store, manifest, dest_dir
+
+
+def test_hardlinked_publish_shares_blobs_and_keeps_tree_hashes(skills_repo):
+    store, manifest, dest_dir = _publish(skills_repo, "hardlink")
+
+    assert store.stats["hardlink"] == 4
+    alpha_asset = dest_dir / "alpha/assets/rest-api-template.py"
+    beta_asset = dest_dir / "beta/assets/rest-api-template.py"
+    # Same content, different modes: one blob per mode; same mode would share the inode.
+    assert os.access(alpha_asset, os.X_OK) and not os.access(beta_asset, os.X_OK)
+    assert not os.access(beta_asset, os.W_OK) or os.geteuid() == 0
+
+    for row in manifest["skills"]:
+        skill_dir = dest_dir / row["name"]
+        assert row["sha256_tree"] == sha256_tree(skill_dir)
+        assert published_tree_hash(skill_dir, row["files"], store) == row["sha256_tree"]
+        assert all(store.is_linked(skill_dir / rel, digest) for rel, digest in row["files"].items())
+
+    on_disk = json.loads((dest_dir / ".active_set_manifest.json").read_text(encoding="utf-8"))
+    assert on_disk["skills"][0]["files"]["assets/rest-api-template.py"] == manifest["skills"][1]["files"]["assets/rest-api-template.py"]
+
+
+def test_identical_files_are_stored_once(skills_repo):
+    repo_root, _active_md, _dest_dir = skills_repo
+    os.chmod(repo_root / "skills/alpha/assets/rest-api-template.py", 0o644)
+    store, _manifest, dest_dir = _publish(skills_repo, "hardlink")
+
+    assert store.stats["stored"] == 3 and store.stats["reused"] == 1
+    a = (dest_dir / "alpha/assets/rest-api-template.py").stat()
+    b = (dest_dir / "beta/assets/rest-api-template.py").stat()
+    assert (a.st_ino, a.st_dev) == (b.st_ino, b.st_dev)
+
+
+def test_copy_mode_and_tamper_detection(skills_repo):
+    store, manifest, dest_dir = _publish(skills_repo, "copy")
+    assert store.stats["copy"] == 4
+    row = manifest["skills"][1]
+    skill_dir = dest_dir / row["name"]
+    assert published_tree_hash(skill_dir, row["files"], store) == row["sha256_tree"]
+
+    (skill_dir / "SKILL.md").write_text("# edited\n", encoding="utf-8")
+    assert published_tree_hash(skill_dir, row["files"], store) != row["sha256_tree"]
+
+
+def test_blob_edited_in_place_is_not_trusted_or_reused(skills_repo):
+    store, manifest, dest_dir = _publish(skills_repo, "hardlink")
+    row = manifest["skills"][1]
+    skill_dir = dest_dir / row["name"]
+    blob = store.path_for(row["files"]["SKILL.md"])
+    os.chmod(blob, 0o644)  # what root, or anyone who owns the store, can do
+    with blob.open("r+", encoding="utf-8") as f:
+        f.write("# evil\n")
+
+    assert not store.is_linked(skill_dir / "SKILL.md", row["files"]["SKILL.md"])
+    assert published_tree_hash(skill_dir, row["files"], store) != row["sha256_tree"]
+
+    store, manifest, dest_dir = _publish(skills_repo, "hardlink")
+    assert (dest_dir / "beta/SKILL.md").read_text(encoding="utf-8") == "# beta\n"
+    assert published_tree_hash(dest_dir / "beta", manifest["skills"][1]["files"], store) == row["sha256_tree"]
+
+
+def test_gc_removes_only_unreferenced_blobs(skills_repo):
+    repo_root, active_md, _dest_dir = skills_repo
+    store, _manifest, dest_dir = _publish(skills_repo, "hardlink")
+    active_md.write_text("- `skills/beta`\n", encoding="utf-8")
+    store, manifest, dest_dir = _publish(skills_repo, "hardlink")
+
+    removed = gc_blob_store([dest_dir], store)
+
+    # Only alpha's SKILL.md is unreferenced; manifests record digests, not modes,
+    # so the executable copy of the shared asset stays with beta's.
+    assert removed == [store.path_for(hashlib.sha256(b"# alpha\n").hexdigest())]
+    row = manifest["skills"][0]
+    assert all(store.path_for(digest).exists() for digest in row["files"].values())
+    assert published_tree_hash(dest_dir / "beta", row["files"], store) == row["sha256_tree"]
+    assert gc_blob_store([dest_dir], store) == []
+
+
+def test_unknown_link_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        BlobStore(tmp_path, link_mode="symlink")
@@ -0,0 +1,139 @@
+import json
+import sys
+import threading
+import time
+
+import pytest
+
+from active_set_lib import publish_active_set, sha256_tree, sync_active_set
+from skill_store import BlobStore
+from skill_watch import watch_active_set
+
+
+@pytest.fixture
+def skills_repo(tmp_path):
+    for name in ("alpha", "beta"):
+        skill = tmp_path / "skills" / name
+        skill.mkdir(parents=True)
+        (skill / "SKILL.md").write_text(f"# {name}\n", encoding="utf-8")
+    active_md = tmp_path / "configs/skills/ACTIVE_SKILLS.md"
+    active_md.parent.mkdir(parents=True)
+    active_md.write_text("- `skills/alpha`\n- `skills/beta`\n", encoding="utf-8")
+    return tmp_path, active_md, tmp_path / ".agent/skills"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(tmp_path / "blobs")
+
+
+def _manifest(dest_dir):
+    return json.loads((dest_dir / ".active_set_manifest.json").read_text(encoding="utf-8"))
+
+
+def test_sync_republishes_only_changed_skills(skills_repo, store):
+    repo_root, active_md, dest_dir = skills_repo
+    publish_active_set(repo_root=repo_root, active_md=active_md, dest_dir=dest_dir, store=store)
+
+    assert sync_active_set(repo_root=repo_root, active_md=active_md, dest_dir=dest_dir, store=store)["republished"] == []
+
+    (repo_root / "skills/beta/notes.md").write_text("new\n", encoding="utf-8")
+    result = sync_active_set(
+        repo_root=repo_root, active_md=active_md, dest_dir=dest_dir, names=["alpha", "beta"], store=store
+    )
+    assert result["republished"] == ["beta"]
+    rows = {row["name"]: row for row in _manifest(dest_dir)["skills"]}
+    assert rows["beta"]["sha256_tree"] == sha256_tree(dest_dir / "beta") == sha256_tree(repo_root / "skills/beta")
+
+    active_md.write_text("- `skills/beta`\n", encoding="utf-8")
+    result = sync_active_set(repo_root=repo_root, active_md=active_md, dest_dir=dest_dir, store=store)
+    assert result["removed"] == ["alpha"]
+    assert not (dest_dir / "alpha").exists()
+    assert [row["name"] for row in _manifest(dest_dir)["skills"]] == ["beta"]
+
+
+@pytest.mark.parametrize("use_inotify", [False, pytest.param(True, marks=pytest.mark.skipif(sys.platform != "linux", reason="inotify"))])
+def test_watch_republishes_edited_skill(skills_repo, store, use_inotify):
+    repo_root, active_md, dest_dir = skills_repo
+    stop = threading.Event()
+    synced = []
+    thread = threading.Thread(
+        target=watch_active_set,
+        kwargs=dict(
+            repo_root=repo_root,
+            active_md=active_md,
+            dest_dir=dest_dir,
+            on_sync=synced.append,
+            stop=stop,
+            debounce=0.05,
+            use_inotify=use_inotify,
+            interval=0.05,
+            store=store,
+        ),
+    )
+    thread.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not synced and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert synced[0]["republished"] == ["alpha", "beta"]
+        time.sleep(0.1)  # let the polling watcher take its first snapshot
+
+        for i in range(3):  # a burst of writes is debounced into one republish
+            (repo_root / "skills/alpha/SKILL.md").write_text(f"# alpha v{i}\n", encoding="utf-8")
+        while len(synced) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        stop.set()
+        thread.join(timeout=5)
+
+    assert synced[1]["republished"] == ["alpha"]
+    assert (dest_dir / "alpha/SKILL.md").read_text(encoding="utf-8") == "# alpha v2\n"
+
+
+@pytest.mark.parametrize("use_inotify", [False, pytest.param(True, marks=pytest.mark.skipif(sys.platform != "linux", reason="inotify"))])
+def test_watch_survives_active_skills_md_going_missing(skills_repo, store, use_inotify):
+    repo_root, active_md, dest_dir = skills_repo
+    stop = threading.Event()
+    synced = []
+    thread = threading.Thread(
+        target=watch_active_set,
+        kwargs=dict(
+            repo_root=repo_root,
+            active_md=active_md,
+            dest_dir=dest_dir,
+            on_sync=synced.append,
+            stop=stop,
+            debounce=0.05,
+            use_inotify=use_inotify,
+            interval=0.05,
+            store=store,
+        ),
+    )
+
+    def wait_for(predicate):
+        deadline = time.monotonic() + 5
+        while not any(predicate(r) for r in synced) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return any(predicate(r) for r in synced)
+
+    thread.start()
+    try:
+        assert wait_for(lambda r: r["republished"] == ["alpha", "beta"])
+        time.sleep(0.1)  # let the polling watcher take its first snapshot
+
+        active_md.unlink()
+        assert wait_for(lambda r: "error" in r)
+        time.sleep(0.2)  # the watches are rebuilt after the failed resync
+        assert thread.is_alive()
+
+        active_md.write_text("- `skills/alpha`\n", encoding="utf-8")
+        assert wait_for(lambda r: r["removed"] == ["beta"])
+        time.sleep(0.1)
+        (repo_root / "skills/alpha/SKILL.md").write_text("# alpha v2\n", encoding="utf-8")
+        assert wait_for(lambda r: r["republished"] == ["alpha"])
+    finally:
+        stop.set()
+        thread.join(timeout=5)
+
+    assert (dest_dir / "alpha/SKILL.md").read_text(encoding="utf-8") == "# alpha v2\n"
@@ -0,0 +1,61 @@
+import json
+import re
+from dataclasses import fields
+
+from export_mapping import map_snapshot_to_export_config
+from snapshot_model import (
+    ConfigurationSnapshot,
+    GraphEdge,
+    GraphMember,
+    GraphNode,
+    StructureGraph,
+    decode_snapshot,
+    load_snapshot,
+)
+
+FIELD_ALIASES = {"from": "source", "to": "target"}
+
+
+def _field_names(schema_properties):
+    names = set()
+    for prop in schema_properties:
+        prop = FIELD_ALIASES.get(prop, prop)
+        names.add(re.sub(r"(?<!^)(?=[A-Z])", "_", prop).lower())
+    return names
+
+
+class TestSnapshotModel:
+    def test_model_fields_follow_schemas(self, schemas_dir):
+        snapshot_schema = json.loads((schemas_dir / "configuration-snapshot.schema.json").read_text())
+        graph_schema = json.loads((schemas_dir / "structure-graph.schema.json").read_text())
+        graph_props = graph_schema["properties"]
+
+        assert {f.name for f in fields(ConfigurationSnapshot)} == _field_names(snapshot_schema["properties"])
+        assert {f.name for f in fields(StructureGraph)} == _field_names(graph_props)
+        assert {f.name for f in fields(GraphNode)} == _field_names(graph_props["nodes"]["items"]["properties"])
+        assert {f.name for f in fields(GraphMember)} == _field_names(graph_props["members"]["items"]["properties"])
+        assert {f.name for f in fields(GraphEdge)} == _field_names(graph_props["edges"]["items"]["properties"])
+
+    def test_decode_normalizes_malformed_members(self):
+        snapshot = decode_snapshot(
+            {
+                "stateId": "s1",
+                "dimensions": {"width": "900", "height": None},
+                "graph": {"nodes": {"a": {"id": "a", "article": 100}, "b": "junk"}, "edges": [{"from": "a"}, 3]},
+                "bom": [{"article": "100002"}, "junk"],
+            }
+        )
+        assert snapshot.dimensions.width == 900
+        assert snapshot.dimensions.height is None
+        assert snapshot.graph.nodes == (GraphNode(id="a", kind=None, article="100", geom=None, transform=None),)
+        assert snapshot.graph.edges == (GraphEdge(source="a", target="", type=None),)
+        assert snapshot.bom == ({"article": "100002"},)
+        assert snapshot.structure_graph is None
+
+    def test_mapping_accepts_decoded_snapshot(self, examples_dir):
+        path = examples_dir / "example.snapshot.json"
+        from_dict = map_snapshot_to_export_config(json.loads(path.read_text()), "p1")
+        from_model = map_snapshot_to_export_config(load_snapshot(path), "p1")
+        from_dict["meta"].pop("createdAt")
+        from_model["meta"].pop("createdAt")
+        assert from_dict == from_model
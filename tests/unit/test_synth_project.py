@@ -0,0 +1,46 @@
+from collections import Counter
+
+import pytest
+
+from export_mapping import map_snapshot_to_export_config
+from snapshot_model import decode_snapshot
+from synth_project import generate_snapshot, load_article_catalog
+
+
+def test_snapshot_is_deterministic_and_sized_as_requested():
+    snapshot = generate_snapshot(2_000, edges=3_500, walls=4, seed=7)
+    assert snapshot == generate_snapshot(2_000, edges=3_500, walls=4, seed=7)
+    assert snapshot != generate_snapshot(2_000, edges=3_500, walls=4, seed=8)
+
+    graph = snapshot["graph"]
+    ids = {n["id"] for n in graph["nodes"]}
+    assert len(ids) == 2_000 and len(graph["edges"]) == 3_500
+    assert all(e["from"] in ids and e["to"] in ids for e in graph["edges"])
+    assert {line["comment"] for line in snapshot["bom"]} == {f"Стена {i}" for i in range(1, 5)}
+
+
+def test_articles_come_from_the_catalog_and_bom_matches_the_graph():
+    catalog = load_article_catalog()
+    articles = {item["article"] for items in catalog.values() for item in items}
+    snapshot = generate_snapshot(5_000, seed=1)
+    nodes = snapshot["graph"]["nodes"]
+
+    kinds = Counter(n["kind"] for n in nodes)
+    assert kinds.most_common(1)[0][0] == "profile"
+    assert {n["article"] for n in nodes} <= articles
+
+    profile_mm = sum(
+        abs(n["geom"]["end"]["x"] - n["geom"]["start"]["x"]) + abs(n["geom"]["end"]["y"] - n["geom"]["start"]["y"])
+        for n in nodes
+        if n["kind"] == "profile"
+    )
+    assert sum(line["qty"] for line in snapshot["bom"] if line["uom"] == "mm") == profile_mm
+    assert sum(line["qty"] for line in snapshot["bom"] if line["uom"] == "pcs") == len(nodes) - kinds["profile"]
+
+    config = map_snapshot_to_export_config(decode_snapshot(snapshot), "synthetic")
+    assert len(config["elements"]) == 5_000 and config["bom"]["lines"] == snapshot["bom"]
+
+
+def test_rejects_empty_projects():
+    with pytest.raises(ValueError):
+        generate_snapshot(0)
@@ -0,0 +1,62 @@
+import pytest
+
+from text_norm import KeywordTable, analyze, stem, stem_english, stem_russian
+
+
+@pytest.mark.parametrize(
+    "word, expected",
+    [
+        ("caresses", "caress"), ("ponies", "poni"), ("hopping", "hop"), ("agreed", "agre"),
+        ("relational", "relat"), ("generously", "generous"), ("dependencies", "depend"), ("refactoring", "refactor"),
+    ],
+)
+def test_english_stems(word, expected):
+    assert stem_english(word) == expected
+
+
+@pytest.mark.parametrize(
+    "word, expected",
+    [
+        ("ошибка", "ошибк"), ("ошибкой", "ошибк"), ("исправить", "исправ"), ("платежей", "платеж"),
+        ("вавилонской", "вавилонск"), ("красивейшая", "красив"), ("безопасность", "безопасн"), ("ёлка", "елк"),
+    ],
+)
+def test_russian_stems(word, expected):
+    assert stem_russian(word) == expected
+
+
+def test_stem_picks_language_by_script():
+    assert stem("errors") == "error"
+    assert stem("ошибки") == "ошибк"
+    assert stem("e2e") == "e2e"
+
+
+def test_analyze_splits_identifiers_and_is_cached():
+    doc = analyze("Fix package.json in snake_case")
+    assert doc.tokens == ("fix", "package", "json", "in", "snake", "case")
+    assert analyze("Fix package.json in snake_case") is doc
+
+
+def test_keyword_table_matches_whole_tokens_stems_prefixes_and_phrases():
+    table = KeywordTable(
+        {
+            "pay": ["ton", "ton connect", "оплат*"],
+            "ci": ["ci", "package.json"],
+            "err": ["ошибка", "не работает", "fail*"],
+        }
+    )
+    assert table.matches("Move the button on the decision screen") == {}
+    assert table.matches("Подключить TON Connect и оплату") == {"pay": ["ton", "ton connect", "оплат*"]}
+    assert table.counts("CI breaks when package.json changes") == {"ci": 2}
+    assert table.counts("Ошибки: оплата не работают, tests failing") == {"pay": 1, "err": 3}
+
+
+def test_keyword_without_word_characters_is_rejected():
+    with pytest.raises(ValueError):
+        KeywordTable({"x": ["<>"]})
+
+
+def test_exact_keyword_word_matches_only_the_token():
+    table = KeywordTable({"design": ["=тема", "тёмная =тема"]})
+    assert table.matches("Светлая тема и тёмная тема") == {"design": ["=тема", "тёмная =тема"]}
+    assert table.matches("тем более, темы нет") == {}
@@ -0,0 +1,77 @@
+import math
+import sys
+import threading
+import time
+
+from router_config import RouterConfig
+from tool_pool import RingBuffer, ToolCall, ToolPool
+
+PY = sys.executable
+
+
+def _router(**timeouts):
+    return RouterConfig(None, None, 0, timeouts, {}, (), {}, "")
+
+
+def test_ring_buffer_keeps_the_tail():
+    ring = RingBuffer(8)
+    for chunk in (b"abc", b"defgh", b"ij", b"klmnopqrstu"):
+        ring.write(chunk)
+    assert ring.getvalue() == b"nopqrstu" and ring.dropped == 13
+    small = RingBuffer(8)
+    small.write(b"abc")
+    assert small.getvalue() == b"abc" and small.dropped == 0
+
+
+def test_output_is_streamed_and_capped():
+    chunks = []
+    script = "import sys\nfor i in range(2000): print('line', i)\nsys.stderr.write('oops')\n"
+    with ToolPool(router=_router(light=30), capture_bytes=64, observer=lambda c, s, d: chunks.append((s, d))) as pool:
+        result = pool.run(ToolCall(PY, ("-c", script), correlation_id="t"))
+    assert result.status == "ok" and result.exit_code == 0
+    assert result.stdout.endswith("line 1999\n") and len(result.stdout) == 64
+    assert result.stdout_dropped > 0 and result.stderr == "oops"
+    assert b"".join(d for s, d in chunks if s == "stdout").count(b"\n") == 2000
+
+
+def test_timeout_comes_from_the_router_tier():
+    with ToolPool(router=_router(light=0.3, reasoning=30)) as pool:
+        started = time.monotonic()
+        result = pool.run(ToolCall(PY, ("-c", "import time; print('started', flush=True); time.sleep(30)")))
+        assert time.monotonic() - started < 10
+        assert pool.timeout_for(ToolCall("x", tier="reasoning")) == 30
+    assert result.error == "TIMEOUT" and result.timeout_s == 0.3
+    assert result.stdout == "started\n" and result.exit_code != 0
+
+
+def test_infinite_timeout_overrides_the_tier():
+    with ToolPool(router=_router(light=0.1)) as pool:
+        result = pool.run(ToolCall(PY, ("-c", "import time; time.sleep(0.5); print('done')"), timeout=math.inf))
+    assert result.status == "ok" and result.stdout == "done\n" and result.timeout_s is None
+
+
+def test_mode_limits_bound_concurrency():
+    running = {"read": 0, "write": 0}
+    peak = {"read": 0, "write": 0}
+    lock = threading.Lock()
+
+    def observer(call, stream, data):
+        with lock:
+            running[call.mode] += 1
+            peak[call.mode] = max(peak[call.mode], running[call.mode])
+        time.sleep(0.05)
+        with lock:
+            running[call.mode] -= 1
+
+    calls = [ToolCall(PY, ("-c", "print(1)"), mode=mode) for mode in ("read", "write") * 4]
+    with ToolPool(router=_router(light=30), limits={"read": 3, "write": 1}, observer=observer) as pool:
+        results = pool.map(calls)
+    assert [r.status for r in results] == ["ok"] * 8
+    assert peak["write"] == 1 and peak["read"] <= 3
+
+
+def test_missing_tool_and_failing_exit():
+    with ToolPool(router=_router()) as pool:
+        missing, failing = pool.map([ToolCall("no-such-tool-xyz"), ToolCall(PY, ("-c", "raise SystemExit(3)"))])
+    assert (missing.error, missing.exit_code) == ("TOOL_NOT_FOUND", 127)
+    assert (failing.error, failing.exit_code, failing.timeout_s) == ("NON_ZERO_EXIT", 3, 60.0)
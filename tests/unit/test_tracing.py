@@ -0,0 +1,85 @@
+import contextvars
+import threading
+
+import pytest
+
+from json_io import loads
+from tracing import Tracer, iter_spans, summarize
+
+
+def _records(path):
+    return [loads(line) for line in path.read_bytes().splitlines()]
+
+
+def test_spans_nest_record_errors_and_flush_as_ndjson(tmp_path):
+    tracer = Tracer(tmp_path, flush_interval_s=60)
+    forwarded = []
+    tracer.forward_events(lambda name, payload: forwarded.append((name, payload)))
+    with tracer.span("route", cache="disk") as root:
+        with tracer.span("triage") as child:
+            child.set(task_type="T3")
+        tracer.event("route_decision", {"primary_model": "m"})
+        with pytest.raises(ValueError):
+            with tracer.span("retrieval"):
+                raise ValueError("boom")
+        root.set(hit=True)
+    tracer.close()
+
+    records = _records(tmp_path / "spans.ndjson")
+    spans = {r["name"]: r for r in records if r["type"] == "span"}
+    assert spans["triage"]["parent_id"] == spans["route"]["span_id"]
+    assert spans["triage"]["trace_id"] == spans["route"]["trace_id"]
+    assert spans["route"]["attrs"] == {"cache": "disk", "hit": True}
+    assert spans["retrieval"]["status"] == "error" and "boom" in spans["retrieval"]["error"]
+    assert [r["name"] for r in records if r["type"] == "event"] == ["route_decision"]
+    assert forwarded == [("route_decision", {"primary_model": "m"})]
+
+
+def test_sampling_is_decided_per_trace(tmp_path):
+    tracer = Tracer(tmp_path, sample_rate=0.0)
+    forwarded = []
+    tracer.forward_events(lambda name, payload: forwarded.append(name))
+    with tracer.span("root"):
+        with tracer.span("child"):
+            tracer.event("route_cache", {"hit": False})
+    tracer.close()
+    assert not (tmp_path / "spans.ndjson").exists()
+    assert forwarded == ["route_cache"]  # forwarded events are not subject to sampling
+
+
+def test_ring_drops_oldest_when_full(tmp_path):
+    tracer = Tracer(tmp_path, capacity=3, flush_interval_s=60)
+    for i in range(5):
+        with tracer.span(f"s{i}"):
+            pass
+    tracer.close()
+    assert tracer.dropped == 2
+    assert [r["name"] for r in _records(tmp_path / "spans.ndjson")] == ["s2", "s3", "s4"]
+
+
+def test_spans_in_worker_threads_nest_under_the_submitting_span(tmp_path):
+    tracer = Tracer(tmp_path)
+
+    def check():
+        with tracer.span("check.env"):
+            pass
+
+    with tracer.span("doctor"):
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(check,))
+        worker.start()
+        worker.join()
+    tracer.close()
+    spans = {r["name"]: r for r in _records(tmp_path / "spans.ndjson")}
+    assert spans["check.env"]["parent_id"] == spans["doctor"]["span_id"]
+
+
+def test_otlp_files_summarize_like_ndjson(tmp_path):
+    for fmt in ("ndjson", "otlp"):
+        tracer = Tracer(tmp_path / fmt, fmt=fmt)
+        for _ in range(3):
+            with tracer.span("export_dxf.write"):
+                pass
+        tracer.close()
+        rows = summarize(iter_spans(sorted((tmp_path / fmt).glob("spans.*"))))
+        assert [(r["span"], r["count"], r["errors"]) for r in rows] == [("export_dxf.write", 3, 0)]
+        assert rows[0]["p50_ms"] <= rows[0]["p95_ms"] <= rows[0]["max_ms"]
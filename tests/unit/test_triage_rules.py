@@ -0,0 +1,19 @@
+from triage_rules import guess_complexity, guess_task_type
+
+
+def test_task_type_and_complexity():
+    assert guess_task_type("Исправь ошибку в форме логина") == "T2"
+    assert guess_task_type("Подключить оплату через TON Connect") == "T7"
+    assert guess_task_type("Refactor the module architecture") == "T4"
+    assert guess_task_type("Добавь новый эндпоинт") == "T3"
+    assert guess_complexity("Rotate key in production") == "C5"
+    assert guess_complexity("Fix a typo in README") == "C1"
+    assert guess_complexity("Обнови текст кнопки") == "C2"
+
+
+def test_short_design_words_match_only_as_written():
+    assert guess_task_type("Тема оформления: поменяй цвет кнопок") == "T6"
+    assert guess_task_type("Нужна тёмная тема") == "T6"
+    # "тема" and the pronoun "тем" share a stem; "тем более" is not about design.
+    assert guess_task_type("Сделай экспорт, тем более что API уже есть") == "T3"
+    assert guess_task_type("Поговорим о тем, кто пишет тесты") == "T3"